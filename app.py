@@ -1,411 +1,818 @@
-import tkinter as tk
-from tkinter import ttk, messagebox, filedialog
-from typing import List, Dict, Any, Optional
-from optimization import optimize_parts, draw_cutting_plan
-from file_handlers import (
-    save_project, load_project,
-    export_to_excel, export_to_pdf,
-    import_from_csv, export_to_csv,
-    safe_get_part_attr,
-)
-from gui_helpers import register_fonts, show_about, update_status, Translator, validate_positive_number
-from theme_manager import ThemeManager
-from constants import DEFAULT_STOCK_LENGTH, DEFAULT_KERF, DEFAULT_LANGUAGE, DEFAULT_THEME, LANGUAGES
-
-
-class OptimizationApp:
-    def __init__(self, root: tk.Tk) -> None:
-        self.root = root
-        register_fonts()
-
-        self.translator = Translator(DEFAULT_LANGUAGE)
-        self.theme_manager = ThemeManager(root)
-        self.theme_manager.set_theme(DEFAULT_THEME)
-
-        # Parametreler
-        self.stock_length = DEFAULT_STOCK_LENGTH
-        self.kerf = DEFAULT_KERF
-        self.trials = 20
-        self.algorithm = "first_fit"
-        self.stock_unit_price = 1.0
-
-        self.parts_data: List[Dict[str, Any]] = []
-        self.optimization_result_data: Optional[Any] = None
-
-        self._create_widgets()
-        self._setup_menu()
-        self._setup_status_bar()
-
-    def _create_widgets(self) -> None:
-        self.main_frame = ttk.Frame(self.root)
-        self.main_frame.pack(fill="both", expand=True, padx=10, pady=10)
-
-        # Parça Giriş Alanları
-        entry_frame = ttk.Frame(self.main_frame)
-        entry_frame.pack(fill="x", pady=5)
-
-        ttk.Label(entry_frame, text="Parça Adı:").grid(row=0, column=0, sticky="w")
-        self.part_name_var = tk.StringVar()
-        ttk.Entry(entry_frame, width=15, textvariable=self.part_name_var).grid(row=0, column=1)
-
-        ttk.Label(entry_frame, text="Parça Uzunluğu (mm):").grid(row=0, column=2, sticky="w", padx=(10,0))
-        self.part_length_var = tk.StringVar()
-        ttk.Entry(entry_frame, width=10, textvariable=self.part_length_var).grid(row=0, column=3)
-
-        ttk.Label(entry_frame, text="Adet:").grid(row=0, column=4, sticky="w", padx=(10,0))
-        self.part_quantity_var = tk.StringVar()
-        ttk.Entry(entry_frame, width=5, textvariable=self.part_quantity_var).grid(row=0, column=5)
-
-        add_part_btn = ttk.Button(entry_frame, text=self.translator.translate("add_part"), command=self._add_part)
-        add_part_btn.grid(row=0, column=6, padx=10)
-
-        # Butonlar çerçevesi
-        button_frame_2 = ttk.Frame(self.main_frame)
-        button_frame_2.pack(fill="x", pady=5)
-
-        edit_part_btn = ttk.Button(button_frame_2, text=self.translator.translate("edit_part"), command=self._edit_selected_part)
-        edit_part_btn.pack(side="left", padx=(0,10))
-
-        delete_part_btn = ttk.Button(button_frame_2, text=self.translator.translate("delete_part"), command=self._delete_selected_part)
-        delete_part_btn.pack(side="left", padx=(0,10))
-
-        delete_all_btn = ttk.Button(button_frame_2, text=self.translator.translate("delete_all_parts"), command=self._delete_all_parts)
-        delete_all_btn.pack(side="left", padx=(0,10))
-
-        # Parça Listesi Treeview
-        self.parts_tree = ttk.Treeview(self.main_frame, columns=("name", "length", "quantity"), show="headings", height=8)
-        self.parts_tree.heading("name", text=self.translator.translate("add_part"))
-        self.parts_tree.heading("length", text="Uzunluk (mm)")
-        self.parts_tree.heading("quantity", text="Adet")
-        self.parts_tree.pack(fill="both", expand=True, pady=5)
-
-        # Matplotlib Görselleştirme Tuvali
-        import matplotlib.pyplot as plt
-        from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
-
-        self.fig, self.ax = plt.subplots(figsize=(7,4))
-        self.canvas = FigureCanvasTkAgg(self.fig, master=self.main_frame)
-        self.canvas.get_tk_widget().pack(fill="both", expand=True, pady=10)
-
-        # Optimize Et, Excel ve PDF Butonları yanyana frame içinde
-        button_frame = ttk.Frame(self.main_frame)
-        button_frame.pack(pady=10)
-
-        self.optimize_button = ttk.Button(button_frame, text=self.translator.translate("optimize"), command=self._optimize)
-        self.optimize_button.pack(side="left", padx=5)
-
-        self.export_excel_button = ttk.Button(button_frame, text=self.translator.translate("export_excel"), command=self._export_excel)
-        self.export_excel_button.pack(side="left", padx=5)
-
-        self.export_pdf_button = ttk.Button(button_frame, text=self.translator.translate("export_pdf"), command=self._export_pdf)
-        self.export_pdf_button.pack(side="left", padx=5)
-
-    def _setup_menu(self) -> None:
-        menubar = tk.Menu(self.root)
-
-        # Dosya Menüsü
-        file_menu = tk.Menu(menubar, tearoff=0)
-        file_menu.add_command(label=self.translator.translate("project_save"), command=self._save_project)
-        file_menu.add_command(label=self.translator.translate("project_load"), command=self._load_project)
-        file_menu.add_command(label=self.translator.translate("import_csv"), command=self._import_csv)
-        file_menu.add_command(label=self.translator.translate("export_csv"), command=self._export_csv)
-        file_menu.add_separator()
-        file_menu.add_command(label=self.translator.translate("export_excel"), command=self._export_excel)
-        file_menu.add_command(label=self.translator.translate("export_pdf"), command=self._export_pdf)
-        file_menu.add_separator()
-        file_menu.add_command(label=self.translator.translate("exit"), command=self.root.quit)
-        menubar.add_cascade(label=self.translator.translate("file"), menu=file_menu)
-
-        # Tema Menüsü
-        theme_menu = tk.Menu(menubar, tearoff=0)
-        theme_menu.add_command(label=self.translator.translate("theme_select"), command=self.theme_manager.show_theme_dialog)
-        menubar.add_cascade(label=self.translator.translate("theme"), menu=theme_menu)
-
-        # Dil Menüsü
-        lang_menu = tk.Menu(menubar, tearoff=0)
-        for lang_code in LANGUAGES.keys():
-            lang_name = LANGUAGES[lang_code].get(lang_code, lang_code)
-            lang_menu.add_command(label=lang_name, command=lambda c=lang_code: self._set_language(c))
-        menubar.add_cascade(label=self.translator.translate("language_select"), menu=lang_menu)
-
-        # Ayarlar Menüsü
-        settings_menu = tk.Menu(menubar, tearoff=0)
-        settings_menu.add_command(label=self.translator.translate("settings"), command=self._show_settings_dialog)
-        menubar.add_cascade(label=self.translator.translate("settings_menu"), menu=settings_menu)
-
-        # Yardım Menüsü
-        help_menu = tk.Menu(menubar, tearoff=0)
-        help_menu.add_command(label=self.translator.translate("about"), command=lambda: show_about(self.root))
-        menubar.add_cascade(label=self.translator.translate("help"), menu=help_menu)
-
-        self.root.config(menu=menubar)
-
-    def _setup_status_bar(self) -> None:
-        self.status_bar = ttk.Label(self.root, relief=tk.SUNKEN, anchor="w")
-        self.status_bar.pack(side=tk.BOTTOM, fill=tk.X)
-        update_status(self.status_bar, self.translator.translate("ready"))
-
-    # ---- Parça Ekleme-Düzenleme-Silme ----
-
-    def _add_part(self) -> None:
-        name = self.part_name_var.get().strip()
-        if not name:
-            messagebox.showerror("Hata", "Parça adı boş olamaz.")
-            return
-        if not validate_positive_number(self.part_length_var.get()):
-            messagebox.showerror("Hata", self.translator.translate("error_invalid_input"))
-            return
-        if not validate_positive_number(self.part_quantity_var.get()):
-            messagebox.showerror("Hata", self.translator.translate("error_invalid_input"))
-            return
-
-        try:
-            length = float(self.part_length_var.get())
-            quantity = int(self.part_quantity_var.get())
-            new_part = {"name": name, "length": length, "quantity": quantity}
-            self.parts_data.append(new_part)
-            self.parts_tree.insert("", "end", values=(name, length, quantity))
-            self.part_name_var.set("")
-            self.part_length_var.set("")
-            self.part_quantity_var.set("")
-            update_status(self.status_bar, f"Parça eklendi: {name}, Uzunluk={length} mm, Adet={quantity}", duration_ms=3000)
-        except Exception as e:
-            messagebox.showerror("Hata", f"Parça eklenirken hata oluştu:\n{e}")
-
-    def _edit_selected_part(self) -> None:
-        selected_items = self.parts_tree.selection()
-        if not selected_items:
-            messagebox.showwarning("Uyarı", self.translator.translate("warning_select_part"))
-            return
-        item = selected_items[0]
-        values = self.parts_tree.item(item, "values")
-        name, length, quantity = values
-        self.part_name_var.set(name)
-        self.part_length_var.set(length)
-        self.part_quantity_var.set(quantity)
-        self.parts_tree.delete(item)
-        for i, part in enumerate(self.parts_data):
-            if (part["name"] == name and
-                    float(part["length"]) == float(length) and
-                    int(part["quantity"]) == int(quantity)):
-                del self.parts_data[i]
-                break
-        update_status(self.status_bar, "Parça düzenlemesi için form dolduruldu.", duration_ms=3000)
-
-    def _delete_selected_part(self) -> None:
-        selected_items = self.parts_tree.selection()
-        if not selected_items:
-            messagebox.showwarning("Uyarı", self.translator.translate("warning_select_part"))
-            return
-        for item in selected_items:
-            values = self.parts_tree.item(item, "values")
-            name, length_str, quantity_str = values
-            length = float(length_str)
-            quantity = int(quantity_str)
-            for i, part in enumerate(self.parts_data):
-                if (part["name"] == name and
-                        float(part["length"]) == length and
-                        int(part["quantity"]) == quantity):
-                    del self.parts_data[i]
-                    break
-            self.parts_tree.delete(item)
-        update_status(self.status_bar, "Seçili parça(lar) silindi.", duration_ms=3000)
-
-    def _delete_all_parts(self) -> None:
-        if not self.parts_data:
-            messagebox.showinfo("Bilgi", "Listede silinecek parça yok.")
-            return
-        if messagebox.askyesno("Onay", self.translator.translate("confirm_delete_all")):
-            self.parts_data.clear()
-            for item in self.parts_tree.get_children():
-                self.parts_tree.delete(item)
-            update_status(self.status_bar, "Tüm parçalar silindi.", duration_ms=3000)
-
-    # ---- Optimizasyon ve Grafik ----
-
-    def _optimize(self) -> None:
-        if not self.parts_data:
-            messagebox.showwarning("Uyarı", "Lütfen önce parça verilerini ekleyin.")
-            update_status(self.status_bar, "Parça verisi yok")
-            return
-        try:
-            optimize_result = optimize_parts(
-                self.parts_data,
-                self.stock_length,
-                self.kerf,
-                trials=self.trials,
-                algorithm=self.algorithm,
-            )
-            self.optimization_result_data = optimize_result
-            self._draw_cutting_plan()
-            update_status(self.status_bar, self.translator.translate("optimization_complete"))
-        except Exception as e:
-            messagebox.showerror("Hata", f"{self.translator.translate('optimization_error')}\n{e}")
-            update_status(self.status_bar, self.translator.translate("optimization_error"))
-
-    def _draw_cutting_plan(self) -> None:
-        if self.optimization_result_data is None:
-            update_status(self.status_bar, "Görselleştirilecek veri yok")
-            return
-        try:
-            kerf_val = (
-                self.optimization_result_data.get("kerf", self.kerf)
-                if isinstance(self.optimization_result_data, dict)
-                else self.kerf
-            )
-            draw_cutting_plan(self.ax, self.canvas, self.optimization_result_data,
-                              stock_length=self.stock_length, kerf=kerf_val)
-            update_status(self.status_bar, "Kesim planı çizildi.")
-        except Exception as e:
-            messagebox.showerror("Hata", f"Kesim planı çizilirken hata oluştu:\n{e}")
-            update_status(self.status_bar, "Çizim hatası")
-
-    # ---- Dosya İşlemleri ----
-
-    def _save_project(self) -> None:
-        try:
-            save_project(self.parts_data, self.stock_length, self.kerf)
-            update_status(self.status_bar, "Proje kaydedildi.")
-        except Exception as e:
-            messagebox.showerror("Hata", f"Dosya kaydedilemedi:\n{e}")
-            update_status(self.status_bar, "Kaydetme hatası")
-
-    def _load_project(self) -> None:
-        try:
-            result = load_project()
-            if result:
-                parts, stock_length, kerf = result
-                self.parts_data = parts
-                self.stock_length = stock_length
-                self.kerf = kerf
-                self.parts_tree.delete(*self.parts_tree.get_children())
-                for part in self.parts_data:
-                    self.parts_tree.insert("", "end", values=(
-                        safe_get_part_attr(part, "name", ""),
-                        safe_get_part_attr(part, "length", 0),
-                        safe_get_part_attr(part, "quantity", 0)
-                    ))
-                update_status(self.status_bar, "Proje yüklendi.")
-            else:
-                update_status(self.status_bar, "Proje yükleme iptal edildi.")
-        except Exception as e:
-            messagebox.showerror("Hata", f"Dosya yüklenemedi:\n{e}")
-            update_status(self.status_bar, "Yükleme hatası")
-
-    # ---- CSV İşlemleri ----
-
-    def _import_csv(self) -> None:
-        try:
-            imported = import_from_csv()
-            if imported:
-                self.parts_data = imported
-                self.parts_tree.delete(*self.parts_tree.get_children())
-                for part in self.parts_data:
-                    self.parts_tree.insert("", "end", values=(
-                        safe_get_part_attr(part, "name", ""),
-                        safe_get_part_attr(part, "length", 0),
-                        safe_get_part_attr(part, "quantity", 0)
-                    ))
-                update_status(self.status_bar, "CSV dosyası içe aktarıldı.", 3000)
-        except Exception as e:
-            messagebox.showerror("Hata", f"CSV içe aktarılırken hata oluştu:\n{e}")
-
-    def _export_csv(self) -> None:
-        if not self.parts_data:
-            messagebox.showinfo("Bilgi", "Dışa aktarılacak veri bulunmamaktadır.")
-            return
-        try:
-            export_to_csv(self.parts_data)
-        except Exception as e:
-            messagebox.showerror("Hata", f"CSV dışa aktarılırken hata oluştu:\n{e}")
-
-    # ---- Excel & PDF Dışa Aktarma ----
-
-    def _export_excel(self) -> None:
-        if not self.optimization_result_data:
-            messagebox.showinfo("Bilgi", "Önce optimizasyon yapılmalı.")
-            return
-        file_path = filedialog.asksaveasfilename(defaultextension=".xlsx", filetypes=[("Excel Dosyaları", "*.xlsx")])
-        if file_path:
-            try:
-                export_to_excel(self.optimization_result_data, file_path, self.stock_unit_price)
-            except Exception as e:
-                messagebox.showerror("Hata", f"Excel dışa aktarılırken hata oluştu:\n{e}")
-
-    def _export_pdf(self) -> None:
-        if not self.optimization_result_data:
-            messagebox.showinfo("Bilgi", "Önce optimizasyon yapılmalı.")
-            return
-        file_path = filedialog.asksaveasfilename(defaultextension=".pdf", filetypes=[("PDF Dosyaları", "*.pdf")])
-        if file_path:
-            try:
-                export_to_pdf(self.optimization_result_data, file_path, self.stock_unit_price)
-            except Exception as e:
-                messagebox.showerror("Hata", f"PDF dışa aktarılırken hata oluştu:\n{e}")
-
-    # ---- Tema ve Dil Yönetimi ----
-
-    def _set_language(self, lang_code: str) -> None:
-        self.translator.set_language(lang_code)
-        self._refresh_ui_texts()
-
-    def _refresh_ui_texts(self) -> None:
-        # Menü ve buton yazıları dahil tüm metinleri güncelle
-
-        # Menü yeniden oluştur
-        self._setup_menu()
-
-        # Butonlar
-        self.optimize_button.config(text=self.translator.translate("optimize"))
-        self.export_excel_button.config(text=self.translator.translate("export_excel"))
-        self.export_pdf_button.config(text=self.translator.translate("export_pdf"))
-
-        # Diğer statik metin alanlarını da güncellemek isterseniz buraya ekleyin, örn. Treeview başlığı vs.
-
-    def _show_settings_dialog(self) -> None:
-        dialog = tk.Toplevel(self.root)
-        dialog.title(self.translator.translate("settings"))
-        dialog.resizable(False, False)
-
-        ttk.Label(dialog, text=self.translator.translate("stock_length")).grid(row=0, column=0, sticky="w", padx=5, pady=5)
-        stock_length_var = tk.StringVar(value=str(self.stock_length))
-        ttk.Entry(dialog, textvariable=stock_length_var).grid(row=0, column=1, padx=5, pady=5)
-
-        ttk.Label(dialog, text=self.translator.translate("kerf_label")).grid(row=1, column=0, sticky="w", padx=5, pady=5)
-        kerf_var = tk.StringVar(value=str(self.kerf))
-        ttk.Entry(dialog, textvariable=kerf_var).grid(row=1, column=1, padx=5, pady=5)
-
-        ttk.Label(dialog, text=self.translator.translate("trials_label")).grid(row=2, column=0, sticky="w", padx=5, pady=5)
-        trials_var = tk.StringVar(value=str(self.trials))
-        ttk.Entry(dialog, textvariable=trials_var).grid(row=2, column=1, padx=5, pady=5)
-
-        ttk.Label(dialog, text=self.translator.translate("algorithm_label")).grid(row=3, column=0, sticky="w", padx=5, pady=5)
-        alg_var = tk.StringVar(value=self.algorithm)
-        ttk.Combobox(dialog, textvariable=alg_var, values=["first_fit", "genetic"], state="readonly").grid(row=3, column=1, padx=5, pady=5)
-
-        ttk.Label(dialog, text=self.translator.translate("stock_unit_price_label")).grid(row=4, column=0, sticky="w", padx=5, pady=5)
-        price_var = tk.StringVar(value=str(self.stock_unit_price))
-        ttk.Entry(dialog, textvariable=price_var).grid(row=4, column=1, padx=5, pady=5)
-
-        def on_save():
-            try:
-                sl = int(stock_length_var.get())
-                kf = int(kerf_var.get())
-                tr = int(trials_var.get())
-                alg = alg_var.get()
-                price = float(price_var.get())
-                if sl <= 0 or kf <= 0 or tr <= 0 or price < 0:
-                    raise ValueError()
-                self.stock_length = sl
-                self.kerf = kf
-                self.trials = tr
-                self.algorithm = alg
-                self.stock_unit_price = price
-                dialog.destroy()
-                update_status(self.status_bar,
-                              f"Ayarlar güncellendi: Stok={sl}, Kerf={kf}, Deneme={tr}, Alg={alg}, Fiyat={price} TL/mm", 5000)
-            except ValueError:
-                messagebox.showerror("Hata", "Geçerli pozitif sayılar giriniz.")
-
-        ttk.Button(dialog, text=self.translator.translate("save_button"), command=on_save).grid(row=5, column=0, columnspan=2, pady=10)
-        dialog.grab_set()
+import base64
+import os
+import time
+import tkinter as tk
+from tkinter import ttk, messagebox, filedialog
+from typing import List, Dict, Any, Optional
+from optimization import (
+    iter_optimize, collect_new_remnants,
+    ReductionDone, TrialFinished, NewIncumbent, Finished,
+)
+from file_handlers import (
+    save_project, load_project,
+    import_from_csv, export_to_csv,
+    read_parts_file, safe_get_part_attr,
+)
+from batching import iter_optimize_orders, merge_orders
+from export_jobs import ExportJob, export_targets
+from plan_renderer import TILE_BARS, Viewport, default_renderer
+from gui_helpers import (
+    register_fonts, show_about, update_status, Translator, validate_positive_number,
+    parse_stock_catalog, format_stock_catalog,
+)
+from theme_manager import ThemeManager
+from profiling import format_summary, memory_budget_from_env
+from remote_client import RemoteOptimizer, RemoteError
+from remnants import RemnantInventory
+from journal import EditJournal
+from job_history import JobHistory
+from startup_timing import startup_profiler
+from constants import (
+    DEFAULT_STOCK_LENGTH, DEFAULT_KERF, DEFAULT_LANGUAGE, LANGUAGES, TRACE_ENV_VAR, JOURNAL_FLUSH_MS,
+    PATTERN_DB_FILE,
+)
+
+# Journal'a yazılan ve kurtarmada geri yüklenen ayarlar
+SETTINGS_KEYS = ("stock_length", "kerf", "trials", "algorithm", "stock_unit_price", "server_url",
+                 "stock_catalog", "use_remnants")
+
+
+class OptimizationApp:
+    def __init__(self, root: tk.Tk) -> None:
+        self.root = root
+        register_fonts()
+
+        self.translator = Translator(DEFAULT_LANGUAGE)
+        self.theme_manager = ThemeManager(root)
+        self.theme_manager.apply_startup_theme()
+
+        # Parametreler
+        self.stock_length = DEFAULT_STOCK_LENGTH
+        self.kerf = DEFAULT_KERF
+        self.trials = 20
+        self.algorithm = "auto"  # motor ve deneme sayısı her işte örneğe göre seçilir
+        self.stock_unit_price = 1.0
+        self.server_url = ""  # boş değilse optimizasyon bu sunucuda çalışır (server.py)
+        self.stock_catalog: List[Dict[str, Any]] = []  # boşsa yalnızca stock_length kullanılır
+        self.use_remnants = False
+        self._remnant_inventory: Optional[RemnantInventory] = None
+        self._history: Optional[JobHistory] = None
+        self._optimization_started = 0.0
+
+        self.parts_data: List[Dict[str, Any]] = []
+        self.optimization_result_data: Optional[Any] = None
+        # Çalışan yerel optimizasyonun olay üreteci ya da uzak iş (istemci, iş no)
+        self._optimization_events = None
+        self._optimization_done = None
+        self._remote_job = None
+        self._export_job: Optional[ExportJob] = None
+
+        self._create_widgets()
+        self._setup_menu()
+        self._setup_status_bar()
+
+        # Düzenlemeler journal'a eklenir; çökmeden sonra açılışta yeniden oynatılır
+        self._journal = EditJournal()
+        self._recover_session()
+        self.root.protocol("WM_DELETE_WINDOW", self._on_close)
+        self.root.after(JOURNAL_FLUSH_MS, self._autosave_tick)
+
+    def _create_widgets(self) -> None:
+        self.main_frame = ttk.Frame(self.root)
+        self.main_frame.pack(fill="both", expand=True, padx=10, pady=10)
+
+        # Parça Giriş Alanları
+        entry_frame = ttk.Frame(self.main_frame)
+        entry_frame.pack(fill="x", pady=5)
+
+        ttk.Label(entry_frame, text="Parça Adı:").grid(row=0, column=0, sticky="w")
+        self.part_name_var = tk.StringVar()
+        ttk.Entry(entry_frame, width=15, textvariable=self.part_name_var).grid(row=0, column=1)
+
+        ttk.Label(entry_frame, text="Parça Uzunluğu (mm):").grid(row=0, column=2, sticky="w", padx=(10,0))
+        self.part_length_var = tk.StringVar()
+        ttk.Entry(entry_frame, width=10, textvariable=self.part_length_var).grid(row=0, column=3)
+
+        ttk.Label(entry_frame, text="Adet:").grid(row=0, column=4, sticky="w", padx=(10,0))
+        self.part_quantity_var = tk.StringVar()
+        ttk.Entry(entry_frame, width=5, textvariable=self.part_quantity_var).grid(row=0, column=5)
+
+        add_part_btn = ttk.Button(entry_frame, text=self.translator.translate("add_part"), command=self._add_part)
+        add_part_btn.grid(row=0, column=6, padx=10)
+
+        # Butonlar çerçevesi
+        button_frame_2 = ttk.Frame(self.main_frame)
+        button_frame_2.pack(fill="x", pady=5)
+
+        edit_part_btn = ttk.Button(button_frame_2, text=self.translator.translate("edit_part"), command=self._edit_selected_part)
+        edit_part_btn.pack(side="left", padx=(0,10))
+
+        delete_part_btn = ttk.Button(button_frame_2, text=self.translator.translate("delete_part"), command=self._delete_selected_part)
+        delete_part_btn.pack(side="left", padx=(0,10))
+
+        delete_all_btn = ttk.Button(button_frame_2, text=self.translator.translate("delete_all_parts"), command=self._delete_all_parts)
+        delete_all_btn.pack(side="left", padx=(0,10))
+
+        # Parça Listesi Treeview
+        self.parts_tree = ttk.Treeview(self.main_frame, columns=("name", "length", "quantity"), show="headings", height=8)
+        self.parts_tree.heading("name", text=self.translator.translate("add_part"))
+        self.parts_tree.heading("length", text="Uzunluk (mm)")
+        self.parts_tree.heading("quantity", text="Adet")
+        self.parts_tree.pack(fill="both", expand=True, pady=5)
+
+        # Plan Görselleştirme Tuvali: karolar plan_renderer ile çizilir, matplotlib ilk
+        # çizimde yüklenir; pencere açılana kadar yalnızca yer tutucu çerçeve bulunur
+        self.plot_frame = ttk.Frame(self.main_frame)
+        self.plot_frame.pack(fill="both", expand=True, pady=10)
+        self.canvas = None
+        self.root.after_idle(lambda: self.root.after(1, self._ensure_plot_canvas))
+
+        # Optimize Et, Excel ve PDF Butonları yanyana frame içinde
+        button_frame = ttk.Frame(self.main_frame)
+        button_frame.pack(pady=10)
+
+        self.optimize_button = ttk.Button(button_frame, text=self.translator.translate("optimize"), command=self._optimize)
+        self.optimize_button.pack(side="left", padx=5)
+
+        self.stop_button = ttk.Button(button_frame, text=self.translator.translate("stop_optimization"),
+                                      command=self._stop_optimization, state="disabled")
+        self.stop_button.pack(side="left", padx=5)
+
+        self.export_excel_button = ttk.Button(button_frame, text=self.translator.translate("export_excel"), command=self._export_excel)
+        self.export_excel_button.pack(side="left", padx=5)
+
+        self.export_pdf_button = ttk.Button(button_frame, text=self.translator.translate("export_pdf"), command=self._export_pdf)
+        self.export_pdf_button.pack(side="left", padx=5)
+
+    def _setup_menu(self) -> None:
+        menubar = tk.Menu(self.root)
+
+        # Dosya Menüsü
+        file_menu = tk.Menu(menubar, tearoff=0)
+        file_menu.add_command(label=self.translator.translate("project_save"), command=self._save_project)
+        file_menu.add_command(label=self.translator.translate("project_load"), command=self._load_project)
+        file_menu.add_command(label=self.translator.translate("import_csv"), command=self._import_csv)
+        file_menu.add_command(label=self.translator.translate("export_csv"), command=self._export_csv)
+        file_menu.add_command(label=self.translator.translate("batch_optimize"), command=self._batch_optimize)
+        file_menu.add_command(label=self.translator.translate("commit_remnants"), command=self._commit_remnants)
+        file_menu.add_separator()
+        file_menu.add_command(label=self.translator.translate("export_excel"), command=self._export_excel)
+        file_menu.add_command(label=self.translator.translate("export_pdf"), command=self._export_pdf)
+        file_menu.add_command(label=self.translator.translate("export_all"), command=self._export_all)
+        file_menu.add_command(label=self.translator.translate("cancel_export"), command=self._cancel_export)
+        file_menu.add_separator()
+        file_menu.add_command(label=self.translator.translate("exit"), command=self._on_close)
+        menubar.add_cascade(label=self.translator.translate("file"), menu=file_menu)
+
+        # Tema Menüsü
+        theme_menu = tk.Menu(menubar, tearoff=0)
+        theme_menu.add_command(label=self.translator.translate("theme_select"), command=self.theme_manager.show_theme_dialog)
+        menubar.add_cascade(label=self.translator.translate("theme"), menu=theme_menu)
+
+        # Dil Menüsü
+        lang_menu = tk.Menu(menubar, tearoff=0)
+        for lang_code in LANGUAGES.keys():
+            lang_name = LANGUAGES[lang_code].get(lang_code, lang_code)
+            lang_menu.add_command(label=lang_name, command=lambda c=lang_code: self._set_language(c))
+        menubar.add_cascade(label=self.translator.translate("language_select"), menu=lang_menu)
+
+        # Ayarlar Menüsü
+        settings_menu = tk.Menu(menubar, tearoff=0)
+        settings_menu.add_command(label=self.translator.translate("settings"), command=self._show_settings_dialog)
+        menubar.add_cascade(label=self.translator.translate("settings_menu"), menu=settings_menu)
+
+        # Yardım Menüsü
+        help_menu = tk.Menu(menubar, tearoff=0)
+        help_menu.add_command(label=self.translator.translate("about"), command=lambda: show_about(self.root))
+        menubar.add_cascade(label=self.translator.translate("help"), menu=help_menu)
+
+        self.root.config(menu=menubar)
+
+    def _setup_status_bar(self) -> None:
+        self.status_bar = ttk.Label(self.root, relief=tk.SUNKEN, anchor="w")
+        self.status_bar.pack(side=tk.BOTTOM, fill=tk.X)
+        update_status(self.status_bar, self.translator.translate("ready"))
+
+    # ---- Otomatik Kayıt ve Kurtarma ----
+
+    def _settings_state(self) -> Dict[str, Any]:
+        return {key: getattr(self, key) for key in SETTINGS_KEYS}
+
+    def _recover_session(self) -> None:
+        try:
+            state = self._journal.recover()
+        except Exception as e:
+            messagebox.showerror("Hata", f"Önceki oturum kurtarılamadı:\n{e}")
+            state = None
+        if state is not None:
+            self.parts_data = state["parts"]
+            for key, value in state["settings"].items():
+                if key in SETTINGS_KEYS:
+                    setattr(self, key, value)
+            self.optimization_result_data = state["result"]
+            self._populate_parts_tree()
+            if state["result"] is not None:
+                self.root.after_idle(self._draw_cutting_plan)
+            update_status(self.status_bar, f"Önceki oturum kurtarıldı: {len(self.parts_data)} parça.", 5000)
+            state["settings"] = self._settings_state()
+        try:
+            self._journal.open(state)
+        except OSError as e:
+            messagebox.showerror("Hata", f"Otomatik kayıt başlatılamadı:\n{e}")
+
+    def _autosave_tick(self) -> None:
+        # Biriken kayıtlar toplu fsync ile diske iner; journal büyüdüyse arka planda sıkıştırılır
+        self._journal.flush()
+        if self._journal.needs_compaction:
+            self._journal.compact({"parts": self.parts_data, "settings": self._settings_state(),
+                                   "result": self.optimization_result_data})
+        self.root.after(JOURNAL_FLUSH_MS, self._autosave_tick)
+
+    def _on_close(self) -> None:
+        # Düzgün kapanışta kurtarılacak bir şey kalmaz
+        self._journal.discard()
+        self.root.destroy()
+
+    # ---- Parça Ekleme-Düzenleme-Silme ----
+
+    def _add_part(self) -> None:
+        name = self.part_name_var.get().strip()
+        if not name:
+            messagebox.showerror("Hata", "Parça adı boş olamaz.")
+            return
+        if not validate_positive_number(self.part_length_var.get()):
+            messagebox.showerror("Hata", self.translator.translate("error_invalid_input"))
+            return
+        if not validate_positive_number(self.part_quantity_var.get()):
+            messagebox.showerror("Hata", self.translator.translate("error_invalid_input"))
+            return
+
+        try:
+            length = float(self.part_length_var.get())
+            quantity = int(self.part_quantity_var.get())
+            new_part = {"name": name, "length": length, "quantity": quantity}
+            self.parts_data.append(new_part)
+            self._journal.add_part(new_part)
+            self.parts_tree.insert("", "end", values=(name, length, quantity))
+            self.part_name_var.set("")
+            self.part_length_var.set("")
+            self.part_quantity_var.set("")
+            update_status(self.status_bar, f"Parça eklendi: {name}, Uzunluk={length} mm, Adet={quantity}", duration_ms=3000)
+        except Exception as e:
+            messagebox.showerror("Hata", f"Parça eklenirken hata oluştu:\n{e}")
+
+    def _edit_selected_part(self) -> None:
+        selected_items = self.parts_tree.selection()
+        if not selected_items:
+            messagebox.showwarning("Uyarı", self.translator.translate("warning_select_part"))
+            return
+        item = selected_items[0]
+        values = self.parts_tree.item(item, "values")
+        name, length, quantity = values
+        self.part_name_var.set(name)
+        self.part_length_var.set(length)
+        self.part_quantity_var.set(quantity)
+        self.parts_tree.delete(item)
+        for i, part in enumerate(self.parts_data):
+            if (part["name"] == name and
+                    float(part["length"]) == float(length) and
+                    int(part["quantity"]) == int(quantity)):
+                del self.parts_data[i]
+                self._journal.delete_part(i)
+                break
+        update_status(self.status_bar, "Parça düzenlemesi için form dolduruldu.", duration_ms=3000)
+
+    def _delete_selected_part(self) -> None:
+        selected_items = self.parts_tree.selection()
+        if not selected_items:
+            messagebox.showwarning("Uyarı", self.translator.translate("warning_select_part"))
+            return
+        for item in selected_items:
+            values = self.parts_tree.item(item, "values")
+            name, length_str, quantity_str = values
+            length = float(length_str)
+            quantity = int(quantity_str)
+            for i, part in enumerate(self.parts_data):
+                if (part["name"] == name and
+                        float(part["length"]) == length and
+                        int(part["quantity"]) == quantity):
+                    del self.parts_data[i]
+                    self._journal.delete_part(i)
+                    break
+            self.parts_tree.delete(item)
+        update_status(self.status_bar, "Seçili parça(lar) silindi.", duration_ms=3000)
+
+    def _delete_all_parts(self) -> None:
+        if not self.parts_data:
+            messagebox.showinfo("Bilgi", "Listede silinecek parça yok.")
+            return
+        if messagebox.askyesno("Onay", self.translator.translate("confirm_delete_all")):
+            self.parts_data.clear()
+            self._journal.clear_parts()
+            for item in self.parts_tree.get_children():
+                self.parts_tree.delete(item)
+            update_status(self.status_bar, "Tüm parçalar silindi.", duration_ms=3000)
+
+    def _populate_parts_tree(self) -> None:
+        self.parts_tree.delete(*self.parts_tree.get_children())
+        for part in self.parts_data:
+            self.parts_tree.insert("", "end", values=(
+                safe_get_part_attr(part, "name", ""),
+                safe_get_part_attr(part, "length", 0),
+                safe_get_part_attr(part, "quantity", 0)
+            ))
+
+    # ---- Optimizasyon ve Grafik ----
+
+    def _optimize(self) -> None:
+        if not self.parts_data:
+            messagebox.showwarning("Uyarı", "Lütfen önce parça verilerini ekleyin.")
+            update_status(self.status_bar, "Parça verisi yok")
+            return
+        if self._optimization_events is not None or self._remote_job is not None:
+            return
+        if self.server_url:
+            self._optimize_remote()
+            return
+        # Optimizasyon olay olay ilerletilir; her adım arasında arayüz olayları işlenir
+        self._optimization_started = time.perf_counter()
+        self._optimization_events = iter_optimize(
+            self.parts_data,
+            self.stock_length,
+            self.kerf,
+            trials=self.trials,
+            algorithm=self.algorithm,
+            profile=True,
+            trace_path=os.environ.get(TRACE_ENV_VAR) or None,
+            stock_catalog=self.stock_catalog or None,
+            remnants=self._get_remnant_inventory() if self.use_remnants else None,
+            pattern_storage=PATTERN_DB_FILE,
+            memory_budget_mb=memory_budget_from_env(),
+        )
+        self._optimization_done = self._on_optimization_result
+        self._set_optimization_running(True)
+        self.root.after(1, self._step_optimization)
+
+    def _step_optimization(self) -> None:
+        events = self._optimization_events
+        if events is None:
+            return
+        try:
+            event = next(events)
+        except Exception as e:
+            self._optimization_events = None
+            self._set_optimization_running(False)
+            messagebox.showerror("Hata", f"{self.translator.translate('optimization_error')}\n{e}")
+            update_status(self.status_bar, self.translator.translate("optimization_error"))
+            return
+        if isinstance(event, Finished):
+            self._optimization_events = None
+            self._set_optimization_running(False)
+            self._optimization_done(event.result)
+            return
+        if isinstance(event, ReductionDone):
+            update_status(self.status_bar, f"Optimizasyon: {event.pieces} parça, alt sınır {event.lower_bound} stok")
+        elif isinstance(event, TrialFinished) and event.bars is not None:
+            update_status(self.status_bar, f"Optimizasyon: deneme {event.number + 1}, {event.bars} stok")
+        elif isinstance(event, NewIncumbent):
+            update_status(self.status_bar, f"Optimizasyon: yeni en iyi {event.bars} stok")
+        self.root.after(1, self._step_optimization)
+
+    def _stop_optimization(self) -> None:
+        if self._optimization_events is not None:
+            self._optimization_events.close()
+            self._optimization_events = None
+        if self._remote_job is not None:
+            client, job_id = self._remote_job
+            try:
+                client.cancel(job_id)
+            except RemoteError as e:
+                messagebox.showerror("Hata", str(e))
+            self._remote_job = None
+        self._set_optimization_running(False)
+        update_status(self.status_bar, "Optimizasyon durduruldu", 5000)
+
+    def _set_optimization_running(self, running: bool) -> None:
+        self.optimize_button.config(state="disabled" if running else "normal")
+        self.stop_button.config(state="normal" if running else "disabled")
+
+    def _optimize_remote(self) -> None:
+        # İş sunucuya gönderilir, durum arayüzü kilitlemeden root.after ile yoklanır
+        client = RemoteOptimizer(self.server_url)
+        self._optimization_started = time.perf_counter()
+        try:
+            job_id = client.submit(self.parts_data, self.stock_length, self.kerf,
+                                   trials=self.trials, algorithm=self.algorithm, profile=True,
+                                   stock_catalog=self.stock_catalog or None)
+        except RemoteError as e:
+            messagebox.showerror("Hata", f"{self.translator.translate('optimization_error')}\n{e}")
+            update_status(self.status_bar, self.translator.translate("optimization_error"))
+            return
+        self._remote_job = (client, job_id)
+        self._set_optimization_running(True)
+
+        def poll() -> None:
+            if self._remote_job != (client, job_id):
+                return  # kullanıcı durdurdu
+            try:
+                status = client.status(job_id)
+                if status["status"] == "done":
+                    self._on_optimization_result(client.result(job_id), source="remote")
+                elif status["status"] in ("failed", "cancelled"):
+                    raise RemoteError(status.get("error") or status["status"])
+                else:
+                    event = status.get("last_event") or {}
+                    data = event.get("data", {})
+                    detail = ""
+                    if data.get("number") is not None and data.get("bars") is not None:
+                        detail = f" (deneme {data['number'] + 1}, {data['bars']} stok)"
+                    update_status(self.status_bar, f"Sunucuda optimizasyon: {status['status']}{detail}")
+                    self.root.after(500, poll)
+                    return
+            except Exception as e:
+                messagebox.showerror("Hata", f"{self.translator.translate('optimization_error')}\n{e}")
+                update_status(self.status_bar, self.translator.translate("optimization_error"))
+            self._remote_job = None
+            self._set_optimization_running(False)
+
+        poll()
+
+    def _get_remnant_inventory(self) -> RemnantInventory:
+        # Veritabanı ilk kullanımda açılır
+        if self._remnant_inventory is None:
+            self._remnant_inventory = RemnantInventory()
+        return self._remnant_inventory
+
+    def _commit_remnants(self) -> None:
+        # Plan kesildikten sonra kullanılan artıklar düşülür, yeni artıklar stoğa eklenir
+        result = self.optimization_result_data
+        if not result or "bar_stocks" not in result:
+            messagebox.showwarning("Uyarı", "Artık stoğuna işlenecek katalog/artık planı yok.")
+            return
+        if result.get("remnants_committed"):
+            messagebox.showinfo("Bilgi", "Bu plan artık stoğuna zaten işlendi.")
+            return
+        inventory = self._get_remnant_inventory()
+        if "new_remnants" not in result:
+            result["new_remnants"] = collect_new_remnants(result["plan"], result["bar_stocks"],
+                                                          result["kerf"], inventory.min_length)
+        counts = inventory.apply_result(result)
+        result["remnants_committed"] = True
+        update_status(self.status_bar,
+                      f"Artık stoğu güncellendi: {counts['taken']} kullanıldı, {counts['added']} eklendi "
+                      f"(stokta {len(inventory)} artık)", 5000)
+
+    def _batch_optimize(self) -> None:
+        # Seçilen her dosya bir sipariştir; aynı stok boyu ve kerf ile birlikte kesilir
+        if self._optimization_events is not None or self._remote_job is not None:
+            return
+        file_paths = filedialog.askopenfilenames(
+            filetypes=[("Sipariş Dosyaları", "*.kesim *.json *.csv"), ("Tüm Dosyalar", "*.*")]
+        )
+        if not file_paths:
+            return
+        try:
+            orders = [
+                {"order_id": os.path.splitext(os.path.basename(path))[0], "parts": read_parts_file(path)}
+                for path in file_paths
+            ]
+        except Exception as e:
+            messagebox.showerror("Hata", f"{self.translator.translate('optimization_error')}\n{e}")
+            update_status(self.status_bar, self.translator.translate("optimization_error"))
+            return
+
+        def done(result: Dict[str, Any]) -> None:
+            self.parts_data = merge_orders(orders)
+            self._journal.set_parts(self.parts_data)
+            self._populate_parts_tree()
+            self._on_optimization_result(result, source="batch")
+            lines = [
+                f"{order_id}: {report['pieces']} parça, stok payı {report['bar_share']:.2f}, "
+                f"maliyet {report['total_cost']:.2f} TL"
+                for order_id, report in result["orders"].items()
+            ]
+            if len(lines) > 20:
+                lines = lines[:20] + [f"... (+{len(lines) - 20} sipariş)"]
+            messagebox.showinfo("Sipariş Raporu",
+                                f"Toplam stok: {result['used_stocks']}\n\n" + "\n".join(lines))
+
+        # Tekli optimizasyon gibi olay olay ilerletilir; Durdur düğmesi toplu çalışmayı da keser
+        self._optimization_started = time.perf_counter()
+        self._optimization_events = iter_optimize_orders(
+            orders, self.stock_length, self.kerf, self.stock_unit_price,
+            trials=self.trials, algorithm=self.algorithm, profile=True,
+            pattern_storage=PATTERN_DB_FILE, memory_budget_mb=memory_budget_from_env(),
+        )
+        self._optimization_done = done
+        self._set_optimization_running(True)
+        self.root.after(1, self._step_optimization)
+
+    def _on_optimization_result(self, optimize_result: Dict[str, Any], source: str = "gui") -> None:
+        self.optimization_result_data = optimize_result
+        self._journal.set_result(optimize_result)
+        self._record_history(optimize_result, source)
+        self._draw_cutting_plan()
+        message = self.translator.translate("optimization_complete")
+        profile_text = format_summary(optimize_result.get("profile"))
+        if profile_text:
+            message = f"{message} {profile_text}"
+        selection = optimize_result.get("auto_selection")
+        if selection:
+            message = f"{message} [otomatik: {selection['algorithm']}, {selection['trials']} deneme]"
+        update_status(self.status_bar, message)
+
+    def _record_history(self, optimize_result: Dict[str, Any], source: str) -> None:
+        # Her çalışmanın özeti iş geçmişine yazılır (cli.py history ile raporlanır)
+        try:
+            if self._history is None:
+                self._history = JobHistory()
+            self._history.record(optimize_result, self.parts_data, self.stock_length, source,
+                                 elapsed_s=time.perf_counter() - self._optimization_started,
+                                 algorithm=self.algorithm)
+        except Exception as e:
+            update_status(self.status_bar, f"İş geçmişi yazılamadı: {e}", 5000)
+
+    def _ensure_plot_canvas(self) -> None:
+        if self.canvas is not None:
+            return
+        with startup_profiler.span("plot_canvas"):
+            # Plan, ekran dışında çizilen karolardan oluşur; yalnızca görünen karolar istenir
+            self.plot_title = ttk.Label(self.plot_frame, anchor="center")
+            self.plot_title.pack(fill="x")
+            scrollbar = ttk.Scrollbar(self.plot_frame, orient="vertical", command=self._scroll_plot)
+            scrollbar.pack(side="right", fill="y")
+            self.canvas = tk.Canvas(self.plot_frame, background="white", highlightthickness=0,
+                                    yscrollcommand=scrollbar.set)
+            self.canvas.pack(fill="both", expand=True)
+            self.canvas.bind("<Configure>", lambda e: self._layout_plot_tiles())
+            self.canvas.bind("<MouseWheel>", lambda e: self._scroll_plot("scroll", -e.delta // 120, "units"))
+            self.canvas.bind("<Button-4>", lambda e: self._scroll_plot("scroll", -1, "units"))
+            self.canvas.bind("<Button-5>", lambda e: self._scroll_plot("scroll", 1, "units"))
+            self._plot_tiles: Dict[int, Any] = {}
+            self._plot_tile_width = 0
+
+    def _scroll_plot(self, *args) -> None:
+        self.canvas.yview(*args)
+        self._show_visible_tiles()
+
+    def _layout_plot_tiles(self) -> None:
+        # Genişlik değişince karolar yeni genişlikte istenir (önbellekte yoksa çizilir)
+        self.canvas.delete("all")
+        self._plot_tiles.clear()
+        result = self.optimization_result_data
+        if not result:
+            return
+        self._plot_tile_width = max(self.canvas.winfo_width(), 200)
+        bar_total = len(result.get("plan", []))
+        tile_height = default_renderer.tile_height_px()
+        self.canvas.configure(scrollregion=(0, 0, self._plot_tile_width, bar_total * tile_height / TILE_BARS),
+                              yscrollincrement=tile_height / TILE_BARS)
+        self._show_visible_tiles()
+
+    def _show_visible_tiles(self) -> None:
+        result = self.optimization_result_data
+        if not result or not self._plot_tile_width:
+            return
+        bar_total = len(result.get("plan", []))
+        tile_height = default_renderer.tile_height_px()
+        top = self.canvas.canvasy(0)
+        bottom = self.canvas.canvasy(self.canvas.winfo_height())
+        visible = range(max(0, int(top // tile_height)),
+                        min((bar_total + TILE_BARS - 1) // TILE_BARS, int(bottom // tile_height) + 1))
+        kerf_val = result.get("kerf", self.kerf)
+        for tile_idx in visible:
+            if tile_idx in self._plot_tiles:
+                continue
+            first = tile_idx * TILE_BARS
+            viewport = Viewport(first, min(TILE_BARS, bar_total - first), self._plot_tile_width)
+            png = default_renderer.render(result, viewport, self.stock_length, kerf_val)
+            image = tk.PhotoImage(data=base64.b64encode(png))
+            item = self.canvas.create_image(0, tile_idx * tile_height, anchor="nw", image=image)
+            self._plot_tiles[tile_idx] = (item, image)
+        # Görünmeyen karoların Tk görüntüleri bırakılır; PNG'ler önbellekte kalır
+        for tile_idx in [idx for idx in self._plot_tiles if idx not in visible]:
+            item, _image = self._plot_tiles.pop(tile_idx)
+            self.canvas.delete(item)
+
+    def _draw_cutting_plan(self) -> None:
+        if self.optimization_result_data is None:
+            update_status(self.status_bar, "Görselleştirilecek veri yok")
+            return
+        try:
+            self._ensure_plot_canvas()
+            result = self.optimization_result_data
+            self.plot_title.config(text=f"Kesim Planı (Kullanılan Stok Sayısı: {result.get('used_stocks', 0)}, "
+                                        f"Kerf: {result.get('kerf', self.kerf)} mm)")
+            self.canvas.yview_moveto(0)
+            self._layout_plot_tiles()
+            update_status(self.status_bar, "Kesim planı çizildi.")
+        except Exception as e:
+            messagebox.showerror("Hata", f"Kesim planı çizilirken hata oluştu:\n{e}")
+            update_status(self.status_bar, "Çizim hatası")
+
+    # ---- Dosya İşlemleri ----
+
+    def _save_project(self) -> None:
+        try:
+            save_project(self.parts_data, self.stock_length, self.kerf, self.optimization_result_data)
+            update_status(self.status_bar, "Proje kaydedildi.")
+        except Exception as e:
+            messagebox.showerror("Hata", f"Dosya kaydedilemedi:\n{e}")
+            update_status(self.status_bar, "Kaydetme hatası")
+
+    def _load_project(self) -> None:
+        try:
+            result = load_project()
+            if result:
+                parts, stock_length, kerf, stored_result = result
+                self.parts_data = parts
+                self.stock_length = stock_length
+                self.kerf = kerf
+                self.optimization_result_data = stored_result
+                self._journal.set_parts(parts)
+                self._journal.set_settings({"stock_length": stock_length, "kerf": kerf})
+                self._journal.set_result(stored_result)
+                self._populate_parts_tree()
+                if stored_result is not None:
+                    # Kayıtlı plan varsa yeniden optimizasyon gerekmez
+                    self._draw_cutting_plan()
+                update_status(self.status_bar, "Proje yüklendi.")
+            else:
+                update_status(self.status_bar, "Proje yükleme iptal edildi.")
+        except Exception as e:
+            messagebox.showerror("Hata", f"Dosya yüklenemedi:\n{e}")
+            update_status(self.status_bar, "Yükleme hatası")
+
+    # ---- CSV İşlemleri ----
+
+    def _import_csv(self) -> None:
+        try:
+            imported = import_from_csv()
+            if imported:
+                self.parts_data = imported
+                self._journal.set_parts(imported)
+                self._populate_parts_tree()
+                update_status(self.status_bar, "CSV dosyası içe aktarıldı.", 3000)
+        except Exception as e:
+            messagebox.showerror("Hata", f"CSV içe aktarılırken hata oluştu:\n{e}")
+
+    def _export_csv(self) -> None:
+        if not self.parts_data:
+            messagebox.showinfo("Bilgi", "Dışa aktarılacak veri bulunmamaktadır.")
+            return
+        try:
+            export_to_csv(self.parts_data)
+        except Exception as e:
+            messagebox.showerror("Hata", f"CSV dışa aktarılırken hata oluştu:\n{e}")
+
+    # ---- Excel & PDF Dışa Aktarma ----
+
+    def _export_excel(self) -> None:
+        if not self._can_export():
+            return
+        file_path = filedialog.asksaveasfilename(defaultextension=".xlsx", filetypes=[("Excel Dosyaları", "*.xlsx")])
+        if file_path:
+            self._start_export({"excel": file_path})
+
+    def _export_pdf(self) -> None:
+        if not self._can_export():
+            return
+        file_path = filedialog.asksaveasfilename(defaultextension=".pdf", filetypes=[("PDF Dosyaları", "*.pdf")])
+        if file_path:
+            self._start_export({"pdf": file_path})
+
+    def _export_all(self) -> None:
+        # Excel, PDF, CSV ve JSON aynı taban adla, plan bir kez gruplanarak birlikte yazılır
+        if not self._can_export():
+            return
+        file_path = filedialog.asksaveasfilename(title=self.translator.translate("export_all"),
+                                                 filetypes=[("Tüm Dosyalar", "*.*")])
+        if file_path:
+            self._start_export(export_targets(file_path))
+
+    def _can_export(self) -> bool:
+        if not self.optimization_result_data:
+            messagebox.showinfo("Bilgi", "Önce optimizasyon yapılmalı.")
+            return False
+        if self._export_job is not None:
+            messagebox.showinfo("Bilgi", "Önceki dışa aktarma sürüyor.")
+            return False
+        return True
+
+    def _start_export(self, targets: Dict[str, str]) -> None:
+        # Yazım iş parçacıklarında sürer; arayüz ilerlemeyi root.after ile yoklar
+        try:
+            self._export_job = ExportJob(self.optimization_result_data, self.stock_unit_price, targets,
+                                         stock_length=self.stock_length).start()
+        except Exception as e:
+            messagebox.showerror("Hata", f"Dışa aktarma başlatılamadı:\n{e}")
+            return
+        self.root.after(100, self._poll_export)
+
+    def _poll_export(self) -> None:
+        job = self._export_job
+        if job is None:
+            return
+        update_status(self.status_bar, f"Dışa aktarılıyor: {job.format_progress()}")
+        if not job.done:
+            self.root.after(200, self._poll_export)
+            return
+        self._export_job = None
+        if job.cancelled:
+            update_status(self.status_bar, f"Dışa aktarma iptal edildi: {job.format_progress()}", 5000)
+            return
+        written = [path for fmt, path in job.targets.items() if job.status[fmt] == "done"]
+        if written:
+            messagebox.showinfo("Başarılı", "Dosyalar oluşturuldu:\n" + "\n".join(written))
+        if job.errors:
+            messagebox.showerror("Hata", "Dışa aktarılırken hata oluştu:\n"
+                                 + "\n".join(f"{fmt}: {error}" for fmt, error in job.errors.items()))
+        update_status(self.status_bar, f"Dışa aktarma bitti: {job.format_progress()}", 5000)
+
+    def _cancel_export(self) -> None:
+        if self._export_job is not None:
+            self._export_job.cancel()
+
+    # ---- Tema ve Dil Yönetimi ----
+
+    def _set_language(self, lang_code: str) -> None:
+        self.translator.set_language(lang_code)
+        self._refresh_ui_texts()
+
+    def _refresh_ui_texts(self) -> None:
+        # Menü ve buton yazıları dahil tüm metinleri güncelle
+
+        # Menü yeniden oluştur
+        self._setup_menu()
+
+        # Butonlar
+        self.optimize_button.config(text=self.translator.translate("optimize"))
+        self.stop_button.config(text=self.translator.translate("stop_optimization"))
+        self.export_excel_button.config(text=self.translator.translate("export_excel"))
+        self.export_pdf_button.config(text=self.translator.translate("export_pdf"))
+
+        # Diğer statik metin alanlarını da güncellemek isterseniz buraya ekleyin, örn. Treeview başlığı vs.
+
+    def _show_settings_dialog(self) -> None:
+        dialog = tk.Toplevel(self.root)
+        dialog.title(self.translator.translate("settings"))
+        dialog.resizable(False, False)
+
+        ttk.Label(dialog, text=self.translator.translate("stock_length")).grid(row=0, column=0, sticky="w", padx=5, pady=5)
+        stock_length_var = tk.StringVar(value=str(self.stock_length))
+        ttk.Entry(dialog, textvariable=stock_length_var).grid(row=0, column=1, padx=5, pady=5)
+
+        ttk.Label(dialog, text=self.translator.translate("kerf_label")).grid(row=1, column=0, sticky="w", padx=5, pady=5)
+        kerf_var = tk.StringVar(value=str(self.kerf))
+        ttk.Entry(dialog, textvariable=kerf_var).grid(row=1, column=1, padx=5, pady=5)
+
+        ttk.Label(dialog, text=self.translator.translate("trials_label")).grid(row=2, column=0, sticky="w", padx=5, pady=5)
+        trials_var = tk.StringVar(value=str(self.trials))
+        ttk.Entry(dialog, textvariable=trials_var).grid(row=2, column=1, padx=5, pady=5)
+
+        ttk.Label(dialog, text=self.translator.translate("algorithm_label")).grid(row=3, column=0, sticky="w", padx=5, pady=5)
+        alg_var = tk.StringVar(value=self.algorithm)
+        ttk.Combobox(dialog, textvariable=alg_var, values=["auto", "first_fit", "best_fit", "portfolio", "genetic"], state="readonly").grid(row=3, column=1, padx=5, pady=5)
+
+        ttk.Label(dialog, text=self.translator.translate("stock_unit_price_label")).grid(row=4, column=0, sticky="w", padx=5, pady=5)
+        price_var = tk.StringVar(value=str(self.stock_unit_price))
+        ttk.Entry(dialog, textvariable=price_var).grid(row=4, column=1, padx=5, pady=5)
+
+        ttk.Label(dialog, text="Sunucu adresi (isteğe bağlı):").grid(row=5, column=0, sticky="w", padx=5, pady=5)
+        server_var = tk.StringVar(value=self.server_url)
+        ttk.Entry(dialog, textvariable=server_var).grid(row=5, column=1, padx=5, pady=5)
+
+        ttk.Label(dialog, text="Stok kataloğu (boy:fiyat[:adet], ...):").grid(row=6, column=0, sticky="w", padx=5, pady=5)
+        catalog_var = tk.StringVar(value=format_stock_catalog(self.stock_catalog))
+        ttk.Entry(dialog, textvariable=catalog_var).grid(row=6, column=1, padx=5, pady=5)
+
+        remnants_var = tk.BooleanVar(value=self.use_remnants)
+        ttk.Checkbutton(dialog, text="Artık stoğunu kullan", variable=remnants_var).grid(row=7, column=0, columnspan=2, sticky="w", padx=5, pady=5)
+
+        def on_save():
+            try:
+                sl = int(stock_length_var.get())
+                kf = int(kerf_var.get())
+                tr = int(trials_var.get())
+                alg = alg_var.get()
+                price = float(price_var.get())
+                if sl <= 0 or kf <= 0 or tr <= 0 or price < 0:
+                    raise ValueError()
+                catalog = parse_stock_catalog(catalog_var.get())
+                self.stock_length = sl
+                self.kerf = kf
+                self.trials = tr
+                self.algorithm = alg
+                self.stock_unit_price = price
+                self.server_url = server_var.get().strip()
+                self.stock_catalog = catalog
+                self.use_remnants = remnants_var.get()
+                self._journal.set_settings(self._settings_state())
+                dialog.destroy()
+                update_status(self.status_bar,
+                              f"Ayarlar güncellendi: Stok={sl}, Kerf={kf}, Deneme={tr}, Alg={alg}, Fiyat={price} TL/mm", 5000)
+            except ValueError:
+                messagebox.showerror("Hata", "Geçerli pozitif sayılar ve boy:fiyat[:adet] biçiminde stok kataloğu giriniz.")
+
+        ttk.Button(dialog, text=self.translator.translate("save_button"), command=on_save).grid(row=8, column=0, columnspan=2, pady=10)
+        dialog.grab_set()
@@ -0,0 +1,112 @@
+from collections import defaultdict
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from optimization import Finished, OptimizationEvent, iter_optimize, optimize_parts
+
+
+def _order_settings(order: Dict[str, Any], stock_length: Optional[int], kerf: Optional[int]) -> Tuple[int, int]:
+    return int(order.get("stock_length", stock_length)), int(order.get("kerf", kerf))
+
+
+def group_orders(orders: List[Dict[str, Any]], stock_length: int, kerf: int) -> Dict[Tuple[int, int], List[Dict[str, Any]]]:
+    """
+    Siparişleri (stok boyu, kerf) çiftine göre gruplar; yalnızca aynı gruptakiler birlikte kesilebilir.
+    Sipariş: {"order_id": ..., "parts": [...], "stock_length": ?, "kerf": ?}
+    """
+    groups: Dict[Tuple[int, int], List[Dict[str, Any]]] = defaultdict(list)
+    for order in orders:
+        groups[_order_settings(order, stock_length, kerf)].append(order)
+    return dict(groups)
+
+
+def merge_orders(orders: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    merged: List[Dict[str, Any]] = []
+    seen = set()
+    for idx, order in enumerate(orders):
+        order_id = str(order.get("order_id") or f"Sipariş {idx + 1}")
+        if order_id in seen:
+            raise ValueError(f"Aynı sipariş numarası birden fazla kez verildi: {order_id}")
+        seen.add(order_id)
+        for part in order.get("parts", []):
+            tagged = dict(part)
+            tagged["order_id"] = order_id
+            merged.append(tagged)
+    return merged
+
+
+def order_reports(result: Dict[str, Any], stock_unit_price: float) -> Dict[str, Dict[str, Any]]:
+    """
+    Her stoğu, içindeki siparişlere kullandıkları malzeme (parça + kerf) oranında paylaştırır.
+    Paylar toplamı stok sayısına, maliyetler toplamı calculate_costs sonucuna eşittir.
+    """
+    kerf = result.get("kerf", 0)
+    stock_fire = result.get("fire_efficiency", {}).get("stock_fire", [])
+    reports: Dict[str, Dict[str, Any]] = {}
+
+    def report_for(order_id: str) -> Dict[str, Any]:
+        report = reports.get(order_id)
+        if report is None:
+            report = reports[order_id] = {
+                "pieces": 0, "material_mm": 0.0, "bar_share": 0.0, "fire_share_mm": 0.0,
+                "bars_touched": 0, "exclusive_bars": 0,
+            }
+        return report
+
+    for bar_idx, stock_parts in enumerate(result.get("plan", [])):
+        consumed: Dict[str, float] = defaultdict(float)
+        for piece in stock_parts:
+            report = report_for(piece.order_id)
+            report["pieces"] += 1
+            report["material_mm"] += piece.length
+            consumed[piece.order_id] += piece.length + kerf
+        total = sum(consumed.values())
+        fire = stock_fire[bar_idx] if bar_idx < len(stock_fire) else 0.0
+        for order_id, amount in consumed.items():
+            share = amount / total if total > 0 else 1.0 / len(consumed)
+            report = reports[order_id]
+            report["bar_share"] += share
+            report["fire_share_mm"] += fire * share
+            report["bars_touched"] += 1
+            if len(consumed) == 1:
+                report["exclusive_bars"] += 1
+
+    total_material = sum(r["material_mm"] for r in reports.values())
+    for report in reports.values():
+        report["usage_share"] = report["material_mm"] / total_material if total_material > 0 else 0.0
+        report["total_cost"] = report["bar_share"] * stock_unit_price
+        report["fire_cost"] = report["fire_share_mm"] * stock_unit_price
+    return reports
+
+
+def _batch_settings(orders: List[Dict[str, Any]], stock_length: int, kerf: int) -> Tuple[int, int]:
+    groups = group_orders(orders, stock_length, kerf)
+    if len(groups) > 1:
+        settings = ", ".join(f"{sl} mm / kerf {kf}" for sl, kf in groups)
+        raise ValueError(f"Siparişler aynı stok boyu ve kerf'i paylaşmalı: {settings}")
+    return next(iter(groups)) if groups else (stock_length, kerf)
+
+
+def optimize_orders(orders: List[Dict[str, Any]], stock_length: int, kerf: int,
+                    stock_unit_price: float = 1.0, **options) -> Dict[str, Any]:
+    """
+    Aynı stok boyu ve kerf'i paylaşan siparişleri tek seferde optimize eder.
+    Sonuç, optimize_parts sonucuna ek olarak sipariş bazlı raporları ("orders") içerir.
+    """
+    batch_stock_length, batch_kerf = _batch_settings(orders, stock_length, kerf)
+    merged = merge_orders(orders)
+    result = optimize_parts(merged, batch_stock_length, batch_kerf, **options)
+    result["orders"] = order_reports(result, stock_unit_price)
+    return result
+
+
+def iter_optimize_orders(orders: List[Dict[str, Any]], stock_length: int, kerf: int,
+                         stock_unit_price: float = 1.0, **options) -> Iterator[OptimizationEvent]:
+    """
+    optimize_orders'ın olay olay ilerleyen biçimi (iter_optimize gibi); Finished sonucuna
+    sipariş raporları ("orders") eklenir.
+    """
+    batch_stock_length, batch_kerf = _batch_settings(orders, stock_length, kerf)
+    for event in iter_optimize(merge_orders(orders), batch_stock_length, batch_kerf, **options):
+        if isinstance(event, Finished):
+            event.result["orders"] = order_reports(event.result, stock_unit_price)
+        yield event
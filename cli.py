@@ -0,0 +1,437 @@
+import argparse
+import sys
+import time
+from contextlib import closing
+
+from constants import (DEFAULT_STOCK_LENGTH, DEFAULT_KERF, DEFAULT_WORKER_PORT, STUDY_STORAGE_FILE, JOB_HISTORY_FILE,
+                       PATTERN_DB_FILE, MEMORY_BUDGET_ENV_VAR)
+from job_history import HISTORY_GROUPS
+from online_packing import EVICTION_POLICIES
+from optimization import (iter_optimize, Started, ReductionDone, TrialFinished, NewIncumbent, Finished, SEARCH_SPACES,
+                          STREAM_OPEN_BARS)
+from profiling import MemoryBudgetError, memory_budget_from_env
+from scenarios import SCENARIO_SORT_KEYS
+
+
+def _print_event(event) -> None:
+    if isinstance(event, Started):
+        print(f"Başladı: {event.part_types} parça tipi, {event.trials} deneme, algoritma {event.algorithm}")
+    elif isinstance(event, ReductionDone):
+        print(f"İndirgeme: {event.part_types} tip, {event.pieces} parça, alt sınır {event.lower_bound} stok")
+    elif isinstance(event, TrialFinished):
+        engine = f" [{event.engine}]" if event.engine else ""
+        print(f"  deneme {event.number + 1}{engine}: kerf {event.kerf}, {event.bars} stok")
+    elif isinstance(event, NewIncumbent):
+        print(f"  yeni en iyi: {event.bars} stok")
+
+
+def run_optimize(args: argparse.Namespace) -> int:
+    # Dosya okuma tkinter iletişim kutularını içeren modülde; yalnızca burada yüklenir
+    from file_handlers import read_parts_file
+    parts = read_parts_file(args.parts_file)
+    if args.stream:
+        return _run_streaming(parts, args)
+    options = {"trials": args.trials, "algorithm": args.algorithm, "n_jobs": args.jobs,
+               "search_space": args.search_space}
+    if args.study_db and not args.server:
+        options["study_storage"] = args.study_db
+    if args.pattern_db and not args.server:
+        options["pattern_storage"] = args.pattern_db
+    if args.profile_memory:
+        options["profile_memory"] = True
+    if args.memory_budget and not args.server:
+        # Sunucudaki işlerin bütçesi sunucu ayarıdır (server.py --memory-budget)
+        options["memory_budget_mb"] = args.memory_budget
+    if args.server:
+        # Sunucudaki işler sunucunun geçmişine yazılır; etiketler işle birlikte gönderilir
+        from remote_client import RemoteOptimizer
+        events = RemoteOptimizer(args.server).iter_optimize(parts, args.stock_length, args.kerf, **options,
+                                                            name=args.parts_file, profile_name=args.profile,
+                                                            customer=args.customer)
+    else:
+        events = iter_optimize(parts, args.stock_length, args.kerf, **options)
+
+    result = None
+    started = time.perf_counter()
+    # Ctrl+C üreteci kapatır; yerel optimizasyon durur, uzak iş iptal edilir
+    with closing(events):
+        try:
+            for event in events:
+                if isinstance(event, Finished):
+                    result = event.result
+                elif not args.quiet:
+                    _print_event(event)
+        except KeyboardInterrupt:
+            print("Optimizasyon durduruldu.", file=sys.stderr)
+            return 130
+        except MemoryBudgetError as e:
+            if e.estimate_mb is None or args.server:
+                print(f"HATA: {e}", file=sys.stderr)
+                return 1
+            # Tahmin bütçeyi aşıyor: plan bellekte tutulmadan akışlı olarak üretilir
+            print(f"Uyarı: {e}\nAkışlı plana geçiliyor.", file=sys.stderr)
+            return _run_streaming(parts, args)
+
+    fire = result["fire_efficiency"]
+    print(f"Sonuç: {result['used_stocks']} stok, kerf {result['kerf']} mm, "
+          f"fire {fire['total_fire']:.1f} mm, verim %{fire['total_efficiency']:.1f}")
+    if result.get("study"):
+        study = result["study"]
+        print(f"Optuna çalışması {study['name']}: {study['past_trials']} geçmiş deneme, "
+              f"{study['warm_start']} ısınma denemesi")
+    if result.get("patterns"):
+        patterns = result["patterns"]
+        print(f"Desen kütüphanesi: {patterns['seeded_packings']} tohumlanmış paketleme daha iyi, "
+              f"{patterns['learned']} desen öğrenildi (kütüphanede {patterns['library_size']})")
+    if result.get("memory"):
+        memory = result["memory"]
+        notes = {"sequence_off": "kesim sırası atlandı", "compact_engine": "sade motor, paralellik kapalı"}
+        adjustments = ", ".join(notes[a] for a in memory["adjustments"])
+        print(f"Bellek bütçesi {memory['budget_mb']:.0f} MB: tahmin {memory['estimate_mb']:.0f} MB"
+              + (f", en yüksek {memory['peak_mb']:.0f} MB" if memory.get("peak_mb") else "")
+              + (f" ({adjustments})" if adjustments else ""))
+    if args.profile_memory and result.get("profile"):
+        from profiling import format_summary
+        print(f"Profil: {format_summary(result['profile'], max_phases=6)}")
+    if not args.server:
+        _record_history(args, parts, result, "cli", time.perf_counter() - started, args.parts_file)
+    if args.output:
+        from project_format import write_project
+        write_project(args.output, parts, args.stock_length, args.kerf, result)
+        print(f"Proje kaydedildi: {args.output}")
+    return 0
+
+
+def _run_streaming(parts, args: argparse.Namespace) -> int:
+    from streaming import optimize_streaming
+    started = time.perf_counter()
+    try:
+        result = optimize_streaming(parts, args.stock_length, args.kerf, outputs=args.report or [])
+    except KeyboardInterrupt:
+        print("Optimizasyon durduruldu.", file=sys.stderr)
+        return 130
+    _record_history(args, parts, result, "cli", time.perf_counter() - started, args.parts_file,
+                    algorithm="stream")
+    fire = result["fire_efficiency"]
+    print(f"Sonuç: {result['used_stocks']} stok (alt sınır {result['lower_bound']}), {result['pieces']} parça, "
+          f"fire {fire['total_fire']:.1f} mm, verim %{fire['total_efficiency']:.1f}")
+    for path in result["outputs"]:
+        print(f"Rapor yazıldı: {path}")
+    return 0
+
+
+def run_watch(args: argparse.Namespace) -> int:
+    from watch_folder import WatchFolder, format_stats
+    watcher = WatchFolder(args.directory, args.stock_length, args.kerf, workers=args.workers,
+                          queue_size=args.queue_size, settle_s=args.settle, poll_s=args.poll,
+                          history_path=None if args.no_history else args.history_db,
+                          profile=args.profile, customer=args.customer,
+                          trials=args.trials, algorithm=args.algorithm, search_space=args.search_space,
+                          study_storage=args.study_db, pattern_storage=args.pattern_db)
+    print(f"İzleniyor: {args.directory} (işçi: {args.workers}, kuyruk: {args.queue_size})")
+    try:
+        watcher.run(once=args.once)
+    except KeyboardInterrupt:
+        print("İzleme durduruldu.", file=sys.stderr)
+        return 130
+    finally:
+        print(format_stats(watcher.stats()))
+        watcher.close()
+    return 0
+
+
+def run_worker(args: argparse.Namespace) -> int:
+    from distributed import run_worker as serve
+    try:
+        serve(args.host, args.port)
+    except ValueError as e:
+        print(f"HATA: {e}", file=sys.stderr)
+        return 1
+    except KeyboardInterrupt:
+        print("İşçi durduruldu.", file=sys.stderr)
+        return 130
+    return 0
+
+
+def run_distribute(args: argparse.Namespace) -> int:
+    import os
+    from distributed import Coordinator, RemoteTaskError, parse_address
+    from file_handlers import read_parts_file
+    workers = [parse_address(text) for text in args.workers.split(",") if text.strip()]
+    # Çözüm süreleri iş geçmişi için işçideki profil özetinden alınır
+    options = {"trials": args.trials, "algorithm": args.algorithm, "profile": True}
+    failed = 0
+    try:
+        coordinator = Coordinator(workers)
+    except ValueError as e:
+        print(f"HATA: {e}", file=sys.stderr)
+        return 1
+    with coordinator:
+        jobs = []
+        for path in args.parts_files:
+            parts = read_parts_file(path)
+            if not parts:
+                failed += 1
+                print(f"HATA {path}: Dosyada geçerli parça bulunamadı.", file=sys.stderr)
+                continue
+            jobs.append((path, parts, coordinator.submit_optimize(parts, args.stock_length, args.kerf, **options)))
+        print(f"{len(jobs)} iş {len(workers)} işçiye dağıtıldı.")
+        try:
+            for path, parts, future in jobs:
+                try:
+                    result = future.result()
+                except RemoteTaskError as e:
+                    failed += 1
+                    print(f"HATA {path}: {e}", file=sys.stderr)
+                    continue
+                print(f"{path}: {result['used_stocks']} stok, kerf {result['kerf']} mm, "
+                      f"verim %{result['fire_efficiency']['total_efficiency']:.1f}")
+                _record_history(args, parts, result, "distribute", None, path, algorithm=args.algorithm)
+                if args.output_dir:
+                    from project_format import write_project
+                    name = os.path.splitext(os.path.basename(path))[0] + ".kesim"
+                    write_project(os.path.join(args.output_dir, name), parts, args.stock_length, args.kerf, result)
+        except KeyboardInterrupt:
+            print("Dağıtık çalışma durduruldu.", file=sys.stderr)
+            return 130
+        stats = coordinator.stats
+    print(f"Tamamlanan {stats['done']}, hatalı {stats['failed']}, yeniden denenen {stats['retries']}, "
+          f"kaybedilen işçi {stats['worker_lost']}, yinelenen {stats['duplicates']}")
+    return 1 if failed else 0
+
+
+def _record_history(args: argparse.Namespace, parts, result, source: str, elapsed_s, name: str,
+                    algorithm=None) -> None:
+    if args.no_history:
+        return
+    from job_history import JobHistory
+    history = JobHistory(args.history_db)
+    try:
+        history.record(result, parts, args.stock_length, source, elapsed_s=elapsed_s, name=name,
+                       profile=args.profile, customer=args.customer,
+                       algorithm=algorithm or getattr(args, "algorithm", None))
+    finally:
+        history.close()
+
+
+def run_history(args: argparse.Namespace) -> int:
+    import os
+    from job_history import JobHistory, format_report
+    if not os.path.exists(args.history_db):
+        print(f"İş geçmişi bulunamadı: {args.history_db}", file=sys.stderr)
+        return 1
+    history = JobHistory(args.history_db)
+    try:
+        print(format_report(history, months=args.months, group_by=args.by, slowest=args.slowest,
+                            profile=args.profile, customer=args.customer))
+    finally:
+        history.close()
+    return 0
+
+
+def _parse_numbers(text: str, kind=int) -> list:
+    try:
+        return [kind(value) for value in text.split(",") if value.strip()]
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Virgülle ayrılmış sayılar bekleniyor: {text}")
+
+
+def run_scenarios(args: argparse.Namespace) -> int:
+    import os
+    from file_handlers import read_parts_file
+    from scenarios import format_scenarios, run_scenarios as sweep, sort_scenarios, write_scenarios
+    part_lists = {}
+    for path in args.parts_files:
+        parts = read_parts_file(path)
+        if not parts:
+            print(f"HATA {path}: Dosyada geçerli parça bulunamadı.", file=sys.stderr)
+            return 1
+        part_lists[os.path.splitext(os.path.basename(path))[0]] = parts
+
+    def progress(done: int, total: int) -> None:
+        if not args.quiet:
+            print(f"\r{done}/{total} paketleme", end="", file=sys.stderr, flush=True)
+
+    try:
+        rows = sweep(part_lists, args.stock_lengths, args.kerfs, args.prices, workers=args.jobs,
+                     progress=progress)
+    except KeyboardInterrupt:
+        print("\nSenaryo taraması durduruldu.", file=sys.stderr)
+        return 130
+    if not args.quiet:
+        print(file=sys.stderr)
+    rows = sort_scenarios(rows, args.sort, args.descending)
+    print(format_scenarios(rows))
+    if args.output:
+        write_scenarios(rows, args.output)
+        print(f"Senaryo tablosu yazıldı: {args.output}")
+    return 0
+
+
+def _read_piece(line: str):
+    # "boy[,adet[,ad]]"; boş satırlar ve # ile başlayanlar atlanır
+    from optimization import Part
+    fields = [field.strip() for field in line.split(",")]
+    if not fields[0] or fields[0].startswith("#"):
+        return None
+    try:
+        quantity = int(fields[1]) if len(fields) > 1 and fields[1] else 1
+        return Part(float(fields[0]), quantity, fields[2] if len(fields) > 2 else "")
+    except ValueError:
+        raise ValueError(f"Geçersiz parça satırı: {line.strip()}")
+
+
+def run_online(args: argparse.Namespace) -> int:
+    from online_packing import OnlinePacker, format_bar
+    packer = OnlinePacker(args.stock_length, args.kerf, max_open_bars=args.max_open,
+                          fill_threshold=args.fill_threshold, max_age_s=args.max_age,
+                          min_piece_length=args.min_piece, eviction=args.eviction,
+                          on_close=lambda bar: print(format_bar(bar), flush=True))
+    source = sys.stdin if args.input == "-" else open(args.input, encoding="utf-8")
+    try:
+        for number, line in enumerate(source, 1):
+            try:
+                part = _read_piece(line)
+                if part is not None:
+                    packer.add(part)
+            except ValueError as e:
+                print(f"HATA satır {number}: {e}", file=sys.stderr)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if source is not sys.stdin:
+            source.close()
+    packer.flush()
+    fire = packer.stats.fire_efficiency()
+    print(f"Sonuç: {packer.stats.used_stocks} stok, {packer.stats.pieces} parça, "
+          f"fire {fire['total_fire']:.1f} mm, verim %{fire['total_efficiency']:.1f}")
+    return 0
+
+
+def _add_search_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--search-space", choices=SEARCH_SPACES, default="kerf",
+                        help="wide: kerf ile birlikte paketleme motoru ve yerleştirme sırası da aranır")
+    parser.add_argument("--study-db", nargs="?", const=STUDY_STORAGE_FILE,
+                        help="Optuna çalışmasını bu SQLite dosyasında sakla; aynı profil ailesindeki "
+                             "sonraki işler geçmiş denemelerden devam eder")
+    parser.add_argument("--pattern-db", nargs="?", const=PATTERN_DB_FILE,
+                        help="Kesim deseni kütüphanesi: paketleme önceki işlerin verimli desenleriyle "
+                             "tohumlanır, yeni verimli stoklar kütüphaneye eklenir")
+
+
+def _add_history_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--profile", help="Profil (kesit) adı; iş geçmişine yazılır")
+    parser.add_argument("--customer", help="Müşteri; verilmezse tek siparişli dosyada sipariş numarası")
+    parser.add_argument("--history-db", default=JOB_HISTORY_FILE, help="İş geçmişi SQLite dosyası")
+    parser.add_argument("--no-history", action="store_true", help="Çalışmayı iş geçmişine yazma")
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Kesim optimizasyonu komut satırı aracı")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    opt = sub.add_parser("optimize", help="Parça dosyasını optimize et ve ilerlemeyi yazdır")
+    opt.add_argument("parts_file", help="CSV, .kesim veya JSON parça dosyası")
+    opt.add_argument("--stock-length", type=int, default=DEFAULT_STOCK_LENGTH)
+    opt.add_argument("--kerf", type=int, default=DEFAULT_KERF)
+    opt.add_argument("--trials", type=int, default=20)
+    opt.add_argument("--algorithm", default="auto")
+    opt.add_argument("--jobs", "-j", type=int, default=1, help="Denemeleri bu kadar süreçte paralel değerlendir")
+    opt.add_argument("--server", help="Optimizasyonu bu sunucuda çalıştır (server.py)")
+    _add_search_arguments(opt)
+    opt.add_argument("--output", "-o", help="Sonucu .kesim proje dosyasına yaz")
+    opt.add_argument("--quiet", "-q", action="store_true", help="Yalnızca sonucu yazdır")
+    opt.add_argument("--stream", action="store_true",
+                     help="Çok büyük işler için sınırlı bellekli akışlı plan (kerf araması yapılmaz)")
+    opt.add_argument("--report", action="append",
+                     help="Akışlı planı bu CSV/.xlsx dosyasına yaz (birden çok kez verilebilir)")
+    opt.add_argument("--memory-budget", type=float, default=memory_budget_from_env(),
+                     help=f"Süreç belleği sınırı (MB; varsayılan {MEMORY_BUDGET_ENV_VAR}). Tahmin sığmazsa kesim "
+                          "sırası ve paralellik kapatılır, yine sığmazsa akışlı plana geçilir")
+    opt.add_argument("--profile-memory", action="store_true",
+                     help="Adım başına süre ve tracemalloc tepe belleğini yazdır (çözümü yavaşlatır)")
+    _add_history_arguments(opt)
+    opt.set_defaults(func=run_optimize)
+
+    watch = sub.add_parser("watch", help="Klasöre bırakılan sipariş dosyalarını otomatik optimize et")
+    watch.add_argument("directory", help="İzlenecek klasör (CSV, .kesim veya JSON dosyaları)")
+    watch.add_argument("--stock-length", type=int, default=DEFAULT_STOCK_LENGTH)
+    watch.add_argument("--kerf", type=int, default=DEFAULT_KERF)
+    watch.add_argument("--trials", type=int, default=20)
+    watch.add_argument("--algorithm", default="auto")
+    _add_search_arguments(watch)
+    watch.add_argument("--workers", "-j", type=int, default=2, help="Aynı anda optimize edilen en fazla dosya")
+    watch.add_argument("--queue-size", type=int, default=8, help="Havuzda bekleyebilecek en fazla dosya")
+    watch.add_argument("--settle", type=float, default=2.0,
+                       help="Dosya bu kadar saniye değişmeden kalınca yazımı bitmiş sayılır")
+    watch.add_argument("--poll", type=float, default=1.0, help="Yoklama aralığı (s)")
+    watch.add_argument("--once", action="store_true", help="Mevcut dosyaları işleyip çık")
+    _add_history_arguments(watch)
+    watch.set_defaults(func=run_watch)
+
+    worker = sub.add_parser("worker", help="Dağıtık optimizasyon işçisi başlat")
+    worker.add_argument("--host", default="127.0.0.1", help="Dinlenecek adres; yerel olmayan adreslerde KESIM_CLUSTER_KEY gizli anahtarı "
+                             "ayarlanmalıdır (anahtarı bilen işçide kod çalıştırabilir)")
+    worker.add_argument("--port", type=int, default=DEFAULT_WORKER_PORT)
+    worker.set_defaults(func=run_worker)
+
+    dist = sub.add_parser("distribute", help="Parça dosyalarını uzak işçilerde optimize et")
+    dist.add_argument("parts_files", nargs="+", help="CSV, .kesim veya JSON parça dosyaları")
+    dist.add_argument("--workers", "-w", required=True, help="İşçi adresleri: host:port,host:port")
+    dist.add_argument("--stock-length", type=int, default=DEFAULT_STOCK_LENGTH)
+    dist.add_argument("--kerf", type=int, default=DEFAULT_KERF)
+    dist.add_argument("--trials", type=int, default=20)
+    dist.add_argument("--algorithm", default="auto")
+    dist.add_argument("--output-dir", "-o", help="Sonuçları bu klasöre .kesim proje dosyası olarak yaz")
+    _add_history_arguments(dist)
+    dist.set_defaults(func=run_distribute)
+
+    scen = sub.add_parser("scenarios", help="Stok boyu, kerf ve fiyat senaryolarını karşılaştır")
+    scen.add_argument("parts_files", nargs="+", help="CSV, .kesim veya JSON parça dosyaları")
+    scen.add_argument("--stock-lengths", type=_parse_numbers, default=[DEFAULT_STOCK_LENGTH],
+                      help="Virgülle ayrılmış stok boyları (mm), ör. 6000,6500")
+    scen.add_argument("--kerfs", type=_parse_numbers, default=[DEFAULT_KERF],
+                      help="Virgülle ayrılmış testere kalınlıkları (mm)")
+    scen.add_argument("--prices", type=lambda text: _parse_numbers(text, float), default=[1.0],
+                      help="Virgülle ayrılmış stok birim fiyatları")
+    scen.add_argument("--jobs", "-j", type=int, help="Paralel süreç sayısı (varsayılan: çekirdek sayısı)")
+    scen.add_argument("--sort", choices=SCENARIO_SORT_KEYS, default="total_cost", help="Sıralama sütunu")
+    scen.add_argument("--descending", action="store_true", help="Büyükten küçüğe sırala")
+    scen.add_argument("--output", "-o", help="Tabloyu .csv, .xlsx ya da .json dosyasına yaz")
+    scen.add_argument("--quiet", "-q", action="store_true", help="İlerlemeyi yazdırma")
+    scen.set_defaults(func=run_scenarios)
+
+    online = sub.add_parser("online", help="Tek tek gelen parçaları çevrimiçi paketle, dolan stokları hemen yazdır")
+    online.add_argument("input", nargs="?", default="-",
+                        help="Satır başına \"boy[,adet[,ad]]\" içeren dosya (varsayılan: standart girdi)")
+    online.add_argument("--stock-length", type=int, default=DEFAULT_STOCK_LENGTH)
+    online.add_argument("--kerf", type=int, default=DEFAULT_KERF)
+    online.add_argument("--max-open", type=int, default=STREAM_OPEN_BARS, help="Aynı anda açık en fazla stok")
+    online.add_argument("--fill-threshold", type=float,
+                        help="Parça boyları stok boyunun bu oranına (0-1) ulaşınca stoğu kapat")
+    online.add_argument("--max-age", type=float,
+                        help="Bu kadar saniyeden uzun açık kalan stoğu kapat (parça geldikçe denetlenir)")
+    online.add_argument("--min-piece", type=float, default=0.0,
+                        help="Beklenen en kısa parça (mm); kalan boyu buna yetmeyen stok hemen kapanır")
+    online.add_argument("--eviction", choices=EVICTION_POLICIES, default="fullest",
+                        help="Açık stok sınırı dolunca kapatılacak stok")
+    online.set_defaults(func=run_online)
+
+    hist = sub.add_parser("history", help="İş geçmişinden fire ve süre eğilimi raporu")
+    hist.add_argument("--history-db", default=JOB_HISTORY_FILE, help="İş geçmişi SQLite dosyası")
+    hist.add_argument("--months", type=int, default=12, help="Son kaç ay (0: tümü)")
+    hist.add_argument("--by", choices=HISTORY_GROUPS, default="month", help="Gruplama")
+    hist.add_argument("--slowest", type=int, default=10, help="Listelenecek en yavaş iş sayısı")
+    hist.add_argument("--profile", help="Yalnızca bu profilin işleri")
+    hist.add_argument("--customer", help="Yalnızca bu müşterinin işleri")
+    hist.set_defaults(func=run_history)
+    return parser
+
+
+def main(argv=None) -> int:
+    args = build_parser().parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,211 +1,283 @@
-LANGUAGES = {
-    "tr": {
-        "add_part": "Parça Ekle",
-        "edit_part": "Parça Düzenle",
-        "delete_part": "Seçiliyi Sil",
-        "delete_all_parts": "Tümünü Sil",
-        "optimize": "Optimize Et",
-        "error_invalid_input": "Geçersiz giriş! Lütfen pozitif sayılar girin.",
-        "warning_select_part": "Lütfen önce bir parça seçin.",
-        "confirm_delete_all": "Tüm parçalar silinecek. Emin misiniz?",
-        "ready": "Hazır",
-        "optimization_complete": "Optimizasyon tamamlandı.",
-        "optimization_error": "Optimizasyon sırasında hata oluştu.",
-        "settings": "Ayarlar",
-        "file": "Dosya",
-        "theme": "Tema",
-        "settings_menu": "Ayarlar",
-        "help": "Yardım",
-        "about": "Hakkında",
-        "exit": "Çıkış",
-        "project_save": "Projeyi Kaydet",
-        "project_load": "Projeyi Yükle",
-        "import_csv": "CSV'den İçe Aktar",
-        "export_csv": "CSV'ye Dışa Aktar",
-        "export_pdf": "PDF'e Dışa Aktar",
-        "export_excel": "Excel'e Dışa Aktar",
-        "theme_select": "Tema Seç",
-        "language_select": "Dil Seçimi",
-        "english": "İngilizce",
-        "german": "Almanca",
-        "french": "Fransızca",
-        "spanish": "İspanyolca",
-        "turkish": "Türkçe",
-        "italian": "İtalyanca"
-    },
-    "en": {
-        "add_part": "Add Part",
-        "edit_part": "Edit Part",
-        "delete_part": "Delete Selected",
-        "delete_all_parts": "Delete All",
-        "optimize": "Optimize",
-        "error_invalid_input": "Invalid input! Please enter positive numbers.",
-        "warning_select_part": "Please select a part first.",
-        "confirm_delete_all": "All parts will be deleted. Are you sure?",
-        "ready": "Ready",
-        "optimization_complete": "Optimization completed.",
-        "optimization_error": "Error occurred during optimization.",
-        "settings": "Settings",
-        "file": "File",
-        "theme": "Theme",
-        "settings_menu": "Settings",
-        "help": "Help",
-        "about": "About",
-        "exit": "Exit",
-        "project_save": "Save Project",
-        "project_load": "Load Project",
-        "import_csv": "Import CSV",
-        "export_csv": "Export CSV",
-        "export_pdf": "Export PDF",
-        "export_excel": "Export Excel",
-        "theme_select": "Select Theme",
-        "language_select": "Select Language",
-        "english": "English",
-        "german": "German",
-        "french": "French",
-        "spanish": "Spanish",
-        "turkish": "Turkish",
-        "italian": "Italian"
-    },
-    "de": {
-        "add_part": "Teil hinzufügen",
-        "edit_part": "Teil bearbeiten",
-        "delete_part": "Auswahl löschen",
-        "delete_all_parts": "Alle löschen",
-        "optimize": "Optimieren",
-        "error_invalid_input": "Ungültige Eingabe! Bitte positive Zahlen eingeben.",
-        "warning_select_part": "Bitte zuerst ein Teil auswählen.",
-        "confirm_delete_all": "Alle Teile werden gelöscht. Sind Sie sicher?",
-        "ready": "Bereit",
-        "optimization_complete": "Optimierung abgeschlossen.",
-        "optimization_error": "Fehler bei der Optimierung aufgetreten.",
-        "settings": "Einstellungen",
-        "file": "Datei",
-        "theme": "Thema",
-        "settings_menu": "Einstellungen",
-        "help": "Hilfe",
-        "about": "Info",
-        "exit": "Beenden",
-        "project_save": "Projekt speichern",
-        "project_load": "Projekt laden",
-        "import_csv": "CSV importieren",
-        "export_csv": "CSV exportieren",
-        "export_pdf": "PDF exportieren",
-        "export_excel": "Excel exportieren",
-        "theme_select": "Thema wählen",
-        "language_select": "Sprache wählen",
-        "english": "Englisch",
-        "german": "Deutsch",
-        "french": "Französisch",
-        "spanish": "Spanisch",
-        "turkish": "Türkisch",
-        "italian": "Italienisch"
-    },
-    "fr": {
-        "add_part": "Ajouter une pièce",
-        "edit_part": "Modifier la pièce",
-        "delete_part": "Supprimer la sélection",
-        "delete_all_parts": "Tout supprimer",
-        "optimize": "Optimiser",
-        "error_invalid_input": "Entrée invalide ! Veuillez saisir des nombres positifs.",
-        "warning_select_part": "Veuillez d'abord sélectionner une pièce.",
-        "confirm_delete_all": "Toutes les pièces seront supprimées. Êtes-vous sûr ?",
-        "ready": "Prêt",
-        "optimization_complete": "Optimisation terminée.",
-        "optimization_error": "Erreur survenue lors de l'optimisation.",
-        "settings": "Paramètres",
-        "file": "Fichier",
-        "theme": "Thème",
-        "settings_menu": "Paramètres",
-        "help": "Aide",
-        "about": "À propos",
-        "exit": "Quitter",
-        "project_save": "Sauvegarder le projet",
-        "project_load": "Charger le projet",
-        "import_csv": "Importer CSV",
-        "export_csv": "Exporter CSV",
-        "export_pdf": "Exporter PDF",
-        "export_excel": "Exporter Excel",
-        "theme_select": "Choisir le thème",
-        "language_select": "Choisir la langue",
-        "english": "Anglais",
-        "german": "Allemand",
-        "french": "Français",
-        "spanish": "Espagnol",
-        "turkish": "Turc",
-        "italian": "Italien"
-    },
-    "es": {
-        "add_part": "Agregar pieza",
-        "edit_part": "Editar pieza",
-        "delete_part": "Eliminar selección",
-        "delete_all_parts": "Eliminar todo",
-        "optimize": "Optimizar",
-        "error_invalid_input": "Entrada inválida! Por favor ingrese números positivos.",
-        "warning_select_part": "Por favor seleccione una pieza primero.",
-        "confirm_delete_all": "Se eliminarán todas las piezas. ¿Está seguro?",
-        "ready": "Listo",
-        "optimization_complete": "Optimización completada.",
-        "optimization_error": "Error ocurrido durante la optimización.",
-        "settings": "Configuración",
-        "file": "Archivo",
-        "theme": "Tema",
-        "settings_menu": "Configuraciones",
-        "help": "Ayuda",
-        "about": "Acerca de",
-        "exit": "Salir",
-        "project_save": "Guardar proyecto",
-        "project_load": "Cargar proyecto",
-        "import_csv": "Importar CSV",
-        "export_csv": "Exportar CSV",
-        "export_pdf": "Exportar PDF",
-        "export_excel": "Exportar Excel",
-        "theme_select": "Seleccionar tema",
-        "language_select": "Seleccionar idioma",
-        "english": "Inglés",
-        "german": "Alemán",
-        "french": "Francés",
-        "spanish": "Español",
-        "turkish": "Turco",
-        "italian": "Italiano"
-    },
-    "it": {
-        "add_part": "Aggiungi pezzo",
-        "edit_part": "Modifica pezzo",
-        "delete_part": "Elimina selezionato",
-        "delete_all_parts": "Elimina tutto",
-        "optimize": "Ottimizza",
-        "error_invalid_input": "Input non valido! Inserisci numeri positivi.",
-        "warning_select_part": "Seleziona prima un pezzo.",
-        "confirm_delete_all": "Tutti i pezzi saranno eliminati. Sei sicuro?",
-        "ready": "Pronto",
-        "optimization_complete": "Ottimizzazione completata.",
-        "optimization_error": "Errore durante l'ottimizzazione.",
-        "settings": "Impostazioni",
-        "file": "File",
-        "theme": "Tema",
-        "settings_menu": "Impostazioni",
-        "help": "Aiuto",
-        "about": "Informazioni",
-        "exit": "Esci",
-        "project_save": "Salva progetto",
-        "project_load": "Carica progetto",
-        "import_csv": "Importa CSV",
-        "export_csv": "Esporta CSV",
-        "export_pdf": "Esporta PDF",
-        "export_excel": "Esporta Excel",
-        "theme_select": "Seleziona tema",
-        "language_select": "Seleziona lingua",
-        "english": "Inglese",
-        "german": "Tedesco",
-        "french": "Francese",
-        "spanish": "Spagnolo",
-        "turkish": "Turco",
-        "italian": "Italiano"
-    }
-}
-
-DEFAULT_LANGUAGE = "tr"
-DEFAULT_THEME = "clam"
-DEFAULT_STOCK_LENGTH = 6000  # mm
-DEFAULT_KERF = 3  # mm
+LANGUAGES = {
+    "tr": {
+        "add_part": "Parça Ekle",
+        "edit_part": "Parça Düzenle",
+        "delete_part": "Seçiliyi Sil",
+        "delete_all_parts": "Tümünü Sil",
+        "optimize": "Optimize Et",
+        "stop_optimization": "Durdur",
+        "error_invalid_input": "Geçersiz giriş! Lütfen pozitif sayılar girin.",
+        "warning_select_part": "Lütfen önce bir parça seçin.",
+        "confirm_delete_all": "Tüm parçalar silinecek. Emin misiniz?",
+        "ready": "Hazır",
+        "optimization_complete": "Optimizasyon tamamlandı.",
+        "optimization_error": "Optimizasyon sırasında hata oluştu.",
+        "settings": "Ayarlar",
+        "file": "Dosya",
+        "theme": "Tema",
+        "settings_menu": "Ayarlar",
+        "help": "Yardım",
+        "about": "Hakkında",
+        "exit": "Çıkış",
+        "project_save": "Projeyi Kaydet",
+        "project_load": "Projeyi Yükle",
+        "import_csv": "CSV'den İçe Aktar",
+        "export_csv": "CSV'ye Dışa Aktar",
+        "batch_optimize": "Toplu Sipariş Optimizasyonu",
+        "commit_remnants": "Kesilen Planı Artık Stoğuna İşle",
+        "export_pdf": "PDF'e Dışa Aktar",
+        "export_all": "Tüm Raporları Dışa Aktar",
+        "cancel_export": "Dışa Aktarmayı İptal Et",
+        "export_excel": "Excel'e Dışa Aktar",
+        "theme_select": "Tema Seç",
+        "language_select": "Dil Seçimi",
+        "english": "İngilizce",
+        "german": "Almanca",
+        "french": "Fransızca",
+        "spanish": "İspanyolca",
+        "turkish": "Türkçe",
+        "italian": "İtalyanca"
+    },
+    "en": {
+        "add_part": "Add Part",
+        "edit_part": "Edit Part",
+        "delete_part": "Delete Selected",
+        "delete_all_parts": "Delete All",
+        "optimize": "Optimize",
+        "stop_optimization": "Stop",
+        "error_invalid_input": "Invalid input! Please enter positive numbers.",
+        "warning_select_part": "Please select a part first.",
+        "confirm_delete_all": "All parts will be deleted. Are you sure?",
+        "ready": "Ready",
+        "optimization_complete": "Optimization completed.",
+        "optimization_error": "Error occurred during optimization.",
+        "settings": "Settings",
+        "file": "File",
+        "theme": "Theme",
+        "settings_menu": "Settings",
+        "help": "Help",
+        "about": "About",
+        "exit": "Exit",
+        "project_save": "Save Project",
+        "project_load": "Load Project",
+        "import_csv": "Import CSV",
+        "export_csv": "Export CSV",
+        "batch_optimize": "Batch Optimize Orders",
+        "commit_remnants": "Commit Plan to Remnant Stock",
+        "export_pdf": "Export PDF",
+        "export_all": "Export All Reports",
+        "cancel_export": "Cancel Export",
+        "export_excel": "Export Excel",
+        "theme_select": "Select Theme",
+        "language_select": "Select Language",
+        "english": "English",
+        "german": "German",
+        "french": "French",
+        "spanish": "Spanish",
+        "turkish": "Turkish",
+        "italian": "Italian"
+    },
+    "de": {
+        "add_part": "Teil hinzufügen",
+        "edit_part": "Teil bearbeiten",
+        "delete_part": "Auswahl löschen",
+        "delete_all_parts": "Alle löschen",
+        "optimize": "Optimieren",
+        "stop_optimization": "Stopp",
+        "error_invalid_input": "Ungültige Eingabe! Bitte positive Zahlen eingeben.",
+        "warning_select_part": "Bitte zuerst ein Teil auswählen.",
+        "confirm_delete_all": "Alle Teile werden gelöscht. Sind Sie sicher?",
+        "ready": "Bereit",
+        "optimization_complete": "Optimierung abgeschlossen.",
+        "optimization_error": "Fehler bei der Optimierung aufgetreten.",
+        "settings": "Einstellungen",
+        "file": "Datei",
+        "theme": "Thema",
+        "settings_menu": "Einstellungen",
+        "help": "Hilfe",
+        "about": "Info",
+        "exit": "Beenden",
+        "project_save": "Projekt speichern",
+        "project_load": "Projekt laden",
+        "import_csv": "CSV importieren",
+        "export_csv": "CSV exportieren",
+        "batch_optimize": "Aufträge gemeinsam optimieren",
+        "commit_remnants": "Plan in Reststücklager buchen",
+        "export_pdf": "PDF exportieren",
+        "export_all": "Alle Berichte exportieren",
+        "cancel_export": "Export abbrechen",
+        "export_excel": "Excel exportieren",
+        "theme_select": "Thema wählen",
+        "language_select": "Sprache wählen",
+        "english": "Englisch",
+        "german": "Deutsch",
+        "french": "Französisch",
+        "spanish": "Spanisch",
+        "turkish": "Türkisch",
+        "italian": "Italienisch"
+    },
+    "fr": {
+        "add_part": "Ajouter une pièce",
+        "edit_part": "Modifier la pièce",
+        "delete_part": "Supprimer la sélection",
+        "delete_all_parts": "Tout supprimer",
+        "optimize": "Optimiser",
+        "stop_optimization": "Arrêter",
+        "error_invalid_input": "Entrée invalide ! Veuillez saisir des nombres positifs.",
+        "warning_select_part": "Veuillez d'abord sélectionner une pièce.",
+        "confirm_delete_all": "Toutes les pièces seront supprimées. Êtes-vous sûr ?",
+        "ready": "Prêt",
+        "optimization_complete": "Optimisation terminée.",
+        "optimization_error": "Erreur survenue lors de l'optimisation.",
+        "settings": "Paramètres",
+        "file": "Fichier",
+        "theme": "Thème",
+        "settings_menu": "Paramètres",
+        "help": "Aide",
+        "about": "À propos",
+        "exit": "Quitter",
+        "project_save": "Sauvegarder le projet",
+        "project_load": "Charger le projet",
+        "import_csv": "Importer CSV",
+        "export_csv": "Exporter CSV",
+        "batch_optimize": "Optimiser des commandes groupées",
+        "commit_remnants": "Enregistrer le plan dans le stock de chutes",
+        "export_pdf": "Exporter PDF",
+        "export_all": "Exporter tous les rapports",
+        "cancel_export": "Annuler l'export",
+        "export_excel": "Exporter Excel",
+        "theme_select": "Choisir le thème",
+        "language_select": "Choisir la langue",
+        "english": "Anglais",
+        "german": "Allemand",
+        "french": "Français",
+        "spanish": "Espagnol",
+        "turkish": "Turc",
+        "italian": "Italien"
+    },
+    "es": {
+        "add_part": "Agregar pieza",
+        "edit_part": "Editar pieza",
+        "delete_part": "Eliminar selección",
+        "delete_all_parts": "Eliminar todo",
+        "optimize": "Optimizar",
+        "stop_optimization": "Detener",
+        "error_invalid_input": "Entrada inválida! Por favor ingrese números positivos.",
+        "warning_select_part": "Por favor seleccione una pieza primero.",
+        "confirm_delete_all": "Se eliminarán todas las piezas. ¿Está seguro?",
+        "ready": "Listo",
+        "optimization_complete": "Optimización completada.",
+        "optimization_error": "Error ocurrido durante la optimización.",
+        "settings": "Configuración",
+        "file": "Archivo",
+        "theme": "Tema",
+        "settings_menu": "Configuraciones",
+        "help": "Ayuda",
+        "about": "Acerca de",
+        "exit": "Salir",
+        "project_save": "Guardar proyecto",
+        "project_load": "Cargar proyecto",
+        "import_csv": "Importar CSV",
+        "export_csv": "Exportar CSV",
+        "batch_optimize": "Optimizar pedidos en lote",
+        "commit_remnants": "Registrar plan en stock de retales",
+        "export_pdf": "Exportar PDF",
+        "export_all": "Exportar todos los informes",
+        "cancel_export": "Cancelar exportación",
+        "export_excel": "Exportar Excel",
+        "theme_select": "Seleccionar tema",
+        "language_select": "Seleccionar idioma",
+        "english": "Inglés",
+        "german": "Alemán",
+        "french": "Francés",
+        "spanish": "Español",
+        "turkish": "Turco",
+        "italian": "Italiano"
+    },
+    "it": {
+        "add_part": "Aggiungi pezzo",
+        "edit_part": "Modifica pezzo",
+        "delete_part": "Elimina selezionato",
+        "delete_all_parts": "Elimina tutto",
+        "optimize": "Ottimizza",
+        "stop_optimization": "Ferma",
+        "error_invalid_input": "Input non valido! Inserisci numeri positivi.",
+        "warning_select_part": "Seleziona prima un pezzo.",
+        "confirm_delete_all": "Tutti i pezzi saranno eliminati. Sei sicuro?",
+        "ready": "Pronto",
+        "optimization_complete": "Ottimizzazione completata.",
+        "optimization_error": "Errore durante l'ottimizzazione.",
+        "settings": "Impostazioni",
+        "file": "File",
+        "theme": "Tema",
+        "settings_menu": "Impostazioni",
+        "help": "Aiuto",
+        "about": "Informazioni",
+        "exit": "Esci",
+        "project_save": "Salva progetto",
+        "project_load": "Carica progetto",
+        "import_csv": "Importa CSV",
+        "export_csv": "Esporta CSV",
+        "batch_optimize": "Ottimizza ordini in blocco",
+        "commit_remnants": "Registra piano nel magazzino sfridi",
+        "export_pdf": "Esporta PDF",
+        "export_all": "Esporta tutti i report",
+        "cancel_export": "Annulla esportazione",
+        "export_excel": "Esporta Excel",
+        "theme_select": "Seleziona tema",
+        "language_select": "Seleziona lingua",
+        "english": "Inglese",
+        "german": "Tedesco",
+        "french": "Francese",
+        "spanish": "Spagnolo",
+        "turkish": "Turco",
+        "italian": "Italiano"
+    }
+}
+
+DEFAULT_LANGUAGE = "tr"
+DEFAULT_THEME = "clam"
+THEME_SETTINGS_FILE = "theme_settings.json"  # son seçilen tema
+DEFAULT_STOCK_LENGTH = 6000  # mm
+DEFAULT_KERF = 3  # mm
+# Ayarlanırsa her optimizasyonun Chrome trace JSON'u bu dosyaya yazılır
+TRACE_ENV_VAR = "KESIM_TRACE_FILE"
+# Artık stoğu: bu boydan kısa kesim artıkları fire sayılır, stoğa eklenmez
+REMNANT_DB_FILE = "remnants.db"
+REMNANT_MIN_LENGTH = 500  # mm
+
+# Klasör izleme: işlenen dosyaların indeksi (izlenen klasörde)
+WATCH_INDEX_FILE = ".kesim_watch.db"
+
+# Kalıcı optuna çalışmaları (--study-db değer verilmeden kullanılırsa)
+STUDY_STORAGE_FILE = "optuna_studies.db"
+
+# İş geçmişi: her optimizasyonun özeti (fire, stok, süre) bu SQLite dosyasına yazılır
+JOB_HISTORY_FILE = "job_history.db"
+
+# Kesim deseni kütüphanesi: bu verimin (%) üzerindeki stoklar desen olarak saklanır,
+# (stok boyu, kerf) başına en fazla PATTERN_LIMIT desen tutulur
+PATTERN_DB_FILE = "patterns.db"
+PATTERN_MIN_EFFICIENCY = 95.0
+PATTERN_LIMIT = 5000
+
+# İş sunucusu (server.py) paylaşılan erişim anahtarı; ayarlıysa istemciler Authorization: Bearer ile gönderir
+SERVER_TOKEN_ENV_VAR = "KESIM_SERVER_TOKEN"
+
+# Bellek bütçesi (MB): ayarlanırsa çözüm önce tahminle, sonra canlı ölçümle bu sınırda tutulur
+MEMORY_BUDGET_ENV_VAR = "KESIM_MEMORY_BUDGET_MB"
+# Tahmin katsayıları (tracemalloc ile ölçüldü): plan ve deneme başına parça maliyeti,
+# kesim sıralamasının ek maliyeti ve her ek işçi sürecinin taban belleği
+PLAN_BYTES_PER_PIECE = 128
+SEQUENCE_BYTES_PER_PIECE = 224
+WORKER_PROCESS_MB = 40
+
+# Dağıtık optimizasyon işçilerinin varsayılan portu
+DEFAULT_WORKER_PORT = 8766
+
+# Otomatik kayıt: düzenleme journal'ı ve anlık görüntü bu klasörde tutulur
+AUTOSAVE_DIR = "autosave"
+JOURNAL_BATCH_SIZE = 32  # bu kadar kayıt birikince fsync
+JOURNAL_FLUSH_MS = 1000  # biriken kayıtlar en geç bu sürede diske iner
+JOURNAL_COMPACT_RECORDS = 20000  # bu kadar kayıttan sonra anlık görüntü alınır
+JOURNAL_COMPACT_INTERVAL_S = 300  # değişiklik varsa en geç bu sürede anlık görüntü alınır
@@ -0,0 +1,416 @@
+import hashlib
+import ipaddress
+import multiprocessing
+import os
+import pickle
+import queue
+import socket
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor, wait
+from contextlib import closing
+from multiprocessing.connection import Connection, Listener, answer_challenge, deliver_challenge
+from typing import Any, Dict, List, Optional, Tuple
+
+import portfolio
+from constants import DEFAULT_WORKER_PORT
+from optimization import Finished, OptimizationCancelled, Part, iter_optimize, lower_bound
+from project_format import result_from_dict, result_to_dict
+
+# İşçiler ve koordinatör multiprocessing.connection üzerinden (TCP + HMAC kimlik doğrulama,
+# pickle mesajlar) konuşur; yalnızca güvenilen ağlarda ve ortak bir anahtarla kullanılmalıdır.
+# Anahtarı bilen herkes işçide kod çalıştırabilir: anahtar ortam değişkeninden gelir, yalnızca
+# tamamen yerel (loopback) kurulumlarda sabit geliştirme anahtarına düşülür.
+CLUSTER_KEY_ENV_VAR = "KESIM_CLUSTER_KEY"
+_LOOPBACK_KEY = "kesim-cluster-local"
+HEARTBEAT_S = 1.0
+WORKER_TIMEOUT_S = 5.0
+RECONNECT_S = 2.0
+MAX_ATTEMPTS = 3
+
+Address = Tuple[str, int]
+
+
+def is_loopback(host: str) -> bool:
+    if host == "localhost":
+        return True
+    try:
+        return ipaddress.ip_address(host).is_loopback
+    except ValueError:
+        return False
+
+
+def cluster_key(hosts: Optional[List[str]] = None) -> bytes:
+    """
+    KESIM_CLUSTER_KEY ortam değişkenindeki anahtar. Ayarlanmamışsa yalnızca hosts'un hepsi
+    loopback ise yerel geliştirme anahtarı döner; aksi halde ValueError.
+    """
+    key = os.environ.get(CLUSTER_KEY_ENV_VAR)
+    if key:
+        return key.encode()
+    if hosts and all(is_loopback(host) for host in hosts):
+        return _LOOPBACK_KEY.encode()
+    raise ValueError(f"{CLUSTER_KEY_ENV_VAR} ortam değişkeni ayarlanmadan yerel olmayan adreslerde işçi "
+                     f"ya da koordinatör başlatılamaz (bağlantılar pickle taşır, anahtarı bilen kod çalıştırabilir).")
+
+
+def parse_address(text: str) -> Address:
+    host, _, port = text.strip().rpartition(":")
+    if not host or not port.isdigit():
+        raise ValueError(f"Geçersiz işçi adresi: {text} (host:port bekleniyor)")
+    return host, int(port)
+
+
+# ---- İşçi ----
+
+def _execute(kind: str, payload: Dict[str, Any]) -> Any:
+    # İşçinin görev sürecinde çalışır; portfolio._stop koordinatörün iptal isteğiyle kurulur
+    if kind == "optimize":
+        events = iter_optimize(payload["parts"], payload["stock_length"], payload["kerf"], **payload["options"])
+        with closing(events):
+            for event in events:
+                if portfolio._stop.is_set():
+                    raise OptimizationCancelled()
+                if isinstance(event, Finished):
+                    return result_to_dict(event.result)
+        raise OptimizationCancelled()
+    if kind == "engine":
+        return portfolio._run_engine(**payload)
+    raise ValueError(f"Bilinmeyen görev türü: {kind}")
+
+
+def run_worker(host: str = "127.0.0.1", port: int = DEFAULT_WORKER_PORT, authkey: Optional[bytes] = None,
+               log=print) -> None:
+    """
+    Koordinatör bağlantılarını sırayla kabul eder ve gönderilen görevleri tek bir görev
+    sürecinde çalıştırır. Görev sürerken HEARTBEAT_S aralıkla yaşam sinyali gönderilir;
+    koordinatörden gelen "cancel" ve "incumbent" mesajları görev sürecine iletilir.
+    """
+    authkey = authkey or cluster_key([host])
+    ctx = multiprocessing.get_context()
+    incumbent = ctx.Value("i", 0)
+    stop = ctx.Event()
+    pool = ProcessPoolExecutor(max_workers=1, mp_context=ctx,
+                               initializer=portfolio._init_worker, initargs=(incumbent, stop))
+    # Görev süreci dinleme soketinden önce başlatılır; yoksa soketi miras alır ve işçi
+    # öldükten sonra port açık kalıp koordinatörü bekletir
+    pool.submit(int).result()
+    listener = Listener((host, port), authkey=authkey)
+    log(f"İşçi hazır: {host}:{listener.address[1]}")
+    # Kopan koordinatörden kalan görev durdurulmuş olsa da süreçte hâlâ çalışıyor olabilir
+    running: List[Optional[Future]] = [None]
+    try:
+        while True:
+            conn = listener.accept()
+            try:
+                _serve_coordinator(conn, pool, incumbent, stop, log, running)
+            except (EOFError, OSError):
+                pass
+            finally:
+                # Koordinatör koptuysa yarıda kalan görev durdurulur
+                stop.set()
+                conn.close()
+    finally:
+        listener.close()
+        pool.shutdown(wait=True, cancel_futures=True)
+
+
+def _serve_coordinator(conn, pool: ProcessPoolExecutor, incumbent, stop, log,
+                       running: List[Optional[Future]]) -> None:
+    while True:
+        message = conn.recv()
+        if message[0] != "task":
+            continue
+        _, task_id, kind, payload, best = message
+        previous = running[0]
+        if previous is not None and not previous.done():
+            # Önceki görev durana kadar beklenir; stop temizlenirse yeniden canlanırdı.
+            # Bu sırada gelen iptal/incumbent mesajları görev başladıktan sonra okunur.
+            stop.set()
+            while not wait([previous], timeout=HEARTBEAT_S).done:
+                conn.send(("heartbeat", task_id))
+        stop.clear()
+        incumbent.value = best or 0
+        future = pool.submit(_execute, kind, payload)
+        running[0] = future
+        while not future.done():
+            if conn.poll(HEARTBEAT_S):
+                command = conn.recv()
+                if command[0] == "cancel" and command[1] == task_id:
+                    stop.set()
+                elif command[0] == "incumbent":
+                    with incumbent.get_lock():
+                        if incumbent.value == 0 or command[1] < incumbent.value:
+                            incumbent.value = command[1]
+            else:
+                conn.send(("heartbeat", task_id))
+        try:
+            conn.send(("result", task_id, True, future.result()))
+        except Exception as e:
+            conn.send(("result", task_id, False, f"{type(e).__name__}: {e}"))
+        log(f"Görev tamamlandı: {task_id[:12]} ({kind})")
+
+
+# ---- Koordinatör ----
+
+class RemoteTaskError(Exception):
+    pass
+
+
+class _Task:
+    __slots__ = ("id", "kind", "payload", "group", "future", "attempts", "cancel_requested")
+
+    def __init__(self, task_id: str, kind: str, payload: Dict[str, Any], group: Optional[str]):
+        self.id = task_id
+        self.kind = kind
+        self.payload = payload
+        self.group = group
+        self.future: Future = Future()
+        self.attempts = 0
+        self.cancel_requested = False
+
+
+def _skipped_engine(name: str) -> Dict[str, Any]:
+    return {"engine": name, "status": "skipped", "bars": None, "kerf": None, "recipe": None,
+            "time_s": 0.0, "evaluations": 0, "pruned": 0}
+
+
+class Coordinator:
+    """
+    Görevleri (optimize_parts işleri ya da portföy motorları) uzak işçilere dağıtır.
+    Her işçi için bir bağlantı iş parçacığı kuyruktan görev alır; işçiden WORKER_TIMEOUT_S
+    boyunca yaşam sinyali gelmezse ya da bağlantı koparsa görev başka işçiye yeniden
+    verilir (en fazla max_attempts kez). Görevler içerik özetiyle kimliklendirilir: aynı
+    görev ikinci kez gönderilirse mevcut Future döner, gecikmeli gelen ikinci sonuç atılır.
+    """
+
+    def __init__(self, workers: List[Address], authkey: Optional[bytes] = None,
+                 timeout_s: float = WORKER_TIMEOUT_S, max_attempts: int = MAX_ATTEMPTS):
+        if not workers:
+            raise ValueError("En az bir işçi adresi gerekli.")
+        self.workers = list(workers)
+        self.authkey = authkey or cluster_key([host for host, _port in self.workers])
+        self.timeout_s = timeout_s
+        self.max_attempts = max_attempts
+        self.stats = {"submitted": 0, "done": 0, "failed": 0, "retries": 0, "worker_lost": 0,
+                      "duplicates": 0}
+        self.alive: Dict[Address, bool] = {address: False for address in self.workers}
+        self._tasks: Dict[str, _Task] = {}
+        self._queue: "queue.Queue[_Task]" = queue.Queue()
+        self._lock = threading.Lock()
+        self._closing = threading.Event()
+        self._threads: List[threading.Thread] = []
+        # Portföy grupları: grup -> {"best": en iyi stok sayısı (0 = yok), "lb": alt sınır}
+        self._groups: Dict[str, Dict[str, int]] = {}
+
+    def start(self) -> "Coordinator":
+        for address in self.workers:
+            thread = threading.Thread(target=self._worker_loop, args=(address,), daemon=True,
+                                      name=f"coordinator-{address[0]}:{address[1]}")
+            thread.start()
+            self._threads.append(thread)
+        return self
+
+    def close(self) -> None:
+        self._closing.set()
+        for thread in self._threads:
+            thread.join()
+        for task in self._tasks.values():
+            if not task.future.done():
+                task.future.set_exception(RemoteTaskError("Koordinatör kapatıldı."))
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+    # ---- Gönderme ----
+
+    def submit(self, kind: str, payload: Dict[str, Any], group: Optional[str] = None) -> Future:
+        task_id = hashlib.sha256(pickle.dumps((kind, payload))).hexdigest()
+        with self._lock:
+            task = self._tasks.get(task_id)
+            # Hatayla biten görev yeniden gönderilebilir; diğer durumlarda aynı Future paylaşılır
+            if task is not None and not (task.future.done() and task.future.exception()):
+                self.stats["duplicates"] += 1
+                return task.future
+            task = self._tasks[task_id] = _Task(task_id, kind, payload, group)
+            self.stats["submitted"] += 1
+        self._queue.put(task)
+        return task.future
+
+    def submit_optimize(self, parts_data: List[Any], stock_length: int, kerf: int, **options) -> Future:
+        """
+        optimize_parts işini bir işçide çalıştırır; Future, optimize_parts sonucuna benzer sözlük döndürür.
+        """
+        remote = self.submit("optimize", {"parts": parts_data, "stock_length": int(stock_length),
+                                          "kerf": int(kerf), "options": options})
+        local: Future = Future()
+
+        def convert(done: Future) -> None:
+            try:
+                local.set_result(result_from_dict(done.result()))
+            except Exception as e:
+                local.set_exception(e)
+        remote.add_done_callback(convert)
+        return local
+
+    def run_portfolio(self, parts: List[Part], stock_length: int, k_min: int, k_max: int, trials: int = 20,
+                      engines: Optional[List[str]] = None, seed: int = 0) -> Dict[str, Any]:
+        """
+        Portföy motorlarını ayrı işçilerde yarıştırır (portfolio.run_portfolio ile aynı dönüş).
+        En iyi stok sayısı yaşam sinyalleriyle işçilere iletilir; alt sınıra ulaşılınca diğer
+        motorlara iptal gönderilir, henüz başlamamış olanlar atlanır.
+        """
+        engines = list(engines or portfolio.PORTFOLIO_ENGINES)
+        lb = lower_bound(parts, stock_length, k_min)
+        start = time.perf_counter()
+        group = f"portfolio-{time.time_ns()}"
+        with self._lock:
+            self._groups[group] = {"best": 0, "lb": lb}
+        futures = {
+            name: self.submit("engine", {"name": name, "parts": parts, "stock_length": stock_length,
+                                         "k_min": k_min, "k_max": k_max, "trials": trials, "lb": lb,
+                                         "seed": seed + i}, group=group)
+            for i, name in enumerate(engines)
+        }
+        reports: Dict[str, Dict[str, Any]] = {}
+        for name, future in futures.items():
+            try:
+                reports[name] = future.result()
+            except RemoteTaskError as e:
+                reports[name] = dict(_skipped_engine(name), status="failed", error=str(e))
+        with self._lock:
+            del self._groups[group]
+        finished = [r for r in reports.values() if r["bars"] is not None]
+        if not finished:
+            raise ValueError("Portföydeki hiçbir motor plan üretemedi.")
+        winner = min(finished, key=lambda r: (r["bars"], r["time_s"]))
+        # İşçiler plan değil tarif gönderir; kazanan plan koordinatörde yeniden paketlenir
+        plan = portfolio.build_plan(parts, stock_length, winner["recipe"])
+        return {
+            "winner": winner["engine"],
+            "bars": winner["bars"],
+            "kerf": winner["kerf"],
+            "plan": plan,
+            "lower_bound": lb,
+            "wall_s": time.perf_counter() - start,
+            "engines": {name: portfolio.engine_summary(report) for name, report in reports.items()},
+        }
+
+    # ---- Sonuçlar ----
+
+    def _complete(self, task: _Task, ok: bool, value: Any) -> None:
+        with self._lock:
+            if task.future.done():
+                self.stats["duplicates"] += 1
+                return
+            if not ok:
+                self.stats["failed"] += 1
+                task.future.set_exception(RemoteTaskError(value))
+                return
+            self.stats["done"] += 1
+            group = self._groups.get(task.group) if task.group else None
+            if group is not None and value.get("bars"):
+                if group["best"] == 0 or value["bars"] < group["best"]:
+                    group["best"] = value["bars"]
+                if group["best"] <= group["lb"]:
+                    # Alt sınıra ulaşıldı: gruptaki diğer motorlar durdurulur
+                    for other in self._tasks.values():
+                        if other.group == task.group and other is not task:
+                            other.cancel_requested = True
+            task.future.set_result(value)
+
+    def _retry(self, task: _Task, reason: str) -> None:
+        task.attempts += 1
+        if task.attempts >= self.max_attempts:
+            with self._lock:
+                self.stats["failed"] += 1
+                if not task.future.done():
+                    task.future.set_exception(
+                        RemoteTaskError(f"Görev {task.attempts} denemede tamamlanamadı: {reason}"))
+            return
+        with self._lock:
+            self.stats["retries"] += 1
+        self._queue.put(task)
+
+    # ---- İşçi bağlantıları ----
+
+    def _connect(self, address: Address) -> Optional[Connection]:
+        # Client() zaman aşımı bilmez: yanıt vermeyen bir port el sıkışmada sonsuza dek bekletir
+        conn = None
+        try:
+            sock = socket.create_connection(address, timeout=self.timeout_s)
+            sock.setblocking(True)
+            conn = Connection(sock.detach())
+            if not conn.poll(self.timeout_s):
+                raise TimeoutError()
+            answer_challenge(conn, self.authkey)
+            deliver_challenge(conn, self.authkey)
+        except (OSError, EOFError, multiprocessing.AuthenticationError):
+            if conn is not None:
+                conn.close()
+            self.alive[address] = False
+            return None
+        self.alive[address] = True
+        return conn
+
+    def _worker_loop(self, address: Address) -> None:
+        conn = None
+        while not self._closing.is_set():
+            if conn is None:
+                conn = self._connect(address)
+                if conn is None:
+                    self._closing.wait(RECONNECT_S)
+                    continue
+            try:
+                task = self._queue.get(timeout=0.2)
+            except queue.Empty:
+                continue
+            if task.future.done():
+                continue
+            if task.cancel_requested and task.kind == "engine":
+                self._complete(task, True, _skipped_engine(task.payload["name"]))
+                continue
+            try:
+                self._run_task(conn, task)
+            except (OSError, EOFError, TimeoutError) as e:
+                # İşçi kayıp: bağlantı kapatılır, görev kuyruğa geri döner
+                conn.close()
+                conn = None
+                self.alive[address] = False
+                with self._lock:
+                    self.stats["worker_lost"] += 1
+                self._retry(task, f"{address[0]}:{address[1]} yanıt vermedi ({type(e).__name__})")
+        if conn is not None:
+            conn.close()
+
+    def _group_best(self, task: _Task) -> int:
+        group = self._groups.get(task.group) if task.group else None
+        return group["best"] if group else 0
+
+    def _run_task(self, conn, task: _Task) -> None:
+        sent_best = self._group_best(task)
+        cancel_sent = False
+        conn.send(("task", task.id, task.kind, task.payload, sent_best))
+        while True:
+            if self._closing.is_set():
+                conn.send(("cancel", task.id))
+                return
+            if not conn.poll(self.timeout_s):
+                raise TimeoutError()
+            message = conn.recv()
+            if message[0] == "result" and message[1] == task.id:
+                self._complete(task, message[2], message[3])
+                return
+            # Yaşam sinyali: iptal isteği ve daha iyi stok sayısı işçiye iletilir
+            if task.cancel_requested and not cancel_sent:
+                conn.send(("cancel", task.id))
+                cancel_sent = True
+            best = self._group_best(task)
+            if best and (sent_best == 0 or best < sent_best):
+                conn.send(("incumbent", best))
+                sent_best = best
+
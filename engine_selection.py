@@ -0,0 +1,154 @@
+import json
+import math
+import os
+import random
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from optimization import Part, _simple_first_fit, lower_bound
+
+BENCHMARK_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "engine_benchmarks.json")
+
+# Karşılaştırılan motor/bütçe seçenekleri: (algorithm, trials)
+CANDIDATES: List[Tuple[str, int]] = [
+    ("first_fit", 4),
+    ("best_fit", 4),
+    ("first_fit", 20),
+    ("portfolio", 20),
+    ("portfolio", 60),
+]
+# Parça boyu / stok boyu oranı sınıfları
+RATIO_BINS = (0.1, 0.25, 0.5)
+NEIGHBOURS = 3
+
+_benchmark_cache: Dict[str, List[Dict[str, Any]]] = {}
+
+
+def instance_features(parts: List[Part], stock_length: int, kerf: int) -> Dict[str, Any]:
+    """
+    Ucuz örnek özellikleri: parça sayısı, farklı boy sayısı, boy/stok oranı dağılımı
+    ve first-fit planının alt sınırdan sapması (slack).
+    """
+    pieces = sum(p.quantity for p in parts)
+    histogram = [0] * (len(RATIO_BINS) + 1)
+    for p in parts:
+        ratio = p.length / stock_length
+        histogram[sum(1 for edge in RATIO_BINS if ratio >= edge)] += p.quantity
+    lb = lower_bound(parts, stock_length, kerf)
+    ffd_bars = len(_simple_first_fit(parts, stock_length, kerf))
+    return {
+        "pieces": pieces,
+        "distinct_lengths": len({p.length for p in parts}),
+        "ratio_histogram": [count / pieces for count in histogram],
+        "lower_bound": lb,
+        "ffd_bars": ffd_bars,
+        "slack": (ffd_bars - lb) / lb,
+    }
+
+
+def _feature_vector(features: Dict[str, Any]) -> List[float]:
+    # Ölçekleri yakın tutmak için sayılar logaritmik alınır
+    return [
+        math.log10(features["pieces"] + 1),
+        math.log10(features["distinct_lengths"] + 1),
+        features["slack"] * 10,
+        *features["ratio_histogram"],
+    ]
+
+
+def load_benchmarks(path: str = BENCHMARK_FILE) -> List[Dict[str, Any]]:
+    if path not in _benchmark_cache:
+        with open(path, "r", encoding="utf-8") as f:
+            _benchmark_cache[path] = json.load(f)["instances"]
+    return _benchmark_cache[path]
+
+
+def select_engine(parts: List[Part], stock_length: int, kerf: int,
+                  benchmarks: Optional[List[Dict[str, Any]]] = None) -> Dict[str, Any]:
+    """
+    Örneğe en yakın kıyaslama örneklerinde en iyi plana en kısa sürede ulaşan
+    motor/bütçeyi seçer. Dönen sözlük seçimi, gerekçesini ve özellikleri içerir.
+    """
+    features = instance_features(parts, stock_length, kerf)
+    if features["ffd_bars"] <= features["lower_bound"]:
+        return {"algorithm": "first_fit", "trials": 1, "features": features,
+                "reason": "First-fit planı alt sınıra eşit; arama gereksiz."}
+
+    records = benchmarks if benchmarks is not None else load_benchmarks()
+    vector = _feature_vector(features)
+    nearest = sorted(records, key=lambda r: math.dist(vector, _feature_vector(r["features"])))[:NEIGHBOURS]
+
+    # Her aday için komşulardaki ortalama süre; en iyi plana ulaşamadığı örnekler cezalandırılır
+    scores: Dict[str, float] = {}
+    for algorithm, trials in CANDIDATES:
+        key = f"{algorithm}:{trials}"
+        total = 0.0
+        for record in nearest:
+            run = record["runs"].get(key)
+            if run is None:
+                total = math.inf
+                break
+            gap = run["bars"] - record["best_bars"]
+            total += run["time_s"] * (1 + 10 * gap)
+        scores[key] = total / len(nearest)
+    best_key = min(scores, key=scores.get)
+    algorithm, trials = best_key.split(":")
+    neighbour_names = ", ".join(r["name"] for r in nearest)
+    return {
+        "algorithm": algorithm,
+        "trials": int(trials),
+        "features": features,
+        "scores": scores,
+        "reason": (f"{features['pieces']} parça, {features['distinct_lengths']} farklı boy, "
+                   f"slack %{features['slack'] * 100:.1f}; en yakın kıyaslama örneklerinde "
+                   f"({neighbour_names}) en iyi plana en hızlı {algorithm} / {trials} deneme ulaştı."),
+    }
+
+
+def _random_instance(rng: random.Random, pieces: int, distinct: int, low: float, high: float,
+                     stock_length: int) -> List[Part]:
+    lengths = [round(rng.uniform(low, high) * stock_length) for _ in range(distinct)]
+    counts = [1] * distinct
+    for _ in range(max(0, pieces - distinct)):
+        counts[rng.randrange(distinct)] += 1
+    return [Part(length=float(l), quantity=c, name=f"P{i}") for i, (l, c) in enumerate(zip(lengths, counts))]
+
+
+def build_benchmarks(path: str = BENCHMARK_FILE, seed: int = 7, stock_length: int = 6000, kerf: int = 3) -> None:
+    """
+    Kıyaslama tablosunu yeniden üretir: farklı boyut ve boy dağılımlarında her aday
+    motorun stok sayısı ve süresi ölçülür (python engine_selection.py).
+    """
+    import optuna
+    from optimization import optimize_parts
+    optuna.logging.set_verbosity(optuna.logging.WARNING)
+
+    rng = random.Random(seed)
+    shapes = [("kısa", 0.02, 0.15), ("karışık", 0.05, 0.6), ("uzun", 0.3, 0.7), ("yarım", 0.2, 0.5)]
+    sizes = [(40, 5), (300, 20), (2000, 60), (10000, 200)]
+    instances = []
+    for shape, low, high in shapes:
+        for pieces, distinct in sizes:
+            parts = _random_instance(rng, pieces, distinct, low, high, stock_length)
+            parts_data = [p._asdict() for p in parts]
+            runs = {}
+            for algorithm, trials in CANDIDATES:
+                start = time.perf_counter()
+                result = optimize_parts(parts_data, stock_length, kerf, trials=trials, algorithm=algorithm,
+                                        kerf_min=kerf, kerf_max=kerf)
+                runs[f"{algorithm}:{trials}"] = {"bars": result["used_stocks"],
+                                                 "time_s": round(time.perf_counter() - start, 4)}
+            instances.append({
+                "name": f"{shape}-{pieces}",
+                "features": instance_features(parts, stock_length, kerf),
+                "best_bars": min(run["bars"] for run in runs.values()),
+                "runs": runs,
+            })
+            print(instances[-1]["name"], runs)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"stock_length": stock_length, "kerf": kerf, "instances": instances}, f,
+                  ensure_ascii=False, indent=1)
+
+
+if __name__ == "__main__":
+    build_benchmarks()
@@ -0,0 +1,134 @@
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+from file_handlers import build_report, write_excel_report, write_pdf_report, write_plan_csv, write_plan_json
+
+# Biçim: (uzantı, görünen ad, yazıcı)
+EXPORT_FORMATS: Dict[str, tuple] = {
+    "excel": (".xlsx", "Excel", write_excel_report),
+    "pdf": (".pdf", "PDF", write_pdf_report),
+    "csv": (".csv", "CSV", write_plan_csv),
+    "json": (".json", "JSON", write_plan_json),
+}
+# Yazım bitene kadar dosya bu uzantıyla tutulur; iptal ya da hatada silinir
+PARTIAL_SUFFIX = ".part"
+
+
+class ExportCancelled(Exception):
+    pass
+
+
+class ExportJob:
+    """
+    Planı bir kez gruplayıp istenen biçimleri ayrı iş parçacıklarında aynı anda yazar.
+    Arayüz iş parçacığı yalnızca progress/status değerlerini okur; cancel() yazıcıları
+    bir sonraki stokta durdurur ve yarım kalan dosyaları siler.
+    """
+
+    def __init__(self, optimization_result: dict, stock_unit_price: float, targets: Dict[str, str],
+                 stock_length: Optional[float] = None):
+        unknown = set(targets) - set(EXPORT_FORMATS)
+        if unknown:
+            raise ValueError(f"Bilinmeyen dışa aktarma biçimi: {', '.join(sorted(unknown))}")
+        self.targets = dict(targets)
+        self.progress: Dict[str, float] = {fmt: 0.0 for fmt in targets}
+        self.status: Dict[str, str] = {fmt: "pending" for fmt in targets}
+        self.errors: Dict[str, str] = {}
+        self._result = optimization_result
+        self._stock_unit_price = stock_unit_price
+        self._stock_length = stock_length
+        self._cancel = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> "ExportJob":
+        self._thread = threading.Thread(target=self._run, name="export-job", daemon=True)
+        self._thread.start()
+        return self
+
+    def cancel(self) -> None:
+        self._cancel.set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancel.is_set()
+
+    @property
+    def done(self) -> bool:
+        return self._thread is not None and not self._thread.is_alive()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        if self._thread is not None:
+            self._thread.join(timeout)
+        return self.done
+
+    def _run(self) -> None:
+        try:
+            report = build_report(self._result, self._stock_unit_price, self._stock_length)
+        except Exception as e:
+            for fmt in self.targets:
+                self.status[fmt] = "error"
+                self.errors[fmt] = str(e)
+            return
+        with ThreadPoolExecutor(max_workers=len(self.targets), thread_name_prefix="export") as pool:
+            for fmt, path in self.targets.items():
+                pool.submit(self._write, fmt, path, report)
+
+    def _checkpoint(self, fmt: str) -> Callable[[int, int], None]:
+        def progress(done: int, total: int) -> None:
+            if self._cancel.is_set():
+                raise ExportCancelled()
+            # Son kaydetme adımı da sürdüğü için yazıcı bitene kadar %100 gösterilmez
+            self.progress[fmt] = min(done / total, 0.99)
+        return progress
+
+    def _write(self, fmt: str, path: str, report: Dict[str, Any]) -> None:
+        if self._cancel.is_set():
+            self.status[fmt] = "cancelled"
+            return
+        self.status[fmt] = "running"
+        _extension, _label, writer = EXPORT_FORMATS[fmt]
+        partial = path + PARTIAL_SUFFIX
+        try:
+            writer(report, partial, self._checkpoint(fmt))
+            if self._cancel.is_set():
+                raise ExportCancelled()
+            os.replace(partial, path)
+        except ExportCancelled:
+            self.status[fmt] = "cancelled"
+        except Exception as e:
+            self.status[fmt] = "error"
+            self.errors[fmt] = str(e)
+        else:
+            self.progress[fmt] = 1.0
+            self.status[fmt] = "done"
+            return
+        if os.path.exists(partial):
+            os.remove(partial)
+
+    def format_progress(self) -> str:
+        """
+        Durum çubuğu için biçim bazında ilerleme: "Excel %40, PDF %55, CSV tamam".
+        """
+        texts = []
+        for fmt in self.targets:
+            label = EXPORT_FORMATS[fmt][1]
+            status = self.status[fmt]
+            if status == "done":
+                texts.append(f"{label} tamam")
+            elif status == "cancelled":
+                texts.append(f"{label} iptal")
+            elif status == "error":
+                texts.append(f"{label} hata")
+            else:
+                texts.append(f"{label} %{self.progress[fmt] * 100:.0f}")
+        return ", ".join(texts)
+
+
+def export_targets(base_path: str, formats=tuple(EXPORT_FORMATS)) -> Dict[str, str]:
+    """
+    Uzantısız taban yoldan her biçim için hedef dosya yolu üretir.
+    """
+    root, _ext = os.path.splitext(base_path)
+    return {fmt: root + EXPORT_FORMATS[fmt][0] for fmt in formats}
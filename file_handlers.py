@@ -1,319 +1,559 @@
-import json
-import csv
-import os
-from tkinter import filedialog, messagebox
-from typing import Optional, Tuple, List, Any
-from openpyxl import Workbook
-from openpyxl.styles import Font
-from reportlab.lib.pagesizes import letter
-from reportlab.pdfgen import canvas as pdfcanvas
-from reportlab.lib.units import mm
-from optimization import calculate_costs
-
-
-def safe_get_part_attr(part: Any, attr: str, default: Any = "") -> Any:
-    """
-    Parça verisinden hem NamedTuple, dict, hem de tuple/list tipleri için güvenli veri erişimi sağlar.
-    """
-    if hasattr(part, attr):
-        return getattr(part, attr)
-    if isinstance(part, dict):
-        return part.get(attr, default)
-    if isinstance(part, (list, tuple)):
-        # Index bazında erişim örnekleri
-        if attr == "name":
-            return part[0] if len(part) > 0 else default
-        if attr == "length":
-            return part[1] if len(part) > 1 else default
-        if attr == "quantity":
-            return part[2] if len(part) > 2 else default
-        if attr == "cut_type":
-            return part[3] if len(part) > 3 else default
-    return default
-
-
-def save_project(parts_data: List[Any], stock_length: int, kerf: int) -> None:
-    file_path = filedialog.asksaveasfilename(
-        defaultextension=".json",
-        filetypes=[("JSON Dosyaları", "*.json"), ("Tüm Dosyalar", "*.*")]
-    )
-    if not file_path:
-        return
-    data = {
-        "parts": parts_data,
-        "stock_length": stock_length,
-        "kerf": kerf
-    }
-    try:
-        with open(file_path, "w", encoding="utf-8") as f:
-            json.dump(data, f, ensure_ascii=False, indent=4)
-        messagebox.showinfo("Başarılı", "Proje başarıyla kaydedildi.")
-    except Exception as e:
-        messagebox.showerror("Hata", f"Dosya kaydedilirken hata oluştu:\n{e}")
-
-
-def load_project() -> Optional[Tuple[List[Any], int, int]]:
-    file_path = filedialog.askopenfilename(
-        filetypes=[("JSON Dosyaları", "*.json"), ("Tüm Dosyalar", "*.*")]
-    )
-    if not file_path or not os.path.exists(file_path):
-        return None
-    try:
-        with open(file_path, "r", encoding="utf-8") as f:
-            data = json.load(f)
-        parts = data.get("parts", [])
-        stock_length = data.get("stock_length", 6000)
-        kerf = data.get("kerf", 3)
-        return parts, stock_length, kerf
-    except Exception as e:
-        messagebox.showerror("Hata", f"Dosya yüklenirken hata oluştu:\n{e}")
-        return None
-
-
-def export_to_csv(parts_data: List[Any]) -> None:
-    file_path = filedialog.asksaveasfilename(
-        defaultextension=".csv",
-        filetypes=[("CSV Dosyaları", "*.csv")]
-    )
-    if not file_path:
-        return
-    try:
-        with open(file_path, "w", newline="", encoding="utf-8") as csvfile:
-            writer = csv.writer(csvfile)
-            writer.writerow(["Parça Adı", "Uzunluk (mm)", "Adet"])
-            for part in parts_data:
-                writer.writerow([
-                    safe_get_part_attr(part, "name", ""),
-                    safe_get_part_attr(part, "length", ""),
-                    safe_get_part_attr(part, "quantity", "")
-                ])
-        messagebox.showinfo("Başarılı", "CSV dosyası başarıyla oluşturuldu.")
-    except Exception as e:
-        messagebox.showerror("Hata", f"CSV dışa aktarılırken hata oluştu:\n{e}")
-
-
-def import_from_csv() -> Optional[List[Any]]:
-    file_path = filedialog.askopenfilename(filetypes=[("CSV Dosyaları", "*.csv")])
-    if not file_path:
-        return None
-    imported = []
-    try:
-        with open(file_path, newline="", encoding="utf-8") as csvfile:
-            reader = csv.DictReader(csvfile)
-            for row in reader:
-                try:
-                    length = float(row.get("Uzunluk (mm)", 0))
-                    quantity = int(row.get("Adet", 0))
-                    name = row.get("Parça Adı", "")
-                    if length > 0 and quantity > 0:
-                        imported.append({"name": name, "length": length, "quantity": quantity})
-                except ValueError:
-                    continue
-        return imported
-    except Exception as e:
-        messagebox.showerror("Hata", f"CSV içe aktarılırken hata oluştu:\n{e}")
-        return None
-
-
-def export_to_excel(optimization_result: dict, file_path: str, stock_unit_price: float) -> None:
-    try:
-        wb = Workbook()
-        ws = wb.active
-        ws.title = "Kesim Planı"
-        bold_font = Font(bold=True)
-
-        ws.append(["Kesim Planı Raporu"])
-        ws.append([])
-
-        plan = optimization_result.get("plan", [])
-        fire_eff = optimization_result.get("fire_efficiency", {})
-        costs = calculate_costs(fire_eff, stock_unit_price)
-
-        # Stok bazlı plan
-        for stok_no, stock_parts in enumerate(plan, start=1):
-            ws.append([f"Stok {stok_no}"])
-
-            # Parçaları grupla ve adetleri topla
-            part_counts = {}
-            for part in stock_parts:
-                p_name = safe_get_part_attr(part, "name", "")
-                p_length_raw = safe_get_part_attr(part, "length", 0)
-                p_cut_type = safe_get_part_attr(part, "cut_type", "")
-                try:
-                    p_length = float(p_length_raw)
-                except (TypeError, ValueError):
-                    p_length = 0.0
-                key = (p_name, p_length, p_cut_type)
-                part_counts[key] = part_counts.get(key, 0) + 1
-
-            # Grupları "Adet x Uzunluk" formatında metne dönüştür
-            stok_desc_list = []
-            for (p_name, p_length, p_cut_type), count in part_counts.items():
-                if p_cut_type and p_cut_type.lower() != "düz kesim":
-                    stok_desc_list.append(f"{p_name} ({p_length:.1f} mm, {p_cut_type}) x {count}")
-                else:
-                    stok_desc_list.append(f"{p_name} ({p_length:.1f} mm) x {count}")
-
-            stok_desc = " - ".join(stok_desc_list)
-            ws.append([stok_desc])
-            ws.append([])  # stoklar arası boşluk
-
-        # Genel istatistikler
-        ws.append([])
-        ws.append(["Toplam Fire (mm):", fire_eff.get("total_fire", 0)])
-        ws.append(["Toplam Verimlilik (%):", fire_eff.get("total_efficiency", 0)])
-        ws.append(["Toplam Maliyet:", costs.get("total_cost", 0)])
-        ws.append(["Fire Maliyeti:", costs.get("fire_cost", 0)])
-
-        # Parça listesi başlığı
-        ws.append([])
-        ws.append(["Parça Listesi:"])
-        ws.append(["Parça Adı", "Uzunluk (mm)", "Adet", "Kesim Tipi"])
-        for cell in ws[ws.max_row]:
-            cell.font = bold_font
-
-        parts_list = optimization_result.get("parts_list", [])
-        if not parts_list:
-            part_aggregate = {}
-            for stk in plan:
-                for part in stk:
-                    p_name = safe_get_part_attr(part, "name", "")
-                    p_length_raw = safe_get_part_attr(part, "length", 0)
-                    try:
-                        p_length = float(p_length_raw)
-                    except (TypeError, ValueError):
-                        p_length = 0.0
-                    key = (p_name, p_length)
-                    part_aggregate[key] = part_aggregate.get(key, 0) + 1
-            parts_list = [(k[0], k[1], v) for k, v in part_aggregate.items()]
-
-        for part in parts_list:
-            p_name = safe_get_part_attr(part, "name", "")
-            p_len_raw = safe_get_part_attr(part, "length", 0)
-            p_qty = safe_get_part_attr(part, "quantity", 0)
-            p_cut_type = safe_get_part_attr(part, "cut_type", "")
-
-            try:
-                p_len = float(p_len_raw)
-            except (TypeError, ValueError):
-                p_len = 0.0
-
-            if p_cut_type and p_cut_type.lower() != "düz kesim":
-                ws.append([p_name, p_len, p_qty, p_cut_type])
-            else:
-                ws.append([p_name, p_len, p_qty])
-
-        wb.save(file_path)
-        messagebox.showinfo("Başarılı", f"Excel dosyası başarıyla oluşturuldu:\n{file_path}")
-    except Exception as e:
-        messagebox.showerror("Hata", f"Excel dışa aktarılırken hata oluştu:\n{e}")
-
-
-def export_to_pdf(optimization_result: dict, file_path: str, stock_unit_price: float) -> None:
-    try:
-        c = pdfcanvas.Canvas(file_path, pagesize=letter)
-        width, height = letter
-        margin = 20 * mm
-        y = height - margin
-
-        c.setFont("Helvetica-Bold", 14)
-        c.drawString(margin, y, "Kesim Planİ Raporu")
-        y -= 18
-        c.setFont("Helvetica", 10)
-
-        plan = optimization_result.get("plan", [])
-        fire_eff = optimization_result.get("fire_efficiency", {})
-        costs = calculate_costs(fire_eff, stock_unit_price)
-
-        # Stok bazlı plan ve parça listesi
-        for stok_no, stock_parts in enumerate(plan, start=1):
-            c.drawString(margin, y, f"Stok {stok_no}:")
-            y -= 14
-
-            part_counts = {}
-            for part in stock_parts:
-                p_name = safe_get_part_attr(part, "name", "")
-                p_length_raw = safe_get_part_attr(part, "length", 0)
-                p_cut_type = safe_get_part_attr(part, "cut_type", "")
-                try:
-                    p_length = float(p_length_raw)
-                except (TypeError, ValueError):
-                    p_length = 0.0
-                key = (p_name, p_length, p_cut_type)
-                part_counts[key] = part_counts.get(key, 0) + 1
-
-            for (p_name, p_length, p_cut_type), count in part_counts.items():
-                line = f"- {p_name} ({p_length:.1f} mm) x {count}"
-                if p_cut_type and p_cut_type.lower() != "düz kesim":
-                    line = f"- {p_name} ({p_length:.1f} mm, {p_cut_type}) x {count}"
-
-                c.drawString(margin + 10, y, line)
-                y -= 14
-                if y < margin:
-                    c.showPage()
-                    y = height - margin
-                    c.setFont("Helvetica", 10)
-
-            y -= 10  # stoklar arası boşluk
-
-        # Genel özet
-        c.setFont("Helvetica-Bold", 12)
-        c.drawString(margin, y, "Toplamlar ve Maliyetler:")
-        y -= 14
-        c.setFont("Helvetica", 10)
-        c.drawString(margin + 10, y, f"Toplam Fire (mm): {fire_eff.get('total_fire', 0):.1f}")
-        y -= 14
-        c.drawString(margin + 10, y, f"Toplam Verimlilik (%): {fire_eff.get('total_efficiency', 0):.1f}")
-        y -= 14
-        c.drawString(margin + 10, y, f"Toplam Maliyet: {costs.get('total_cost', 0):.2f} TL")
-        y -= 14
-        c.drawString(margin + 10, y, f"Fire Maliyeti: {costs.get('fire_cost', 0):.2f} TL")
-        y -= 20
-
-        # Parça listesi başlığı
-        c.setFont("Helvetica-Bold", 12)
-        c.drawString(margin, y, "Parça Listesi:")
-        y -= 15
-        c.setFont("Helvetica", 10)
-
-        parts_list = optimization_result.get("parts_list", [])
-        if not parts_list:
-            part_aggregate = {}
-            for stk in plan:
-                for part in stk:
-                    p_name = safe_get_part_attr(part, "name", "")
-                    p_length_raw = safe_get_part_attr(part, "length", 0)
-                    try:
-                        p_length = float(p_length_raw)
-                    except (TypeError, ValueError):
-                        p_length = 0.0
-                    key = (p_name, p_length)
-                    part_aggregate[key] = part_aggregate.get(key, 0) + 1
-            parts_list = [(k[0], k[1], v) for k, v in part_aggregate.items()]
-
-        for part in parts_list:
-            p_name = safe_get_part_attr(part, "name", "")
-            p_len_raw = safe_get_part_attr(part, "length", 0)
-            p_qty = safe_get_part_attr(part, "quantity", 0)
-            p_cut_type = safe_get_part_attr(part, "cut_type", "")
-
-            try:
-                p_len = float(p_len_raw)
-            except (TypeError, ValueError):
-                p_len = 0.0
-
-            line = f"- {p_name}: {p_qty} adet, {p_len:.1f} mm"
-            if p_cut_type:
-                line += f", {p_cut_type}"
-
-            c.drawString(margin + 10, y, line)
-            y -= 14
-            if y < margin:
-                c.showPage()
-                y = height - margin
-                c.setFont("Helvetica", 10)
-
-        c.save()
-        messagebox.showinfo("Başarılı", f"PDF dosyası başarıyla oluşturuldu:\n{file_path}")
-    except Exception as e:
-        messagebox.showerror("Hata", f"PDF dışa aktarılırken hata oluştu:\n{e}")
+import json
+import csv
+import io
+import os
+from tkinter import filedialog, messagebox
+from typing import Optional, Tuple, List, Any, Callable
+from optimization import calculate_costs
+from project_format import write_project, read_project
+from plan_renderer import default_renderer
+
+
+def safe_get_part_attr(part: Any, attr: str, default: Any = "") -> Any:
+    """
+    Parça verisinden hem NamedTuple, dict, hem de tuple/list tipleri için güvenli veri erişimi sağlar.
+    """
+    if hasattr(part, attr):
+        return getattr(part, attr)
+    if isinstance(part, dict):
+        return part.get(attr, default)
+    if isinstance(part, (list, tuple)):
+        # Index bazında erişim örnekleri
+        if attr == "name":
+            return part[0] if len(part) > 0 else default
+        if attr == "length":
+            return part[1] if len(part) > 1 else default
+        if attr == "quantity":
+            return part[2] if len(part) > 2 else default
+        if attr == "cut_type":
+            return part[3] if len(part) > 3 else default
+    return default
+
+
+def save_project(parts_data: List[Any], stock_length: int, kerf: int,
+                 optimization_result: Optional[dict] = None) -> None:
+    file_path = filedialog.asksaveasfilename(
+        defaultextension=".kesim",
+        filetypes=[("Kesim Projesi", "*.kesim"), ("JSON Dosyaları", "*.json"), ("Tüm Dosyalar", "*.*")]
+    )
+    if not file_path:
+        return
+    try:
+        if file_path.lower().endswith(".json"):
+            # Eski biçim: yalnızca parça listesi ve ayarlar, plan saklanmaz
+            data = {
+                "parts": parts_data,
+                "stock_length": stock_length,
+                "kerf": kerf
+            }
+            with open(file_path, "w", encoding="utf-8") as f:
+                json.dump(data, f, ensure_ascii=False, indent=4)
+        else:
+            thumbnail = None
+            if optimization_result and optimization_result.get("plan"):
+                thumbnail = default_renderer.thumbnail(optimization_result, stock_length)
+            write_project(file_path, parts_data, stock_length, kerf, optimization_result, thumbnail)
+        messagebox.showinfo("Başarılı", "Proje başarıyla kaydedildi.")
+    except Exception as e:
+        messagebox.showerror("Hata", f"Dosya kaydedilirken hata oluştu:\n{e}")
+
+
+def load_project() -> Optional[Tuple[List[Any], int, int, Optional[dict]]]:
+    file_path = filedialog.askopenfilename(
+        filetypes=[("Proje Dosyaları", "*.kesim *.json"), ("Kesim Projesi", "*.kesim"),
+                   ("JSON Dosyaları", "*.json"), ("Tüm Dosyalar", "*.*")]
+    )
+    if not file_path or not os.path.exists(file_path):
+        return None
+    try:
+        return read_project(file_path)
+    except Exception as e:
+        messagebox.showerror("Hata", f"Dosya yüklenirken hata oluştu:\n{e}")
+        return None
+
+
+def export_to_csv(parts_data: List[Any]) -> None:
+    file_path = filedialog.asksaveasfilename(
+        defaultextension=".csv",
+        filetypes=[("CSV Dosyaları", "*.csv")]
+    )
+    if not file_path:
+        return
+    try:
+        with open(file_path, "w", newline="", encoding="utf-8") as csvfile:
+            writer = csv.writer(csvfile)
+            writer.writerow(["Parça Adı", "Uzunluk (mm)", "Adet"])
+            for part in parts_data:
+                writer.writerow([
+                    safe_get_part_attr(part, "name", ""),
+                    safe_get_part_attr(part, "length", ""),
+                    safe_get_part_attr(part, "quantity", "")
+                ])
+        messagebox.showinfo("Başarılı", "CSV dosyası başarıyla oluşturuldu.")
+    except Exception as e:
+        messagebox.showerror("Hata", f"CSV dışa aktarılırken hata oluştu:\n{e}")
+
+
+def read_parts_csv(file_path: str) -> List[Any]:
+    imported = []
+    with open(file_path, newline="", encoding="utf-8") as csvfile:
+        reader = csv.DictReader(csvfile)
+        for row in reader:
+            try:
+                length = float(row.get("Uzunluk (mm)", 0))
+                quantity = int(row.get("Adet", 0))
+                name = row.get("Parça Adı", "")
+                if length > 0 and quantity > 0:
+                    imported.append({"name": name, "length": length, "quantity": quantity})
+            except ValueError:
+                continue
+    return imported
+
+
+def read_parts_file(file_path: str) -> List[Any]:
+    """
+    CSV, .kesim ya da JSON dosyasından yalnızca parça listesini okur.
+    """
+    if file_path.lower().endswith(".csv"):
+        return read_parts_csv(file_path)
+    return read_project(file_path, with_result=False)[0]
+
+
+def import_from_csv() -> Optional[List[Any]]:
+    file_path = filedialog.askopenfilename(filetypes=[("CSV Dosyaları", "*.csv")])
+    if not file_path:
+        return None
+    try:
+        return read_parts_csv(file_path)
+    except Exception as e:
+        messagebox.showerror("Hata", f"CSV içe aktarılırken hata oluştu:\n{e}")
+        return None
+
+
+def stock_label(optimization_result: dict, stok_no: int) -> str:
+    # Katalog/artık kullanılan planlarda çubuğun boyu ve kaynağı da yazılır
+    bar_stocks = optimization_result.get("bar_stocks")
+    if not bar_stocks or stok_no > len(bar_stocks):
+        return f"Stok {stok_no}"
+    bar = bar_stocks[stok_no - 1]
+    source = " (artık)" if bar.get("source") == "remnant" else ""
+    return f"Stok {stok_no} - {bar['length']:.0f} mm{source}"
+
+
+def _part_length(part: Any) -> float:
+    try:
+        return float(safe_get_part_attr(part, "length", 0))
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def group_bar_pieces(stock_parts: List[Any]) -> List[Tuple[str, float, str, int]]:
+    """
+    Stoktaki parçaları (ad, boy, kesim tipi, adet) gruplarına indirger.
+    """
+    part_counts = {}
+    for part in stock_parts:
+        key = (safe_get_part_attr(part, "name", ""), _part_length(part), safe_get_part_attr(part, "cut_type", ""))
+        part_counts[key] = part_counts.get(key, 0) + 1
+    return [(name, length, cut_type, count) for (name, length, cut_type), count in part_counts.items()]
+
+
+def report_parts(parts_list: List[Any]) -> List[Tuple[str, float, int, str]]:
+    return [(safe_get_part_attr(p, "name", ""), _part_length(p), safe_get_part_attr(p, "quantity", 0),
+             safe_get_part_attr(p, "cut_type", "")) for p in parts_list]
+
+
+# PDF'teki plan görseli: karo genişliği (100 dpi piksel), baskı dpi'ı ve en fazla stok sayısı
+PDF_PLAN_TILE_WIDTH = 900
+PDF_PLAN_DPI = 150
+PDF_PLAN_MAX_BARS = 200
+
+
+def build_report(optimization_result: dict, stock_unit_price: float, stock_length: Optional[float] = None) -> dict:
+    """
+    Planı dışa aktarım için bir kez gruplar: stok başına (ad, boy, kesim tipi) adetleri,
+    parça listesi ve toplamlar. Tüm rapor yazıcıları bu sözlüğü kullanır. stock_length
+    verilirse PDF, plan görselini ortak karo önbelleğinden alır.
+    """
+    plan = optimization_result.get("plan", [])
+    fire_eff = optimization_result.get("fire_efficiency", {})
+
+    bars = [(stock_label(optimization_result, stok_no), group_bar_pieces(stock_parts))
+            for stok_no, stock_parts in enumerate(plan, start=1)]
+
+    parts_list = optimization_result.get("parts_list", [])
+    if parts_list:
+        parts = report_parts(parts_list)
+    else:
+        part_aggregate = {}
+        for stk in plan:
+            for part in stk:
+                key = (safe_get_part_attr(part, "name", ""), _part_length(part))
+                part_aggregate[key] = part_aggregate.get(key, 0) + 1
+        parts = [(name, length, qty, "") for (name, length), qty in part_aggregate.items()]
+
+    plan_tiles = None
+    if stock_length and plan:
+        plan_view = dict(optimization_result, plan=[plan[i] for i in range(min(len(plan), PDF_PLAN_MAX_BARS))])
+
+        def plan_tiles():
+            return default_renderer.render_tiles(plan_view, PDF_PLAN_TILE_WIDTH, stock_length, dpi=PDF_PLAN_DPI)
+
+    return {
+        "bars": bars,
+        "parts": parts,
+        "plan_tiles": plan_tiles,
+        "fire_efficiency": fire_eff,
+        "costs": calculate_costs(fire_eff, stock_unit_price),
+        "stock_cost": optimization_result.get("stock_cost"),
+        "sequence": optimization_result.get("sequence"),
+        "orders": optimization_result.get("orders"),
+    }
+
+
+def _is_special_cut(cut_type: str) -> bool:
+    return bool(cut_type) and cut_type.lower() != "düz kesim"
+
+
+def format_bar_pieces(pieces: List[Tuple[str, float, str, int]]) -> str:
+    # Stok satırı: gruplar "Ad (Uzunluk) x Adet" formatında
+    descriptions = []
+    for p_name, p_length, p_cut_type, count in pieces:
+        if _is_special_cut(p_cut_type):
+            descriptions.append(f"{p_name} ({p_length:.1f} mm, {p_cut_type}) x {count}")
+        else:
+            descriptions.append(f"{p_name} ({p_length:.1f} mm) x {count}")
+    return " - ".join(descriptions)
+
+
+def write_excel_report(report: dict, file_path: str, progress: Optional[Callable[[int, int], None]] = None) -> None:
+    """
+    progress(yazılan stok, toplam stok) her stoktan sonra çağrılır; istisna fırlatarak yazımı durdurabilir.
+    """
+    # openpyxl yalnızca ilk Excel dışa aktarımında yüklenir
+    from openpyxl import Workbook
+    from openpyxl.styles import Font
+    wb = Workbook()
+    ws = wb.active
+    ws.title = "Kesim Planı"
+    bold_font = Font(bold=True)
+
+    ws.append(["Kesim Planı Raporu"])
+    ws.append([])
+
+    # Stok bazlı plan: gruplar "Ad (Uzunluk) x Adet" formatında
+    bars = report["bars"]
+    for stok_no, (label, pieces) in enumerate(bars, start=1):
+        ws.append([label])
+        ws.append([format_bar_pieces(pieces)])
+        ws.append([])  # stoklar arası boşluk
+        if progress:
+            progress(stok_no, len(bars))
+
+    # Genel istatistikler
+    fire_eff = report["fire_efficiency"]
+    costs = report["costs"]
+    ws.append([])
+    ws.append(["Toplam Fire (mm):", fire_eff.get("total_fire", 0)])
+    ws.append(["Toplam Verimlilik (%):", fire_eff.get("total_efficiency", 0)])
+    ws.append(["Toplam Maliyet:", costs.get("total_cost", 0)])
+    ws.append(["Fire Maliyeti:", costs.get("fire_cost", 0)])
+    if report["stock_cost"] is not None:
+        ws.append(["Katalog Stok Maliyeti:", report["stock_cost"]])
+    sequence = report["sequence"]
+    if sequence:
+        ws.append(["Tahmini Makine Süresi (dk):", round(sequence["machine_time_s"] / 60, 1)])
+        ws.append(["Dayama / Kesim Tipi Değişimi:", f"{sequence['stop_changes']} / {sequence['cut_type_changes']}"])
+
+    # Toplu optimizasyonda sipariş bazlı paylar
+    orders = report["orders"]
+    if orders:
+        ws.append([])
+        ws.append(["Sipariş Raporu:"])
+        ws.append(["Sipariş", "Parça Sayısı", "Malzeme (mm)", "Stok Payı", "Kullanım Payı (%)",
+                   "Fire Payı (mm)", "Maliyet", "Fire Maliyeti"])
+        for cell in ws[ws.max_row]:
+            cell.font = bold_font
+        for order_id, order in orders.items():
+            ws.append([order_id, order["pieces"], order["material_mm"], round(order["bar_share"], 3),
+                       round(order["usage_share"] * 100, 2), round(order["fire_share_mm"], 1),
+                       round(order["total_cost"], 2), round(order["fire_cost"], 2)])
+
+    # Parça listesi
+    ws.append([])
+    ws.append(["Parça Listesi:"])
+    ws.append(["Parça Adı", "Uzunluk (mm)", "Adet", "Kesim Tipi"])
+    for cell in ws[ws.max_row]:
+        cell.font = bold_font
+    for p_name, p_len, p_qty, p_cut_type in report["parts"]:
+        if _is_special_cut(p_cut_type):
+            ws.append([p_name, p_len, p_qty, p_cut_type])
+        else:
+            ws.append([p_name, p_len, p_qty])
+
+    wb.save(file_path)
+
+
+def write_pdf_report(report: dict, file_path: str, progress: Optional[Callable[[int, int], None]] = None) -> None:
+    # reportlab yalnızca ilk PDF dışa aktarımında yüklenir
+    from reportlab.lib.pagesizes import letter
+    from reportlab.pdfgen import canvas as pdfcanvas
+    from reportlab.lib.units import mm
+    c = pdfcanvas.Canvas(file_path, pagesize=letter)
+    width, height = letter
+    margin = 20 * mm
+    y = height - margin
+
+    c.setFont("Helvetica-Bold", 14)
+    c.drawString(margin, y, "Kesim Planİ Raporu")
+    y -= 18
+    c.setFont("Helvetica", 10)
+
+    # Stok bazlı plan ve parça listesi
+    bars = report["bars"]
+    for stok_no, (label, pieces) in enumerate(bars, start=1):
+        c.drawString(margin, y, f"{label}:")
+        y -= 14
+        for p_name, p_length, p_cut_type, count in pieces:
+            line = f"- {p_name} ({p_length:.1f} mm) x {count}"
+            if _is_special_cut(p_cut_type):
+                line = f"- {p_name} ({p_length:.1f} mm, {p_cut_type}) x {count}"
+
+            c.drawString(margin + 10, y, line)
+            y -= 14
+            if y < margin:
+                c.showPage()
+                y = height - margin
+                c.setFont("Helvetica", 10)
+
+        y -= 10  # stoklar arası boşluk
+        if progress:
+            progress(stok_no, len(bars))
+
+    # Genel özet
+    fire_eff = report["fire_efficiency"]
+    costs = report["costs"]
+    c.setFont("Helvetica-Bold", 12)
+    c.drawString(margin, y, "Toplamlar ve Maliyetler:")
+    y -= 14
+    c.setFont("Helvetica", 10)
+    c.drawString(margin + 10, y, f"Toplam Fire (mm): {fire_eff.get('total_fire', 0):.1f}")
+    y -= 14
+    c.drawString(margin + 10, y, f"Toplam Verimlilik (%): {fire_eff.get('total_efficiency', 0):.1f}")
+    y -= 14
+    c.drawString(margin + 10, y, f"Toplam Maliyet: {costs.get('total_cost', 0):.2f} TL")
+    y -= 14
+    c.drawString(margin + 10, y, f"Fire Maliyeti: {costs.get('fire_cost', 0):.2f} TL")
+    y -= 14
+    if report["stock_cost"] is not None:
+        c.drawString(margin + 10, y, f"Katalog Stok Maliyeti: {report['stock_cost']:.2f} TL")
+        y -= 14
+    sequence = report["sequence"]
+    if sequence:
+        c.drawString(margin + 10, y, f"Tahmini Makine Süresi: {sequence['machine_time_s'] / 60:.1f} dk "
+                                     f"(dayama değişimi {sequence['stop_changes']}, "
+                                     f"kesim tipi değişimi {sequence['cut_type_changes']})")
+        y -= 14
+    y -= 6
+
+    # Toplu optimizasyonda sipariş bazlı paylar
+    orders = report["orders"]
+    if orders:
+        c.setFont("Helvetica-Bold", 12)
+        c.drawString(margin, y, "Sipariş Raporu:")
+        y -= 15
+        c.setFont("Helvetica", 10)
+        for order_id, order in orders.items():
+            c.drawString(margin + 10, y,
+                         f"- {order_id}: {order['pieces']} parça, stok payı {order['bar_share']:.2f}, "
+                         f"kullanım %{order['usage_share'] * 100:.1f}, maliyet {order['total_cost']:.2f} TL")
+            y -= 14
+            if y < margin:
+                c.showPage()
+                y = height - margin
+                c.setFont("Helvetica", 10)
+        y -= 6
+
+    # Parça listesi başlığı
+    c.setFont("Helvetica-Bold", 12)
+    c.drawString(margin, y, "Parça Listesi:")
+    y -= 15
+    c.setFont("Helvetica", 10)
+
+    for p_name, p_len, p_qty, p_cut_type in report["parts"]:
+        line = f"- {p_name}: {p_qty} adet, {p_len:.1f} mm"
+        if p_cut_type:
+            line += f", {p_cut_type}"
+
+        c.drawString(margin + 10, y, line)
+        y -= 14
+        if y < margin:
+            c.showPage()
+            y = height - margin
+            c.setFont("Helvetica", 10)
+
+    # Plan görseli: arayüzle aynı karo önbelleğinden, sayfa genişliğine ölçeklenmiş
+    if report.get("plan_tiles"):
+        from reportlab.lib.utils import ImageReader
+        c.showPage()
+        y = height - margin
+        c.setFont("Helvetica-Bold", 12)
+        c.drawString(margin, y, "Kesim Planı Görseli:")
+        y -= 10
+        for _viewport, tile in report["plan_tiles"]():
+            image = ImageReader(io.BytesIO(tile))
+            image_width, image_height = image.getSize()
+            draw_width = width - 2 * margin
+            draw_height = draw_width * image_height / image_width
+            if y - draw_height < margin:
+                c.showPage()
+                y = height - margin
+            c.drawImage(image, margin, y - draw_height, draw_width, draw_height)
+            y -= draw_height
+            if progress:
+                progress(len(bars), len(bars))
+
+    c.save()
+
+
+PLAN_CSV_HEADER = ["Stok No", "Stok", "Parça Adı", "Uzunluk (mm)", "Kesim Tipi", "Adet"]
+
+
+def write_plan_csv(report: dict, file_path: str, progress: Optional[Callable[[int, int], None]] = None) -> None:
+    """
+    Kesim planını stok başına bir satır grubu olarak CSV'ye yazar.
+    """
+    bars = report["bars"]
+    with open(file_path, "w", newline="", encoding="utf-8") as csvfile:
+        writer = csv.writer(csvfile)
+        writer.writerow(PLAN_CSV_HEADER)
+        for stok_no, (label, pieces) in enumerate(bars, start=1):
+            for p_name, p_length, p_cut_type, count in pieces:
+                writer.writerow([stok_no, label, p_name, p_length, p_cut_type, count])
+            if progress:
+                progress(stok_no, len(bars))
+
+
+def write_plan_json(report: dict, file_path: str, progress: Optional[Callable[[int, int], None]] = None) -> None:
+    bars = report["bars"]
+    bar_entries = []
+    for stok_no, (label, pieces) in enumerate(bars, start=1):
+        bar_entries.append({
+            "stock": stok_no,
+            "label": label,
+            "pieces": [{"name": p_name, "length": p_length, "cut_type": p_cut_type, "count": count}
+                       for p_name, p_length, p_cut_type, count in pieces],
+        })
+        if progress:
+            progress(stok_no, len(bars))
+    data = {
+        "bars": bar_entries,
+        "parts": [{"name": p_name, "length": p_len, "quantity": p_qty, "cut_type": p_cut_type}
+                  for p_name, p_len, p_qty, p_cut_type in report["parts"]],
+        "fire_efficiency": report["fire_efficiency"],
+        "costs": report["costs"],
+        "stock_cost": report["stock_cost"],
+        "sequence": report["sequence"],
+        "orders": report["orders"],
+    }
+    with open(file_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, indent=1, default=str)
+
+
+# Excel sayfa başına satır sınırı; akışlı yazımda dolan sayfanın ardından yeni sayfa açılır
+EXCEL_MAX_ROWS = 1048576
+
+
+class PlanCsvStream:
+    """
+    Stokları geldikçe write_plan_csv ile aynı sütunlarda CSV'ye yazar; plan bellekte tutulmaz.
+    """
+
+    def __init__(self, file_path: str):
+        self.file_path = file_path
+        self._file = open(file_path, "w", newline="", encoding="utf-8")
+        self._writer = csv.writer(self._file)
+        self._writer.writerow(PLAN_CSV_HEADER)
+
+    def add(self, stok_no: int, stock_parts: List[Any]) -> None:
+        label = f"Stok {stok_no}"
+        self._writer.writerows([stok_no, label, p_name, p_length, p_cut_type, count]
+                               for p_name, p_length, p_cut_type, count in group_bar_pieces(stock_parts))
+
+    def close(self, summary: dict) -> None:
+        self._file.close()
+
+    def abort(self) -> None:
+        self._file.close()
+
+
+class PlanExcelStream:
+    """
+    Stokları geldikçe openpyxl'in yalnızca yazma kipinde Excel'e aktarır: stok başına bir satır
+    (stok no, "Ad (Uzunluk) x Adet" grupları). Toplamlar ve parça listesi sonda "Özet" sayfasına yazılır.
+    """
+
+    def __init__(self, file_path: str):
+        from openpyxl import Workbook
+        self.file_path = file_path
+        self._workbook = Workbook(write_only=True)
+        self._sheets = 0
+        self._new_sheet()
+
+    def _new_sheet(self) -> None:
+        self._sheets += 1
+        title = "Kesim Planı" if self._sheets == 1 else f"Kesim Planı ({self._sheets})"
+        self._sheet = self._workbook.create_sheet(title)
+        self._sheet.append(["Stok No", "Kesim Planı"])
+        self._rows = 1
+
+    def add(self, stok_no: int, stock_parts: List[Any]) -> None:
+        if self._rows >= EXCEL_MAX_ROWS:
+            self._new_sheet()
+        # Stok etiketi metin yerine sayı olarak yazılır; paylaşılan metin tablosu stok sayısıyla büyümez
+        self._sheet.append([stok_no, format_bar_pieces(group_bar_pieces(stock_parts))])
+        self._rows += 1
+
+    def close(self, summary: dict) -> None:
+        fire_eff = summary["fire_efficiency"]
+        costs = summary["costs"]
+        ws = self._workbook.create_sheet("Özet")
+        ws.append(["Kesim Planı Raporu"])
+        ws.append([])
+        ws.append(["Kullanılan Stok:", summary["used_stocks"]])
+        ws.append(["Toplam Fire (mm):", fire_eff.get("total_fire", 0)])
+        ws.append(["Toplam Verimlilik (%):", fire_eff.get("total_efficiency", 0)])
+        ws.append(["En Düşük Stok Verimi (%):", fire_eff.get("min_stock_efficiency", 0)])
+        ws.append(["Toplam Maliyet:", costs.get("total_cost", 0)])
+        ws.append(["Fire Maliyeti:", costs.get("fire_cost", 0)])
+        ws.append([])
+        ws.append(["Parça Listesi:"])
+        ws.append(["Parça Adı", "Uzunluk (mm)", "Adet", "Kesim Tipi"])
+        for p_name, p_len, p_qty, p_cut_type in summary["parts"]:
+            if _is_special_cut(p_cut_type):
+                ws.append([p_name, p_len, p_qty, p_cut_type])
+            else:
+                ws.append([p_name, p_len, p_qty])
+        self._workbook.save(self.file_path)
+
+    def abort(self) -> None:
+        # Yalnızca yazma kipinde sayfalar geçici dosyalardadır; kaydetmek onları temizler,
+        # yarım dosyayı çağıran siler
+        self._workbook.save(self.file_path)
+
+
+def export_to_excel(optimization_result: dict, file_path: str, stock_unit_price: float) -> None:
+    try:
+        write_excel_report(build_report(optimization_result, stock_unit_price), file_path)
+        messagebox.showinfo("Başarılı", f"Excel dosyası başarıyla oluşturuldu:\n{file_path}")
+    except Exception as e:
+        messagebox.showerror("Hata", f"Excel dışa aktarılırken hata oluştu:\n{e}")
+
+
+def export_to_pdf(optimization_result: dict, file_path: str, stock_unit_price: float,
+                  stock_length: Optional[float] = None) -> None:
+    try:
+        write_pdf_report(build_report(optimization_result, stock_unit_price, stock_length), file_path)
+        messagebox.showinfo("Başarılı", f"PDF dosyası başarıyla oluşturuldu:\n{file_path}")
+    except Exception as e:
+        messagebox.showerror("Hata", f"PDF dışa aktarılırken hata oluştu:\n{e}")
@@ -1,39 +1,68 @@
-import tkinter as tk
-from tkinter import messagebox, font
-from typing import Optional
-from constants import LANGUAGES, DEFAULT_LANGUAGE
-
-class Translator:
-    def __init__(self, language_code: str = DEFAULT_LANGUAGE):
-        self.set_language(language_code)
-
-    def set_language(self, language_code: str):
-        if language_code in LANGUAGES:
-            self.lang = language_code
-            self.translations = LANGUAGES[language_code]
-        else:
-            self.lang = DEFAULT_LANGUAGE
-            self.translations = LANGUAGES[DEFAULT_LANGUAGE]
-
-    def translate(self, key: str) -> str:
-        return self.translations.get(key, key)
-
-def register_fonts() -> None:
-    default_font = font.nametofont("TkDefaultFont")
-    default_font.configure(size=10)
-
-def show_about(root: tk.Tk) -> None:
-    messagebox.showinfo("Hakkında", "Kesim Optimizasyon Uygulaması\n© 2025")
-
-def update_status(status_bar: tk.Label, message: str, duration_ms: Optional[int] = None) -> None:
-    status_bar.config(text=message)
-    status_bar.update_idletasks()
-    if duration_ms is not None:
-        status_bar.after(duration_ms, lambda: status_bar.config(text=""))
-
-def validate_positive_number(value: str) -> bool:
-    try:
-        val = float(value)
-        return val > 0
-    except ValueError:
-        return False
+import tkinter as tk
+from tkinter import messagebox, font
+from typing import Any, Dict, List, Optional
+from constants import LANGUAGES, DEFAULT_LANGUAGE
+
+class Translator:
+    def __init__(self, language_code: str = DEFAULT_LANGUAGE):
+        self.set_language(language_code)
+
+    def set_language(self, language_code: str):
+        if language_code in LANGUAGES:
+            self.lang = language_code
+            self.translations = LANGUAGES[language_code]
+        else:
+            self.lang = DEFAULT_LANGUAGE
+            self.translations = LANGUAGES[DEFAULT_LANGUAGE]
+
+    def translate(self, key: str) -> str:
+        return self.translations.get(key, key)
+
+def register_fonts() -> None:
+    default_font = font.nametofont("TkDefaultFont")
+    default_font.configure(size=10)
+
+def show_about(root: tk.Tk) -> None:
+    messagebox.showinfo("Hakkında", "Kesim Optimizasyon Uygulaması\n© 2025")
+
+def update_status(status_bar: tk.Label, message: str, duration_ms: Optional[int] = None) -> None:
+    status_bar.config(text=message)
+    status_bar.update_idletasks()
+    if duration_ms is not None:
+        status_bar.after(duration_ms, lambda: status_bar.config(text=""))
+
+def validate_positive_number(value: str) -> bool:
+    try:
+        val = float(value)
+        return val > 0
+    except ValueError:
+        return False
+
+def parse_stock_catalog(text: str) -> List[Dict[str, Any]]:
+    """
+    "6000:100, 6500:110:20" biçimindeki stok kataloğunu çözer: boy:fiyat[:adet].
+    Boş metin boş liste döndürür (tek stok boyu kullanılır).
+    """
+    catalog: List[Dict[str, Any]] = []
+    for item in text.replace(";", ",").split(","):
+        item = item.strip()
+        if not item:
+            continue
+        fields = item.split(":")
+        if len(fields) not in (2, 3):
+            raise ValueError(f"Geçersiz katalog girdisi: {item} (beklenen boy:fiyat[:adet])")
+        length, cost = float(fields[0]), float(fields[1])
+        count = int(fields[2]) if len(fields) == 3 else None
+        if length <= 0 or cost < 0 or (count is not None and count < 0):
+            raise ValueError(f"Geçersiz katalog girdisi: {item}")
+        catalog.append({"length": length, "cost": cost, "count": count})
+    return catalog
+
+def format_stock_catalog(catalog: List[Dict[str, Any]]) -> str:
+    items = []
+    for entry in catalog:
+        item = f"{entry['length']:g}:{entry['cost']:g}"
+        if entry.get("count") is not None:
+            item += f":{entry['count']}"
+        items.append(item)
+    return ", ".join(items)
@@ -0,0 +1,253 @@
+import json
+import sqlite3
+import time
+from typing import Any, Dict, List, Optional
+
+from constants import JOB_HISTORY_FILE
+from engine_selection import RATIO_BINS
+
+# aggregate() gruplama sütunları; hepsi jobs tablosunda indekslidir
+HISTORY_GROUPS = ("month", "day", "profile", "customer", "engine", "source")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY,
+    finished_at REAL NOT NULL,
+    day TEXT NOT NULL,
+    month TEXT NOT NULL,
+    source TEXT NOT NULL,
+    name TEXT,
+    profile TEXT NOT NULL DEFAULT '',
+    customer TEXT NOT NULL DEFAULT '',
+    engine TEXT,
+    stock_length REAL NOT NULL,
+    kerf REAL,
+    part_types INTEGER NOT NULL,
+    pieces INTEGER NOT NULL,
+    part_length_mm REAL NOT NULL,
+    lower_bound INTEGER,
+    used_stocks INTEGER NOT NULL,
+    material_mm REAL NOT NULL,
+    total_fire REAL NOT NULL,
+    total_efficiency REAL NOT NULL,
+    stock_cost REAL,
+    elapsed_s REAL,
+    features TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_jobs_finished ON jobs (finished_at);
+CREATE INDEX IF NOT EXISTS idx_jobs_month ON jobs (month, finished_at);
+CREATE INDEX IF NOT EXISTS idx_jobs_day ON jobs (day);
+CREATE INDEX IF NOT EXISTS idx_jobs_profile ON jobs (profile, finished_at);
+CREATE INDEX IF NOT EXISTS idx_jobs_customer ON jobs (customer, finished_at);
+CREATE INDEX IF NOT EXISTS idx_jobs_engine ON jobs (engine);
+CREATE INDEX IF NOT EXISTS idx_jobs_source ON jobs (source);
+CREATE INDEX IF NOT EXISTS idx_jobs_elapsed ON jobs (elapsed_s DESC);
+"""
+
+_COLUMNS = ("finished_at", "day", "month", "source", "name", "profile", "customer", "engine", "stock_length",
+            "kerf", "part_types", "pieces", "part_length_mm", "lower_bound", "used_stocks", "material_mm",
+            "total_fire", "total_efficiency", "stock_cost", "elapsed_s", "features")
+
+
+def _result_engine(result: Dict[str, Any], algorithm: Optional[str]) -> Optional[str]:
+    if result.get("portfolio") is not None:
+        return "portfolio"
+    selection = result.get("auto_selection")
+    if selection:
+        return selection["algorithm"]
+    search_params = result.get("search_params") or {}
+    return search_params.get("engine") or algorithm
+
+
+def job_record(result: Dict[str, Any], parts_data: List[Dict[str, Any]], stock_length: float,
+               source: str, elapsed_s: Optional[float] = None, profile: Optional[str] = None,
+               customer: Optional[str] = None, name: Optional[str] = None,
+               algorithm: Optional[str] = None, finished_at: Optional[float] = None) -> Dict[str, Any]:
+    """
+    Sonuçtan geçmiş kaydı çıkarır; yalnızca özet alanlar kullanıldığından plan gerekmez
+    (sunucunun result_to_dict çıktısı ve akışlı planın sonucu da kabul edilir).
+    customer verilmezse tüm parçalar tek siparişe aitse o siparişin numarası yazılır.
+    """
+    finished_at = time.time() if finished_at is None else finished_at
+    lengths = [(float(p["length"]), int(p["quantity"])) for p in parts_data]
+    pieces = sum(quantity for _length, quantity in lengths)
+    histogram = [0] * (len(RATIO_BINS) + 1)
+    for length, quantity in lengths:
+        ratio = length / stock_length
+        histogram[sum(1 for edge in RATIO_BINS if ratio >= edge)] += quantity
+    if customer is None:
+        order_ids = {p.get("order_id") for p in parts_data}
+        customer = order_ids.pop() if len(order_ids) == 1 else None
+
+    fire = result.get("fire_efficiency", {})
+    used_stocks = int(result["used_stocks"])
+    bar_stocks = result.get("bar_stocks")
+    material = sum(b["length"] for b in bar_stocks) if bar_stocks else used_stocks * stock_length
+    if elapsed_s is None and result.get("profile"):
+        elapsed_s = result["profile"]["total_s"]
+    features = {
+        "distinct_lengths": len({length for length, _quantity in lengths}),
+        "ratio_histogram": [count / pieces for count in histogram] if pieces else histogram,
+        "stock_lengths": sorted({b["length"] for b in bar_stocks}) if bar_stocks else None,
+    }
+    return {
+        "finished_at": finished_at,
+        "day": time.strftime("%Y-%m-%d", time.localtime(finished_at)),
+        "month": time.strftime("%Y-%m", time.localtime(finished_at)),
+        "source": source,
+        "name": name,
+        "profile": profile or "",
+        "customer": customer or "",
+        "engine": _result_engine(result, algorithm),
+        "stock_length": float(stock_length),
+        "kerf": result.get("kerf"),
+        "part_types": len(parts_data),
+        "pieces": pieces,
+        "part_length_mm": sum(length * quantity for length, quantity in lengths),
+        "lower_bound": result.get("lower_bound"),
+        "used_stocks": used_stocks,
+        "material_mm": material,
+        "total_fire": fire.get("total_fire", 0.0),
+        "total_efficiency": fire.get("total_efficiency", 0.0),
+        "stock_cost": result.get("stock_cost"),
+        "elapsed_s": elapsed_s,
+        "features": json.dumps(features),
+    }
+
+
+def _since(text: Optional[str]) -> Optional[float]:
+    # "YYYY-MM" ya da "YYYY-MM-DD" (yerel saat) -> epoch
+    if not text:
+        return None
+    for fmt in ("%Y-%m-%d", "%Y-%m"):
+        try:
+            return time.mktime(time.strptime(text, fmt))
+        except ValueError:
+            continue
+    raise ValueError(f"Geçersiz tarih: {text} (YYYY-MM ya da YYYY-MM-DD bekleniyor)")
+
+
+class JobHistory:
+    """
+    Her optimizasyon çalışmasının özetini (örnek özellikleri, motor, süre, stok, fire) tutan
+    yerel SQLite veritabanı. Tarih, ay, profil ve müşteri indeksli olduğundan aylık fire ya
+    da en yavaş işler gibi özetler proje dosyaları yeniden taranmadan SQL ile hesaplanır.
+    """
+
+    def __init__(self, db_path: str = JOB_HISTORY_FILE):
+        self.db_path = db_path
+        self._conn = sqlite3.connect(db_path)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+
+    def add(self, record: Dict[str, Any]) -> int:
+        with self._conn:
+            cur = self._conn.execute(
+                f"INSERT INTO jobs ({', '.join(_COLUMNS)}) VALUES ({', '.join('?' * len(_COLUMNS))})",
+                [record.get(column) for column in _COLUMNS],
+            )
+        return cur.lastrowid
+
+    def record(self, result: Dict[str, Any], parts_data: List[Dict[str, Any]], stock_length: float,
+               source: str, **meta) -> int:
+        return self.add(job_record(result, parts_data, stock_length, source, **meta))
+
+    def _where(self, since: Optional[str], until: Optional[str], profile: Optional[str],
+               customer: Optional[str]):
+        clauses, params = [], []
+        if since:
+            clauses.append("finished_at >= ?")
+            params.append(_since(since))
+        if until:
+            clauses.append("finished_at < ?")
+            params.append(_since(until))
+        if profile is not None:
+            clauses.append("profile = ?")
+            params.append(profile)
+        if customer is not None:
+            clauses.append("customer = ?")
+            params.append(customer)
+        return (" WHERE " + " AND ".join(clauses)) if clauses else "", params
+
+    def aggregate(self, group_by: str = "month", since: Optional[str] = None, until: Optional[str] = None,
+                  profile: Optional[str] = None, customer: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Grup başına iş sayısı, stok, fire, verim (malzemeye göre ağırlıklı), alt sınırı aşan
+        stok ve çözüm süreleri. since/until "YYYY-MM" ya da "YYYY-MM-DD"; until hariçtir.
+        """
+        if group_by not in HISTORY_GROUPS:
+            raise ValueError(f"Bilinmeyen gruplama: {group_by}")
+        where, params = self._where(since, until, profile, customer)
+        rows = self._conn.execute(f"""
+            SELECT {group_by} AS key, COUNT(*) AS jobs, SUM(pieces) AS pieces,
+                   SUM(used_stocks) AS bars, SUM(used_stocks - COALESCE(lower_bound, used_stocks)) AS excess_bars,
+                   SUM(material_mm) AS material_mm, SUM(total_fire) AS total_fire,
+                   SUM(COALESCE(stock_cost, 0)) AS stock_cost,
+                   AVG(elapsed_s) AS avg_elapsed_s, MAX(elapsed_s) AS max_elapsed_s
+            FROM jobs{where} GROUP BY {group_by} ORDER BY {group_by}
+        """, params).fetchall()
+        summary = []
+        for row in rows:
+            entry = dict(row)
+            material = entry["material_mm"] or 0
+            entry["efficiency"] = (material - entry["total_fire"]) / material * 100 if material > 0 else 0.0
+            summary.append(entry)
+        return summary
+
+    def slowest(self, limit: int = 10, since: Optional[str] = None, until: Optional[str] = None,
+                profile: Optional[str] = None, customer: Optional[str] = None) -> List[Dict[str, Any]]:
+        where, params = self._where(since, until, profile, customer)
+        where = (where + " AND " if where else " WHERE ") + "elapsed_s IS NOT NULL"
+        return [dict(row) for row in self._conn.execute(
+            f"SELECT * FROM jobs{where} ORDER BY elapsed_s DESC LIMIT ?", params + [limit])]
+
+    def __len__(self) -> int:
+        return self._conn.execute("SELECT COUNT(*) FROM jobs").fetchone()[0]
+
+    def close(self) -> None:
+        self._conn.close()
+
+
+def report_since(months: int) -> str:
+    # Bu ay dahil son "months" ayın ilk günü
+    year, month = time.localtime()[:2]
+    month -= months - 1
+    while month <= 0:
+        month += 12
+        year -= 1
+    return f"{year:04d}-{month:02d}"
+
+
+def format_report(history: JobHistory, months: int = 12, group_by: str = "month", slowest: int = 10,
+                  profile: Optional[str] = None, customer: Optional[str] = None) -> str:
+    """
+    Konsol için eğilim özeti: grup başına fire ve verim, ay/gün gruplarında önceki döneme
+    göre verim değişimi ve en yavaş işler.
+    """
+    since = report_since(months) if months else None
+    lines = [f"{'Grup':<12} {'İş':>5} {'Parça':>9} {'Stok':>7} {'Fazla':>6} {'Fire (m)':>10} "
+             f"{'Verim':>7} {'Değişim':>8} {'Ort. s':>7} {'En çok s':>8}"]
+    previous = None
+    for row in history.aggregate(group_by, since=since, profile=profile, customer=customer):
+        # Verim değişimi yalnızca zaman gruplarında (ay, gün) anlamlıdır
+        change = "" if previous is None or group_by not in ("month", "day") else \
+            f"{row['efficiency'] - previous:+.1f}"
+        previous = row["efficiency"]
+        lines.append(
+            f"{str(row['key'] or '-'):<12} {row['jobs']:>5} {row['pieces']:>9} {row['bars']:>7} "
+            f"{row['excess_bars']:>6} {row['total_fire'] / 1000:>10.1f} {row['efficiency']:>6.1f}% "
+            f"{change:>8} {row['avg_elapsed_s'] or 0:>7.1f} {row['max_elapsed_s'] or 0:>8.1f}")
+    if len(lines) == 1:
+        lines.append("Kayıtlı iş yok.")
+    if slowest:
+        jobs = history.slowest(slowest, since=since, profile=profile, customer=customer)
+        if jobs:
+            lines.append("")
+            lines.append("En yavaş işler:")
+            for job in jobs:
+                when = time.strftime("%Y-%m-%d %H:%M", time.localtime(job["finished_at"]))
+                lines.append(f"  {job['elapsed_s']:8.1f} s  {when}  {job['name'] or '-'}  "
+                             f"{job['pieces']} parça, {job['used_stocks']} stok, motor {job['engine'] or '-'}")
+    return "\n".join(lines)
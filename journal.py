@@ -0,0 +1,264 @@
+import copy
+import json
+import os
+import shutil
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+from constants import AUTOSAVE_DIR, JOURNAL_BATCH_SIZE, JOURNAL_COMPACT_RECORDS, JOURNAL_COMPACT_INTERVAL_S
+from project_format import ProjectFile, write_project, result_to_dict, result_from_dict, is_project_container
+
+# Otomatik kayıt klasöründeki dosyalar:
+#   snapshot.kesim   son sıkıştırmadaki tam durum (parçalar, plan, ayarlar + journal kuşağı)
+#   journal.log      anlık görüntüden sonraki düzenlemeler, satır başına bir JSON kaydı
+#   journal.old      sıkıştırma sürerken önceki kuşağın kayıtları
+# Her journal dosyası {"op": "base", "generation": g} satırıyla başlar. Kuşağı G olan anlık
+# görüntü, G'den küçük kuşaklardaki tüm kayıtları içerir; kurtarmada yalnızca kuşağı >= G
+# olan kayıtlar yeniden oynatılır. Anlık görüntü yazılamadıysa sonraki kuşaklar journal.old'un
+# sonuna eklenir; dosya birden çok base satırı (kuşak bölümü) içerebilir.
+SNAPSHOT_FILE = "snapshot.kesim"
+JOURNAL_FILE = "journal.log"
+OLD_JOURNAL_FILE = "journal.old"
+
+
+def apply_record(state: Dict[str, Any], record: Dict[str, Any]) -> None:
+    op = record["op"]
+    if op == "add":
+        state["parts"].append(record["part"])
+    elif op == "delete":
+        del state["parts"][record["index"]]
+    elif op == "clear":
+        state["parts"].clear()
+    elif op == "parts":
+        state["parts"] = list(record["parts"])
+    elif op == "settings":
+        state["settings"].update(record["values"])
+    elif op == "result":
+        state["result"] = result_from_dict(record["result"]) if record["result"] else None
+
+
+def _detach_result(result: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    # Arayüz sonucu değiştirmeye devam eder (artık onayı, yeniden çalıştırma); arka planda yazılacak
+    # bağımsız kopya çağıranın iş parçacığında alınır. Part'lar değişmez, stok listeleri kopyalanır.
+    if result is None:
+        return None
+    detached = {key: copy.deepcopy(value) for key, value in result.items()
+                if key not in ("plan", "optuna_study", "parts_list")}
+    if result.get("plan") is not None:
+        detached["plan"] = [list(stock_parts) for stock_parts in result["plan"]]
+    return detached
+
+
+def _read_journal(path: str) -> Optional[List[Dict[str, Any]]]:
+    # Çökme anında yarım yazılmış son satır (ve sonrası) yok sayılır
+    records = []
+    with open(path, "rb") as f:
+        for line in f:
+            try:
+                records.append(json.loads(line))
+            except ValueError:
+                break
+    if not records or records[0].get("op") != "base":
+        return None
+    return records
+
+
+class EditJournal:
+    """
+    Parça düzenlemeleri, ayar değişiklikleri ve optimizasyon sonuçları için yalnızca
+    eklenen journal. Kayıtlar bellekte biriktirilir, batch_size kayıtta ya da flush()
+    çağrısında tek yazma + fsync ile diske iner; düzenleme başına maliyet bir json.dumps.
+    Journal büyüyünce compact() durumu arka planda snapshot.kesim dosyasına yazar.
+    """
+
+    def __init__(self, directory: str = AUTOSAVE_DIR, batch_size: int = JOURNAL_BATCH_SIZE,
+                 compact_records: int = JOURNAL_COMPACT_RECORDS,
+                 compact_interval_s: float = JOURNAL_COMPACT_INTERVAL_S):
+        self.directory = directory
+        self.batch_size = batch_size
+        self.compact_records = compact_records
+        self.compact_interval_s = compact_interval_s
+        self.generation = 0
+        self.records = 0  # son sıkıştırmadan beri yazılan kayıt
+        self._buffer: List[bytes] = []
+        self._file = None
+        self._compactor: Optional[threading.Thread] = None
+        self._last_compaction = time.monotonic()
+        self.last_error: Optional[str] = None
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.directory, name)
+
+    # ---- Kurtarma ----
+
+    def recover(self) -> Optional[Dict[str, Any]]:
+        """
+        Önceki oturum düzgün kapanmadıysa anlık görüntüyü yükleyip journal'ı yeniden oynatır.
+        Dönen durum: {"parts", "settings", "result"}; kurtarılacak bir şey yoksa None.
+        """
+        snapshot = self._path(SNAPSHOT_FILE)
+        journals = []
+        for name in (OLD_JOURNAL_FILE, JOURNAL_FILE):
+            if os.path.exists(self._path(name)):
+                records = _read_journal(self._path(name))
+                if records is not None:
+                    journals.append(records)
+        has_snapshot = os.path.exists(snapshot) and is_project_container(snapshot)
+        if not has_snapshot and not any(len(records) > 1 for records in journals):
+            return None
+
+        state: Dict[str, Any] = {"parts": [], "settings": {}, "result": None}
+        snapshot_generation = 0
+        if has_snapshot:
+            with ProjectFile(snapshot) as project:
+                state["parts"] = project.load_parts()
+                state["result"] = project.load_result(state["parts"])
+                metadata = project.load_metadata()
+                state["settings"] = dict(metadata.get("settings", {}),
+                                         stock_length=project.stock_length, kerf=project.kerf)
+                snapshot_generation = metadata.get("generation", 0)
+        for records in journals:
+            generation = 0
+            for record in records:
+                if record["op"] == "base":
+                    generation = record.get("generation", 0)
+                    self.generation = max(self.generation, generation)
+                elif generation >= snapshot_generation:  # küçük kuşaklar anlık görüntüde zaten var
+                    apply_record(state, record)
+        self.generation = max(self.generation, snapshot_generation)
+        return state
+
+    # ---- Yazma ----
+
+    def open(self, state: Optional[Dict[str, Any]] = None) -> None:
+        """
+        Yeni oturum için journal'ı açar. Kurtarılan bir durum verilirse önce tam anlık
+        görüntü alınır; böylece eski journal dosyaları tek kuşağa indirgenir.
+        """
+        os.makedirs(self.directory, exist_ok=True)
+        if state is not None:
+            self.generation += 1
+            self._write_snapshot(state, self.generation)
+            for name in (OLD_JOURNAL_FILE, JOURNAL_FILE):
+                if os.path.exists(self._path(name)):
+                    os.remove(self._path(name))
+        else:
+            self.discard()
+            os.makedirs(self.directory, exist_ok=True)
+        self._open_log()
+
+    def _open_log(self) -> None:
+        self._file = open(self._path(JOURNAL_FILE), "ab")
+        self._buffer.append(json.dumps({"op": "base", "generation": self.generation}).encode())
+        self.flush()
+
+    def append(self, op: str, **fields) -> None:
+        if self._file is None:
+            return
+        fields["op"] = op
+        self._buffer.append(json.dumps(fields, ensure_ascii=False, default=str).encode("utf-8"))
+        self.records += 1
+        if len(self._buffer) >= self.batch_size:
+            self.flush()
+
+    def add_part(self, part: Dict[str, Any]) -> None:
+        self.append("add", part=part)
+
+    def delete_part(self, index: int) -> None:
+        self.append("delete", index=index)
+
+    def clear_parts(self) -> None:
+        self.append("clear")
+
+    def set_parts(self, parts: List[Dict[str, Any]]) -> None:
+        self.append("parts", parts=parts)
+
+    def set_settings(self, values: Dict[str, Any]) -> None:
+        self.append("settings", values=values)
+
+    def set_result(self, result: Optional[Dict[str, Any]]) -> None:
+        self.append("result", result=result_to_dict(result) if result else None)
+
+    def flush(self) -> None:
+        if not self._buffer or self._file is None:
+            return
+        try:
+            self._file.write(b"\n".join(self._buffer) + b"\n")
+            self._file.flush()
+            os.fsync(self._file.fileno())
+        except OSError as e:
+            self.last_error = str(e)
+        self._buffer.clear()
+
+    # ---- Sıkıştırma ----
+
+    @property
+    def needs_compaction(self) -> bool:
+        if self._compactor is not None and self._compactor.is_alive():
+            return False
+        if self.records >= self.compact_records:
+            return True
+        return self.records > 0 and time.monotonic() - self._last_compaction >= self.compact_interval_s
+
+    def compact(self, state: Dict[str, Any]) -> None:
+        """
+        Journal'ı döndürür ve durumu arka planda anlık görüntüye yazar. Parçalar, ayarlar ve
+        sonuç burada (çağıranın iş parçacığında) kopyalanır; arka plan yazımı bunları paylaşmaz.
+        """
+        if self._file is None or (self._compactor is not None and self._compactor.is_alive()):
+            return
+        self.flush()
+        self._file.close()
+        old = self._path(OLD_JOURNAL_FILE)
+        if os.path.exists(old):
+            # Önceki anlık görüntü yazılamamış: journal.old kurtarma için hâlâ gerekli, eklenir
+            with open(self._path(JOURNAL_FILE), "rb") as src, open(old, "ab") as dst:
+                shutil.copyfileobj(src, dst)
+                dst.flush()
+                os.fsync(dst.fileno())
+            os.remove(self._path(JOURNAL_FILE))
+        else:
+            os.replace(self._path(JOURNAL_FILE), old)
+        self.generation += 1
+        self._open_log()
+        self.records = 0
+        self._last_compaction = time.monotonic()
+        snapshot_state = dict(state, parts=[dict(part) for part in state["parts"]],
+                              settings=dict(state["settings"]), result=_detach_result(state["result"]))
+        self._compactor = threading.Thread(target=self._compact_worker,
+                                           args=(snapshot_state, self.generation), daemon=True)
+        self._compactor.start()
+
+    def _compact_worker(self, state: Dict[str, Any], generation: int) -> None:
+        try:
+            self._write_snapshot(state, generation)
+            os.remove(self._path(OLD_JOURNAL_FILE))
+        except Exception as e:
+            # Anlık görüntü yazılamazsa journal.old kalır; kurtarma onu da oynatır
+            self.last_error = str(e)
+
+    def _write_snapshot(self, state: Dict[str, Any], generation: int) -> None:
+        settings = dict(state["settings"])
+        stock_length = settings.pop("stock_length")
+        kerf = settings.pop("kerf")
+        # write_project geçici dosyaya yazıp yerine taşır
+        write_project(self._path(SNAPSHOT_FILE), state["parts"], stock_length, kerf, state["result"],
+                      metadata={"generation": generation, "settings": settings})
+
+    def wait(self) -> None:
+        if self._compactor is not None:
+            self._compactor.join()
+
+    def discard(self) -> None:
+        """
+        Düzgün kapanışta çağrılır: journal ve anlık görüntü silinir.
+        """
+        self.wait()
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        self._buffer.clear()
+        for name in (JOURNAL_FILE, OLD_JOURNAL_FILE, SNAPSHOT_FILE, SNAPSHOT_FILE + ".tmp"):
+            if os.path.exists(self._path(name)):
+                os.remove(self._path(name))
@@ -1,11 +1,34 @@
-import tkinter as tk
-from app import OptimizationApp
-
-def main() -> None:
-    root = tk.Tk()
-    root.title("Kesim Optimizasyon Uygulaması")
-    app = OptimizationApp(root)
-    root.mainloop()
-
-if __name__ == "__main__":
-    main()
+import sys
+import time
+import tkinter as tk
+from startup_timing import startup_profiler, enable_startup_timing, print_startup_report
+
+def main() -> None:
+    # --startup-report: modül yükleme ve açılış adımlarının sürelerini konsola yazar
+    timing = "--startup-report" in sys.argv[1:]
+    started = time.perf_counter()
+    if timing:
+        enable_startup_timing()
+
+    with startup_profiler.span("import_app"):
+        from app import OptimizationApp
+    with startup_profiler.span("tk_root"):
+        root = tk.Tk()
+    root.title("Kesim Optimizasyon Uygulaması")
+    with startup_profiler.span("app_init"):
+        app = OptimizationApp(root)
+
+    if timing:
+        def on_first_paint() -> None:
+            startup_profiler.record("first_paint", started, time.perf_counter())
+            print_startup_report()
+        root.after_idle(on_first_paint)
+
+    root.mainloop()
+
+    if timing:
+        # Oturum boyunca ölçülen tema geçişleri vb. ile birlikte son rapor
+        print_startup_report()
+
+if __name__ == "__main__":
+    main()
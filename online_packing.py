@@ -0,0 +1,176 @@
+import time
+from collections import deque
+from typing import Callable, Deque, List, NamedTuple, Optional, Tuple
+
+from optimization import STREAM_OPEN_BARS, Part, PlanStats, _ResidualTree
+
+# Kapanış nedenleri
+CLOSE_FULL = "full"            # kalan boya en kısa parça bile sığmıyor
+CLOSE_THRESHOLD = "threshold"  # doluluk eşiği aşıldı
+CLOSE_AGE = "age"              # stok çok uzun süredir açık
+CLOSE_CAPACITY = "capacity"    # açık stok sınırı doldu, yeni stok için yer açıldı
+CLOSE_FLUSH = "flush"          # vardiya sonu / akış bitti
+
+# Açık stok sınırı dolunca kapatılacak stok: en dolu ya da en eski
+EVICTION_POLICIES = ("fullest", "oldest")
+
+
+class ClosedBar(NamedTuple):
+    bar_id: int
+    pieces: List[Part]
+    residual: float
+    opened_at: float
+    closed_at: float
+    reason: str
+
+
+class OnlinePacker:
+    """
+    Parçaların tek tek geldiği (toplam talebin bilinmediği) hatlar için çevrimiçi first-fit.
+    En fazla max_open_bars stok açık tutulur; sığan ilk stok kalan boy ağacında (_ResidualTree)
+    O(log max_open_bars) adımda bulunur. Stoklar dolunca (min_piece_length + kerf sığmıyor),
+    doluluk fill_threshold'u aşınca, max_age_s saniyeden uzun açık kalınca ya da açık stok
+    sınırı dolunca (eviction: "fullest" / "oldest") kapatılır. Kapanan stoklar add() ve
+    tick() dönüş değerinde ve verildiyse on_close geri çağrısıyla hemen bildirilir.
+    """
+
+    def __init__(self, stock_length: float, kerf: float, max_open_bars: int = STREAM_OPEN_BARS,
+                 fill_threshold: Optional[float] = None, max_age_s: Optional[float] = None,
+                 min_piece_length: float = 0.0, eviction: str = "fullest",
+                 on_close: Optional[Callable[[ClosedBar], None]] = None,
+                 clock: Callable[[], float] = time.monotonic):
+        if stock_length <= 0 or kerf < 0:
+            raise ValueError("Stok boyu pozitif, kerf negatif olmayan bir sayı olmalı.")
+        if max_open_bars < 1:
+            raise ValueError("Açık stok sınırı en az 1 olmalı.")
+        if fill_threshold is not None and not 0 < fill_threshold <= 1:
+            raise ValueError("Doluluk eşiği 0 ile 1 arasında olmalı.")
+        if eviction not in EVICTION_POLICIES:
+            raise ValueError(f"Bilinmeyen kapatma politikası: {eviction}")
+        self.stock_length = stock_length
+        self.kerf = kerf
+        self.max_open_bars = max_open_bars
+        self.max_age_s = max_age_s
+        self.eviction = eviction
+        self.on_close = on_close
+        self.clock = clock
+        # Kalan boy bu değerin altına inen stok dolu sayılır (kerf'ten kısa boşluğa parça sığmaz);
+        # doluluk eşiği parça boyları toplamına çevrilir
+        self._full_below = max(min_piece_length + kerf, kerf + 1e-9)
+        self._close_at_used = None if fill_threshold is None else fill_threshold * stock_length
+        self.stats = PlanStats(stock_length, kerf)
+
+        # Açık stoklar sabit sayıda yuvada tutulur; kapanan yuva yeniden kullanılır
+        self._tree = _ResidualTree(max_open_bars)
+        self._pieces: List[Optional[List[Part]]] = [None] * self._tree.size
+        self._used: List[float] = [0.0] * self._tree.size
+        self._bar_ids: List[int] = [0] * self._tree.size
+        self._opened_at: List[float] = [0.0] * self._tree.size
+        self._free: List[int] = list(range(max_open_bars - 1, -1, -1))
+        # Açılış sırası (yaş ve "oldest" politikası için); kapanan stoklar tembel silinir
+        self._opened: Deque[Tuple[float, int, int]] = deque()
+        self._next_id = 0
+        self.pieces_added = 0
+
+    @property
+    def open_bars(self) -> int:
+        return self.max_open_bars - len(self._free)
+
+    def add(self, part: Part) -> List[ClosedBar]:
+        """
+        part.quantity adet parçayı yerleştirir; bu çağrıda kapanan stokları döner.
+        """
+        length_needed = part.length + self.kerf
+        if part.length <= 0 or part.quantity <= 0:
+            raise ValueError("Geçersiz parça özellikleri.")
+        if length_needed > self.stock_length:
+            raise ValueError(f"{part.length:g} mm parça {self.stock_length:g} mm stoğa sığmıyor.")
+        closed: List[ClosedBar] = []
+        tree = self._tree
+        for _ in range(part.quantity):
+            slot = tree.find_first(length_needed)
+            if slot < 0:
+                if not self._free:
+                    closed.append(self._close(self._victim(), CLOSE_CAPACITY))
+                slot = self._open()
+            pieces = self._pieces[slot]
+            pieces.append(part)
+            used = self._used[slot] + length_needed
+            self._used[slot] = used
+            residual = self.stock_length - used
+            if residual < self._full_below:
+                closed.append(self._close(slot, CLOSE_FULL))
+            elif self._close_at_used is not None and used - self.kerf * len(pieces) >= self._close_at_used:
+                closed.append(self._close(slot, CLOSE_THRESHOLD))
+            else:
+                tree.update(slot, residual)
+        self.pieces_added += part.quantity
+        if self.max_age_s is not None:
+            closed.extend(self.tick())
+        return closed
+
+    def tick(self, now: Optional[float] = None) -> List[ClosedBar]:
+        """
+        max_age_s'den uzun süredir açık stokları kapatır; parça gelmeyen dönemlerde de çağrılabilir.
+        """
+        if self.max_age_s is None:
+            return []
+        deadline = (self.clock() if now is None else now) - self.max_age_s
+        closed = []
+        opened = self._opened
+        while opened and opened[0][0] <= deadline:
+            _opened_at, slot, bar_id = opened.popleft()
+            if self._pieces[slot] is not None and self._bar_ids[slot] == bar_id:
+                closed.append(self._close(slot, CLOSE_AGE))
+        return closed
+
+    def flush(self) -> List[ClosedBar]:
+        """
+        Açık stokların hepsini açılış sırasıyla kapatır.
+        """
+        closed = []
+        while self._opened:
+            _opened_at, slot, bar_id = self._opened.popleft()
+            if self._pieces[slot] is not None and self._bar_ids[slot] == bar_id:
+                closed.append(self._close(slot, CLOSE_FLUSH))
+        return closed
+
+    def _open(self) -> int:
+        slot = self._free.pop()
+        now = self.clock()
+        self._pieces[slot] = []
+        self._used[slot] = 0.0
+        self._bar_ids[slot] = self._next_id
+        self._opened_at[slot] = now
+        self._opened.append((now, slot, self._next_id))
+        self._next_id += 1
+        return slot
+
+    def _victim(self) -> int:
+        if self.eviction == "oldest":
+            while True:
+                _opened_at, slot, bar_id = self._opened[0]
+                if self._pieces[slot] is not None and self._bar_ids[slot] == bar_id:
+                    return slot
+                self._opened.popleft()
+        # En dolu açık stok: sınır küçük olduğundan doğrusal tarama yeterli
+        used = self._used
+        return max((slot for slot in range(self.max_open_bars) if self._pieces[slot] is not None),
+                   key=used.__getitem__)
+
+    def _close(self, slot: int, reason: str) -> ClosedBar:
+        pieces = self._pieces[slot]
+        bar = ClosedBar(self._bar_ids[slot], pieces, self.stock_length - self._used[slot],
+                        self._opened_at[slot], self.clock(), reason)
+        self._pieces[slot] = None
+        self._tree.update(slot, float("-inf"))
+        self._free.append(slot)
+        self.stats.add(pieces)
+        if self.on_close is not None:
+            self.on_close(bar)
+        return bar
+
+
+def format_bar(bar: ClosedBar) -> str:
+    lengths = "+".join(f"{p.length:g}" for p in bar.pieces)
+    return f"Stok {bar.bar_id + 1}: {lengths} (fire {bar.residual:g} mm, {bar.reason})"
@@ -1,168 +1,989 @@
-from typing import List, Dict, Any, NamedTuple, Optional
-import optuna
-
-class Part(NamedTuple):
-    length: float
-    quantity: int
-    name: Optional[str] = None
-    cut_order: Optional[int] = None
-    cut_type: Optional[str] = None
-
-def _validate_parts(parts_data: List[Part]) -> None:
-    if not parts_data:
-        raise ValueError("Parça listesi boş olmamalı.")
-    for part in parts_data:
-        if part.length <= 0 or part.quantity <= 0:
-            raise ValueError("Geçersiz parça özellikleri.")
-
-def _simple_first_fit(parts_data: List[Part], stock_length: int, kerf: int) -> List[List[Part]]:
-    sorted_parts = sorted(parts_data, key=lambda p: p.length, reverse=True)
-    stocks: List[List[Part]] = []
-    lengths_in_stocks: List[float] = []
-
-    for part in sorted_parts:
-        for _ in range(part.quantity):
-            length_needed = part.length + kerf
-            placed = False
-            for idx, current_length in enumerate(lengths_in_stocks):
-                if current_length + length_needed <= stock_length:
-                    stocks[idx].append(part)
-                    lengths_in_stocks[idx] += length_needed
-                    placed = True
-                    break
-            if not placed:
-                stocks.append([part])
-                lengths_in_stocks.append(length_needed)
-    return stocks
-
-def calculate_fire_and_efficiency(plan: List[List[Part]], stock_length: int, kerf: int) -> dict:
-    total_stocks = len(plan)
-    total_material = total_stocks * stock_length
-    total_used = 0
-
-    stock_fire = []
-    stock_efficiency = []
-
-    for stock_parts in plan:
-        length_sum = sum(p.length for p in stock_parts)
-        total_kerf = kerf * (len(stock_parts) - 1) if len(stock_parts) > 1 else 0
-        used = length_sum + total_kerf
-        fire = stock_length - used
-        efficiency = (length_sum / stock_length) * 100 if stock_length > 0 else 0
-        stock_fire.append(fire)
-        stock_efficiency.append(efficiency)
-        total_used += used
-
-    total_fire = total_material - total_used
-    total_efficiency = (total_used / total_material) * 100 if total_material > 0 else 0
-
-    return {
-        "total_fire": total_fire,
-        "total_efficiency": total_efficiency,
-        "stock_fire": stock_fire,
-        "stock_efficiency": stock_efficiency,
-    }
-
-def calculate_costs(fire_info: dict, stock_unit_price: float) -> dict:
-    total_fire = fire_info.get("total_fire", 0)
-    total_stocks = len(fire_info.get("stock_fire", []))
-    total_cost = total_stocks * stock_unit_price
-    fire_cost = total_fire * stock_unit_price
-    savings = 0
-    return {
-        "total_cost": total_cost,
-        "fire_cost": fire_cost,
-        "savings": savings,
-    }
-
-def optimize_parts(parts_data: List[Dict[str, Any]], stock_length: int, kerf: int,
-                   trials: int = 20, algorithm: str = "first_fit",
-                   kerf_min: Optional[int] = None,
-                   kerf_max: Optional[int] = None) -> Dict[str, Any]:
-    wrapped_parts = []
-    for p in parts_data:
-        wrapped_parts.append(Part(
-            length=float(p["length"]),
-            quantity=int(p["quantity"]),
-            name=p.get("name"),
-            cut_order=p.get("cut_order"),
-            cut_type=p.get("cut_type"),
-        ))
-
-    _validate_parts(wrapped_parts)
-
-    k_min = kerf_min if kerf_min is not None else max(1, kerf - 1)
-    k_max = kerf_max if kerf_max is not None else kerf + 2
-    if k_min > k_max:
-        raise ValueError("kerf_min kerf_max'dan büyük olamaz")
-
-    def objective(trial: optuna.Trial) -> int:
-        trial_kerf = trial.suggest_int("kerf", k_min, k_max)
-        plan = _simple_first_fit(wrapped_parts, stock_length, trial_kerf)
-        return len(plan)
-
-    study = optuna.create_study(direction="minimize")
-    study.optimize(objective, n_trials=trials)
-
-    best_kerf = study.best_params["kerf"]
-    best_plan = _simple_first_fit(wrapped_parts, stock_length, best_kerf)
-
-    fire_eff = calculate_fire_and_efficiency(best_plan, stock_length, best_kerf)
-
-    return {
-        "kerf": best_kerf,
-        "plan": best_plan,
-        "used_stocks": len(best_plan),
-        "optuna_study": study,
-        "fire_efficiency": fire_eff,
-        "parts_list": parts_data,
-    }
-
-def draw_cutting_plan(ax, canvas, optimization_result, stock_length: int = None, kerf: int = None):
-    import matplotlib.patches as patches
-    ax.clear()
-
-    used_stocks = optimization_result.get("used_stocks", 0)
-    kerf_val = kerf or optimization_result.get("kerf", 0)
-
-    title = f"Kesim Planı (Kullanılan Stok Sayısı: {used_stocks}, Kerf: {kerf_val} mm)"
-    ax.set_title(title)
-    ax.set_xlabel("Uzunluk (mm)")
-    ax.set_ylabel("Stok Parça No")
-
-    stock_length_val = stock_length or 6000
-    plan = optimization_result.get("plan", [])
-
-    y_height = 7
-    y_gap = 12
-
-    colors = ["#ff9999", "#66b3ff", "#99ff99", "#ffcc99", "#c2f0c2", "#ffb3e6"]
-
-    for stock_idx, stock_parts in enumerate(plan):
-        current_x = 0
-        y_bottom = stock_idx * (y_height + y_gap)
-        sorted_parts = sorted(stock_parts, key=lambda p: p.cut_order if p.cut_order is not None else 0)
-        for part_idx, part in enumerate(sorted_parts):
-            part_length = part.length
-            color = colors[part_idx % len(colors)]
-            rect = patches.Rectangle(
-                (current_x, y_bottom), part_length, y_height,
-                edgecolor="black", facecolor=color
-            )
-            ax.add_patch(rect)
-            label = f"{part.name}\n{part_length:.1f} mm"
-            if part.cut_type and part.cut_type.lower() != "düz kesim":
-                label += f"\n{part.cut_type}"
-            ax.text(current_x + part_length / 2, y_bottom + y_height / 2, label,
-                    ha="center", va="center", fontsize=8)
-            current_x += part_length + kerf_val
-
-        ax.plot([0, stock_length_val], [y_bottom - 1, y_bottom - 1], "k--", linewidth=0.5)
-
-    ax.set_xlim(0, stock_length_val + 150)
-    ax.set_ylim(-15, len(plan) * (y_height + y_gap))
-    ax.grid(True)
-    try:
-        canvas.draw()
-    except Exception:
-        pass
+import hashlib
+import math
+import os
+from bisect import bisect_left, insort
+from contextlib import closing
+from typing import List, Dict, Any, NamedTuple, Optional, Callable, Tuple, Iterator
+from constants import PLAN_BYTES_PER_PIECE, SEQUENCE_BYTES_PER_PIECE, WORKER_PROCESS_MB
+from profiling import MB, MemoryBudgetError, MemoryGuard, Profiler
+
+class Part(NamedTuple):
+    length: float
+    quantity: int
+    name: Optional[str] = None
+    cut_order: Optional[int] = None
+    cut_type: Optional[str] = None
+    order_id: Optional[str] = None
+
+class OptimizationCancelled(Exception):
+    """
+    İlerleme geri çağrısından fırlatılarak çalışan optimizasyon durdurulur.
+    """
+
+def _validate_parts(parts_data: List[Part]) -> None:
+    if not parts_data:
+        raise ValueError("Parça listesi boş olmamalı.")
+    for part in parts_data:
+        if part.length <= 0 or part.quantity <= 0:
+            raise ValueError("Geçersiz parça özellikleri.")
+
+def _wrap_parts(parts_data: List[Dict[str, Any]]) -> List[Part]:
+    return [Part(
+        length=float(p["length"]),
+        quantity=int(p["quantity"]),
+        name=p.get("name"),
+        cut_order=p.get("cut_order"),
+        cut_type=p.get("cut_type"),
+        order_id=p.get("order_id"),
+    ) for p in parts_data]
+
+class _ResidualTree:
+    """
+    Stokların kalan boylarını tutan maksimum segment ağacı. İlk sığan stok
+    (en soldaki) tek tek taranmadan O(log n) adımda bulunur.
+    """
+
+    def __init__(self, capacity: int = 64):
+        size = 1
+        while size < capacity:
+            size *= 2
+        self.size = size
+        self.tree = [float("-inf")] * (2 * size)
+        self.count = 0
+
+    def find_first(self, needed: float) -> int:
+        # Sığan stok yoksa -1 döner
+        tree = self.tree
+        if tree[1] < needed:
+            return -1
+        i = 1
+        size = self.size
+        while i < size:
+            i *= 2
+            if tree[i] < needed:
+                i += 1
+        return i - size
+
+    def update(self, idx: int, residual: float) -> None:
+        tree = self.tree
+        i = idx + self.size
+        tree[i] = residual
+        i //= 2
+        while i:
+            left = tree[2 * i]
+            right = tree[2 * i + 1]
+            best = left if left >= right else right
+            if tree[i] == best:
+                break
+            tree[i] = best
+            i //= 2
+
+    def append(self, residual: float) -> int:
+        if self.count == self.size:
+            leaves = self.tree[self.size:]
+            self.size *= 2
+            self.tree = [float("-inf")] * (2 * self.size)
+            self.tree[self.size:self.size + len(leaves)] = leaves
+            for i in range(self.size - 1, 0, -1):
+                left = self.tree[2 * i]
+                right = self.tree[2 * i + 1]
+                self.tree[i] = left if left >= right else right
+        idx = self.count
+        self.count += 1
+        self.update(idx, residual)
+        return idx
+
+def _length_desc(part: Part) -> float:
+    return -part.length
+
+def _simple_first_fit(parts_data: List[Part], stock_length: int, kerf: int,
+                      profiler: Optional[Profiler] = None,
+                      bar_limit: Optional[int] = None,
+                      sort_key: Optional[Callable[[Part], float]] = None) -> Optional[List[List[Part]]]:
+    # bar_limit: stok sayısı bu sınırı aşarsa paketleme yarıda bırakılır ve None döner;
+    # sort_key: yerleştirme sırası (varsayılan: uzundan kısaya)
+    sorted_parts = sorted(parts_data, key=sort_key or _length_desc)
+    stocks: List[List[Part]] = []
+    lengths_in_stocks: List[float] = []
+    # Her parça için ilk sığan stok doğrusal tarama yerine kalan boy ağacıyla bulunur;
+    # yerleşim klasik first-fit ile aynıdır
+    residuals = _ResidualTree()
+    pieces_placed = 0
+
+    for part in sorted_parts:
+        length_needed = part.length + kerf
+        for _ in range(part.quantity):
+            idx = residuals.find_first(length_needed)
+            if idx >= 0:
+                stocks[idx].append(part)
+                lengths_in_stocks[idx] += length_needed
+                residuals.update(idx, stock_length - lengths_in_stocks[idx])
+            else:
+                if bar_limit is not None and len(stocks) >= bar_limit:
+                    return None
+                stocks.append([part])
+                lengths_in_stocks.append(length_needed)
+                residuals.append(stock_length - length_needed)
+        pieces_placed += part.quantity
+
+    if profiler is not None:
+        # bars_scanned: ağaçta incelenen düğüm sayısının üst sınırı
+        profiler.count("pieces_placed", pieces_placed)
+        profiler.count("bars_scanned", pieces_placed * residuals.size.bit_length())
+    return stocks
+
+def _simple_best_fit(parts_data: List[Part], stock_length: int, kerf: int,
+                     profiler: Optional[Profiler] = None,
+                     bar_limit: Optional[int] = None,
+                     sort_key: Optional[Callable[[Part], float]] = None) -> Optional[List[List[Part]]]:
+    # Parça, sığdığı stoklar içinde en az boşluk bırakana yerleşir;
+    # (kalan boy, stok no) sıralı listesinde ikili aramayla bulunur
+    sorted_parts = sorted(parts_data, key=sort_key or _length_desc)
+    stocks: List[List[Part]] = []
+    residuals: List[Tuple[float, int]] = []
+    pieces_placed = 0
+
+    for part in sorted_parts:
+        length_needed = part.length + kerf
+        for _ in range(part.quantity):
+            pos = bisect_left(residuals, (length_needed, -1))
+            if pos < len(residuals):
+                residual, idx = residuals.pop(pos)
+                stocks[idx].append(part)
+                insort(residuals, (residual - length_needed, idx))
+            else:
+                if bar_limit is not None and len(stocks) >= bar_limit:
+                    return None
+                insort(residuals, (stock_length - length_needed, len(stocks)))
+                stocks.append([part])
+        pieces_placed += part.quantity
+
+    if profiler is not None:
+        profiler.count("pieces_placed", pieces_placed)
+        profiler.count("bars_scanned", pieces_placed * max(1, len(residuals)).bit_length())
+    return stocks
+
+def _total_length_desc(part: Part) -> float:
+    return -part.length * part.quantity
+
+def _quantity_desc(part: Part) -> Tuple[int, float]:
+    return -part.quantity, -part.length
+
+# Geniş arama uzayındaki yerleştirme sıraları: parça tipleri bu anahtarla sıralanır
+SORT_ORDERS: Dict[str, Callable[[Part], Any]] = {
+    "length_desc": _length_desc,
+    "total_length_desc": _total_length_desc,
+    "quantity_desc": _quantity_desc,
+}
+
+# algorithm adı -> tek stok boyu için paketleme motoru
+ENGINES: Dict[str, Callable[..., Optional[List[List[Part]]]]] = {
+    "first_fit": _simple_first_fit,
+    "best_fit": _simple_best_fit,
+}
+
+# Akışlı planlamada aynı anda açık tutulan en fazla stok deseni (aynı içerikli stoklar tek desen)
+STREAM_OPEN_BARS = 64
+
+def iter_first_fit_bars(parts_data: List[Part], stock_length: int, kerf: int,
+                        open_bars: int = STREAM_OPEN_BARS) -> Iterator[List[Part]]:
+    """
+    Kapalı stok politikalı first-fit: stoklar kesinleştikçe tek tek üretilir, plan bellekte tutulmaz.
+    Açık stoklar içerikleri aynıysa tek desen + adet olarak tutulur; kalan boyuna en kısa parça
+    bile sığmayan desen hemen kapanır, desen sayısı open_bars'ı aşarsa en dolu desen kapatılır.
+    Bellek parça adedine değil, parça tipi ve open_bars'a bağlıdır. Aynı desenli stoklar aynı
+    liste nesnesiyle üretilir; üretilen listeler değiştirilmemelidir.
+    """
+    sorted_parts = sorted(_reduce_parts(parts_data), key=_length_desc)
+    smallest_needed = sorted_parts[-1].length + kerf if sorted_parts else 0
+    groups: List[list] = []  # açık desenler: [kalan boy, parçalar, stok adedi], first-fit sırasıyla
+    for part in sorted_parts:
+        length_needed = part.length + kerf
+        remaining = part.quantity
+        i = 0
+        while remaining and i < len(groups):
+            residual, stock_parts, count = groups[i]
+            if residual >= length_needed:
+                per_bar = int(residual // length_needed)
+                if remaining >= per_bar * count:
+                    groups[i] = [residual - per_bar * length_needed, stock_parts + [part] * per_bar, count]
+                    remaining -= per_bar * count
+                else:
+                    # Desen bölünür: dolan stoklar öne (first-fit'te önce dolanlar), kalanlar aynen kalır
+                    full, extra = divmod(remaining, per_bar)
+                    split = []
+                    if full:
+                        split.append([residual - per_bar * length_needed, stock_parts + [part] * per_bar, full])
+                    if extra:
+                        split.append([residual - extra * length_needed, stock_parts + [part] * extra, 1])
+                    rest = count - full - (1 if extra else 0)
+                    groups[i:i + 1] = split + ([[residual, stock_parts, rest]] if rest else [])
+                    remaining = 0
+            i += 1
+        per_bar = max(1, int(stock_length // length_needed))
+        full, extra = divmod(remaining, per_bar)
+        if full:
+            groups.append([stock_length - per_bar * length_needed, [part] * per_bar, full])
+        if extra:
+            groups.append([stock_length - extra * length_needed, [part] * extra, 1])
+
+        open_groups = []
+        for group in groups:
+            if group[0] < smallest_needed:
+                for _ in range(group[2]):
+                    yield group[1]
+            else:
+                open_groups.append(group)
+        groups = open_groups
+        while len(groups) > open_bars:
+            fullest = min(range(len(groups)), key=lambda k: groups[k][0])
+            _residual, stock_parts, count = groups.pop(fullest)
+            for _ in range(count):
+                yield stock_parts
+    for _residual, stock_parts, count in groups:
+        for _ in range(count):
+            yield stock_parts
+
+class PlanStats:
+    """
+    Stoklar üretildikçe fire ve verimliliği biriktirir (calculate_fire_and_efficiency'nin
+    stok listesi tutmayan karşılığı).
+    """
+
+    def __init__(self, stock_length: float, kerf: float):
+        self.stock_length = stock_length
+        self.kerf = kerf
+        self.used_stocks = 0
+        self.pieces = 0
+        self.total_used = 0.0
+        self.total_material = 0.0
+        self.min_efficiency: Optional[float] = None
+
+    def add(self, stock_parts: List[Part], bar_length: Optional[float] = None) -> None:
+        bar_length = bar_length or self.stock_length
+        length_sum = sum(p.length for p in stock_parts)
+        self.used_stocks += 1
+        self.pieces += len(stock_parts)
+        self.total_used += length_sum + (self.kerf * (len(stock_parts) - 1) if len(stock_parts) > 1 else 0)
+        self.total_material += bar_length
+        efficiency = (length_sum / bar_length) * 100 if bar_length > 0 else 0
+        if self.min_efficiency is None or efficiency < self.min_efficiency:
+            self.min_efficiency = efficiency
+
+    def fire_efficiency(self) -> dict:
+        # stock_fire/stock_efficiency listeleri yerine stok sayısı ve en düşük stok verimi döner
+        return {
+            "total_fire": self.total_material - self.total_used,
+            "total_efficiency": (self.total_used / self.total_material) * 100 if self.total_material > 0 else 0,
+            "stock_count": self.used_stocks,
+            "min_stock_efficiency": self.min_efficiency or 0,
+        }
+
+def lower_bound(parts_data: List[Part], stock_length: int, kerf: int) -> int:
+    """
+    Gereken stok sayısı için alt sınır: toplam (parça + kerf) boyu / stok boyu, yukarı yuvarlanmış.
+    """
+    total = sum((p.length + kerf) * p.quantity for p in parts_data)
+    return max(1, math.ceil(total / stock_length - 1e-9))
+
+def estimate_solve_memory(pieces: int, sequence: bool = True, n_jobs: int = 1,
+                          algorithm: str = "first_fit", patterns: bool = False) -> float:
+    """
+    Çözümün süreç belleğine ekleyeceği yükün kaba tahmini (MB): en iyi ve güncel deneme
+    planları, kesim sıralaması, desen tohumlama planı ve paralel işçi süreçleri.
+    """
+    per_piece = PLAN_BYTES_PER_PIECE
+    if sequence:
+        per_piece += SEQUENCE_BYTES_PER_PIECE
+    if patterns:
+        per_piece += PLAN_BYTES_PER_PIECE
+    if algorithm == "portfolio":
+        from portfolio import PORTFOLIO_ENGINES
+        workers = min(len(PORTFOLIO_ENGINES), os.cpu_count() or 1)
+    else:
+        workers = n_jobs if n_jobs > 1 else 0
+    # İşçiler yalnızca deneme planlarını kurar; sıralama ve tohumlama ana süreçte yapılır
+    return (pieces * (per_piece + workers * PLAN_BYTES_PER_PIECE)) / MB + workers * WORKER_PROCESS_MB
+
+def _fit_memory_budget(guard: MemoryGuard, pieces: int, sequence: bool, n_jobs: int, algorithm: str,
+                       patterns: bool) -> Dict[str, Any]:
+    # Tahmin bütçeden kalan belleğe sığmazsa önce kesim sıralaması, sonra paralel değerlendirme,
+    # portföy ve desen tohumlama kapatılır; en sade hali de sığmazsa çözüm hiç başlatılmaz
+    available = guard.available_mb()
+    if available is None:
+        available = guard.budget_mb  # süreç belleği ölçülemiyor: bütçenin tamamı çözüme
+    config = {"sequence": sequence, "n_jobs": n_jobs, "algorithm": algorithm, "patterns": patterns}
+    adjustments = []
+    estimate = estimate_solve_memory(pieces, **config)
+    if estimate > available and sequence:
+        config["sequence"] = False
+        adjustments.append("sequence_off")
+        estimate = estimate_solve_memory(pieces, **config)
+    if estimate > available and (n_jobs > 1 or algorithm == "portfolio" or patterns):
+        config.update(n_jobs=1, patterns=False, algorithm="first_fit" if algorithm == "portfolio" else algorithm)
+        adjustments.append("compact_engine")
+        estimate = estimate_solve_memory(pieces, **config)
+    if estimate > available:
+        raise MemoryBudgetError(
+            f"{pieces} parçalık çözüm için tahmini {estimate:.0f} MB gerekiyor, bellek bütçesinden "
+            f"{max(available, 0):.0f} MB kalıyor (bütçe {guard.budget_mb:.0f} MB). Akışlı planı (--stream) "
+            f"kullanın ya da bütçeyi artırın.", guard.budget_mb, estimate_mb=estimate, phase="estimate")
+    return dict(config, budget_mb=guard.budget_mb, estimate_mb=estimate, available_mb=available,
+                adjustments=adjustments)
+
+def _normalize_catalog(stock_catalog: Optional[List[Dict[str, Any]]], stock_length: int) -> List[Dict[str, Any]]:
+    # Katalog verilmezse tek boy, sınırsız stok; maliyet stok başına 1
+    if not stock_catalog:
+        return [{"length": float(stock_length), "cost": 1.0, "count": None}]
+    catalog = []
+    for entry in stock_catalog:
+        length = float(entry["length"])
+        cost = float(entry.get("cost", 1.0))
+        count = entry.get("count")
+        if length <= 0 or cost < 0 or (count is not None and int(count) < 0):
+            raise ValueError("Geçersiz stok kataloğu girdisi.")
+        catalog.append({"length": length, "cost": cost, "count": None if count is None else int(count)})
+    # Önce mm başına en ucuz, eşitlikte en uzun stok denenir
+    catalog.sort(key=lambda e: (e["cost"] / e["length"], -e["length"]))
+    return catalog
+
+def _multi_stock_first_fit(parts_data: List[Part], catalog: List[Dict[str, Any]], kerf: int,
+                           remnants: Optional[List[Tuple[float, int]]] = None,
+                           profiler: Optional[Profiler] = None,
+                           sort_key: Optional[Callable[[Part], float]] = None) -> Tuple[List[List[Part]], List[Dict[str, Any]]]:
+    """
+    Farklı boylarda stoklar ve artık parçalarla first-fit. Yeni stok gerektiğinde önce
+    parçanın sığdığı en kısa artık, yoksa katalogdan mm başına en ucuz uygun boy açılır.
+    remnants: (uzunluk, id) listesi, uzunluğa göre sıralı.
+    """
+    sorted_parts = sorted(parts_data, key=sort_key or _length_desc)
+    remaining = [entry["count"] for entry in catalog]
+    remnant_pool = list(remnants or [])
+    remnant_lengths = [length for length, _ in remnant_pool]
+    stocks: List[List[Part]] = []
+    bar_stocks: List[Dict[str, Any]] = []
+    used_lengths: List[float] = []
+    residuals = _ResidualTree()
+    pieces_placed = 0
+
+    for part in sorted_parts:
+        length_needed = part.length + kerf
+        for _ in range(part.quantity):
+            idx = residuals.find_first(length_needed)
+            if idx >= 0:
+                stocks[idx].append(part)
+                used_lengths[idx] += length_needed
+                residuals.update(idx, bar_stocks[idx]["length"] - used_lengths[idx])
+                continue
+            pos = bisect_left(remnant_lengths, length_needed)
+            if pos < len(remnant_lengths):
+                length, remnant_id = remnant_pool.pop(pos)
+                remnant_lengths.pop(pos)
+                bar = {"length": length, "cost": 0.0, "source": "remnant", "remnant_id": remnant_id}
+            else:
+                choice = None
+                for ci, entry in enumerate(catalog):
+                    if entry["length"] >= length_needed and remaining[ci] != 0:
+                        choice = ci
+                        break
+                if choice is None:
+                    raise ValueError(f"Parça için uygun stok kalmadı: {part.name} ({part.length} mm)")
+                if remaining[choice] is not None:
+                    remaining[choice] -= 1
+                entry = catalog[choice]
+                bar = {"length": entry["length"], "cost": entry["cost"], "source": "stock", "catalog_index": choice}
+            stocks.append([part])
+            bar_stocks.append(bar)
+            used_lengths.append(length_needed)
+            residuals.append(bar["length"] - length_needed)
+        pieces_placed += part.quantity
+
+    # Katalogdan açılan stoklar, içeriklerinin sığdığı daha ucuz bir boy varsa ona indirilir
+    if len(catalog) > 1:
+        for idx, bar in enumerate(bar_stocks):
+            if bar["source"] != "stock":
+                continue
+            best = None
+            for ci, entry in enumerate(catalog):
+                if (entry["length"] >= used_lengths[idx] and remaining[ci] != 0
+                        and entry["cost"] < (catalog[best]["cost"] if best is not None else bar["cost"])):
+                    best = ci
+            if best is None:
+                continue
+            if remaining[best] is not None:
+                remaining[best] -= 1
+            previous = bar["catalog_index"]
+            if remaining[previous] is not None:
+                remaining[previous] += 1
+            entry = catalog[best]
+            bar_stocks[idx] = {"length": entry["length"], "cost": entry["cost"],
+                               "source": "stock", "catalog_index": best}
+
+    if profiler is not None:
+        profiler.count("pieces_placed", pieces_placed)
+        profiler.count("bars_scanned", pieces_placed * residuals.size.bit_length())
+    return stocks, bar_stocks
+
+def collect_new_remnants(plan: List[List[Part]], bar_stocks: List[Dict[str, Any]], kerf: int,
+                         min_length: float) -> List[float]:
+    # Son kesimden sonra kalan parça (kerf düşülmüş) eşik üzerindeyse artık stoğa girer
+    offcuts = []
+    for stock_parts, bar in zip(plan, bar_stocks):
+        offcut = bar["length"] - sum(p.length + kerf for p in stock_parts)
+        if offcut >= min_length:
+            offcuts.append(offcut)
+    return offcuts
+
+def calculate_fire_and_efficiency(plan: List[List[Part]], stock_length: int, kerf: int,
+                                  stock_lengths: Optional[List[float]] = None) -> dict:
+    # stock_lengths verilirse her stoğun kendi boyu kullanılır (çoklu stok boyu / artık)
+    total_stocks = len(plan)
+    total_material = sum(stock_lengths) if stock_lengths is not None else total_stocks * stock_length
+    total_used = 0
+
+    stock_fire = []
+    stock_efficiency = []
+
+    for bar_idx, stock_parts in enumerate(plan):
+        bar_length = stock_lengths[bar_idx] if stock_lengths is not None else stock_length
+        length_sum = sum(p.length for p in stock_parts)
+        total_kerf = kerf * (len(stock_parts) - 1) if len(stock_parts) > 1 else 0
+        used = length_sum + total_kerf
+        fire = bar_length - used
+        efficiency = (length_sum / bar_length) * 100 if bar_length > 0 else 0
+        stock_fire.append(fire)
+        stock_efficiency.append(efficiency)
+        total_used += used
+
+    total_fire = total_material - total_used
+    total_efficiency = (total_used / total_material) * 100 if total_material > 0 else 0
+
+    return {
+        "total_fire": total_fire,
+        "total_efficiency": total_efficiency,
+        "stock_fire": stock_fire,
+        "stock_efficiency": stock_efficiency,
+    }
+
+def calculate_costs(fire_info: dict, stock_unit_price: float) -> dict:
+    total_fire = fire_info.get("total_fire", 0)
+    total_stocks = fire_info.get("stock_count", len(fire_info.get("stock_fire", [])))
+    total_cost = total_stocks * stock_unit_price
+    fire_cost = total_fire * stock_unit_price
+    savings = 0
+    return {
+        "total_cost": total_cost,
+        "fire_cost": fire_cost,
+        "savings": savings,
+    }
+
+class Started(NamedTuple):
+    part_types: int
+    trials: int
+    algorithm: str
+
+class ReductionDone(NamedTuple):
+    # Aynı parçalar birleştirildikten sonraki tip ve toplam parça sayısı
+    part_types: int
+    pieces: int
+    lower_bound: int
+
+class TrialFinished(NamedTuple):
+    number: int
+    kerf: Optional[int]
+    bars: Optional[int]
+    value: Optional[float]
+    engine: Optional[str] = None
+
+class NewIncumbent(NamedTuple):
+    # Portföy modunda yalnızca paylaşılan en iyi stok sayısı bilinir (number/kerf/plan None)
+    number: Optional[int]
+    kerf: Optional[int]
+    bars: int
+    value: float
+    plan: Optional[List[List[Part]]] = None
+
+class Finished(NamedTuple):
+    result: Dict[str, Any]
+
+OptimizationEvent = Any  # Started | ReductionDone | TrialFinished | NewIncumbent | Finished
+
+# Olayların metin adları (sunucu akışı, CLI, progress geri çağrısı)
+EVENT_NAMES = {
+    Started: "started",
+    ReductionDone: "reduction",
+    TrialFinished: "trial",
+    NewIncumbent: "incumbent",
+    Finished: "finished",
+}
+EVENT_TYPES = {name: event_type for event_type, name in EVENT_NAMES.items()}
+
+def event_payload(event: OptimizationEvent) -> Tuple[str, Dict[str, Any]]:
+    """
+    Olayı (ad, JSON'a yazılabilir veri) çiftine çevirir; plan ve sonuç gibi büyük alanlar çıkarılır.
+    """
+    if isinstance(event, Finished):
+        return "finished", {"kerf": event.result["kerf"], "used_stocks": event.result["used_stocks"]}
+    data = event._asdict()
+    data.pop("plan", None)
+    return EVENT_NAMES[type(event)], data
+
+# "kerf": yalnızca kerf aranır; "wide": kerf, paketleme motoru ve yerleştirme sırası birlikte aranır
+SEARCH_SPACES = ("kerf", "wide")
+# Kalıcı çalışmada geçmişin en iyi bu kadar farklı parametre seti ilk denemeler olarak sıraya alınır
+WARM_START_TRIALS = 3
+
+def _suggest(trial, search_space: str, k_min: int, k_max: int, multi_stock: bool) -> Dict[str, Any]:
+    params = {"kerf": trial.suggest_int("kerf", k_min, k_max)}
+    if search_space == "wide":
+        if not multi_stock:
+            params["engine"] = trial.suggest_categorical("engine", list(ENGINES))
+        params["order"] = trial.suggest_categorical("order", list(SORT_ORDERS))
+    return params
+
+def study_name(parts: List[Part], stock_length: int, k_min: int, k_max: int, search_space: str,
+               variant: Any = None) -> str:
+    """
+    Kalıcı optuna çalışmasının adı. Aynı profil ailesi (stok boyu, kerf aralığı, farklı parça
+    boyları) ve arama uzayı aynı çalışmayı paylaşır; adetler günden güne değişebilir.
+    """
+    lengths = sorted({round(p.length) for p in parts})
+    key = repr((stock_length, k_min, k_max, search_space, variant, lengths)).encode()
+    return f"kesim-{search_space}-{hashlib.blake2b(key, digest_size=8).hexdigest()}"
+
+def _open_study(storage_path: Optional[str], name: str, parallel: bool) -> Tuple[Any, int, List[Tuple[Dict, Dict]]]:
+    # (çalışma, geçmiş tamamlanmış deneme sayısı, ısınma denemeleri [(parametreler, dağılımlar)])
+    import optuna
+    # Toplu ask() ile paralel denemelerde sonucu beklenen denemeler TPE'de tekrar önerilmez
+    sampler = optuna.samplers.TPESampler(constant_liar=True) if parallel else None
+    if storage_path is None:
+        return optuna.create_study(direction="minimize", sampler=sampler), 0, []
+    storage = optuna.storages.RDBStorage(
+        f"sqlite:///{os.path.abspath(storage_path)}",
+        # Aynı dosyayı kullanan diğer süreçlerin yazmasını bekler
+        engine_kwargs={"connect_args": {"timeout": 60}},
+    )
+    study = optuna.create_study(study_name=name, storage=storage, direction="minimize", sampler=sampler,
+                                load_if_exists=True)
+    past = study.get_trials(deepcopy=False, states=(optuna.trial.TrialState.COMPLETE,))
+    # enqueue_trial kullanılmaz: aynı çalışmayı kullanan eşzamanlı süreçler bekleyen denemeyi
+    # birlikte alabiliyor. Isınma parametreleri yerelde değerlendirilip add_trial ile yazılır.
+    warm_start = []
+    for trial in sorted(past, key=lambda t: t.value):
+        if all(trial.params != params for params, _distributions in warm_start):
+            warm_start.append((trial.params, trial.distributions))
+            if len(warm_start) == WARM_START_TRIALS:
+                break
+    return study, len(past), warm_start
+
+def _ask(study, warm_start: List[Tuple[Dict, Dict]]) -> Tuple[Any, Optional[Tuple[Dict, Dict]]]:
+    # Önce ısınma parametreleri (deneme nesnesi yok), sonra örnekleyicinin önerileri
+    if warm_start:
+        return None, warm_start.pop(0)
+    return study.ask(), None
+
+def _tell(study, trial, warm: Optional[Tuple[Dict, Dict]], value: Optional[float]) -> None:
+    # value None: deneme yarıda kaldı; kalıcı çalışmada "çalışıyor" kalmasın diye hatalı işaretlenir
+    import optuna
+    if warm is not None:
+        if value is not None:
+            params, distributions = warm
+            study.add_trial(optuna.trial.create_trial(params=params, distributions=distributions, value=value))
+    elif value is None:
+        study.tell(trial, state=optuna.trial.TrialState.FAIL)
+    else:
+        study.tell(trial, value)
+
+def _reduce_parts(parts: List[Part]) -> List[Part]:
+    # Tüm alanları aynı olan satırlar tek tipte toplanır; ilk görülme sırası korunur
+    merged: Dict[Part, int] = {}
+    for part in parts:
+        key = part._replace(quantity=0)
+        merged[key] = merged.get(key, 0) + part.quantity
+    return [key._replace(quantity=quantity) for key, quantity in merged.items()]
+
+def iter_optimize(parts_data: List[Dict[str, Any]], stock_length: int, kerf: int,
+                  trials: int = 20, algorithm: str = "first_fit",
+                  kerf_min: Optional[int] = None,
+                  kerf_max: Optional[int] = None,
+                  profile: bool = False,
+                  trace_path: Optional[str] = None,
+                  stock_catalog: Optional[List[Dict[str, Any]]] = None,
+                  remnants=None,
+                  n_jobs: int = 1,
+                  sequence: bool = True,
+                  search_space: str = "kerf",
+                  study_storage: Optional[str] = None,
+                  pattern_storage: Optional[str] = None,
+                  profile_memory: bool = False,
+                  memory_budget_mb: Optional[float] = None,
+                  single_process: bool = False) -> Iterator[OptimizationEvent]:
+    """
+    optimize_parts'ın adım adım çalışan hali. Started, ReductionDone, her deneme için
+    TrialFinished, iyileşmede NewIncumbent ve en sonda sonucu taşıyan Finished olayı üretir.
+    Üreteç kapatılırsa (close() ya da döngüden çıkış) optimizasyon o noktada durur.
+    """
+    # stock_catalog: [{"length", "cost", "count"}] (count None = sınırsız);
+    # remnants: RemnantInventory, artıklar yeni stoktan önce kullanılır.
+    # İkisi de verilmezse tek boy (stock_length), sınırsız stok varsayılır.
+    # algorithm: ENGINES içindeki bir motor, "portfolio" (motorlar paralel yarışır) ya da
+    # "auto" (motor ve deneme sayısı örneğe göre seçilir, trials yok sayılır).
+    # n_jobs > 1: denemeler bu kadar süreçte paralel değerlendirilir (tek stok boyunda).
+    # sequence: paketlemeden sonra kesim sırası ve makine süresi hesaplanır (sequencing.py).
+    # search_space: SEARCH_SPACES içinden; "wide" kerf'e ek olarak motor ve yerleştirme sırasını arar.
+    # study_storage: SQLite dosyası; optuna çalışması study_name ile burada saklanır, sonraki
+    # çalıştırmalar geçmiş denemelerden devam eder ve en iyi geçmiş parametreleri önce dener.
+    # pattern_storage: desen kütüphanesi (pattern_library.py); tek stok boyunda her paketleme
+    # kütüphanedeki desenlerle tohumlanmış haliyle de denenir, bulunan verimli stoklar kütüphaneye eklenir.
+    # n_jobs > 1'de işçi süreçler de aynı tohumlamayı uygular; deneme değeri ile kurulan son plan
+    # aynı kuralla hesaplanır (seeded_packings yalnızca ana süreçteki paketlemeleri sayar).
+    # trace_path verilirse profil açılır ve sonunda Chrome trace JSON'u yazılır.
+    # profile_memory: adım başına tracemalloc tepe belleği de ölçülür (profil açılır).
+    # memory_budget_mb: süreç belleği sınırı; tahmin sığmazsa kesim sıralaması ve paralel/portföy
+    # motorları kapatılır, yine sığmazsa ya da denemeler sırasında aşılırsa MemoryBudgetError.
+    # single_process: süreç sayısını kendisi sınırlayan çağıranlar (sunucu) için iç içe süreç havuzu
+    # açılmaz; n_jobs 1'e iner, portföy (otomatik seçilse de) first-fit ile çalışır.
+    profiler = Profiler(enabled=profile or profile_memory or trace_path is not None, memory=profile_memory)
+    guard = MemoryGuard(memory_budget_mb)
+
+    with profiler, profiler.span("optimize"):
+        with profiler.span("validate"):
+            wrapped_parts = _wrap_parts(parts_data)
+            _validate_parts(wrapped_parts)
+
+            k_min = kerf_min if kerf_min is not None else max(1, kerf - 1)
+            k_max = kerf_max if kerf_max is not None else kerf + 2
+            if k_min > k_max:
+                raise ValueError("kerf_min kerf_max'dan büyük olamaz")
+            if search_space not in SEARCH_SPACES:
+                raise ValueError(f"Bilinmeyen arama uzayı: {search_space}")
+
+        multi_stock = stock_catalog is not None or remnants is not None
+        study = None
+        study_info = None
+        portfolio = None
+        auto_selection = None
+        if algorithm == "auto":
+            if multi_stock:
+                auto_selection = {"algorithm": "first_fit", "trials": trials,
+                                  "reason": "Stok kataloğu/artık planı: çoklu stok first-fit kullanıldı."}
+            else:
+                # Motor ve deneme bütçesi örnek özelliklerine göre kıyaslama tablosundan seçilir
+                from engine_selection import select_engine
+                with profiler.span("engine_selection"):
+                    auto_selection = select_engine(wrapped_parts, stock_length, k_min)
+            algorithm = auto_selection["algorithm"]
+            trials = auto_selection["trials"]
+
+        if single_process:
+            n_jobs = 1
+            if algorithm == "portfolio":
+                algorithm = "first_fit"
+                if auto_selection is not None:
+                    auto_selection = dict(auto_selection, algorithm=algorithm)
+
+        memory_info = None
+        if memory_budget_mb is not None:
+            with profiler.span("memory_budget"):
+                memory_info = _fit_memory_budget(guard, sum(p.quantity for p in wrapped_parts), sequence, n_jobs,
+                                                 algorithm, pattern_storage is not None)
+            sequence, n_jobs, algorithm = memory_info["sequence"], memory_info["n_jobs"], memory_info["algorithm"]
+            if not memory_info["patterns"]:
+                pattern_storage = None
+
+        library = None
+        pattern_info = None
+        if pattern_storage is not None:
+            from pattern_library import PatternLibrary
+            library = PatternLibrary(pattern_storage)
+            pattern_info = {"storage": pattern_storage, "seeded_packings": 0, "learned": 0}
+
+        yield Started(part_types=len(wrapped_parts), trials=trials, algorithm=algorithm)
+
+        with profiler.span("reduce"):
+            reduced_parts = _reduce_parts(wrapped_parts)
+            lb = lower_bound(reduced_parts, stock_length, k_min)
+        yield ReductionDone(part_types=len(reduced_parts), pieces=sum(p.quantity for p in reduced_parts),
+                            lower_bound=lb)
+
+        if algorithm == "portfolio" and not multi_stock:
+            # Motorlar ayrı süreçlerde yarışır; çoklu stok boyu/artık planlarında portföy kullanılmaz
+            from portfolio import iter_portfolio
+            race = iter_portfolio(reduced_parts, stock_length, k_min, k_max, trials)
+            best_bars = None
+            while True:
+                with profiler.span("portfolio"):
+                    try:
+                        kind, data = next(race)
+                    except StopIteration as stop:
+                        portfolio = stop.value
+                        break
+                if kind == "engine":
+                    yield TrialFinished(number=data["number"], kerf=data["kerf"], bars=data["bars"],
+                                        value=data["bars"], engine=data["engine"])
+                elif best_bars is None or data < best_bars:
+                    best_bars = data
+                    yield NewIncumbent(number=None, kerf=None, bars=data, value=data)
+            best_kerf = portfolio.pop("kerf")
+            best_plan = portfolio.pop("plan")
+            bar_stocks = None
+            profiler.count("trials_evaluated", sum(r["evaluations"] for r in portfolio["engines"].values()))
+        else:
+            # optuna ağır bir modül; uygulama açılışını yavaşlatmamak için ilk optimizasyonda yüklenir
+            with profiler.span("import_optuna"):
+                import optuna
+
+            if multi_stock:
+                catalog = _normalize_catalog(stock_catalog, stock_length)
+                remnant_pool = remnants.snapshot() if remnants is not None else []
+                variant = ("multi_stock", tuple(entry["length"] for entry in catalog))
+
+                def pack(params: Dict[str, Any]):
+                    return _multi_stock_first_fit(reduced_parts, catalog, params["kerf"], remnant_pool, profiler,
+                                                  SORT_ORDERS[params.get("order", "length_desc")])
+            else:
+                # Bilinmeyen algoritma adları (ör. "genetic") first-fit ile çalışır
+                default_engine = ENGINES.get(algorithm, _simple_first_fit)
+                variant = algorithm if search_space == "kerf" else None
+
+                def pack(params: Dict[str, Any]):
+                    engine = ENGINES.get(params.get("engine"), default_engine)
+                    sort_key = SORT_ORDERS[params.get("order", "length_desc")]
+                    plan = engine(reduced_parts, stock_length, params["kerf"], profiler, sort_key=sort_key)
+                    if library is not None:
+                        # Tohumlanmış plan yalnızca daha az stok kullanıyorsa seçilir
+                        with profiler.span("pattern_seed"):
+                            seeded = library.pack_seeded(engine, reduced_parts, stock_length, params["kerf"],
+                                                         sort_key=sort_key)
+                        if seeded is not None and len(seeded) < len(plan):
+                            plan = seeded
+                            pattern_info["seeded_packings"] += 1
+                    return plan, None
+
+            parallel = n_jobs > 1 and not multi_stock
+            with profiler.span("create_study"):
+                name = study_name(reduced_parts, stock_length, k_min, k_max, search_space, variant)
+                study, past_trials, warm_start = _open_study(study_storage, name, parallel)
+            if study_storage is not None:
+                study_info = {"name": name, "storage": study_storage, "past_trials": past_trials,
+                              "warm_start": len(warm_start)}
+
+            # Denemeler ask/tell ile tek tek yürütülür; her denemeden sonra olay üretilir
+            best_value = None
+            best_plan = bar_stocks = None
+            best_params = {"kerf": k_min}
+            if parallel:
+                # n_jobs deneme birlikte istenir ve paylaşılan bellekteki parça dizileriyle
+                # süreç havuzunda değerlendirilir; plan yalnızca en iyi parametreler için burada kurulur
+                from parallel_trials import ParallelEvaluator
+                with profiler.span("parallel_setup"):
+                    evaluator = ParallelEvaluator(reduced_parts, stock_length, algorithm, n_jobs,
+                                                  pattern_storage if library is not None else None)
+                with closing(evaluator):
+                    number = 0
+                    while number < trials:
+                        with profiler.span("trial_batch"):
+                            batch = [_ask(study, warm_start) for _ in range(min(n_jobs, trials - number))]
+                            try:
+                                batch_params = [warm[0] if warm else _suggest(trial, search_space, k_min, k_max, False)
+                                                for trial, warm in batch]
+                                values = evaluator.map(batch_params)
+                                guard.check("trial_batch")
+                            except BaseException:
+                                for trial, warm in batch:
+                                    _tell(study, trial, warm, None)
+                                raise
+                            for (trial, warm), value in zip(batch, values):
+                                _tell(study, trial, warm, value)
+                        for params, value in zip(batch_params, values):
+                            yield TrialFinished(number=number, kerf=params["kerf"], bars=value, value=value,
+                                                engine=params.get("engine"))
+                            if best_value is None or value < best_value:
+                                best_value, best_params = value, params
+                                yield NewIncumbent(number=number, kerf=params["kerf"], bars=value, value=value)
+                            number += 1
+                    profiler.count("trials_evaluated", evaluator.evaluations)
+            else:
+                for number in range(trials):
+                    with profiler.span("trial"):
+                        trial, warm = _ask(study, warm_start)
+                        try:
+                            params = warm[0] if warm else _suggest(trial, search_space, k_min, k_max, multi_stock)
+                            plan, plan_stocks = pack(params)
+                            guard.check("trial")
+                        except BaseException:
+                            _tell(study, trial, warm, None)
+                            raise
+                        # Çoklu stokta amaç toplam stok maliyetidir (artıklar bedava)
+                        value = sum(b["cost"] for b in plan_stocks) if plan_stocks is not None else len(plan)
+                        _tell(study, trial, warm, value)
+                        profiler.count("trials_evaluated")
+                    yield TrialFinished(number=number, kerf=params["kerf"], bars=len(plan), value=value,
+                                        engine=params.get("engine"))
+                    if best_value is None or value < best_value:
+                        best_value, best_params, best_plan, bar_stocks = value, params, plan, plan_stocks
+                        yield NewIncumbent(number=number, kerf=params["kerf"], bars=len(plan), value=value,
+                                           plan=plan)
+
+            if best_plan is None:
+                with profiler.span("final_plan"):
+                    best_plan, bar_stocks = pack(best_params)
+            best_kerf = best_params["kerf"]
+
+        if library is not None:
+            with profiler.span("pattern_learn"):
+                if bar_stocks is None:
+                    pattern_info["learned"] = library.learn(best_plan, stock_length, best_kerf)
+                else:
+                    # Çoklu stokta yalnızca katalogdan gelen stoklar kendi boylarıyla öğrenilir
+                    by_length: Dict[float, List[List[Part]]] = {}
+                    for stock_parts, bar in zip(best_plan, bar_stocks):
+                        if bar["source"] == "stock":
+                            by_length.setdefault(bar["length"], []).append(stock_parts)
+                    pattern_info["learned"] = sum(library.learn(bars, length, best_kerf)
+                                                  for length, bars in by_length.items())
+                pattern_info["library_size"] = len(library)
+            library.close()
+
+        sequence_report = None
+        if sequence:
+            # Stoklar ve parçalar testere ayar değişimleri azalacak şekilde sıralanır, cut_order atanır
+            from sequencing import sequence_plan
+            guard.check("sequence", force=True)
+            with profiler.span("sequence"):
+                best_plan, bar_stocks, sequence_report = sequence_plan(best_plan, bar_stocks)
+
+        guard.check("fire", force=True)
+        with profiler.span("fire"):
+            stock_lengths = [b["length"] for b in bar_stocks] if bar_stocks is not None else None
+            fire_eff = calculate_fire_and_efficiency(best_plan, stock_length, best_kerf, stock_lengths)
+
+    result = {
+        "kerf": best_kerf,
+        "plan": best_plan,
+        "used_stocks": len(best_plan),
+        "optuna_study": study,
+        "fire_efficiency": fire_eff,
+        "parts_list": parts_data,
+        "lower_bound": lb,
+    }
+    if bar_stocks is not None:
+        result["bar_stocks"] = bar_stocks
+        result["stock_cost"] = sum(b["cost"] for b in bar_stocks)
+        result["remnants_used"] = [b["remnant_id"] for b in bar_stocks if b["source"] == "remnant"]
+        if remnants is not None:
+            result["new_remnants"] = collect_new_remnants(best_plan, bar_stocks, best_kerf, remnants.min_length)
+    if portfolio is not None:
+        result["portfolio"] = portfolio
+    if search_space != "kerf" and portfolio is None:
+        result["search_params"] = best_params
+    if study_info is not None:
+        result["study"] = study_info
+    if pattern_info is not None:
+        result["patterns"] = pattern_info
+    if auto_selection is not None:
+        result["auto_selection"] = auto_selection
+    if sequence_report is not None:
+        result["sequence"] = sequence_report
+    if memory_info is not None:
+        result["memory"] = dict(memory_info, peak_mb=guard.peak_mb)
+    if profiler.enabled:
+        result["profile"] = profiler.summary()
+        if trace_path is not None:
+            profiler.dump_chrome_trace(trace_path)
+    yield Finished(result)
+
+def optimize_parts(parts_data: List[Dict[str, Any]], stock_length: int, kerf: int,
+                   trials: int = 20, algorithm: str = "first_fit",
+                   kerf_min: Optional[int] = None,
+                   kerf_max: Optional[int] = None,
+                   profile: bool = False,
+                   trace_path: Optional[str] = None,
+                   progress: Optional[Callable[[str, Dict[str, Any]], None]] = None,
+                   stock_catalog: Optional[List[Dict[str, Any]]] = None,
+                   remnants=None,
+                   n_jobs: int = 1,
+                   sequence: bool = True,
+                   search_space: str = "kerf",
+                   study_storage: Optional[str] = None,
+                   pattern_storage: Optional[str] = None,
+                   profile_memory: bool = False,
+                   memory_budget_mb: Optional[float] = None,
+                   single_process: bool = False) -> Dict[str, Any]:
+    # iter_optimize olaylarını sonuna kadar tüketir.
+    # progress(olay, veri): "started", "trial" ve "finished" olaylarında çağrılır;
+    # OptimizationCancelled fırlatırsa optimizasyon durur
+    events = iter_optimize(parts_data, stock_length, kerf, trials=trials, algorithm=algorithm,
+                           kerf_min=kerf_min, kerf_max=kerf_max, profile=profile, trace_path=trace_path,
+                           stock_catalog=stock_catalog, remnants=remnants, n_jobs=n_jobs,
+                           sequence=sequence, search_space=search_space, study_storage=study_storage,
+                           pattern_storage=pattern_storage, profile_memory=profile_memory,
+                           memory_budget_mb=memory_budget_mb, single_process=single_process)
+    with closing(events):
+        for event in events:
+            if progress is not None and isinstance(event, (Started, TrialFinished, Finished)):
+                progress(*event_payload(event))
+    return event.result
+
+PLAN_COLORS = ["#ff9999", "#66b3ff", "#99ff99", "#ffcc99", "#c2f0c2", "#ffb3e6"]
+PLAN_BAR_HEIGHT = 7
+PLAN_BAR_GAP = 12
+
+
+def draw_plan_bars(ax, plan, bar_lengths: List[float], stock_length: float, kerf: float,
+                   first_bar: int = 0, fontsize: float = 8, compact_labels: bool = False) -> None:
+    """
+    plan içindeki stokları ax üzerine çizer; stok i'nin alt kenarı i * (yükseklik + boşluk).
+    first_bar, bar_lengths içindeki ilk stokun indeksidir (parça parça çizimde).
+    """
+    import matplotlib.patches as patches
+    separator = " " if compact_labels else "\n"
+    for offset, stock_parts in enumerate(plan):
+        stock_idx = first_bar + offset
+        current_x = 0
+        y_bottom = stock_idx * (PLAN_BAR_HEIGHT + PLAN_BAR_GAP)
+        sorted_parts = sorted(stock_parts, key=lambda p: p.cut_order if p.cut_order is not None else 0)
+        for part_idx, part in enumerate(sorted_parts):
+            part_length = part.length
+            color = PLAN_COLORS[part_idx % len(PLAN_COLORS)]
+            rect = patches.Rectangle(
+                (current_x, y_bottom), part_length, PLAN_BAR_HEIGHT,
+                edgecolor="black", facecolor=color
+            )
+            ax.add_patch(rect)
+            label = f"{part.name}{separator}{part_length:.1f} mm"
+            if part.cut_type and part.cut_type.lower() != "düz kesim":
+                label += f"{separator}{part.cut_type}"
+            ax.text(current_x + part_length / 2, y_bottom + PLAN_BAR_HEIGHT / 2, label,
+                    ha="center", va="center", fontsize=fontsize)
+            current_x += part_length + kerf
+
+        bar_length = bar_lengths[stock_idx] if stock_idx < len(bar_lengths) else stock_length
+        ax.plot([0, bar_length], [y_bottom - 1, y_bottom - 1], "k--", linewidth=0.5)
+
+
+def draw_cutting_plan(ax, canvas, optimization_result, stock_length: int = None, kerf: int = None):
+    ax.clear()
+
+    used_stocks = optimization_result.get("used_stocks", 0)
+    kerf_val = kerf or optimization_result.get("kerf", 0)
+
+    title = f"Kesim Planı (Kullanılan Stok Sayısı: {used_stocks}, Kerf: {kerf_val} mm)"
+    ax.set_title(title)
+    ax.set_xlabel("Uzunluk (mm)")
+    ax.set_ylabel("Stok Parça No")
+
+    stock_length_val = stock_length or 6000
+    plan = optimization_result.get("plan", [])
+    # Stok kataloğu/artık kullanıldıysa her çubuğun kendi boyu vardır
+    bar_lengths = [b["length"] for b in optimization_result.get("bar_stocks") or []]
+
+    draw_plan_bars(ax, plan, bar_lengths, stock_length_val, kerf_val)
+
+    ax.set_xlim(0, max(bar_lengths + [stock_length_val]) + 150)
+    ax.set_ylim(-15, len(plan) * (PLAN_BAR_HEIGHT + PLAN_BAR_GAP))
+    ax.grid(True)
+    try:
+        canvas.draw()
+    except Exception:
+        pass
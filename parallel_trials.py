@@ -0,0 +1,114 @@
+import os
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from typing import Any, Dict, List, Optional
+
+from optimization import ENGINES, SORT_ORDERS, Part, _simple_first_fit
+
+# İşçi süreçte paylaşılan bellekten bir kez kurulan parça listesi ve paketleme ayarları
+_worker_state = {}
+
+
+def _attach(name: str) -> shared_memory.SharedMemory:
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        # Python < 3.13: bağlanan süreç bloğu kaynak izleyicisine kaydeder; blok ana sürecin
+        # olduğu için bağlanırken kayıt yapılmaz (aksi halde çıkışta silinir ya da uyarı verilir)
+        from multiprocessing import resource_tracker
+        register = resource_tracker.register
+        resource_tracker.register = lambda name, rtype: None
+        try:
+            return shared_memory.SharedMemory(name=name)
+        finally:
+            resource_tracker.register = register
+
+
+def _init_worker(lengths_name: str, quantities_name: str, count: int, stock_length: float, algorithm: str,
+                 pattern_storage: Optional[str] = None) -> None:
+    lengths_shm = _attach(lengths_name)
+    quantities_shm = _attach(quantities_name)
+    lengths = lengths_shm.buf[:count * 8].cast("d")
+    quantities = quantities_shm.buf[:count * 8].cast("q")
+    # Ad yerine sıra numarası: aynı boy ve adetli tipler ayrı kalır (desen tohumlaması tipleri
+    # ana süreçteki indirgenmiş listeyle aynı sırada tüketir)
+    _worker_state["parts"] = [Part(length=lengths[i], quantity=quantities[i], name=str(i)) for i in range(count)]
+    lengths.release()
+    quantities.release()
+    _worker_state["shm"] = (lengths_shm, quantities_shm)
+    _worker_state["stock_length"] = stock_length
+    _worker_state["pack"] = ENGINES.get(algorithm, _simple_first_fit)
+    if pattern_storage is not None:
+        from pattern_library import PatternLibrary
+        _worker_state["library"] = PatternLibrary(pattern_storage)
+
+
+def _evaluate(kerf: int, engine: Optional[str] = None, order: Optional[str] = None) -> int:
+    # Süreçler arasında yalnızca deneme parametreleri gider, stok sayısı döner
+    pack = ENGINES.get(engine, _worker_state["pack"])
+    parts = _worker_state["parts"]
+    stock_length = _worker_state["stock_length"]
+    sort_key = SORT_ORDERS[order or "length_desc"]
+    bars = len(pack(parts, stock_length, kerf, sort_key=sort_key))
+    library = _worker_state.get("library")
+    if library is not None:
+        # Ana süreçteki pack() ile aynı kural: tohumlanmış plan daha az stok kullanıyorsa sayılır
+        seeded = library.pack_seeded(pack, parts, stock_length, kerf, sort_key=sort_key)
+        if seeded is not None and len(seeded) < bars:
+            bars = len(seeded)
+    return bars
+
+
+class ParallelEvaluator:
+    """
+    Denemeleri süreç havuzunda değerlendirir. Parça boyları ve adetleri bir kez
+    multiprocessing.shared_memory bloklarına yazılır; işçiler bunlara bağlanır,
+    görev başına parça listesi gönderilmez. pattern_storage verilirse işçiler her paketlemeyi
+    desen kütüphanesiyle tohumlanmış haliyle de dener (optimize_parts'ın seri yoluyla aynı).
+    """
+
+    def __init__(self, parts: List[Part], stock_length: float, algorithm: str = "first_fit",
+                 n_jobs: Optional[int] = None, pattern_storage: Optional[str] = None):
+        self.n_jobs = n_jobs or os.cpu_count() or 1
+        count = len(parts)
+        lengths = array("d", (p.length for p in parts))
+        quantities = array("q", (p.quantity for p in parts))
+        # Boş bloğa izin verilmediğinden en az 8 bayt ayrılır
+        self._lengths = shared_memory.SharedMemory(create=True, size=max(8, count * 8))
+        self._quantities = shared_memory.SharedMemory(create=True, size=max(8, count * 8))
+        try:
+            self._lengths.buf[:count * 8] = lengths.tobytes()
+            self._quantities.buf[:count * 8] = quantities.tobytes()
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.n_jobs, initializer=_init_worker,
+                initargs=(self._lengths.name, self._quantities.name, count, stock_length, algorithm, pattern_storage),
+            )
+        except BaseException:
+            self._release()
+            raise
+        self._cache = {}
+
+    def map(self, params: List[Dict[str, Any]]) -> List[int]:
+        # Paketleme parametrelere göre belirlenimci; aynı parametreler bir kez değerlendirilir
+        keys = [(p["kerf"], p.get("engine"), p.get("order")) for p in params]
+        futures = {k: self._pool.submit(_evaluate, *k) for k in set(keys) if k not in self._cache}
+        for key, future in futures.items():
+            self._cache[key] = future.result()
+        return [self._cache[k] for k in keys]
+
+    @property
+    def evaluations(self) -> int:
+        return len(self._cache)
+
+    def _release(self) -> None:
+        for shm in (self._lengths, self._quantities):
+            shm.close()
+            shm.unlink()
+
+    def close(self) -> None:
+        if self._pool is None:
+            return
+        self._pool.shutdown(wait=True, cancel_futures=True)
+        self._pool = None
+        self._release()
@@ -0,0 +1,153 @@
+import json
+import sqlite3
+import time
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+
+from constants import PATTERN_DB_FILE, PATTERN_MIN_EFFICIENCY, PATTERN_LIMIT
+from optimization import Part
+
+# Desen: stok içindeki parça boylarının çoklu kümesi, ((boy, adet), ...) uzundan kısaya
+Pattern = Tuple[Tuple[float, int], ...]
+
+
+def _length_key(length: float) -> float:
+    # Aynı katalog boyu farklı kaynaklardan 1999.9999 / 2000.0 gibi gelebilir
+    return round(float(length), 3)
+
+
+def pattern_of(stock_parts: List[Part]) -> Pattern:
+    counts = Counter(_length_key(p.length) for p in stock_parts)
+    return tuple(sorted(counts.items(), key=lambda item: -item[0]))
+
+
+class PatternLibrary:
+    """
+    Önceki çözümlerde bulunan yüksek verimli kesim desenlerinin kalıcı kütüphanesi.
+    Desenler (stok boyu, kerf) anahtarıyla ve içerdikleri boy çoklu kümesiyle SQLite'ta
+    tutulur; seed() güncel talebi bu desenlerle karşılayıp kalan parçaları motora bırakır.
+    """
+
+    def __init__(self, db_path: str = PATTERN_DB_FILE, min_efficiency: float = PATTERN_MIN_EFFICIENCY,
+                 limit: int = PATTERN_LIMIT):
+        self.db_path = db_path
+        self.min_efficiency = min_efficiency
+        self.limit = limit
+        # Aynı dosyayı paylaşan süreçler (sunucu, klasör izleme) yazarken beklenir
+        self._conn = sqlite3.connect(db_path, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS patterns (
+                id INTEGER PRIMARY KEY,
+                stock_length REAL NOT NULL,
+                kerf REAL NOT NULL,
+                lengths TEXT NOT NULL,
+                efficiency REAL NOT NULL,
+                uses INTEGER NOT NULL DEFAULT 1,
+                last_used REAL NOT NULL,
+                UNIQUE (stock_length, kerf, lengths)
+            );
+            CREATE INDEX IF NOT EXISTS idx_patterns_key_efficiency
+                ON patterns (stock_length, kerf, efficiency DESC, uses DESC);
+        """)
+        # (stok boyu, kerf) -> verime göre sıralı desenler; ilk sorguda yüklenir
+        self._cache: Dict[Tuple[float, float], List[Tuple[Pattern, float]]] = {}
+
+    def patterns(self, stock_length: float, kerf: float) -> List[Tuple[Pattern, float]]:
+        key = (float(stock_length), float(kerf))
+        if key not in self._cache:
+            self._cache[key] = [
+                (tuple((length, count) for length, count in json.loads(lengths)), efficiency)
+                for lengths, efficiency in self._conn.execute(
+                    "SELECT lengths, efficiency FROM patterns WHERE stock_length = ? AND kerf = ? "
+                    "ORDER BY efficiency DESC, uses DESC", key)
+            ]
+        return self._cache[key]
+
+    def learn(self, plan: List[List[Part]], stock_length: float, kerf: float) -> int:
+        """
+        Plandaki verimi min_efficiency üzerindeki stokları kütüphaneye ekler (var olanın
+        kullanım sayısını artırır); eklenen ya da güncellenen desen sayısını döner.
+        """
+        found: Counter = Counter()
+        for stock_parts in plan:
+            length_sum = sum(p.length for p in stock_parts)
+            if length_sum / stock_length * 100 >= self.min_efficiency:
+                found[pattern_of(stock_parts)] += 1
+        if not found:
+            return 0
+        now = time.time()
+        key = (float(stock_length), float(kerf))
+        with self._conn:
+            self._conn.executemany(
+                "INSERT INTO patterns (stock_length, kerf, lengths, efficiency, uses, last_used) "
+                "VALUES (?, ?, ?, ?, ?, ?) ON CONFLICT (stock_length, kerf, lengths) "
+                "DO UPDATE SET uses = uses + excluded.uses, last_used = excluded.last_used",
+                [(*key, json.dumps(pattern), sum(length * count for length, count in pattern) / stock_length * 100,
+                  uses, now) for pattern, uses in found.items()],
+            )
+            # Sınır aşılırsa en az kullanılan, eşitlikte en eski desenler silinir
+            self._conn.execute(
+                "DELETE FROM patterns WHERE id IN (SELECT id FROM patterns WHERE stock_length = ? AND kerf = ? "
+                "ORDER BY uses DESC, last_used DESC LIMIT -1 OFFSET ?)", (*key, self.limit))
+        self._cache.pop(key, None)
+        return len(found)
+
+    def seed(self, parts: List[Part], stock_length: float,
+             kerf: float) -> Tuple[List[List[Part]], List[Part]]:
+        """
+        Talebi kütüphanedeki desenlerle verim sırasına göre açgözlü karşılar: her desen,
+        kalan adetlerin izin verdiği kadar tekrarlanır. (desen stokları, kalan parçalar) döner;
+        kalanlar motorla paketlenmelidir. Bu kerf ile stoğa sığmayan desenler atlanır.
+        """
+        patterns = self.patterns(stock_length, kerf)
+        if not patterns:
+            return [], parts
+        # Aynı boydaki parça tipleri (farklı ad/sipariş) sırayla tüketilir
+        by_length: Dict[float, List[Part]] = {}
+        remaining: Dict[Part, int] = {}
+        for part in parts:
+            by_length.setdefault(_length_key(part.length), []).append(part)
+            remaining[part] = remaining.get(part, 0) + part.quantity
+        demand = {length: sum(remaining[p] for p in types) for length, types in by_length.items()}
+
+        bars: List[List[Part]] = []
+        for pattern, _efficiency in patterns:
+            if any(demand.get(length, 0) < count for length, count in pattern):
+                continue
+            if sum((length + kerf) * count for length, count in pattern) > stock_length:
+                continue
+            repeat = min(demand[length] // count for length, count in pattern)
+            for _ in range(repeat):
+                bar = []
+                for length, count in pattern:
+                    demand[length] -= count
+                    for _ in range(count):
+                        part = next(p for p in by_length[length] if remaining[p] > 0)
+                        remaining[part] -= 1
+                        bar.append(part)
+                bars.append(bar)
+        rest = [part._replace(quantity=remaining[part]) for part in dict.fromkeys(parts) if remaining[part] > 0]
+        return bars, rest
+
+    def pack_seeded(self, pack, parts: List[Part], stock_length: float, kerf: float,
+                    **kwargs) -> Optional[List[List[Part]]]:
+        """
+        Desen stokları + kalan parçaların pack(parts, stock_length, kerf, **kwargs) ile
+        paketlenmesi. Hiç desen uygulanamazsa None döner.
+        """
+        bars, rest = self.seed(parts, stock_length, kerf)
+        if not bars:
+            return None
+        if rest:
+            # Kalan tiplerin adedi azaldığından plandaki parçalar asıl tiplere geri çevrilir
+            original = {part._replace(quantity=0): part for part in parts}
+            packed = pack(rest, stock_length, kerf, **kwargs)
+            bars.extend([original[p._replace(quantity=0)] for p in stock_parts] for stock_parts in packed)
+        return bars
+
+    def __len__(self) -> int:
+        return self._conn.execute("SELECT COUNT(*) FROM patterns").fetchone()[0]
+
+    def close(self) -> None:
+        self._conn.close()
@@ -0,0 +1,154 @@
+import hashlib
+import io
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+from optimization import PLAN_BAR_GAP, PLAN_BAR_HEIGHT, draw_plan_bars
+
+# Karo başına stok sayısı ve 100 dpi'da bir stok satırının yüksekliği (piksel)
+TILE_BARS = 20
+BAR_ROW_PX = 34
+TILE_CACHE_SIZE = 128
+# Karo biçimleri: raster (png) ya da vektör (svg, pdf)
+TILE_FORMATS = ("png", "svg", "pdf")
+THUMBNAIL_SIZE = (320, 240)
+THUMBNAIL_BARS = 12
+
+
+class Viewport(NamedTuple):
+    """
+    Karonun kapsadığı stoklar ve 100 dpi'daki genişliği; dpi arttıkça piksel boyutu ölçeklenir.
+    """
+    first_bar: int
+    bar_count: int
+    width_px: int
+
+
+def plan_hash(optimization_result: Dict[str, Any], stock_length: float, kerf: Optional[float] = None) -> str:
+    """
+    Çizimi etkileyen her şeyin özeti: stok boyları, kerf ve stok içindeki parçalar (ad, boy, tip, sıra).
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    kerf_val = kerf or optimization_result.get("kerf", 0)
+    bar_lengths = [b["length"] for b in optimization_result.get("bar_stocks") or []]
+    digest.update(repr((stock_length, kerf_val, bar_lengths)).encode())
+    for stock_parts in optimization_result.get("plan", []):
+        digest.update(repr([(p.name, p.length, p.cut_type, p.cut_order) for p in stock_parts]).encode())
+        digest.update(b"|")
+    return digest.hexdigest()
+
+
+class PlanRenderer:
+    """
+    Kesim planını matplotlib Agg ile ekran dışında karolar halinde çizer. Karolar
+    (plan özeti, görünüm, dpi, biçim) anahtarıyla LRU önbellekte tutulur; Tk tuvali,
+    PDF raporu ve proje küçük resmi aynı önbellekten beslenir.
+    """
+
+    def __init__(self, max_tiles: int = TILE_CACHE_SIZE):
+        self.max_tiles = max_tiles
+        self.hits = 0
+        self.misses = 0
+        self._tiles: "OrderedDict[Tuple, bytes]" = OrderedDict()
+        self._lock = threading.Lock()
+        # Son planın özeti: aynı sonuç sözlüğü için plan tekrar taranmaz
+        self._last_hash: Optional[Tuple[Any, float, Optional[float], str]] = None
+
+    def plan_hash(self, optimization_result: Dict[str, Any], stock_length: float,
+                  kerf: Optional[float] = None) -> str:
+        last = self._last_hash
+        if last is not None and last[0] is optimization_result and last[1:3] == (stock_length, kerf):
+            return last[3]
+        key = plan_hash(optimization_result, stock_length, kerf)
+        self._last_hash = (optimization_result, stock_length, kerf, key)
+        return key
+
+    @staticmethod
+    def tile_height_px(bar_count: int = TILE_BARS, dpi: int = 100) -> int:
+        return round(bar_count * BAR_ROW_PX * dpi / 100)
+
+    @staticmethod
+    def tile_viewports(bar_total: int, width_px: int, tile_bars: int = TILE_BARS) -> List[Viewport]:
+        return [Viewport(first, min(tile_bars, bar_total - first), width_px)
+                for first in range(0, bar_total, tile_bars)]
+
+    def render(self, optimization_result: Dict[str, Any], viewport: Viewport, stock_length: float,
+               kerf: Optional[float] = None, dpi: int = 100, fmt: str = "png") -> bytes:
+        if fmt not in TILE_FORMATS:
+            raise ValueError(f"Desteklenmeyen karo biçimi: {fmt}")
+        key = (self.plan_hash(optimization_result, stock_length, kerf), viewport, dpi, fmt)
+        with self._lock:
+            tile = self._tiles.get(key)
+            if tile is not None:
+                self._tiles.move_to_end(key)
+                self.hits += 1
+                return tile
+            self.misses += 1
+        tile = self._draw(optimization_result, viewport, stock_length, kerf, dpi, fmt)
+        with self._lock:
+            self._tiles[key] = tile
+            self._tiles.move_to_end(key)
+            while len(self._tiles) > self.max_tiles:
+                self._tiles.popitem(last=False)
+        return tile
+
+    def render_tiles(self, optimization_result: Dict[str, Any], width_px: int, stock_length: float,
+                     kerf: Optional[float] = None, dpi: int = 100, fmt: str = "png"):
+        """
+        Tüm planı sırayla karo karo üretir (PDF raporu için).
+        """
+        bar_total = len(optimization_result.get("plan", []))
+        for viewport in self.tile_viewports(bar_total, width_px):
+            yield viewport, self.render(optimization_result, viewport, stock_length, kerf, dpi, fmt)
+
+    def thumbnail(self, optimization_result: Dict[str, Any], stock_length: float,
+                  kerf: Optional[float] = None) -> bytes:
+        """
+        Proje küçük resmi: planın ilk stokları, küçük PNG.
+        """
+        width, height = THUMBNAIL_SIZE
+        bar_count = min(THUMBNAIL_BARS, len(optimization_result.get("plan", [])))
+        dpi = max(10, round(100 * height / self.tile_height_px(max(bar_count, 1))))
+        return self.render(optimization_result, Viewport(0, bar_count, round(width * 100 / dpi)),
+                           stock_length, kerf, dpi=dpi)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._tiles.clear()
+
+    def _draw(self, optimization_result: Dict[str, Any], viewport: Viewport, stock_length: float,
+              kerf: Optional[float], dpi: int, fmt: str) -> bytes:
+        # pyplot kullanılmaz: her karo kendi Figure/Agg tuvaliyle çizilir, iş parçacıklarından da çağrılabilir
+        from matplotlib.figure import Figure
+        from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+        plan = optimization_result.get("plan", [])
+        kerf_val = kerf or optimization_result.get("kerf", 0)
+        bar_lengths = [b["length"] for b in optimization_result.get("bar_stocks") or []]
+        first, count = viewport.first_bar, viewport.bar_count
+        bars = [plan[i] for i in range(first, min(first + count, len(plan)))]
+
+        fig = Figure(figsize=(viewport.width_px / 100, self.tile_height_px(max(count, 1)) / 100), dpi=dpi)
+        FigureCanvasAgg(fig)
+        ax = fig.add_axes([0.07, 0, 0.92, 1])
+        row = PLAN_BAR_HEIGHT + PLAN_BAR_GAP
+        draw_plan_bars(ax, bars, bar_lengths, stock_length, kerf_val, first_bar=first,
+                       fontsize=6, compact_labels=True)
+        ax.set_xlim(0, max(bar_lengths + [stock_length]) + 150)
+        # Karolar alt alta dizildiğinde ilk stok en üstte olur
+        ax.set_ylim((first + count) * row - PLAN_BAR_GAP / 2, first * row - PLAN_BAR_GAP / 2)
+        ax.set_yticks([(first + i) * row + PLAN_BAR_HEIGHT / 2 for i in range(count)])
+        ax.set_yticklabels([str(first + i + 1) for i in range(count)], fontsize=6)
+        ax.tick_params(axis="x", labelbottom=False, bottom=False)
+        for spine in ax.spines.values():
+            spine.set_visible(False)
+        ax.grid(True, axis="x", linewidth=0.3)
+
+        buffer = io.BytesIO()
+        fig.savefig(buffer, format=fmt, dpi=dpi)
+        return buffer.getvalue()
+
+
+# Arayüz, rapor ve proje kaydı aynı önbelleği paylaşır
+default_renderer = PlanRenderer()
@@ -0,0 +1,248 @@
+import multiprocessing
+import os
+import random
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from typing import Any, Callable, Dict, Generator, List, Optional, Tuple
+
+from optimization import ENGINES, Part, lower_bound
+
+# Yarışan motorlar, ucuzdan pahalıya; çekirdek sayısı azsa bu sırayla başlarlar
+PORTFOLIO_ENGINES = ("first_fit", "best_fit", "optuna", "random_restart")
+
+# İşçi süreçlerde paylaşılan durum (havuz başlatılırken atanır):
+# _incumbent: şimdiye kadarki en iyi stok sayısı (0 = henüz yok), _stop: alt sınıra ulaşıldı
+_incumbent = None
+_stop = None
+
+
+def _init_worker(incumbent, stop) -> None:
+    global _incumbent, _stop
+    _incumbent = incumbent
+    _stop = stop
+
+
+class _EngineRun:
+    """
+    Bir motorun işçi süreçteki durumu; bulduğu planları paylaşılan en iyi değere bildirir.
+    Planın kendisi değil, yalnızca en iyisini yeniden üreten tarif (build_plan) tutulur:
+    kazanmayan motorların planları süreçler arasında taşınmaz.
+    """
+
+    def __init__(self, name: str, lb: int):
+        self.name = name
+        self.lb = lb
+        self.bars: Optional[int] = None
+        self.kerf: Optional[int] = None
+        self.recipe: Optional[Dict[str, Any]] = None
+        self.evaluations = 0
+        self.pruned = 0
+
+    def stopped(self) -> bool:
+        return _stop.is_set()
+
+    def bar_limit(self) -> Optional[int]:
+        # Mevcut en iyiden daha iyi olamayacak paketlemeler yarıda kesilir
+        best = _incumbent.value
+        return best - 1 if best > 0 else None
+
+    def offer(self, plan: Optional[List[List[Part]]], recipe: Dict[str, Any]) -> Optional[int]:
+        self.evaluations += 1
+        if plan is None:
+            self.pruned += 1
+            return None
+        bars = len(plan)
+        if self.bars is None or bars < self.bars:
+            self.bars, self.kerf, self.recipe = bars, recipe["kerf"], recipe
+        with _incumbent.get_lock():
+            if _incumbent.value == 0 or bars < _incumbent.value:
+                _incumbent.value = bars
+        if bars <= self.lb:
+            _stop.set()
+        return bars
+
+
+def _sweep(run: _EngineRun, parts: List[Part], stock_length: int, k_min: int, k_max: int,
+           trials: int, seed: int) -> None:
+    pack = ENGINES[run.name]
+    for kerf in range(k_min, k_max + 1):
+        if run.stopped():
+            break
+        run.offer(pack(parts, stock_length, kerf, bar_limit=run.bar_limit()), {"pack": run.name, "kerf": kerf})
+
+
+def _optuna_search(run: _EngineRun, parts: List[Part], stock_length: int, k_min: int, k_max: int,
+                   trials: int, seed: int) -> None:
+    import optuna
+
+    def objective(trial: "optuna.Trial") -> float:
+        kerf = trial.suggest_int("kerf", k_min, k_max)
+        bars = run.offer(ENGINES["first_fit"](parts, stock_length, kerf, bar_limit=run.bar_limit()),
+                         {"pack": "first_fit", "kerf": kerf})
+        if bars is None:
+            raise optuna.TrialPruned()
+        return bars
+
+    def check_stop(study, frozen_trial) -> None:
+        if run.stopped():
+            study.stop()
+
+    study = optuna.create_study(direction="minimize", sampler=optuna.samplers.TPESampler(seed=seed))
+    study.optimize(objective, n_trials=trials, callbacks=[check_stop])
+
+
+def _random_restart(run: _EngineRun, parts: List[Part], stock_length: int, k_min: int, k_max: int,
+                    trials: int, seed: int) -> None:
+    # Rastgele sıralı FFD/BFD: parça tipleri uzunluklarının %85-100'ü arasında sarsılmış
+    # anahtarla sıralanır, kerf aralığı sırayla denenir
+    rng = random.Random(seed)
+    kerfs = list(range(k_min, k_max + 1))
+    for attempt in range(max(1, trials)):
+        if run.stopped():
+            break
+        recipe = {"pack": "first_fit" if attempt % 2 == 0 else "best_fit",
+                  "kerf": kerfs[attempt % len(kerfs)], "rng_state": rng.getstate()}
+        run.offer(_jittered_pack(parts, stock_length, recipe, rng, run.bar_limit()), recipe)
+
+
+def _jittered_pack(parts: List[Part], stock_length: int, recipe: Dict[str, Any], rng: random.Random,
+                   bar_limit: Optional[int] = None) -> Optional[List[List[Part]]]:
+    jitter = {id(p): rng.uniform(0.85, 1.0) for p in parts}
+    return ENGINES[recipe["pack"]](parts, stock_length, recipe["kerf"], bar_limit=bar_limit,
+                                   sort_key=lambda p: -p.length * jitter[id(p)])
+
+
+def build_plan(parts: List[Part], stock_length: int, recipe: Dict[str, Any]) -> List[List[Part]]:
+    """
+    Motor raporundaki tariften ("pack", "kerf", rastgele sırada "rng_state") planı yeniden üretir.
+    Paketleme deterministiktir; bar_limit yalnızca yarıda keser, yerleşimi değiştirmez.
+    """
+    if recipe.get("rng_state") is None:
+        return ENGINES[recipe["pack"]](parts, stock_length, recipe["kerf"])
+    rng = random.Random()
+    rng.setstate(recipe["rng_state"])
+    return _jittered_pack(parts, stock_length, recipe, rng)
+
+
+def engine_summary(report: Dict[str, Any]) -> Dict[str, Any]:
+    return {k: v for k, v in report.items() if k != "recipe"}
+
+
+_ENGINE_RUNNERS: Dict[str, Callable[..., None]] = {
+    "first_fit": _sweep,
+    "best_fit": _sweep,
+    "optuna": _optuna_search,
+    "random_restart": _random_restart,
+}
+
+
+def _run_engine(name: str, parts: List[Part], stock_length: int, k_min: int, k_max: int,
+                trials: int, lb: int, seed: int) -> Dict[str, Any]:
+    run = _EngineRun(name, lb)
+    start = time.perf_counter()
+    if run.stopped():
+        status = "skipped"
+    else:
+        _ENGINE_RUNNERS[name](run, parts, stock_length, k_min, k_max, trials, seed)
+        if run.bars is not None and run.bars <= lb:
+            status = "lower_bound"
+        elif run.stopped():
+            status = "stopped"
+        elif run.bars is None:
+            status = "pruned"
+        else:
+            status = "finished"
+    return {
+        "engine": name,
+        "status": status,
+        "bars": run.bars,
+        "kerf": run.kerf,
+        "recipe": run.recipe,
+        "time_s": time.perf_counter() - start,
+        "evaluations": run.evaluations,
+        "pruned": run.pruned,
+    }
+
+
+def iter_portfolio(parts: List[Part], stock_length: int, k_min: int, k_max: int, trials: int = 20,
+                   engines: Optional[List[str]] = None, max_workers: Optional[int] = None,
+                   seed: int = 0) -> Generator[Tuple[str, Any], None, Dict[str, Any]]:
+    """
+    Motorları süreç havuzunda yarıştırır. En iyi stok sayısı süreçler arasında paylaşılır;
+    yavaş motorlar bunu aşamayacak paketlemeleri yarıda keser. Bir motor alt sınıra
+    ulaşınca diğerleri durur.
+    Üretilen olaylar: ("engine", motor raporu) ve ("incumbent", en iyi stok sayısı).
+    Dönüş değeri (StopIteration.value) kazanan plan ve motor bazında süre/değerlendirme raporudur.
+    Üreteç kapatılırsa çalışan motorlar bir sonraki değerlendirmede durur.
+    """
+    engines = list(engines or PORTFOLIO_ENGINES)
+    for name in engines:
+        if name not in _ENGINE_RUNNERS:
+            raise ValueError(f"Bilinmeyen motor: {name}")
+    lb = lower_bound(parts, stock_length, k_min)
+
+    ctx = multiprocessing.get_context()
+    incumbent = ctx.Value("i", 0)
+    stop = ctx.Event()
+    workers = max_workers or max(1, min(len(engines), os.cpu_count() or 1))
+    reports: Dict[str, Dict[str, Any]] = {}
+    start = time.perf_counter()
+
+    with ProcessPoolExecutor(max_workers=workers, mp_context=ctx,
+                             initializer=_init_worker, initargs=(incumbent, stop)) as pool:
+        futures = {
+            pool.submit(_run_engine, name, parts, stock_length, k_min, k_max, trials, lb, seed + i): name
+            for i, name in enumerate(engines)
+        }
+        pending = set(futures)
+        last_best = 0
+        try:
+            while pending:
+                done, pending = wait(pending, timeout=0.2, return_when=FIRST_COMPLETED)
+                if incumbent.value and incumbent.value != last_best:
+                    last_best = incumbent.value
+                    yield "incumbent", last_best
+                for future in done:
+                    name = futures[future]
+                    if future.cancelled():
+                        report = {"engine": name, "status": "skipped", "bars": None, "kerf": None,
+                                  "recipe": None, "time_s": 0.0, "evaluations": 0, "pruned": 0}
+                    else:
+                        report = future.result()
+                    reports[name] = report
+                    yield "engine", {"number": len(reports) - 1, **engine_summary(report)}
+                if stop.is_set():
+                    for future in pending:
+                        future.cancel()
+        except BaseException:
+            # Kapatma, iptal veya hata: çalışan motorlar bir sonraki değerlendirmede durur
+            stop.set()
+            for future in pending:
+                future.cancel()
+            raise
+
+    finished = [r for r in reports.values() if r["bars"] is not None]
+    if not finished:
+        raise ValueError("Portföydeki hiçbir motor plan üretemedi.")
+    winner = min(finished, key=lambda r: (r["bars"], r["time_s"]))
+    # Süreçlerden yalnızca tarifler döner; kazanan plan burada bir kez yeniden paketlenir
+    plan = build_plan(parts, stock_length, winner["recipe"])
+    return {
+        "winner": winner["engine"],
+        "bars": winner["bars"],
+        "kerf": winner["kerf"],
+        "plan": plan,
+        "lower_bound": lb,
+        "wall_s": time.perf_counter() - start,
+        "engines": {name: engine_summary(report) for name, report in reports.items()},
+    }
+
+
+def run_portfolio(parts: List[Part], stock_length: int, k_min: int, k_max: int, trials: int = 20,
+                  **options) -> Dict[str, Any]:
+    race = iter_portfolio(parts, stock_length, k_min, k_max, trials, **options)
+    while True:
+        try:
+            next(race)
+        except StopIteration as stop:
+            return stop.value
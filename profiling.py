@@ -0,0 +1,268 @@
+import json
+import os
+import threading
+import time
+import tracemalloc
+from typing import Any, Dict, List, Optional
+
+from constants import MEMORY_BUDGET_ENV_VAR
+
+MB = 1024 * 1024
+
+
+class MemoryBudgetError(MemoryError):
+    """
+    Çözümün bellek bütçesini aşacağı (tahminle) ya da aştığı (canlı ölçümle) anlaşıldığında
+    takasa düşmeden önce yükseltilir. estimate_mb ön tahmindir; aşım canlı ölçümdeyse None.
+    """
+
+    def __init__(self, message: str, budget_mb: float, used_mb: Optional[float] = None,
+                 estimate_mb: Optional[float] = None, phase: Optional[str] = None):
+        super().__init__(message)
+        self.budget_mb = budget_mb
+        self.used_mb = used_mb
+        self.estimate_mb = estimate_mb
+        self.phase = phase
+
+
+def memory_usage() -> Optional[int]:
+    """
+    Sürecin şu anki yerleşik belleği (bayt). Linux'ta /proc, diğer sistemlerde psutil
+    (kuruluysa) kullanılır; ölçülemiyorsa None döner.
+    """
+    try:
+        with open("/proc/self/statm", "rb") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError, IndexError):
+        pass
+    try:
+        import psutil
+    except ImportError:
+        return None
+    return psutil.Process().memory_info().rss
+
+
+def memory_budget_from_env() -> Optional[float]:
+    # KESIM_MEMORY_BUDGET_MB boşsa ya da sayı değilse bütçe yok sayılır
+    try:
+        return float(os.environ[MEMORY_BUDGET_ENV_VAR]) or None
+    except (KeyError, ValueError):
+        return None
+
+
+class MemoryGuard:
+    """
+    Bellek bütçesi bekçisi: check() süreç belleği budget_mb'yi aşmışsa MemoryBudgetError
+    yükseltir. Ölçümün maliyeti için en fazla interval_s aralıkla okunur.
+    """
+
+    def __init__(self, budget_mb: Optional[float], interval_s: float = 0.05):
+        self.budget_mb = budget_mb
+        self.interval_s = interval_s
+        self.peak_mb: Optional[float] = None
+        self._last_check = 0.0
+
+    def available_mb(self) -> Optional[float]:
+        used = memory_usage()
+        if self.budget_mb is None or used is None:
+            return None
+        return self.budget_mb - used / MB
+
+    def check(self, phase: str, force: bool = False) -> None:
+        if self.budget_mb is None:
+            return
+        now = time.perf_counter()
+        if not force and now - self._last_check < self.interval_s:
+            return
+        self._last_check = now
+        used = memory_usage()
+        if used is None:
+            return
+        used_mb = used / MB
+        if self.peak_mb is None or used_mb > self.peak_mb:
+            self.peak_mb = used_mb
+        if used_mb > self.budget_mb:
+            raise MemoryBudgetError(
+                f"Bellek bütçesi aşıldı: {phase} adımında {used_mb:.0f} MB kullanılıyor "
+                f"(bütçe {self.budget_mb:.0f} MB). Akışlı planı (--stream) deneyin ya da bütçeyi artırın.",
+                self.budget_mb, used_mb=used_mb, phase=phase)
+
+
+class _NullSpan:
+    # Kapalı profiler için tek paylaşılan, hiçbir şey yapmayan span
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    __slots__ = ("profiler", "name", "start", "peak", "base")
+
+    def __init__(self, profiler: "Profiler", name: str):
+        self.profiler = profiler
+        self.name = name
+        self.start = 0.0
+        self.peak = 0
+        self.base = 0
+
+    def __enter__(self):
+        profiler = self.profiler
+        profiler._depth += 1
+        if profiler._tracing:
+            # tracemalloc tek bir tepe değeri tutar: sıfırlamadan önce açık span'lere aktarılır
+            self.base, peak = tracemalloc.get_traced_memory()
+            for span in profiler._open_spans:
+                if peak > span.peak:
+                    span.peak = peak
+            tracemalloc.reset_peak()
+            profiler._open_spans.append(self)
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        end = time.perf_counter()
+        profiler = self.profiler
+        profiler._depth -= 1
+        profiler.events.append((self.name, self.start, end - self.start, profiler._depth))
+        if profiler._tracing:
+            peak = max(self.peak, tracemalloc.get_traced_memory()[1])
+            profiler._open_spans.pop()
+            for span in profiler._open_spans:
+                if peak > span.peak:
+                    span.peak = peak
+            # Adımın tepe değeri, adım başındaki izlenen belleğin üzerindeki artıştır
+            growth = peak - self.base
+            if growth > profiler.memory_peaks.get(self.name, -1):
+                profiler.memory_peaks[self.name] = growth
+        return False
+
+
+class Profiler:
+    """
+    Optimizasyon adımları için iç içe zaman ölçümleri ve sayaçlar tutar.
+    Kapalıyken span() ortak bir boş nesne döndürür, count() hiçbir şey yapmaz.
+    memory=True ise her adımın tracemalloc tepe bellek artışı da tutulur (Python ayırmaları
+    yavaşladığından yalnızca istenince açılır); with bloğu ya da stop() izlemeyi kapatır.
+    """
+
+    def __init__(self, enabled: bool = True, memory: bool = False):
+        self.enabled = enabled
+        self.events: List[tuple] = []
+        self.counters: Dict[str, int] = {}
+        self.memory_peaks: Dict[str, int] = {}
+        self._depth = 0
+        self._origin = time.perf_counter()
+        self._open_spans: List[_Span] = []
+        # Başka biri (ör. python -X tracemalloc) zaten izliyorsa izleme ona bırakılır
+        self._owns_tracing = enabled and memory and not tracemalloc.is_tracing()
+        if self._owns_tracing:
+            tracemalloc.start()
+        self._tracing = enabled and memory
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+        return False
+
+    def stop(self) -> None:
+        if self._owns_tracing:
+            tracemalloc.stop()
+            self._owns_tracing = False
+        self._tracing = False
+
+    def span(self, name: str):
+        if not self.enabled:
+            return _NULL_SPAN
+        return _Span(self, name)
+
+    def record(self, name: str, start: float, end: float, depth: int = 0) -> None:
+        # with bloğuna sığmayan aralıklar için (ör. açılıştan ilk çizime kadar geçen süre)
+        if self.enabled:
+            self.events.append((name, start, end - start, depth))
+
+    def count(self, name: str, value: int = 1) -> None:
+        if self.enabled:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def summary(self) -> Dict[str, Any]:
+        phases: Dict[str, Dict[str, Any]] = {}
+        total = 0.0
+        for name, _start, duration, depth in self.events:
+            entry = phases.setdefault(name, {"calls": 0, "total_s": 0.0, "depth": depth})
+            entry["calls"] += 1
+            entry["total_s"] += duration
+            if depth == 0:
+                total += duration
+        summary = {
+            "total_s": total,
+            "phases": phases,
+            "counters": dict(self.counters),
+        }
+        if self.memory_peaks:
+            for name, peak in self.memory_peaks.items():
+                phases[name]["peak_mb"] = peak / MB
+            summary["peak_mb"] = max(self.memory_peaks.values()) / MB
+        return summary
+
+    def to_chrome_trace(self) -> Dict[str, Any]:
+        pid = os.getpid()
+        tid = threading.get_ident()
+        trace_events = []
+        for name, start, duration, _depth in self.events:
+            trace_events.append({
+                "name": name,
+                "ph": "X",
+                "ts": (start - self._origin) * 1e6,
+                "dur": duration * 1e6,
+                "pid": pid,
+                "tid": tid,
+            })
+        end_ts = max((e["ts"] + e["dur"] for e in trace_events), default=0.0)
+        for name, value in self.counters.items():
+            trace_events.append({
+                "name": name,
+                "ph": "C",
+                "ts": end_ts,
+                "pid": pid,
+                "args": {name: value},
+            })
+        return {"traceEvents": trace_events, "displayTimeUnit": "ms"}
+
+    def dump_chrome_trace(self, file_path: str) -> None:
+        with open(file_path, "w", encoding="utf-8") as f:
+            json.dump(self.to_chrome_trace(), f)
+
+
+def format_summary(summary: Optional[Dict[str, Any]], max_phases: int = 4) -> str:
+    """
+    Durum çubuğu için kısa özet: toplam süre ve en uzun süren adımlar.
+    """
+    if not summary:
+        return ""
+    phases = summary.get("phases", {})
+    top = sorted(
+        ((name, info["total_s"]) for name, info in phases.items() if info.get("depth", 0) > 0),
+        key=lambda item: item[1], reverse=True,
+    )[:max_phases]
+    def memory(name: str) -> str:
+        peak = phases[name].get("peak_mb")
+        return "" if peak is None else f" / {peak:.1f} MB"
+
+    text = f"{summary.get('total_s', 0.0):.2f} s"
+    if summary.get("peak_mb") is not None:
+        text += f", tepe bellek {summary['peak_mb']:.1f} MB"
+    if top:
+        text += " (" + ", ".join(f"{name} {seconds:.2f} s{memory(name)}" for name, seconds in top) + ")"
+    counters = summary.get("counters", {})
+    if counters:
+        text += " | " + ", ".join(f"{name}={value}" for name, value in counters.items())
+    return text
@@ -0,0 +1,559 @@
+import json
+import mmap
+import os
+import struct
+import sys
+import zipfile
+from array import array
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from optimization import Part
+
+# .kesim proje dosyası: sürümlü bir zip kabı.
+#   manifest.json             biçim sürümü, stok/kerf ve bölüm boyutları
+#   parts/length.i64|f64      parça uzunlukları (sütun, sıkıştırılmış; hepsi tam sayıysa i64)
+#   parts/quantity.i64        parça adetleri (sütun, sıkıştırılmış)
+#   parts/columns.json        diğer alanlar (name, cut_type, ...) sütun olarak
+#   parts/absent.json         alanı hiç olmayan parçaların indeksleri (None değerden ayırmak için)
+#   plan/types.json           plandaki farklı parça tiplerinin sayısı ve sütun biçimleri
+#   plan/type_<alan>.*        tip tablosu sütunları: length/quantity ikili dizi; metin alanları tek
+#                             blob (.txt) + karakter ofsetleri (.off.u64) + None maskesi (.null.u8)
+#   plan/bar_offsets.u64      her stoğun piece_type içindeki başlangıcı
+#   plan/piece_type.u32       her kesilen parçanın tip indeksi
+#   plan/piece_cut_order.i32  parça kesim sırası (-1 = yok)
+#   plan/stock_fire.f64, plan/stock_efficiency.f64
+#   result.json               kerf, istatistikler ve diğer skaler sonuç alanları
+#   thumbnail.png             planın küçük resmi (isteğe bağlı)
+#   metadata.json             uygulama durumu (isteğe bağlı; ör. otomatik kayıt ayarları)
+# plan/ altındaki ikili dosyalar sıkıştırılmadan yazılır; okurken mmap ile doğrudan eşlenir.
+PROJECT_FORMAT = "kesim-project"
+PROJECT_FORMAT_VERSION = 2
+
+# Sonuç sözlüğünde dosyaya yazılmayan ya da ayrı bölümde tutulan alanlar
+_RESULT_SKIP_KEYS = {"plan", "parts_list", "optuna_study", "fire_efficiency"}
+
+
+def is_project_container(file_path: str) -> bool:
+    return zipfile.is_zipfile(file_path)
+
+
+def _array_bytes(typecode: str, values) -> bytes:
+    return array(typecode, values).tobytes()
+
+
+def _number_column(values: List[Any]) -> Tuple[str, bytes]:
+    # Tam sayılar i64 olarak saklanır ki okurken float'a dönmesinler; tam sayı ve
+    # ondalık karışıksa türleri JSON korur
+    kinds = {type(v) for v in values}
+    if kinds <= {int}:
+        return "i64", _array_bytes("q", values)
+    if kinds == {int, float}:
+        return "json", json.dumps(values).encode()
+    return "f64", _array_bytes("d", [float(v) for v in values])
+
+
+def _text_column(values: List[Any]) -> Optional[Tuple[str, array, Optional[array]]]:
+    # (blob, karakter ofsetleri, None maskesi); metin/None dışı bir değer varsa None
+    offsets = array("Q", [0])
+    nulls = array("B")
+    pieces = []
+    pos = 0
+    for value in values:
+        if value is None:
+            nulls.append(1)
+        elif type(value) is str:
+            nulls.append(0)
+            pieces.append(value)
+            pos += len(value)
+        else:
+            return None
+        offsets.append(pos)
+    return "".join(pieces), offsets, nulls if any(nulls) else None
+
+
+def _write_type_columns(zf: zipfile.ZipFile, types: List[Part]) -> Dict[str, str]:
+    kinds: Dict[str, str] = {}
+    for field_idx, field in enumerate(Part._fields):
+        if field == "cut_order":
+            continue  # kesim sırası parçaya özgüdür, tip tablosunda yok
+        values = [part_type[field_idx] for part_type in types]
+        base = f"plan/type_{field}"
+        if field in ("length", "quantity"):
+            kind, data = _number_column(values)
+            zf.writestr(f"{base}.{kind}", data,
+                        compress_type=zipfile.ZIP_DEFLATED if kind == "json" else zipfile.ZIP_STORED)
+        elif all(value is None for value in values):
+            continue
+        else:
+            text = _text_column(values)
+            if text is None:
+                kind = "json"
+                zf.writestr(f"{base}.json", json.dumps(values, ensure_ascii=False),
+                            compress_type=zipfile.ZIP_DEFLATED)
+            else:
+                kind = "text"
+                blob, offsets, nulls = text
+                zf.writestr(f"{base}.txt", blob.encode("utf-8", "surrogatepass"),
+                            compress_type=zipfile.ZIP_DEFLATED)
+                zf.writestr(f"{base}.off.u64", offsets.tobytes(), compress_type=zipfile.ZIP_STORED)
+                if nulls is not None:
+                    zf.writestr(f"{base}.null.u8", nulls.tobytes(), compress_type=zipfile.ZIP_STORED)
+        kinds[field] = kind
+    return kinds
+
+
+def write_project(file_path: str, parts_data: List[Any], stock_length: int, kerf: int,
+                  result: Optional[Dict[str, Any]] = None, thumbnail: Optional[bytes] = None,
+                  metadata: Optional[Dict[str, Any]] = None) -> None:
+    """
+    Projeyi önce file_path + ".tmp" dosyasına yazar, sonra yerine taşır; yazma yarıda kalırsa
+    mevcut dosya bozulmaz.
+    """
+    temp = file_path + ".tmp"
+    try:
+        _write_container(temp, parts_data, stock_length, kerf, result, thumbnail, metadata)
+        with open(temp, "rb+") as f:
+            os.fsync(f.fileno())
+        os.replace(temp, file_path)
+    except BaseException:
+        if os.path.exists(temp):
+            os.remove(temp)
+        raise
+
+
+def _write_container(file_path: str, parts_data: List[Any], stock_length: int, kerf: int,
+                     result: Optional[Dict[str, Any]], thumbnail: Optional[bytes],
+                     metadata: Optional[Dict[str, Any]]) -> None:
+    lengths: List[Any] = []
+    quantities = array("q")
+    columns: Dict[str, List[Any]] = {}
+    absent: Dict[str, List[int]] = {}
+    for idx, part in enumerate(parts_data):
+        lengths.append(part["length"])
+        quantities.append(int(part["quantity"]))
+        for key, value in part.items():
+            if key in ("length", "quantity"):
+                continue
+            column = columns.get(key)
+            if column is None:
+                column = columns[key] = [None] * idx
+                if idx:
+                    absent[key] = list(range(idx))
+            column.append(value)
+        for key, column in columns.items():
+            if len(column) <= idx:
+                column.append(None)
+                absent.setdefault(key, []).append(idx)
+
+    plan = result.get("plan") if result else None
+    manifest = {
+        "format": PROJECT_FORMAT,
+        "version": PROJECT_FORMAT_VERSION,
+        "byteorder": sys.byteorder,
+        "stock_length": stock_length,
+        "kerf": kerf,
+        "part_count": len(parts_data),
+        "has_plan": plan is not None,
+    }
+
+    deflated = zipfile.ZIP_DEFLATED
+    stored = zipfile.ZIP_STORED
+    with zipfile.ZipFile(file_path, "w", compression=deflated) as zf:
+        length_kind, length_bytes = _number_column(lengths)
+        zf.writestr(f"parts/length.{length_kind}", length_bytes, compress_type=deflated)
+        zf.writestr("parts/quantity.i64", quantities.tobytes(), compress_type=deflated)
+        zf.writestr("parts/columns.json", json.dumps(columns, ensure_ascii=False), compress_type=deflated)
+        if absent:
+            zf.writestr("parts/absent.json", json.dumps(absent), compress_type=deflated)
+
+        if plan is not None:
+            type_index: Dict[Part, int] = {}
+            types: List[Part] = []
+            offsets = array("Q", [0])
+            piece_type = array("I")
+            piece_cut_order = array("i")
+            for stock_parts in plan:
+                for piece in stock_parts:
+                    base = piece._replace(cut_order=None)
+                    idx = type_index.get(base)
+                    if idx is None:
+                        idx = type_index[base] = len(types)
+                        types.append(base)
+                    piece_type.append(idx)
+                    piece_cut_order.append(-1 if piece.cut_order is None else piece.cut_order)
+                offsets.append(len(piece_type))
+
+            fire_eff = result.get("fire_efficiency", {})
+            type_columns = _write_type_columns(zf, types)
+            zf.writestr("plan/types.json", json.dumps({"count": len(types), "columns": type_columns}),
+                        compress_type=deflated)
+            zf.writestr("plan/bar_offsets.u64", offsets.tobytes(), compress_type=stored)
+            zf.writestr("plan/piece_type.u32", piece_type.tobytes(), compress_type=stored)
+            zf.writestr("plan/piece_cut_order.i32", piece_cut_order.tobytes(), compress_type=stored)
+            zf.writestr("plan/stock_fire.f64", _array_bytes("d", fire_eff.get("stock_fire", [])),
+                        compress_type=stored)
+            zf.writestr("plan/stock_efficiency.f64", _array_bytes("d", fire_eff.get("stock_efficiency", [])),
+                        compress_type=stored)
+
+            result_meta = {k: v for k, v in result.items() if k not in _RESULT_SKIP_KEYS}
+            result_meta["fire_efficiency"] = {
+                k: v for k, v in fire_eff.items() if k not in ("stock_fire", "stock_efficiency")
+            }
+            manifest["bar_count"] = len(plan)
+            manifest["piece_count"] = len(piece_type)
+            zf.writestr("result.json", json.dumps(result_meta, ensure_ascii=False, default=str),
+                        compress_type=deflated)
+
+        if thumbnail is not None:
+            zf.writestr("thumbnail.png", thumbnail, compress_type=stored)
+            manifest["has_thumbnail"] = True
+        if metadata is not None:
+            zf.writestr("metadata.json", json.dumps(metadata, ensure_ascii=False, default=str),
+                        compress_type=deflated)
+
+        # manifest en son yazılır; yarım kalmış bir dosyada bulunmaz
+        zf.writestr("manifest.json", json.dumps(manifest, ensure_ascii=False), compress_type=deflated)
+
+
+class _TextColumn(Sequence):
+    """
+    Tek blob + karakter ofsetleri olarak saklanan metin sütunu; değerler istendiğinde kesilir.
+    """
+
+    def __init__(self, text: str, offsets, nulls=None):
+        self._text = text
+        self._offsets = offsets
+        self._nulls = nulls
+
+    def __len__(self) -> int:
+        return len(self._offsets) - 1
+
+    def __getitem__(self, idx):
+        if self._nulls is not None and self._nulls[idx]:
+            return None
+        return self._text[self._offsets[idx]:self._offsets[idx + 1]]
+
+
+class _PartTypes(Sequence):
+    """
+    Plan parça tipi tablosu; Part nesneleri yalnızca istenen tipler için, sütunlardan oluşturulur.
+    """
+
+    def __init__(self, count: int, columns: Dict[str, Sequence]):
+        self._count = count
+        self._columns = columns
+        self._cache: List[Optional[Part]] = [None] * count
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __getitem__(self, idx) -> Part:
+        part = self._cache[idx]
+        if part is None:
+            part = self._cache[idx] = Part(**{field: column[idx] for field, column in self._columns.items()})
+        return part
+
+    def rows(self) -> List[list]:
+        columns = [self._columns.get(field) for field in Part._fields]
+        values = [[None] * self._count if column is None else [column[i] for i in range(self._count)]
+                  for column in columns]
+        return [list(row) for row in zip(*values)]
+
+
+class PlanView(Sequence):
+    """
+    Plan bölümünü listeye çevirmeden okur; her stok istendiğinde sütunlardan oluşturulur.
+    """
+
+    def __init__(self, types: Sequence[Part], offsets, piece_type, piece_cut_order):
+        self._types = types
+        self._offsets = offsets
+        self._piece_type = piece_type
+        self._piece_cut_order = piece_cut_order
+
+    def __len__(self) -> int:
+        return len(self._offsets) - 1
+
+    def _bar(self, idx: int) -> List[Part]:
+        start, end = self._offsets[idx], self._offsets[idx + 1]
+        types = self._types
+        bar = []
+        for pos in range(start, end):
+            part = types[self._piece_type[pos]]
+            order = self._piece_cut_order[pos]
+            bar.append(part if order < 0 else part._replace(cut_order=order))
+        return bar
+
+    def __getitem__(self, idx):
+        if isinstance(idx, slice):
+            return [self._bar(i) for i in range(*idx.indices(len(self)))]
+        if idx < 0:
+            idx += len(self)
+        if not 0 <= idx < len(self):
+            raise IndexError(idx)
+        return self._bar(idx)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        result_to_dict plan biçimi; tip tablosu zaten tekil olduğundan Part oluşturmadan üretilir.
+        """
+        types = self._types
+        rows = types.rows() if isinstance(types, _PartTypes) else [list(part_type) for part_type in types]
+        offsets = self._offsets
+        bounds = [(offsets[b], offsets[b + 1]) for b in range(len(self))]
+        data = {"fields": list(Part._fields), "types": rows,
+                "bars": [self._piece_type[start:end].tolist() for start, end in bounds]}
+        if max(self._piece_cut_order, default=-1) >= 0:
+            data["cut_orders"] = [self._piece_cut_order[start:end].tolist() for start, end in bounds]
+        return data
+
+
+class ProjectFile:
+    """
+    .kesim dosyasını açar. Parçalar ve manifest hemen, plan bölümü yalnızca
+    load_result() çağrıldığında (varsayılan olarak mmap ile) okunur.
+    """
+
+    def __init__(self, file_path: str):
+        self.file_path = file_path
+        self._zip = zipfile.ZipFile(file_path, "r")
+        self._file = None
+        self._mmap = None
+        try:
+            self.manifest = json.loads(self._zip.read("manifest.json"))
+        except KeyError:
+            self.close()
+            raise ValueError("Geçersiz proje dosyası: manifest bulunamadı.")
+        if self.manifest.get("format") != PROJECT_FORMAT:
+            self.close()
+            raise ValueError("Geçersiz proje dosyası biçimi.")
+        if self.manifest.get("version", 0) > PROJECT_FORMAT_VERSION:
+            self.close()
+            raise ValueError(f"Desteklenmeyen proje sürümü: {self.manifest.get('version')}")
+        self._swap = self.manifest.get("byteorder", sys.byteorder) != sys.byteorder
+
+    @property
+    def stock_length(self) -> int:
+        return self.manifest.get("stock_length", 6000)
+
+    @property
+    def kerf(self) -> int:
+        return self.manifest.get("kerf", 3)
+
+    @property
+    def has_plan(self) -> bool:
+        return bool(self.manifest.get("has_plan"))
+
+    def load_metadata(self) -> Dict[str, Any]:
+        try:
+            return json.loads(self._zip.read("metadata.json"))
+        except KeyError:
+            return {}
+
+    def _read_array(self, name: str, typecode: str) -> array:
+        values = array(typecode)
+        values.frombytes(self._zip.read(name))
+        if self._swap:
+            values.byteswap()
+        return values
+
+    def _map_array(self, name: str, typecode: str):
+        info = self._zip.getinfo(name)
+        if info.compress_type != zipfile.ZIP_STORED or self._swap:
+            return self._read_array(name, typecode)
+        if self._mmap is None:
+            self._file = open(self.file_path, "rb")
+            self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        # Yerel dosya başlığı: 30 bayt sabit alan + dosya adı + ekstra alan
+        name_len, extra_len = struct.unpack_from("<HH", self._mmap, info.header_offset + 26)
+        start = info.header_offset + 30 + name_len + extra_len
+        if info.file_size == 0:
+            return array(typecode)
+        return memoryview(self._mmap)[start:start + info.file_size].cast(typecode)
+
+    def _has(self, name: str) -> bool:
+        return name in self._zip.NameToInfo
+
+    def _load_array(self, name: str, typecode: str, mapped: bool):
+        return self._map_array(name, typecode) if mapped else self._read_array(name, typecode)
+
+    def load_parts(self) -> List[Dict[str, Any]]:
+        if self._has("parts/length.i64"):
+            lengths = self._read_array("parts/length.i64", "q")
+        elif self._has("parts/length.json"):
+            lengths = json.loads(self._zip.read("parts/length.json"))
+        else:
+            lengths = self._read_array("parts/length.f64", "d")
+        quantities = self._read_array("parts/quantity.i64", "q")
+        columns = json.loads(self._zip.read("parts/columns.json"))
+        if self.manifest.get("version", 1) >= 2:
+            absent = json.loads(self._zip.read("parts/absent.json")) if self._has("parts/absent.json") else {}
+        else:
+            # Sürüm 1'de eksik alan ile None değer ayrılmıyordu; None'lar eksik sayılır
+            absent = {key: [i for i, value in enumerate(values) if value is None]
+                      for key, values in columns.items()}
+        # Alan sırası eski JSON biçimindeki gibi name, length, quantity olsun
+        names = columns.pop("name", None)
+        if names is not None:
+            parts = [{"name": name, "length": length, "quantity": quantity}
+                     for name, length, quantity in zip(names, lengths, quantities)]
+            for i in absent.get("name", ()):
+                del parts[i]["name"]
+        else:
+            parts = [{"length": length, "quantity": quantity} for length, quantity in zip(lengths, quantities)]
+        for key, values in columns.items():
+            missing = absent.get(key)
+            if not missing:
+                for part, value in zip(parts, values):
+                    part[key] = value
+                continue
+            missing = set(missing)
+            for i, (part, value) in enumerate(zip(parts, values)):
+                if i not in missing:
+                    part[key] = value
+        return parts
+
+    def _load_types(self, mapped: bool) -> Sequence[Part]:
+        type_info = json.loads(self._zip.read("plan/types.json"))
+        if "rows" in type_info:
+            # Sürüm 1: satır satır JSON tablo
+            fields = type_info["fields"]
+            return [Part(**{f: v for f, v in zip(fields, row) if f in Part._fields}) for row in type_info["rows"]]
+        columns: Dict[str, Sequence] = {}
+        for field, kind in type_info["columns"].items():
+            base = f"plan/type_{field}"
+            if kind == "i64":
+                columns[field] = self._load_array(base + ".i64", "q", mapped)
+            elif kind == "f64":
+                columns[field] = self._load_array(base + ".f64", "d", mapped)
+            elif kind == "json":
+                columns[field] = json.loads(self._zip.read(base + ".json"))
+            else:
+                text = self._zip.read(base + ".txt").decode("utf-8", "surrogatepass")
+                nulls = self._load_array(base + ".null.u8", "B", mapped) if self._has(base + ".null.u8") else None
+                columns[field] = _TextColumn(text, self._load_array(base + ".off.u64", "Q", mapped), nulls)
+        return _PartTypes(type_info["count"], columns)
+
+    def load_result(self, parts: Optional[List[Dict[str, Any]]] = None,
+                    lazy: bool = False, mapped: bool = True) -> Optional[Dict[str, Any]]:
+        """
+        lazy: plan, stoklar istendikçe oluşturan bir PlanView olarak döner.
+        mapped=False: plan dizileri mmap yerine belleğe okunur; dosya kapandıktan sonra
+        üzerine yazılabilir (görünüm uzun süre tutulacaksa).
+        """
+        if not self.has_plan:
+            return None
+        types = self._load_types(mapped)
+        offsets = self._load_array("plan/bar_offsets.u64", "Q", mapped)
+        piece_type = self._load_array("plan/piece_type.u32", "I", mapped)
+        piece_cut_order = self._load_array("plan/piece_cut_order.i32", "i", mapped)
+        view = PlanView(types, offsets, piece_type, piece_cut_order)
+        plan = view if lazy else list(view)
+
+        result = json.loads(self._zip.read("result.json"))
+        fire_eff = result.get("fire_efficiency", {})
+        fire_eff["stock_fire"] = list(self._read_array("plan/stock_fire.f64", "d"))
+        fire_eff["stock_efficiency"] = list(self._read_array("plan/stock_efficiency.f64", "d"))
+        result["fire_efficiency"] = fire_eff
+        result["plan"] = plan
+        result["parts_list"] = parts if parts is not None else self.load_parts()
+        return result
+
+    def close(self) -> None:
+        # mmap, üzerinde açık memoryview varken kapatılamaz; bu durumda GC'ye bırakılır
+        if self._mmap is not None:
+            try:
+                self._mmap.close()
+            except BufferError:
+                pass
+            self._mmap = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        self._zip.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+
+def read_project(file_path: str, with_result: bool = True):
+    """
+    Yeni (.kesim) ve eski (JSON) proje dosyalarını okur.
+    (parts, stock_length, kerf, result) döndürür; plan yoksa result None olur. Plan, stokları
+    istendikçe oluşturan bir PlanView'dır.
+    """
+    if not is_project_container(file_path):
+        with open(file_path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        return data.get("parts", []), data.get("stock_length", 6000), data.get("kerf", 3), None
+
+    with ProjectFile(file_path) as project:
+        parts = project.load_parts()
+        result = project.load_result(parts, lazy=True, mapped=False) if with_result else None
+        return parts, project.stock_length, project.kerf, result
+
+
+def read_thumbnail(file_path: str) -> Optional[bytes]:
+    """
+    Proje dosyasındaki plan küçük resmini (PNG) döndürür; yoksa None.
+    """
+    if not is_project_container(file_path):
+        return None
+    with zipfile.ZipFile(file_path) as zf:
+        try:
+            return zf.read("thumbnail.png")
+        except KeyError:
+            return None
+
+
+def result_to_dict(result: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Optimizasyon sonucunu JSON'a yazılabilir, kompakt bir sözlüğe çevirir
+    (sunucu yanıtları vb. için). Plan, parça tipi tablosu + indeks listeleri olarak tutulur.
+    """
+    plan = result.get("plan", [])
+    if isinstance(plan, PlanView):
+        data = {k: v for k, v in result.items() if k not in ("plan", "optuna_study")}
+        data["plan"] = plan.to_dict()
+        return data
+    type_index: Dict[Part, int] = {}
+    types: List[list] = []
+    bars: List[List[int]] = []
+    cut_orders: List[List[int]] = []
+    for stock_parts in plan:
+        bar = []
+        orders = []
+        for piece in stock_parts:
+            # Kesim sırası parçaya özgü olduğundan tip tablosuna girmez
+            base = piece._replace(cut_order=None)
+            idx = type_index.get(base)
+            if idx is None:
+                idx = type_index[base] = len(types)
+                types.append(list(base))
+            bar.append(idx)
+            orders.append(-1 if piece.cut_order is None else piece.cut_order)
+        bars.append(bar)
+        cut_orders.append(orders)
+    data = {k: v for k, v in result.items() if k not in ("plan", "optuna_study")}
+    data["plan"] = {"fields": list(Part._fields), "types": types, "bars": bars}
+    if any(order >= 0 for orders in cut_orders for order in orders):
+        data["plan"]["cut_orders"] = cut_orders
+    return data
+
+
+def result_from_dict(data: Dict[str, Any]) -> Dict[str, Any]:
+    result = dict(data)
+    plan_data = data.get("plan") or {"fields": list(Part._fields), "types": [], "bars": []}
+    fields = plan_data["fields"]
+    types = [Part(**{f: v for f, v in zip(fields, row) if f in Part._fields}) for row in plan_data["types"]]
+    cut_orders = plan_data.get("cut_orders")
+    if cut_orders is None:
+        result["plan"] = [[types[i] for i in bar] for bar in plan_data["bars"]]
+    else:
+        result["plan"] = [[types[i] if order < 0 else types[i]._replace(cut_order=order)
+                           for i, order in zip(bar, orders)]
+                          for bar, orders in zip(plan_data["bars"], cut_orders)]
+    return result
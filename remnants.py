@@ -0,0 +1,89 @@
+import sqlite3
+import time
+from bisect import bisect_left, insort
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from constants import REMNANT_DB_FILE, REMNANT_MIN_LENGTH
+
+
+class RemnantInventory:
+    """
+    Kalıcı artık (kullanılabilir kesim artığı) stoğu.
+    Kayıtlar SQLite'ta uzunluk indeksiyle tutulur; bellekte (uzunluk, id) çiftlerinden oluşan
+    sıralı bir liste, "en az X mm olan en kısa artık" sorgusunu ikili aramayla yanıtlar.
+    """
+
+    def __init__(self, db_path: str = REMNANT_DB_FILE, min_length: float = REMNANT_MIN_LENGTH,
+                 profile: Optional[str] = None):
+        self.db_path = db_path
+        self.min_length = min_length
+        # Farklı profiller (kesit) birbirinin artığını kullanamaz
+        self.profile = profile or ""
+        self._conn = sqlite3.connect(db_path)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS remnants (
+                id INTEGER PRIMARY KEY,
+                profile TEXT NOT NULL DEFAULT '',
+                length REAL NOT NULL,
+                created_at REAL NOT NULL,
+                source TEXT
+            );
+            CREATE INDEX IF NOT EXISTS idx_remnants_profile_length ON remnants (profile, length);
+        """)
+        self._index: List[Tuple[float, int]] = sorted(
+            (length, remnant_id) for remnant_id, length in self._conn.execute(
+                "SELECT id, length FROM remnants WHERE profile = ?", (self.profile,))
+        )
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def snapshot(self) -> List[Tuple[float, int]]:
+        return list(self._index)
+
+    def smallest_at_least(self, length: float) -> Optional[Tuple[float, int]]:
+        pos = bisect_left(self._index, (length, -1))
+        return self._index[pos] if pos < len(self._index) else None
+
+    def add(self, length: float, source: Optional[str] = None) -> Optional[int]:
+        if length < self.min_length:
+            return None
+        with self._conn:
+            cur = self._conn.execute(
+                "INSERT INTO remnants (profile, length, created_at, source) VALUES (?, ?, ?, ?)",
+                (self.profile, float(length), time.time(), source),
+            )
+        insort(self._index, (float(length), cur.lastrowid))
+        return cur.lastrowid
+
+    def take(self, remnant_id: int) -> Optional[float]:
+        row = self._conn.execute("SELECT length FROM remnants WHERE id = ?", (remnant_id,)).fetchone()
+        if row is None:
+            return None
+        with self._conn:
+            self._conn.execute("DELETE FROM remnants WHERE id = ?", (remnant_id,))
+        pos = bisect_left(self._index, (row[0], remnant_id))
+        if pos < len(self._index) and self._index[pos] == (row[0], remnant_id):
+            del self._index[pos]
+        return row[0]
+
+    def take_smallest_at_least(self, length: float) -> Optional[Tuple[float, int]]:
+        found = self.smallest_at_least(length)
+        if found is not None:
+            self.take(found[1])
+        return found
+
+    def apply_result(self, result: Dict[str, Any], source: Optional[str] = None) -> Dict[str, int]:
+        """
+        Kesilen planı stoğa işler: kullanılan artıkları düşer, yeni artıkları ekler.
+        """
+        taken = sum(1 for remnant_id in result.get("remnants_used", []) if self.take(remnant_id) is not None)
+        added = sum(1 for length in result.get("new_remnants", []) if self.add(length, source) is not None)
+        return {"taken": taken, "added": added}
+
+    def lengths(self) -> Iterable[float]:
+        return (length for length, _ in self._index)
+
+    def close(self) -> None:
+        self._conn.close()
@@ -0,0 +1,115 @@
+import json
+import os
+import time
+import urllib.error
+import urllib.request
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from constants import SERVER_TOKEN_ENV_VAR
+from optimization import EVENT_TYPES, Finished, OptimizationEvent
+from project_format import result_from_dict
+
+
+class RemoteError(Exception):
+    pass
+
+
+class RemoteOptimizer:
+    """
+    server.py ile çalışan optimizasyon sunucusu için istemci. token verilmezse
+    KESIM_SERVER_TOKEN ortam değişkeni kullanılır.
+    """
+
+    def __init__(self, base_url: str, timeout: float = 10.0, token: Optional[str] = None):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self.token = token if token is not None else os.environ.get(SERVER_TOKEN_ENV_VAR)
+
+    def _headers(self) -> Dict[str, str]:
+        return {"Authorization": f"Bearer {self.token}"} if self.token else {}
+
+    def _request(self, method: str, path: str, payload: Optional[Dict[str, Any]] = None) -> Any:
+        data = json.dumps(payload, ensure_ascii=False).encode("utf-8") if payload is not None else None
+        request = urllib.request.Request(self.base_url + path, data=data, method=method,
+                                         headers={"Content-Type": "application/json", **self._headers()})
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                return json.loads(response.read().decode("utf-8"))
+        except urllib.error.HTTPError as e:
+            try:
+                body = json.loads(e.read().decode("utf-8"))
+                detail = body.get("error") or body.get("status", "")
+            except Exception:
+                detail = ""
+            raise RemoteError(f"Sunucu hatası ({e.code}): {detail}") from e
+        except urllib.error.URLError as e:
+            raise RemoteError(f"Sunucuya bağlanılamadı: {e.reason}") from e
+
+    def submit(self, parts_data: List[Dict[str, Any]], stock_length: int, kerf: int, **options) -> str:
+        payload = {"parts": parts_data, "stock_length": stock_length, "kerf": kerf, **options}
+        return self._request("POST", "/jobs", payload)["job_id"]
+
+    def status(self, job_id: str) -> Dict[str, Any]:
+        return self._request("GET", f"/jobs/{job_id}")
+
+    def cancel(self, job_id: str) -> Dict[str, Any]:
+        return self._request("DELETE", f"/jobs/{job_id}")
+
+    def result(self, job_id: str) -> Dict[str, Any]:
+        return result_from_dict(self._request("GET", f"/jobs/{job_id}/result"))
+
+    def metrics(self) -> Dict[str, Any]:
+        return self._request("GET", "/metrics")
+
+    def events(self, job_id: str) -> Iterator[Dict[str, Any]]:
+        # Sunucu iş bitene kadar satır satır olay gönderir
+        request = urllib.request.Request(f"{self.base_url}/jobs/{job_id}/events", headers=self._headers())
+        try:
+            with urllib.request.urlopen(request, timeout=None) as response:
+                for line in response:
+                    if line.strip():
+                        yield json.loads(line.decode("utf-8"))
+        except urllib.error.URLError as e:
+            raise RemoteError(f"Sunucuya bağlanılamadı: {e}") from e
+
+    def optimize(self, parts_data: List[Dict[str, Any]], stock_length: int, kerf: int,
+                 on_event: Optional[Callable[[Dict[str, Any]], None]] = None,
+                 poll_interval: float = 0.5, **options) -> Dict[str, Any]:
+        job_id = self.submit(parts_data, stock_length, kerf, **options)
+        while True:
+            status = self.status(job_id)
+            if on_event is not None and status.get("last_event"):
+                on_event(status["last_event"])
+            if status["status"] == "done":
+                return self.result(job_id)
+            if status["status"] in ("failed", "cancelled"):
+                raise RemoteError(status.get("error") or f"İş {status['status']}")
+            time.sleep(poll_interval)
+
+    def iter_optimize(self, parts_data: List[Dict[str, Any]], stock_length: int, kerf: int,
+                      **options) -> Iterator[OptimizationEvent]:
+        """
+        optimization.iter_optimize ile aynı olayları sunucunun olay akışından üretir.
+        Üreteç iş bitmeden kapatılırsa iş sunucuda iptal edilir.
+        """
+        job_id = self.submit(parts_data, stock_length, kerf, **options)
+        finished = False
+        try:
+            for item in self.events(job_id):
+                name, data = item["event"], item.get("data") or {}
+                if name == "done":
+                    finished = True
+                    yield Finished(self.result(job_id))
+                    return
+                if name in ("failed", "cancelled"):
+                    finished = True
+                    raise RemoteError(data.get("error") or f"İş {name}")
+                event_type = EVENT_TYPES.get(name)
+                if event_type is not None and event_type is not Finished:
+                    yield event_type(**{k: v for k, v in data.items() if k in event_type._fields})
+        finally:
+            if not finished:
+                try:
+                    self.cancel(job_id)
+                except RemoteError:
+                    pass
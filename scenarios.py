@@ -0,0 +1,268 @@
+import csv
+import itertools
+import json
+import math
+import os
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+from optimization import Part, _reduce_parts, _simple_best_fit, _simple_first_fit, _validate_parts, _wrap_parts
+
+# Birden fazla parça listesinde her (stok boyu, kerf, fiyat) için eklenen toplam satırının adı
+TOTAL_ROW = "Toplam"
+
+# Tablo sütunları: (anahtar, başlık); CSV/Excel/konsol çıktısı bu sırayla yazılır
+SCENARIO_COLUMNS: List[Tuple[str, str]] = [
+    ("part_list", "Parça Listesi"),
+    ("stock_length", "Stok Boyu (mm)"),
+    ("kerf", "Kerf (mm)"),
+    ("unit_price", "Stok Birim Fiyatı"),
+    ("bars", "Stok"),
+    ("lower_bound", "Alt Sınır"),
+    ("total_fire", "Fire (mm)"),
+    ("efficiency", "Verim (%)"),
+    ("total_cost", "Toplam Maliyet"),
+    ("fire_cost", "Fire Maliyeti"),
+    ("cost_per_m", "Parça Metresi Maliyeti"),
+    ("engine", "Motor"),
+    ("error", "Not"),
+]
+SCENARIO_SORT_KEYS = tuple(key for key, _header in SCENARIO_COLUMNS if key != "error")
+
+
+class Scenario(NamedTuple):
+    stock_length: int
+    kerf: int
+    unit_price: float
+
+
+class _PreparedList(NamedTuple):
+    """
+    Senaryolar arasında paylaşılan, parça listesine ait iş: indirgenmiş ve uzundan kısaya
+    sıralanmış parça tipleri, toplam parça boyu, parça sayısı ve en uzun parça.
+    """
+    parts: List[Part]
+    total_length: float
+    pieces: int
+    longest: float
+
+
+def scenario_grid(stock_lengths: Sequence[int], kerfs: Sequence[int],
+                  unit_prices: Sequence[float]) -> List[Scenario]:
+    if not stock_lengths or not kerfs or not unit_prices:
+        raise ValueError("Stok boyu, kerf ve fiyat listelerinin her biri en az bir değer içermeli.")
+    for value in itertools.chain(stock_lengths, unit_prices):
+        if value <= 0:
+            raise ValueError("Stok boyu ve birim fiyat sıfırdan büyük olmalı.")
+    if any(kerf < 0 for kerf in kerfs):
+        raise ValueError("Kerf negatif olamaz.")
+    # Yinelenen değerler tek senaryoya iner; sıra korunur
+    return [Scenario(int(sl), int(kf), float(price))
+            for sl, kf, price in itertools.product(dict.fromkeys(stock_lengths), dict.fromkeys(kerfs),
+                                                   dict.fromkeys(unit_prices))]
+
+
+def _prepare(parts_data: List[Dict[str, Any]]) -> _PreparedList:
+    parts = _wrap_parts(parts_data)
+    _validate_parts(parts)
+    # Kesim sırası ve sipariş bilgisi senaryo karşılaştırmasını etkilemez; tipler yalnızca boya göre toplanır
+    reduced = sorted(_reduce_parts([Part(length=p.length, quantity=p.quantity) for p in parts]),
+                     key=lambda p: -p.length)
+    return _PreparedList(
+        parts=reduced,
+        total_length=sum(p.length * p.quantity for p in reduced),
+        pieces=sum(p.quantity for p in reduced),
+        longest=reduced[0].length,
+    )
+
+
+def _scenario_lower_bound(prepared: _PreparedList, stock_length: int, kerf: int) -> int:
+    # optimization.lower_bound ile aynı sınır; toplamlar liste başına bir kez hesaplanır
+    return max(1, math.ceil((prepared.total_length + kerf * prepared.pieces) / stock_length - 1e-9))
+
+
+def _pack(prepared: _PreparedList, stock_length: int, kerf: int) -> Dict[str, Any]:
+    # Fiyattan bağımsız paketleme: (liste, stok boyu, kerf) başına bir kez çalışır
+    lb = _scenario_lower_bound(prepared, stock_length, kerf)
+    if prepared.longest > stock_length:
+        return {"bars": None, "lower_bound": lb, "engine": None,
+                "error": f"{prepared.longest:g} mm parça {stock_length} mm stoğa sığmıyor"}
+    plan = _simple_first_fit(prepared.parts, stock_length, kerf)
+    engine = "first_fit"
+    if len(plan) > lb:
+        # Best-fit yalnızca first-fit'i geçebilecekse tamamlanır; alt sınıra ulaşıldıysa hiç çalışmaz
+        better = _simple_best_fit(prepared.parts, stock_length, kerf, bar_limit=len(plan) - 1)
+        if better is not None:
+            plan, engine = better, "best_fit"
+    used = sum(sum(p.length for p in bar) + kerf * (len(bar) - 1) for bar in plan)
+    return {"bars": len(plan), "lower_bound": lb, "engine": engine,
+            "total_fire": len(plan) * stock_length - used}
+
+
+# İşçi süreçte havuz başlatılırken bir kez kurulan hazırlanmış parça listeleri
+_worker_lists: Dict[str, _PreparedList] = {}
+
+
+def _init_worker(prepared: Dict[str, _PreparedList]) -> None:
+    _worker_lists.update(prepared)
+
+
+def _pack_task(list_name: str, stock_length: int, kerf: int) -> Dict[str, Any]:
+    return _pack(_worker_lists[list_name], stock_length, kerf)
+
+
+def _row(list_name: str, scenario: Scenario, packed: Dict[str, Any], total_length: float) -> Dict[str, Any]:
+    row = {"part_list": list_name, "stock_length": scenario.stock_length, "kerf": scenario.kerf,
+           "unit_price": scenario.unit_price, "bars": packed["bars"], "lower_bound": packed["lower_bound"],
+           "engine": packed["engine"], "error": None}
+    if packed["bars"] is None:
+        row.update(total_fire=None, efficiency=None, total_cost=None, fire_cost=None, cost_per_m=None,
+                   error=packed.get("error"))
+        return row
+    material = packed["bars"] * scenario.stock_length
+    total_cost = packed["bars"] * scenario.unit_price
+    row.update(
+        total_fire=packed["total_fire"],
+        efficiency=(material - packed["total_fire"]) / material * 100,
+        total_cost=total_cost,
+        # Fire, stok boyunun kesri olarak birim fiyatla çarpılır (mm başına fiyat = fiyat / stok boyu)
+        fire_cost=packed["total_fire"] / scenario.stock_length * scenario.unit_price,
+        cost_per_m=total_cost / (total_length / 1000),
+    )
+    return row
+
+
+def _total_rows(rows: List[Dict[str, Any]], scenarios: List[Scenario],
+                lists: Dict[str, _PreparedList]) -> List[Dict[str, Any]]:
+    by_key: Dict[Scenario, List[Dict[str, Any]]] = {}
+    for row in rows:
+        by_key.setdefault(Scenario(row["stock_length"], row["kerf"], row["unit_price"]), []).append(row)
+    total_length = sum(prepared.total_length for prepared in lists.values())
+    totals = []
+    for scenario in scenarios:
+        group = by_key[scenario]
+        lb = sum(row["lower_bound"] for row in group)
+        failed = [row for row in group if row["bars"] is None]
+        if failed:
+            packed = {"bars": None, "lower_bound": lb, "engine": None,
+                      "error": "; ".join(f"{row['part_list']}: {row['error']}" for row in failed)}
+        else:
+            packed = {"bars": sum(row["bars"] for row in group), "lower_bound": lb, "engine": None,
+                      "total_fire": sum(row["total_fire"] for row in group)}
+        totals.append(_row(TOTAL_ROW, scenario, packed, total_length))
+    return totals
+
+
+def run_scenarios(part_lists: Dict[str, List[Dict[str, Any]]], stock_lengths: Sequence[int],
+                  kerfs: Sequence[int], unit_prices: Sequence[float], workers: Optional[int] = None,
+                  progress: Optional[Callable[[int, int], None]] = None) -> List[Dict[str, Any]]:
+    """
+    Stok boyu × kerf × birim fiyat ızgarasını her parça listesi için değerlendirir ve
+    senaryo başına bir satır döndürür (SCENARIO_COLUMNS anahtarları).
+
+    Parça listeleri bir kez indirgenip sıralanır; paketleme fiyattan bağımsız olduğu için
+    (liste, stok boyu, kerf) başına bir kez yapılır ve fiyatlar yalnızca maliyeti değiştirir.
+    Paketlemeler workers süreçte paralel çalışır (None: çekirdek sayısı, 1: bu süreçte).
+    Birden fazla liste verilirse her senaryo için TOTAL_ROW satırı eklenir.
+    progress(tamamlanan, toplam) her paketlemeden sonra çağrılır; istisna fırlatırsa çalışma durur.
+    """
+    if not part_lists:
+        raise ValueError("En az bir parça listesi verilmeli.")
+    scenarios = scenario_grid(stock_lengths, kerfs, unit_prices)
+    lists = {name: _prepare(parts) for name, parts in part_lists.items()}
+    tasks = list(dict.fromkeys((name, s.stock_length, s.kerf) for name in lists for s in scenarios))
+
+    packed: Dict[Tuple[str, int, int], Dict[str, Any]] = {}
+    workers = min(workers or os.cpu_count() or 1, len(tasks))
+    if workers <= 1:
+        for task in tasks:
+            packed[task] = _pack(lists[task[0]], task[1], task[2])
+            if progress is not None:
+                progress(len(packed), len(tasks))
+    else:
+        # Hazırlanmış listeler her işçiye başlatılırken bir kez gönderilir; görevler yalnızca anahtar taşır
+        pool = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(lists,))
+        try:
+            pending = {pool.submit(_pack_task, *task): task for task in tasks}
+            while pending:
+                done, _rest = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    packed[pending.pop(future)] = future.result()
+                    if progress is not None:
+                        progress(len(packed), len(tasks))
+        finally:
+            pool.shutdown(wait=True, cancel_futures=True)
+
+    rows = [_row(name, scenario, packed[(name, scenario.stock_length, scenario.kerf)], lists[name].total_length)
+            for name in lists for scenario in scenarios]
+    if len(lists) > 1:
+        rows.extend(_total_rows(rows, scenarios, lists))
+    return rows
+
+
+def sort_scenarios(rows: List[Dict[str, Any]], key: str = "total_cost",
+                   descending: bool = False) -> List[Dict[str, Any]]:
+    """
+    Satırları verilen sütuna göre sıralar; eşitlikte stok sayısı ve fire belirleyicidir.
+    Uygulanamayan senaryolar (stoğa sığmayan parça) yönden bağımsız olarak en sonda kalır.
+    """
+    if key not in SCENARIO_SORT_KEYS:
+        raise ValueError(f"Bilinmeyen sıralama sütunu: {key}")
+    feasible = sorted((row for row in rows if row["bars"] is not None),
+                      key=lambda row: (row["bars"], row["total_fire"]))
+    # Değeri olmayan hücreler (ör. toplam satırının motoru) da sonda kalır
+    valued = [row for row in feasible if row[key] is not None]
+    valued.sort(key=lambda row: row[key], reverse=descending)
+    return (valued + [row for row in feasible if row[key] is None]
+            + [row for row in rows if row["bars"] is None])
+
+
+def _cell(row: Dict[str, Any], key: str) -> Any:
+    value = row.get(key)
+    if value is None:
+        return ""
+    if isinstance(value, float):
+        return round(value, 2)
+    return value
+
+
+def format_scenarios(rows: List[Dict[str, Any]]) -> str:
+    """
+    Konsol için hizalı tablo.
+    """
+    table = [[header for _key, header in SCENARIO_COLUMNS]]
+    table.extend([str(_cell(row, key)) for key, _header in SCENARIO_COLUMNS] for row in rows)
+    widths = [max(len(line[i]) for line in table) for i in range(len(SCENARIO_COLUMNS))]
+    return "\n".join("  ".join(cell.ljust(width) for cell, width in zip(line, widths)).rstrip()
+                     for line in table)
+
+
+def write_scenarios(rows: List[Dict[str, Any]], file_path: str) -> None:
+    """
+    Senaryo tablosunu uzantıya göre CSV, Excel (.xlsx) ya da JSON olarak yazar.
+    """
+    ext = os.path.splitext(file_path)[1].lower()
+    headers = [header for _key, header in SCENARIO_COLUMNS]
+    if ext == ".csv":
+        with open(file_path, "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerow(headers)
+            for row in rows:
+                writer.writerow([_cell(row, key) for key, _header in SCENARIO_COLUMNS])
+    elif ext == ".xlsx":
+        from openpyxl import Workbook
+        wb = Workbook()
+        ws = wb.active
+        ws.title = "Senaryolar"
+        ws.append(headers)
+        for row in rows:
+            ws.append([_cell(row, key) for key, _header in SCENARIO_COLUMNS])
+        # Excel'de sütun başlıklarından sıralama/filtreleme yapılabilsin
+        ws.auto_filter.ref = ws.dimensions
+        ws.freeze_panes = "A2"
+        wb.save(file_path)
+    elif ext == ".json":
+        with open(file_path, "w", encoding="utf-8") as f:
+            json.dump(rows, f, ensure_ascii=False, indent=1)
+    else:
+        raise ValueError(f"Desteklenmeyen senaryo tablosu biçimi: {file_path} (.csv, .xlsx ya da .json)")
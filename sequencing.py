@@ -0,0 +1,118 @@
+from itertools import groupby
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+from optimization import Part
+
+
+class MachineTimes(NamedTuple):
+    """
+    Testere süre modeli (saniye).
+    """
+    bar_load_s: float = 20.0         # stok yükleme / hizalama
+    cut_s: float = 6.0               # tek kesim
+    stop_change_s: float = 12.0      # dayama (boy) ayarı değişimi
+    cut_type_change_s: float = 45.0  # açı / kesim tipi değişimi
+
+
+def _cut_type(part: Part) -> str:
+    cut_type = (part.cut_type or "").strip().lower()
+    return "" if cut_type in ("", "düz kesim") else cut_type
+
+
+def _piece_key(part: Part) -> Tuple[int, str, float]:
+    # Düz kesimler önce, özel kesimler tiplerine göre toplu; her grupta uzundan kısaya
+    cut_type = _cut_type(part)
+    return (1 if cut_type else 0, cut_type, -part.length)
+
+
+def _length_groups(stock_parts: List[Part]) -> List[List[Part]]:
+    ordered = sorted(stock_parts, key=_piece_key)
+    return [list(group) for _, group in groupby(ordered, key=lambda p: (_cut_type(p), p.length))]
+
+
+def estimate_machine_time(plan: List[List[Part]], times: Optional[MachineTimes] = None) -> Dict[str, Any]:
+    """
+    Planı verilen sırayla keserken gereken dayama/kesim tipi değişimlerini ve tahmini süreyi hesaplar.
+    """
+    times = times or MachineTimes()
+    cuts = stop_changes = cut_type_changes = 0
+    last_length = last_type = None
+    for stock_parts in plan:
+        for part in stock_parts:
+            cuts += 1
+            if part.length != last_length:
+                stop_changes += 1
+                last_length = part.length
+            cut_type = _cut_type(part)
+            if cut_type != last_type:
+                # İlk parça düz kesimse makine zaten düz kesim ayarında sayılır
+                if last_type is not None or cut_type:
+                    cut_type_changes += 1
+                last_type = cut_type
+    machine_time = (len(plan) * times.bar_load_s + cuts * times.cut_s
+                    + stop_changes * times.stop_change_s + cut_type_changes * times.cut_type_change_s)
+    return {
+        "bars": len(plan),
+        "cuts": cuts,
+        "stop_changes": stop_changes,
+        "cut_type_changes": cut_type_changes,
+        "machine_time_s": machine_time,
+    }
+
+
+def sequence_plan(plan: List[List[Part]], bar_stocks: Optional[List[Dict[str, Any]]] = None,
+                  times: Optional[MachineTimes] = None
+                  ) -> Tuple[List[List[Part]], Optional[List[Dict[str, Any]]], Dict[str, Any]]:
+    """
+    Stokları ve stok içindeki parçaları ayar değişimi azalacak şekilde sıralar ve cut_order atar:
+    aynı desenli stoklar art arda kesilir, aynı boylar yan yana gelir, özel kesim tipleri
+    toplanır; stok, önceki stoktan geçiş daha ucuzsa ters sırayla kesilir.
+    Dönüş: (sıralı plan, aynı sırada bar_stocks, süre raporu).
+    """
+    times = times or MachineTimes()
+    baseline = estimate_machine_time(plan, times)
+
+    # Desen: stoktaki (tip, boy) grupları; aynı desenli stoklar tek grupta
+    patterns: Dict[Tuple, List[int]] = {}
+    bar_groups: List[List[List[Part]]] = []
+    for bar_idx, stock_parts in enumerate(plan):
+        groups = _length_groups(stock_parts)
+        bar_groups.append(groups)
+        pattern = tuple((_piece_key(g[0]), len(g)) for g in groups)
+        patterns.setdefault(pattern, []).append(bar_idx)
+
+    def transition(previous: Optional[Part], part: Part) -> float:
+        if previous is None:
+            return 0.0
+        cost = times.stop_change_s if previous.length != part.length else 0.0
+        if _cut_type(previous) != _cut_type(part):
+            cost += times.cut_type_change_s
+        return cost
+
+    # Benzer desenler (aynı tip ve uzun boylarla başlayanlar) sözlük sırasıyla yan yana gelir.
+    # Her stok, önceki stoğun son parçasından geçişi ucuz olan yönde (düz ya da ters) kesilir.
+    sequenced: List[List[Part]] = []
+    order: List[int] = []
+    last_part: Optional[Part] = None
+    cut_order = 1
+    for pattern in sorted(patterns):
+        for bar_idx in patterns[pattern]:
+            groups = bar_groups[bar_idx]
+            if len(groups) > 1 and transition(last_part, groups[-1][0]) < transition(last_part, groups[0][0]):
+                groups.reverse()
+            bar = []
+            for group in groups:
+                for part in group:
+                    bar.append(part._replace(cut_order=cut_order))
+                    cut_order += 1
+            last_part = bar[-1]
+            sequenced.append(bar)
+            order.append(bar_idx)
+
+    report = estimate_machine_time(sequenced, times)
+    report["patterns"] = len(patterns)
+    report["baseline_time_s"] = baseline["machine_time_s"]
+    report["baseline_stop_changes"] = baseline["stop_changes"]
+    report["baseline_cut_type_changes"] = baseline["cut_type_changes"]
+    new_stocks = [bar_stocks[i] for i in order] if bar_stocks is not None else None
+    return sequenced, new_stocks, report
@@ -0,0 +1,462 @@
+import argparse
+import asyncio
+import hmac
+import json
+import os
+import multiprocessing
+import threading
+import time
+import uuid
+from contextlib import closing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+from constants import (STUDY_STORAGE_FILE, JOB_HISTORY_FILE, PATTERN_DB_FILE, MEMORY_BUDGET_ENV_VAR,
+                       SERVER_TOKEN_ENV_VAR)
+from distributed import is_loopback
+from optimization import iter_optimize, event_payload, Finished, OptimizationCancelled
+from profiling import memory_budget_from_env
+from project_format import result_to_dict
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+MAX_BODY_BYTES = 64 * 1024 * 1024
+# Biten işler (sonuçlarıyla) bu süre ya da bu sayı aşılınca bellekten atılır; sonra 404 döner
+FINISHED_JOB_TTL_S = 3600.0
+MAX_FINISHED_JOBS = 500
+
+# İstemcinin gönderebileceği optimize_parts seçenekleri. n_jobs kabul edilmez: işler
+# iç içe süreç havuzu açmadan çalışır, CPU kullanımını yalnızca --workers belirler
+JOB_OPTION_KEYS = ("trials", "algorithm", "kerf_min", "kerf_max", "profile", "stock_catalog",
+                   "search_space", "profile_memory")
+TERMINAL_STATES = ("done", "failed", "cancelled")
+
+_HTTP_REASONS = {200: "OK", 202: "Accepted", 400: "Bad Request", 401: "Unauthorized", 404: "Not Found",
+                 405: "Method Not Allowed", 409: "Conflict", 413: "Payload Too Large",
+                 503: "Service Unavailable"}
+
+
+def _run_job(job_id: str, params: Dict[str, Any], events, cancelled,
+             study_storage: Optional[str] = None, pattern_storage: Optional[str] = None,
+             memory_budget_mb: Optional[float] = None) -> Dict[str, Any]:
+    # İşçi süreçte çalışır; ilerleme olayları yönetici kuyruğu üzerinden sunucuya gider.
+    # İptal edilen işin olay üreteci kapatılır, optimizasyon o noktada durur.
+    # Çalışma ve desen depoları ile iş başına bellek bütçesi sunucu ayarıdır; istemci değiştiremez.
+    # Son olarak aynı kuyruğa (iş no, None, None) bitiş işareti konur: sunucu son durumu ancak
+    # bu işaret ulaştığında, yani işin bütün ilerleme olaylarından sonra yayınlar.
+    try:
+        options = {k: params[k] for k in JOB_OPTION_KEYS if k in params}
+        options["study_storage"] = study_storage
+        options["pattern_storage"] = pattern_storage
+        options["memory_budget_mb"] = memory_budget_mb
+        options["single_process"] = True
+        stream = iter_optimize(params["parts"], int(params["stock_length"]), int(params["kerf"]), **options)
+        with closing(stream):
+            for event in stream:
+                if job_id in cancelled:
+                    raise OptimizationCancelled()
+                events.put((job_id, *event_payload(event)))
+                if isinstance(event, Finished):
+                    return result_to_dict(event.result)
+        raise OptimizationCancelled()
+    finally:
+        events.put((job_id, None, None))
+
+
+class Job:
+    def __init__(self, job_id: str, params: Dict[str, Any]):
+        self.id = job_id
+        self.params = params
+        self.status = "queued"
+        self.submitted_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.result: Optional[Dict[str, Any]] = None
+        self.error: Optional[str] = None
+        self.events: List[Dict[str, Any]] = []
+        self.changed = asyncio.Condition()
+        self.drained = asyncio.Event()  # işçi sürecin bütün olayları kaydedildi
+
+    @property
+    def finished(self) -> bool:
+        return self.status in TERMINAL_STATES
+
+    def record(self, event: str, data: Optional[Dict[str, Any]] = None) -> None:
+        self.events.append({"event": event, "data": data or {}, "time": time.time()})
+
+    async def emit(self, event: str, data: Optional[Dict[str, Any]] = None) -> None:
+        self.record(event, data)
+        await self.notify()
+
+    async def notify(self) -> None:
+        async with self.changed:
+            self.changed.notify_all()
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "job_id": self.id,
+            "status": self.status,
+            "submitted_at": self.submitted_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "error": self.error,
+            "last_event": self.events[-1] if self.events else None,
+        }
+
+
+class OptimizationServer:
+    """
+    optimize_parts için yerel HTTP/JSON iş sunucusu.
+
+    POST   /jobs              iş gönder (parts, stock_length, kerf + seçenekler)
+    GET    /jobs/<id>         durum
+    DELETE /jobs/<id>         iptal
+    GET    /jobs/<id>/result  sonuç
+    GET    /jobs/<id>/events  ilerleme olayları (satır başına bir JSON, iş bitene kadar akar)
+    GET    /metrics           kuyruk derinliği, çalışan iş sayısı, eşzamanlılık sınırı
+
+    Biten işler finished_ttl_s saniye ya da en fazla max_finished adet saklanır; silinen
+    işlerin adresleri 404 döner.
+
+    token verilirse her istek "Authorization: Bearer <token>" taşımalıdır (yoksa 401). Yerel
+    olmayan adreste token'sız başlatılamaz. Bağlantı şifrelenmez (düz HTTP); sunucu yalnızca
+    güvenilen ağlarda açılmalıdır.
+    """
+
+    def __init__(self, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT,
+                 max_concurrency: int = 2, max_queue: int = 100, study_storage: Optional[str] = None,
+                 history_path: Optional[str] = None, pattern_storage: Optional[str] = None,
+                 memory_budget_mb: Optional[float] = None, finished_ttl_s: float = FINISHED_JOB_TTL_S,
+                 max_finished: int = MAX_FINISHED_JOBS, token: Optional[str] = None):
+        if not token and not is_loopback(host):
+            raise ValueError(f"{SERVER_TOKEN_ENV_VAR} ortam değişkeni (ya da --token) ayarlanmadan sunucu yerel "
+                             f"olmayan bir adreste ({host}) başlatılamaz; aksi halde ağdaki herkes iş gönderebilir.")
+        self.host = host
+        self.token = token
+        self.study_storage = study_storage
+        self.pattern_storage = pattern_storage
+        self.memory_budget_mb = memory_budget_mb
+        # Verilirse tamamlanan işler iş geçmişine yazılır; etiketler (name, profile_name, customer) istekten gelir
+        self.history = None
+        if history_path is not None:
+            from job_history import JobHistory
+            self.history = JobHistory(history_path)
+        self.port = port
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.jobs: Dict[str, Job] = {}
+        self.finished_ttl_s = finished_ttl_s
+        self.max_finished = max_finished
+        self._finished: Deque[Tuple[float, str]] = deque()  # bitiş sırasıyla (zaman, iş no)
+        self.running = 0
+        self.queued = 0  # kuyrukta bekleyen, iptal edilmemiş işler
+        self.totals = {"submitted": 0, "done": 0, "failed": 0, "cancelled": 0, "rejected": 0}
+
+    async def start(self) -> None:
+        self._loop = asyncio.get_running_loop()
+        self._manager = multiprocessing.Manager()
+        self._events = self._manager.Queue()
+        self._cancelled = self._manager.dict()
+        self._pool = ProcessPoolExecutor(max_workers=self.max_concurrency)
+        # Kuyruk sınırı self.queued ile uygulanır: iptal edilen bekleyen işler bir işçi onları
+        # alana kadar kuyrukta kalır ama yer tutmaz
+        self._queue: asyncio.Queue = asyncio.Queue()
+        self._workers = [asyncio.create_task(self._worker()) for _ in range(self.max_concurrency)]
+        self._pump = threading.Thread(target=self._pump_events, daemon=True)
+        self._pump.start()
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        # port=0 verildiyse işletim sisteminin atadığı port
+        self.port = self._server.sockets[0].getsockname()[1]
+
+    async def serve_forever(self) -> None:
+        async with self._server:
+            await self._server.serve_forever()
+
+    async def close(self) -> None:
+        self._server.close()
+        await self._server.wait_closed()
+        for task in self._workers:
+            task.cancel()
+        for job in self.jobs.values():
+            if not job.finished:
+                self._cancelled[job.id] = True
+        self._pool.shutdown(wait=True, cancel_futures=True)
+        self._events.put(None)
+        self._pump.join(timeout=5)
+        self._manager.shutdown()
+        if self.history is not None:
+            self.history.close()
+
+    def _pump_events(self) -> None:
+        while True:
+            item = self._events.get()
+            if item is None:
+                break
+            self._loop.call_soon_threadsafe(self._on_progress, *item)
+
+    def _on_progress(self, job_id: str, event: Optional[str], data: Optional[Dict[str, Any]]) -> None:
+        # Olay geldiği sırayla hemen kaydedilir; yalnızca bekleyen akışların uyandırılması ertelenir
+        job = self.jobs.get(job_id)
+        if job is None or job.finished:
+            return
+        if event is None:
+            job.drained.set()
+            return
+        job.record(event, data)
+        asyncio.ensure_future(job.notify())
+
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            "queue_depth": self.queued,
+            "running": self.running,
+            "max_concurrency": self.max_concurrency,
+            "max_queue": self.max_queue,
+            "jobs": len(self.jobs),
+            **self.totals,
+        }
+
+    def evict_finished(self, now: Optional[float] = None) -> int:
+        """
+        TTL'i dolan ya da max_finished'ı aşan en eski biten işleri siler; silinen iş sayısını döner.
+        """
+        now = time.time() if now is None else now
+        evicted = 0
+        while self._finished and (len(self._finished) > self.max_finished
+                                  or self._finished[0][0] <= now - self.finished_ttl_s):
+            _finished_at, job_id = self._finished.popleft()
+            if self.jobs.pop(job_id, None) is not None:
+                evicted += 1
+        return evicted
+
+    def submit(self, params: Dict[str, Any]) -> Job:
+        for key in ("parts", "stock_length", "kerf"):
+            if key not in params:
+                raise ValueError(f"Eksik alan: {key}")
+        if self.queued >= self.max_queue:
+            raise asyncio.QueueFull()
+        job = Job(uuid.uuid4().hex, params)
+        self._queue.put_nowait(job)
+        self.queued += 1
+        self.jobs[job.id] = job
+        self.totals["submitted"] += 1
+        job.record("queued")
+        return job
+
+    async def cancel(self, job: Job) -> None:
+        if job.finished:
+            return
+        if job.status == "queued":
+            self.queued -= 1
+            await self._finish(job, "cancelled")
+        else:
+            # Çalışan iş bir sonraki ilerleme bildiriminde durur
+            self._cancelled[job.id] = True
+
+    async def _finish(self, job: Job, status: str, error: Optional[str] = None) -> None:
+        job.status = status
+        job.error = error
+        job.finished_at = time.time()
+        self.totals[status] += 1
+        self._finished.append((job.finished_at, job.id))
+        await job.emit(status, {"error": error} if error else None)
+        self.evict_finished()
+
+    async def _worker(self) -> None:
+        while True:
+            job = await self._queue.get()
+            try:
+                if job.finished:
+                    continue
+                self.queued -= 1
+                job.status = "running"
+                job.started_at = time.time()
+                self.running += 1
+                await job.emit("running")
+                try:
+                    try:
+                        job.result = await self._loop.run_in_executor(
+                            self._pool, _run_job, job.id, job.params, self._events, self._cancelled,
+                            self.study_storage, self.pattern_storage, self.memory_budget_mb)
+                    except BrokenProcessPool:
+                        raise  # işçi süreç öldü, bitiş işareti gelmez
+                    except Exception:
+                        await job.drained.wait()
+                        raise
+                    await job.drained.wait()
+                    await self._finish(job, "done")
+                    self._record_history(job)
+                except OptimizationCancelled:
+                    await self._finish(job, "cancelled")
+                except Exception as e:
+                    await self._finish(job, "failed", str(e))
+                finally:
+                    self.running -= 1
+                    self._cancelled.pop(job.id, None)
+            finally:
+                self._queue.task_done()
+
+    def _record_history(self, job: Job) -> None:
+        if self.history is None:
+            return
+        params = job.params
+        try:
+            self.history.record(job.result, params["parts"], float(params["stock_length"]), "server",
+                                elapsed_s=job.finished_at - job.started_at, name=params.get("name"),
+                                profile=params.get("profile_name"), customer=params.get("customer"),
+                                algorithm=params.get("algorithm"), finished_at=job.finished_at)
+        except Exception as e:
+            # Geçmiş yazılamazsa iş sonucu etkilenmez
+            print(f"İş geçmişi yazılamadı ({job.id}): {e}")
+
+    # ---- HTTP ----
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            request_line = await reader.readline()
+            if not request_line:
+                return
+            method, target, _version = request_line.decode("latin-1").split(" ", 2)
+            headers = {}
+            while True:
+                line = await reader.readline()
+                if line in (b"\r\n", b"\n", b""):
+                    break
+                key, _, value = line.decode("latin-1").partition(":")
+                headers[key.strip().lower()] = value.strip()
+            if self.token and not hmac.compare_digest(headers.get("authorization", "").encode("latin-1"),
+                                                      f"Bearer {self.token}".encode("utf-8")):
+                await self._send_json(writer, 401, {"error": "Yetkisiz istek: geçerli erişim anahtarı gerekli."})
+                return
+            length = int(headers.get("content-length", 0) or 0)
+            if length > MAX_BODY_BYTES:
+                await self._send_json(writer, 413, {"error": "İstek gövdesi çok büyük."})
+                return
+            body = await reader.readexactly(length) if length else b""
+            await self._route(method.upper(), target.split("?", 1)[0], body, writer)
+        except (ValueError, json.JSONDecodeError) as e:
+            await self._send_json(writer, 400, {"error": str(e)})
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            try:
+                writer.close()
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+
+    async def _route(self, method: str, path: str, body: bytes, writer: asyncio.StreamWriter) -> None:
+        self.evict_finished()
+        parts = [p for p in path.split("/") if p]
+        if parts == ["metrics"] and method == "GET":
+            await self._send_json(writer, 200, self.metrics())
+            return
+        if parts == ["jobs"]:
+            if method != "POST":
+                await self._send_json(writer, 405, {"error": "Yalnızca POST desteklenir."})
+                return
+            try:
+                job = self.submit(json.loads(body or b"{}"))
+            except asyncio.QueueFull:
+                self.totals["rejected"] += 1
+                await self._send_json(writer, 503, {"error": "İş kuyruğu dolu.", **self.metrics()})
+                return
+            await self._send_json(writer, 202, job.to_dict())
+            return
+        if len(parts) < 2 or parts[0] != "jobs" or parts[1] not in self.jobs:
+            await self._send_json(writer, 404, {"error": "İş bulunamadı."})
+            return
+
+        job = self.jobs[parts[1]]
+        action = parts[2] if len(parts) > 2 else None
+        if action is None and method == "GET":
+            await self._send_json(writer, 200, job.to_dict())
+        elif action is None and method == "DELETE":
+            await self.cancel(job)
+            await self._send_json(writer, 200, job.to_dict())
+        elif action == "result" and method == "GET":
+            if job.status != "done":
+                await self._send_json(writer, 409, job.to_dict())
+            else:
+                await self._send_json(writer, 200, job.result)
+        elif action == "events" and method == "GET":
+            await self._stream_events(writer, job)
+        else:
+            await self._send_json(writer, 404, {"error": "Bilinmeyen istek."})
+
+    async def _send_json(self, writer: asyncio.StreamWriter, status: int, payload: Any) -> None:
+        body = json.dumps(payload, ensure_ascii=False, default=str).encode("utf-8")
+        writer.write(
+            f"HTTP/1.1 {status} {_HTTP_REASONS.get(status, '')}\r\n"
+            f"Content-Type: application/json; charset=utf-8\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            f"Connection: close\r\n\r\n".encode("latin-1") + body
+        )
+        await writer.drain()
+
+    async def _stream_events(self, writer: asyncio.StreamWriter, job: Job) -> None:
+        # Gövde bağlantı kapanınca biter; her satır bir olay
+        writer.write(b"HTTP/1.1 200 OK\r\nContent-Type: application/x-ndjson\r\n"
+                     b"Cache-Control: no-cache\r\nConnection: close\r\n\r\n")
+        await writer.drain()
+        sent = 0
+        while True:
+            async with job.changed:
+                await job.changed.wait_for(lambda: sent < len(job.events) or job.finished)
+                pending = job.events[sent:]
+            for event in pending:
+                writer.write(json.dumps(event, ensure_ascii=False, default=str).encode("utf-8") + b"\n")
+            sent += len(pending)
+            await writer.drain()
+            if job.finished and sent >= len(job.events):
+                break
+
+
+async def _serve(args: argparse.Namespace) -> None:
+    server = OptimizationServer(args.host, args.port, args.workers, args.max_queue, args.study_db,
+                                args.history_db, args.pattern_db, args.memory_budget, args.job_ttl,
+                                args.max_finished_jobs, args.token)
+    await server.start()
+    print(f"Optimizasyon sunucusu: http://{server.host}:{server.port} "
+          f"(eşzamanlı iş: {server.max_concurrency}, kuyruk: {server.max_queue})")
+    try:
+        await server.serve_forever()
+    finally:
+        await server.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Kesim optimizasyon iş sunucusu")
+    parser.add_argument("--host", default=DEFAULT_HOST,
+                        help=f"Dinlenecek adres; yerel olmayan adreslerde {SERVER_TOKEN_ENV_VAR} erişim anahtarı gerekir")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--workers", type=int, default=max(1, (multiprocessing.cpu_count() or 2) - 1),
+                        help="Aynı anda çalışan en fazla iş sayısı")
+    parser.add_argument("--max-queue", type=int, default=100, help="Bekleyen en fazla iş sayısı")
+    parser.add_argument("--study-db", nargs="?", const=STUDY_STORAGE_FILE,
+                        help="Optuna çalışmalarını bu SQLite dosyasında sakla ve sonraki işlerde sürdür")
+    parser.add_argument("--pattern-db", nargs="?", const=PATTERN_DB_FILE,
+                        help="İşleri bu kesim deseni kütüphanesiyle tohumla ve kütüphaneyi güncelle")
+    parser.add_argument("--history-db", nargs="?", const=JOB_HISTORY_FILE,
+                        help="Tamamlanan işleri bu iş geçmişi SQLite dosyasına yaz")
+    parser.add_argument("--job-ttl", type=float, default=FINISHED_JOB_TTL_S,
+                        help="Biten işlerin sonuçları bu kadar saniye saklanır")
+    parser.add_argument("--max-finished-jobs", type=int, default=MAX_FINISHED_JOBS,
+                        help="Saklanan en fazla biten iş sayısı")
+    parser.add_argument("--memory-budget", type=float, default=memory_budget_from_env(),
+                        help=f"İş başına süreç belleği sınırı (MB); varsayılan {MEMORY_BUDGET_ENV_VAR} ortam değişkeni")
+    parser.add_argument("--token", default=os.environ.get(SERVER_TOKEN_ENV_VAR) or None,
+                        help=f"İstemcilerin göndermesi gereken erişim anahtarı; varsayılan {SERVER_TOKEN_ENV_VAR}")
+    args = parser.parse_args()
+    try:
+        asyncio.run(_serve(args))
+    except KeyboardInterrupt:
+        pass
+    except ValueError as e:
+        print(f"HATA: {e}")
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
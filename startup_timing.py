@@ -0,0 +1,75 @@
+import builtins
+import sys
+import time
+from typing import Dict, List, Tuple
+from profiling import Profiler
+
+# Açılış adımları (Tk kökü, uygulama kurulumu, ilk çizim, tema) bu ortak profiler'a yazılır.
+# Varsayılan olarak kapalıdır; main.py --startup-report ile açılır.
+startup_profiler = Profiler(enabled=False)
+
+
+class ImportTimer:
+    """
+    builtins.__import__ üzerinden her modülün ilk yüklenme süresini ölçer.
+    Kümülatif süre alt modülleri de içerir, kendi süresi içermez.
+    """
+
+    def __init__(self):
+        self.timings: Dict[str, Tuple[float, float]] = {}
+        self._stack: List[float] = []
+        self._original_import = None
+
+    def install(self) -> None:
+        if self._original_import is None:
+            self._original_import = builtins.__import__
+            builtins.__import__ = self._timed_import
+
+    def uninstall(self) -> None:
+        if self._original_import is not None:
+            builtins.__import__ = self._original_import
+            self._original_import = None
+
+    def _timed_import(self, name, globals=None, locals=None, fromlist=(), level=0):
+        if level or name in sys.modules:
+            return self._original_import(name, globals, locals, fromlist, level)
+        self._stack.append(0.0)
+        start = time.perf_counter()
+        try:
+            return self._original_import(name, globals, locals, fromlist, level)
+        finally:
+            elapsed = time.perf_counter() - start
+            children = self._stack.pop()
+            if self._stack:
+                self._stack[-1] += elapsed
+            self.timings[name] = (elapsed, elapsed - children)
+
+    def top(self, limit: int = 15) -> List[Tuple[str, float, float]]:
+        rows = [(name, total, own) for name, (total, own) in self.timings.items()]
+        rows.sort(key=lambda row: row[1], reverse=True)
+        return rows[:limit]
+
+
+import_timer = ImportTimer()
+
+
+def enable_startup_timing() -> None:
+    startup_profiler.enabled = True
+    import_timer.install()
+
+
+def format_startup_report(limit: int = 15) -> str:
+    lines = ["Açılış süresi raporu", "--------------------"]
+    for name, _start, duration, depth in startup_profiler.events:
+        lines.append(f"{'  ' * depth}{name:<30} {duration * 1000:9.1f} ms")
+    rows = import_timer.top(limit)
+    if rows:
+        lines.append("")
+        lines.append(f"{'Modül':<30} {'Kümülatif':>12} {'Kendi':>12}")
+        for name, total, own in rows:
+            lines.append(f"{name:<30} {total * 1000:9.1f} ms {own * 1000:9.1f} ms")
+    return "\n".join(lines)
+
+
+def print_startup_report(limit: int = 15) -> None:
+    print(format_startup_report(limit))
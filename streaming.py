@@ -0,0 +1,68 @@
+import os
+from typing import Any, Callable, Dict, List, Optional
+
+from export_jobs import PARTIAL_SUFFIX
+from file_handlers import PlanCsvStream, PlanExcelStream, report_parts
+from optimization import (STREAM_OPEN_BARS, PlanStats, _validate_parts, _wrap_parts, calculate_costs,
+                          iter_first_fit_bars, lower_bound)
+
+# Rapor uzantısı -> akışlı yazıcı
+STREAM_WRITERS = {".csv": PlanCsvStream, ".xlsx": PlanExcelStream}
+
+
+def optimize_streaming(parts_data: List[Dict[str, Any]], stock_length: int, kerf: int,
+                       outputs: Optional[List[str]] = None, stock_unit_price: float = 1.0,
+                       open_bars: int = STREAM_OPEN_BARS,
+                       progress: Optional[Callable[[int, int], None]] = None) -> Dict[str, Any]:
+    """
+    Milyonlarca parçalık işler için sınırlı bellekli plan: stoklar iter_first_fit_bars ile
+    kesinleştikçe doğrudan CSV/Excel yazıcılarına aktarılır, istatistikler yolda toplanır.
+    Sonuçta plan, parça listesi ve optuna çalışması yoktur; kerf araması ve kesim sırası
+    tam plan gerektirdiğinden verilen kerf kullanılır.
+    progress(yerleşen parça, toplam parça) her stoktan sonra çağrılır; istisna fırlatırsa
+    yazım durur ve yarım kalan dosyalar silinir.
+    """
+    parts = _wrap_parts(parts_data)
+    _validate_parts(parts)
+    outputs = list(outputs or [])
+    for path in outputs:
+        if os.path.splitext(path)[1].lower() not in STREAM_WRITERS:
+            raise ValueError(f"Akışlı yazımda desteklenmeyen rapor biçimi: {path} (.csv ya da .xlsx)")
+
+    total_pieces = sum(p.quantity for p in parts)
+    stats = PlanStats(stock_length, kerf)
+    writers = []
+    try:
+        for path in outputs:
+            writers.append(STREAM_WRITERS[os.path.splitext(path)[1].lower()](path + PARTIAL_SUFFIX))
+        for stock_parts in iter_first_fit_bars(parts, stock_length, kerf, open_bars):
+            stats.add(stock_parts)
+            for writer in writers:
+                writer.add(stats.used_stocks, stock_parts)
+            if progress:
+                progress(stats.pieces, total_pieces)
+
+        fire_eff = stats.fire_efficiency()
+        result = {
+            "kerf": kerf,
+            "used_stocks": stats.used_stocks,
+            "pieces": stats.pieces,
+            "lower_bound": lower_bound(parts, stock_length, kerf),
+            "fire_efficiency": fire_eff,
+            "costs": calculate_costs(fire_eff, stock_unit_price),
+            "open_bars": open_bars,
+            "outputs": outputs,
+        }
+        summary = dict(result, parts=report_parts(parts_data))
+        for writer in writers:
+            writer.close(summary)
+    except BaseException:
+        for writer in writers:
+            writer.abort()
+        for path in outputs:
+            if os.path.exists(path + PARTIAL_SUFFIX):
+                os.remove(path + PARTIAL_SUFFIX)
+        raise
+    for path in outputs:
+        os.replace(path + PARTIAL_SUFFIX, path)
+    return result
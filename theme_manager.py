@@ -1,63 +1,134 @@
-import tkinter as tk
-from tkinter import ttk, messagebox
-
-try:
-    from ttkthemes import ThemedStyle
-    TTKTHEMES_AVAILABLE = True
-except ImportError:
-    TTKTHEMES_AVAILABLE = False
-
-class ThemeManager:
-    def __init__(self, root: tk.Tk):
-        self.root = root
-        if TTKTHEMES_AVAILABLE:
-            self.style = ThemedStyle(self.root)
-            self.available_themes = list(self.style.theme_names())
-        else:
-            self.style = ttk.Style(self.root)
-            self.available_themes = self._get_standard_themes()
-
-        self.current_theme = self.style.theme_use()
-
-    def _get_standard_themes(self):
-        standard_themes = [
-            'winnative', 'clam', 'alt', 'default', 'classic', 'vista', 'xpnative'
-        ]
-        existing = self.style.theme_names()
-        return [t for t in standard_themes if t in existing]
-
-    def set_theme(self, theme_name: str):
-        if theme_name in self.available_themes:
-            if TTKTHEMES_AVAILABLE:
-                self.style.set_theme(theme_name)
-            else:
-                self.style.theme_use(theme_name)
-            self.current_theme = theme_name
-            print(f"Tema değiştirildi: {theme_name}")
-        else:
-            messagebox.showerror("Hata", f"Geçersiz tema seçimi: {theme_name}")
-
-    def get_themes(self):
-        return self.available_themes
-
-    def get_current_theme(self):
-        return self.current_theme
-
-    def show_theme_dialog(self):
-        dialog = tk.Toplevel(self.root)
-        dialog.title("Tema Seçimi")
-        dialog.resizable(False, False)
-
-        ttk.Label(dialog, text="Tema seçin:").pack(pady=8)
-
-        selected_theme = tk.StringVar(value=self.get_current_theme())
-
-        for theme in self.available_themes:
-            ttk.Radiobutton(dialog, text=theme, variable=selected_theme, value=theme).pack(anchor="w", padx=20)
-
-        def apply_theme():
-            self.set_theme(selected_theme.get())
-            dialog.destroy()
-
-        ttk.Button(dialog, text="Uygula", command=apply_theme).pack(pady=10)
-        dialog.grab_set()
+import importlib.util
+import json
+import os
+import tkinter as tk
+from tkinter import ttk, messagebox
+from typing import List, Optional
+from constants import DEFAULT_THEME, THEME_SETTINGS_FILE
+from startup_timing import startup_profiler
+
+# ttkthemes burada içe aktarılmaz; yalnızca kurulu olup olmadığına bakılır.
+# Paket ve temaları ilk kez tema listesi ya da ttkthemes teması istendiğinde yüklenir.
+TTKTHEMES_AVAILABLE = importlib.util.find_spec("ttkthemes") is not None
+
+def load_saved_theme() -> Optional[str]:
+    if not os.path.exists(THEME_SETTINGS_FILE):
+        return None
+    try:
+        with open(THEME_SETTINGS_FILE, "r", encoding="utf-8") as f:
+            return json.load(f).get("theme")
+    except Exception:
+        return None
+
+def save_theme_choice(theme_name: str) -> None:
+    try:
+        with open(THEME_SETTINGS_FILE, "w", encoding="utf-8") as f:
+            json.dump({"theme": theme_name}, f, ensure_ascii=False)
+    except Exception as e:
+        print(f"Tema ayarı kaydedilemedi: {e}")
+
+class ThemeManager:
+    def __init__(self, root: tk.Tk):
+        self.root = root
+        with startup_profiler.span("theme_init"):
+            self.style = ttk.Style(self.root)
+            self._themed_style = None
+            self._available_themes: Optional[List[str]] = None
+            # Yüklenmiş temalar: bunlara geri dönüş yalnızca theme_use çağrısıdır
+            self._loaded_themes = set(self.style.theme_names())
+            self._dialog: Optional[tk.Toplevel] = None
+            self._dialog_var: Optional[tk.StringVar] = None
+            self.current_theme = self.style.theme_use()
+
+    def _get_themed_style(self):
+        if self._themed_style is None:
+            with startup_profiler.span("ttkthemes_load"):
+                from ttkthemes import ThemedStyle
+                self._themed_style = ThemedStyle(self.root)
+        return self._themed_style
+
+    @property
+    def available_themes(self) -> List[str]:
+        if self._available_themes is None:
+            if TTKTHEMES_AVAILABLE:
+                self._available_themes = list(self._get_themed_style().theme_names())
+            else:
+                self._available_themes = self._get_standard_themes()
+        return self._available_themes
+
+    def _get_standard_themes(self):
+        standard_themes = [
+            'winnative', 'clam', 'alt', 'default', 'classic', 'vista', 'xpnative'
+        ]
+        existing = self.style.theme_names()
+        return [t for t in standard_themes if t in existing]
+
+    def apply_startup_theme(self) -> None:
+        # Son kullanılan tema ilk pencere çiziminden önce uygulanır
+        saved = load_saved_theme()
+        if saved and saved != DEFAULT_THEME and self._is_known_theme(saved):
+            self.set_theme(saved, persist=False)
+        else:
+            self.set_theme(DEFAULT_THEME, persist=False)
+
+    def _is_known_theme(self, theme_name: str) -> bool:
+        return theme_name in self._loaded_themes or theme_name in self.available_themes
+
+    def set_theme(self, theme_name: str, persist: bool = True):
+        if not self._is_known_theme(theme_name):
+            messagebox.showerror("Hata", f"Geçersiz tema seçimi: {theme_name}")
+            return
+        with startup_profiler.span(f"theme_switch:{theme_name}"):
+            if theme_name in self._loaded_themes:
+                self.style.theme_use(theme_name)
+            elif TTKTHEMES_AVAILABLE:
+                self._get_themed_style().set_theme(theme_name)
+                self._loaded_themes.add(theme_name)
+            else:
+                self.style.theme_use(theme_name)
+                self._loaded_themes.add(theme_name)
+        self.current_theme = theme_name
+        if persist:
+            save_theme_choice(theme_name)
+        print(f"Tema değiştirildi: {theme_name}")
+
+    def get_themes(self):
+        return self.available_themes
+
+    def get_current_theme(self):
+        return self.current_theme
+
+    def show_theme_dialog(self):
+        # Diyalog bir kez oluşturulur; kapatıldığında gizlenir ve sonraki açılışta yeniden kullanılır
+        if self._dialog is None or not self._dialog.winfo_exists():
+            self._build_theme_dialog()
+        self._dialog_var.set(self.get_current_theme())
+        self._dialog.deiconify()
+        self._dialog.lift()
+        self._dialog.grab_set()
+
+    def _build_theme_dialog(self):
+        dialog = tk.Toplevel(self.root)
+        dialog.title("Tema Seçimi")
+        dialog.resizable(False, False)
+
+        ttk.Label(dialog, text="Tema seçin:").pack(pady=8)
+
+        selected_theme = tk.StringVar(value=self.get_current_theme())
+
+        for theme in self.available_themes:
+            ttk.Radiobutton(dialog, text=theme, variable=selected_theme, value=theme).pack(anchor="w", padx=20)
+
+        def hide_dialog():
+            dialog.grab_release()
+            dialog.withdraw()
+
+        def apply_theme():
+            self.set_theme(selected_theme.get())
+            hide_dialog()
+
+        ttk.Button(dialog, text="Uygula", command=apply_theme).pack(pady=10)
+        dialog.protocol("WM_DELETE_WINDOW", hide_dialog)
+
+        self._dialog = dialog
+        self._dialog_var = selected_theme
@@ -1,43 +1,231 @@
-import json
-import os
-from typing import Optional, Dict, Any
-
-USER_DATA_FILE = "users.json"
-
-def load_users() -> Dict[str, Any]:
-    if not os.path.exists(USER_DATA_FILE):
-        return {}
-    try:
-        with open(USER_DATA_FILE, "r", encoding="utf-8") as f:
-            return json.load(f)
-    except Exception:
-        return {}
-
-def save_users(users: Dict[str, Any]) -> None:
-    try:
-        with open(USER_DATA_FILE, "w", encoding="utf-8") as f:
-            json.dump(users, f, indent=4, ensure_ascii=False)
-    except Exception as e:
-        print(f"User save error: {e}")
-
-def add_user(username: str, password: str) -> bool:
-    users = load_users()
-    if username in users:
-        return False
-    users[username] = {"password": password, "projects": []}
-    save_users(users)
-    return True
-
-def validate_user(username: str, password: str) -> bool:
-    users = load_users()
-    if username in users and users[username]["password"] == password:
-        return True
-    return False
-
-def add_project_for_user(username: str, project_data: dict) -> None:
-    users = load_users()
-    if username in users:
-        users[username]["projects"].append(project_data)
-        save_users(users)
-
-# Daha gelişmiş yetkilendirme, oturum yönetimi eklenebilir.
+import hashlib
+import hmac
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Optional, Dict, Any, List, Tuple
+
+USER_DB_FILE = "users.db"
+# Eski sürümün düz metin kullanıcı dosyası; ilk açılışta veritabanına aktarılır, sonra
+# parolasız kopyası (users.json.migrated) bırakılıp silinir
+LEGACY_USER_DATA_FILE = "users.json"
+PBKDF2_ITERATIONS = 200_000
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+CREATE TABLE IF NOT EXISTS users (
+    id INTEGER PRIMARY KEY,
+    username TEXT NOT NULL UNIQUE,
+    salt BLOB NOT NULL,
+    password_hash BLOB NOT NULL,
+    iterations INTEGER NOT NULL,
+    created_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS projects (
+    id INTEGER PRIMARY KEY,
+    user_id INTEGER NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+    name TEXT NOT NULL,
+    latest_revision INTEGER NOT NULL DEFAULT 0,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL,
+    UNIQUE (user_id, name)
+);
+CREATE INDEX IF NOT EXISTS idx_projects_user_updated ON projects (user_id, updated_at DESC, id DESC);
+CREATE TABLE IF NOT EXISTS project_revisions (
+    id INTEGER PRIMARY KEY,
+    project_id INTEGER NOT NULL REFERENCES projects(id) ON DELETE CASCADE,
+    revision INTEGER NOT NULL,
+    data TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    UNIQUE (project_id, revision)
+);
+"""
+
+_local = threading.local()
+
+def _connect() -> sqlite3.Connection:
+    # Her iş parçacığı kendi bağlantısını kullanır; WAL sayesinde okuyucular yazarı beklemez
+    conn = getattr(_local, "conn", None)
+    if conn is not None and getattr(_local, "path", None) == USER_DB_FILE:
+        return conn
+    conn = sqlite3.connect(USER_DB_FILE)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute("PRAGMA foreign_keys=ON")
+    conn.executescript(_SCHEMA)
+    _local.conn = conn
+    _local.path = USER_DB_FILE
+    _import_legacy_users(conn)
+    return conn
+
+def close_connection() -> None:
+    conn = getattr(_local, "conn", None)
+    if conn is not None:
+        conn.close()
+        _local.conn = None
+
+def _hash_password(password: str, salt: bytes, iterations: int) -> bytes:
+    return hashlib.pbkdf2_hmac("sha256", password.encode("utf-8"), salt, iterations)
+
+def _insert_user(conn: sqlite3.Connection, username: str, password: str) -> int:
+    salt = os.urandom(16)
+    cur = conn.execute(
+        "INSERT INTO users (username, salt, password_hash, iterations, created_at) VALUES (?, ?, ?, ?, ?)",
+        (username, salt, _hash_password(password, salt, PBKDF2_ITERATIONS), PBKDF2_ITERATIONS, time.time()),
+    )
+    return cur.lastrowid
+
+def _import_legacy_users(conn: sqlite3.Connection) -> None:
+    # Dosya okunamazsa hiçbir şey işaretlenmez; bir sonraki açılışta yeniden denenir. Aktarım
+    # var olan kullanıcıları atladığından, önceki sürümün aktarıp bıraktığı dosya da güvenle işlenir.
+    if not os.path.exists(LEGACY_USER_DATA_FILE):
+        return
+    try:
+        with open(LEGACY_USER_DATA_FILE, "r", encoding="utf-8") as f:
+            legacy: Dict[str, Any] = json.load(f)
+        if not isinstance(legacy, dict):
+            raise ValueError("kullanıcı sözlüğü bekleniyordu")
+    except Exception as e:
+        print(f"Eski kullanıcı dosyası okunamadı, sonraki açılışta yeniden denenecek: {e}")
+        return
+    with conn:
+        for username, info in legacy.items():
+            if conn.execute("SELECT 1 FROM users WHERE username = ?", (username,)).fetchone():
+                continue
+            _insert_user(conn, username, str(info.get("password", "")))
+            for project_data in info.get("projects", []):
+                _save_project_revision(conn, username, project_data)
+        conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('legacy_imported', ?)", (str(time.time()),))
+    _retire_legacy_file(legacy)
+
+def _retire_legacy_file(legacy: Dict[str, Any]) -> None:
+    # Düz metin parolalar diskte bırakılmaz: dosya parolasız haliyle users.json.migrated olur
+    scrubbed = {username: {k: v for k, v in info.items() if k != "password"} if isinstance(info, dict) else info
+                for username, info in legacy.items()}
+    target = LEGACY_USER_DATA_FILE + ".migrated"
+    temp = target + ".tmp"
+    try:
+        with open(temp, "w", encoding="utf-8") as f:
+            json.dump(scrubbed, f, ensure_ascii=False, indent=4)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp, target)
+        os.remove(LEGACY_USER_DATA_FILE)
+    except OSError as e:
+        print(f"Eski kullanıcı dosyası kaldırılamadı, düz metin parolalar içeriyor ({LEGACY_USER_DATA_FILE}): {e}")
+
+def add_user(username: str, password: str) -> bool:
+    conn = _connect()
+    try:
+        with conn:
+            _insert_user(conn, username, password)
+        return True
+    except sqlite3.IntegrityError:
+        return False
+
+def validate_user(username: str, password: str) -> bool:
+    row = _connect().execute(
+        "SELECT salt, password_hash, iterations FROM users WHERE username = ?", (username,)
+    ).fetchone()
+    if row is None:
+        return False
+    candidate = _hash_password(password, row["salt"], row["iterations"])
+    return hmac.compare_digest(candidate, row["password_hash"])
+
+def _project_name(project_data: dict) -> Optional[str]:
+    name = project_data.get("name") if isinstance(project_data, dict) else None
+    return str(name) if name else None
+
+def _insert_unnamed_project(conn: sqlite3.Connection, user_id: int, now: float) -> int:
+    # Adsız proje her kayıtta yeni bir projedir ve satır numarasıyla adlandırılır ("Proje <id>");
+    # zaman damgası adı aynı saniyede kaydedilen projeleri (ör. eski içe aktarma) birleştiriyordu.
+    # Boş ad yalnızca bu yazma işlemi içinde geçici olarak kullanılır.
+    project_id = conn.execute(
+        "INSERT INTO projects (user_id, name, created_at, updated_at) VALUES (?, '', ?, ?)",
+        (user_id, now, now),
+    ).lastrowid
+    name, suffix = f"Proje {project_id}", 1
+    while conn.execute("SELECT 1 FROM projects WHERE user_id = ? AND name = ?", (user_id, name)).fetchone():
+        suffix += 1
+        name = f"Proje {project_id}-{suffix}"
+    conn.execute("UPDATE projects SET name = ? WHERE id = ?", (name, project_id))
+    return project_id
+
+def _save_project_revision(conn: sqlite3.Connection, username: str, project_data: dict) -> Optional[int]:
+    user = conn.execute("SELECT id FROM users WHERE username = ?", (username,)).fetchone()
+    if user is None:
+        return None
+    now = time.time()
+    name = _project_name(project_data)
+    if name is None:
+        project_id = _insert_unnamed_project(conn, user["id"], now)
+    else:
+        conn.execute(
+            "INSERT INTO projects (user_id, name, created_at, updated_at) VALUES (?, ?, ?, ?) "
+            "ON CONFLICT (user_id, name) DO UPDATE SET updated_at = excluded.updated_at",
+            (user["id"], name, now, now),
+        )
+        project_id = conn.execute(
+            "SELECT id FROM projects WHERE user_id = ? AND name = ?", (user["id"], name)
+        ).fetchone()["id"]
+    project = conn.execute("SELECT id, latest_revision FROM projects WHERE id = ?", (project_id,)).fetchone()
+    revision = project["latest_revision"] + 1
+    conn.execute(
+        "INSERT INTO project_revisions (project_id, revision, data, created_at) VALUES (?, ?, ?, ?)",
+        (project["id"], revision, json.dumps(project_data, ensure_ascii=False), now),
+    )
+    conn.execute("UPDATE projects SET latest_revision = ? WHERE id = ?", (revision, project["id"]))
+    return revision
+
+def add_project_for_user(username: str, project_data: dict) -> Optional[int]:
+    """
+    Projeyi adına göre yeni bir revizyon olarak kaydeder; revizyon numarasını döndürür.
+    """
+    conn = _connect()
+    with conn:
+        return _save_project_revision(conn, username, project_data)
+
+def list_projects(username: str, page_size: int = 20,
+                  cursor: Optional[Tuple[float, int]] = None) -> Tuple[List[Dict[str, Any]], Optional[Tuple[float, int]]]:
+    """
+    Kullanıcının projelerini son güncellenenden başlayarak sayfalar halinde listeler.
+    Dönen imleç bir sonraki sayfa için cursor olarak verilir; son sayfada None olur.
+    """
+    conn = _connect()
+    params: List[Any] = [username]
+    query = (
+        "SELECT p.id, p.name, p.latest_revision, p.created_at, p.updated_at "
+        "FROM projects p JOIN users u ON u.id = p.user_id WHERE u.username = ?"
+    )
+    if cursor is not None:
+        query += " AND (p.updated_at < ? OR (p.updated_at = ? AND p.id < ?))"
+        params.extend([cursor[0], cursor[0], cursor[1]])
+    query += " ORDER BY p.updated_at DESC, p.id DESC LIMIT ?"
+    params.append(page_size + 1)
+    rows = [dict(r) for r in conn.execute(query, params).fetchall()]
+    next_cursor = None
+    if len(rows) > page_size:
+        rows = rows[:page_size]
+        next_cursor = (rows[-1]["updated_at"], rows[-1]["id"])
+    return rows, next_cursor
+
+def get_project(username: str, name: str, revision: Optional[int] = None) -> Optional[dict]:
+    conn = _connect()
+    query = (
+        "SELECT r.data FROM project_revisions r "
+        "JOIN projects p ON p.id = r.project_id JOIN users u ON u.id = p.user_id "
+        "WHERE u.username = ? AND p.name = ? AND r.revision = "
+    )
+    if revision is None:
+        row = conn.execute(query + "p.latest_revision", (username, name)).fetchone()
+    else:
+        row = conn.execute(query + "?", (username, name, revision)).fetchone()
+    return json.loads(row["data"]) if row else None
+
+# Daha gelişmiş yetkilendirme, oturum yönetimi eklenebilir.
@@ -0,0 +1,251 @@
+import os
+import sqlite3
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Deque, Dict, Optional, Tuple
+
+from constants import DEFAULT_STOCK_LENGTH, DEFAULT_KERF, WATCH_INDEX_FILE
+
+# İzlenen uzantılar; raporlar girdinin yanına "<ad>_rapor.<uzantı>" olarak yazılır
+WATCH_EXTENSIONS = (".csv", ".json", ".kesim")
+REPORT_SUFFIX = "_rapor"
+REPORT_FORMATS = ("excel", "pdf", "json")
+
+Signature = Tuple[int, int]  # (boyut, mtime_ns)
+
+
+def _process_file(path: str, stock_length: int, kerf: int, stock_unit_price: float,
+                  options: Dict[str, Any], labels: Dict[str, Optional[str]]) -> Dict[str, Any]:
+    # İşçi süreçte çalışır: dosyayı okur, optimize eder ve raporları yazar
+    from export_jobs import EXPORT_FORMATS, ExportJob
+    from file_handlers import read_parts_file
+    from job_history import job_record
+    from optimization import optimize_parts
+
+    started_at = time.time()
+    parts = read_parts_file(path)
+    if not parts:
+        raise ValueError("Dosyada geçerli parça bulunamadı.")
+    result = optimize_parts(parts, stock_length, kerf, **options)
+    base = os.path.splitext(path)[0] + REPORT_SUFFIX
+    job = ExportJob(result, stock_unit_price, {fmt: base + EXPORT_FORMATS[fmt][0] for fmt in REPORT_FORMATS})
+    job.start().wait()
+    if job.errors:
+        raise RuntimeError("; ".join(f"{fmt}: {error}" for fmt, error in job.errors.items()))
+    elapsed_s = time.time() - started_at
+    return {
+        "started_at": started_at,
+        "elapsed_s": elapsed_s,
+        "pieces": sum(int(p["quantity"]) for p in parts),
+        "used_stocks": result["used_stocks"],
+        "reports": list(job.targets.values()),
+        # İş geçmişi kaydı burada çıkarılır; veritabanına yalnızca ana süreç yazar
+        "history": job_record(result, parts, stock_length, "watch", elapsed_s=elapsed_s, name=path,
+                              algorithm=options.get("algorithm"), **labels),
+    }
+
+
+class WatchFolder:
+    """
+    Sipariş klasörünü yoklar ve bırakılan parça dosyalarını otomatik optimize eder.
+
+    Dosya, boyutu ve değişiklik zamanı settle_s boyunca sabit kaldığında (yazımı bittiğinde)
+    hazır sayılır ve süreç havuzuna verilir. Havuzda en fazla workers + queue_size iş bulunur;
+    fazlası klasörde bekler. İşlenen dosyalar (yol, boyut, mtime) ile klasördeki SQLite
+    indeksine yazılır: yeniden başlatmada tamamlanan dosyalar atlanır, yarım kalanlar
+    yeniden işlenir, değişen dosya yeniden optimize edilir.
+    """
+
+    def __init__(self, directory: str, stock_length: int = DEFAULT_STOCK_LENGTH, kerf: int = DEFAULT_KERF,
+                 workers: int = 2, queue_size: int = 8, settle_s: float = 2.0, poll_s: float = 1.0,
+                 stock_unit_price: float = 1.0, index_path: Optional[str] = None,
+                 history_path: Optional[str] = None, profile: Optional[str] = None,
+                 customer: Optional[str] = None, log: Callable[[str], None] = print, **options):
+        if not os.path.isdir(directory):
+            raise ValueError(f"Klasör bulunamadı: {directory}")
+        self.directory = directory
+        self.stock_length = stock_length
+        self.kerf = kerf
+        self.workers = workers
+        self.queue_size = queue_size
+        self.settle_s = settle_s
+        self.poll_s = poll_s
+        self.stock_unit_price = stock_unit_price
+        self.options = options
+        self.labels = {"profile": profile, "customer": customer}
+        self.log = log
+        # history_path verilirse işlenen her dosya iş geçmişine (job_history.py) yazılır
+        self._history = None
+        if history_path is not None:
+            from job_history import JobHistory
+            self._history = JobHistory(history_path)
+
+        self._conn = sqlite3.connect(index_path or os.path.join(directory, WATCH_INDEX_FILE))
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS processed (
+                path TEXT PRIMARY KEY,
+                size INTEGER NOT NULL,
+                mtime_ns INTEGER NOT NULL,
+                status TEXT NOT NULL,
+                ready_at REAL,
+                finished_at REAL,
+                used_stocks INTEGER,
+                error TEXT
+            )
+        """)
+        self._conn.commit()
+        # İndeksin bellekteki kopyası: her yoklamada dosya başına sorgu yapılmaz
+        self._index: Dict[str, Tuple[Signature, str]] = {
+            path: ((size, mtime_ns), status)
+            for path, size, mtime_ns, status in self._conn.execute(
+                "SELECT path, size, mtime_ns, status FROM processed")
+        }
+
+        # Yazımı süren dosyalar: yol -> (imza, imzanın ilk görüldüğü an)
+        self._settling: Dict[str, Tuple[Signature, float]] = {}
+        # Hazır olup havuza verilmeyi bekleyenler (FIFO)
+        self._ready: Deque[Tuple[str, Signature, float]] = deque()
+        self._in_flight: Dict[Any, Tuple[str, Signature, float]] = {}
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._started_at = time.time()
+        self.totals = {"done": 0, "failed": 0, "pieces": 0}
+        self._latencies: Deque[float] = deque(maxlen=1000)
+        self._durations: Deque[float] = deque(maxlen=1000)
+
+    # ---- İndeks ----
+
+    def _indexed(self, path: str, signature: Signature) -> bool:
+        entry = self._index.get(path)
+        # Hatalı dosya değişmedikçe yeniden denenmez; "queued" kalmışsa önceki çalışma yarıda kesilmiştir
+        return entry is not None and entry[0] == signature and entry[1] in ("done", "failed")
+
+    def _record(self, path: str, signature: Signature, status: str, ready_at: float,
+                used_stocks: Optional[int] = None, error: Optional[str] = None) -> None:
+        with self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO processed (path, size, mtime_ns, status, ready_at, finished_at, "
+                "used_stocks, error) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (path, signature[0], signature[1], status, ready_at,
+                 None if status == "queued" else time.time(), used_stocks, error),
+            )
+        self._index[path] = (signature, status)
+
+    # ---- Yoklama ----
+
+    def _candidates(self):
+        with os.scandir(self.directory) as entries:
+            for entry in entries:
+                name = entry.name
+                stem, ext = os.path.splitext(name)
+                if (name.startswith(".") or ext.lower() not in WATCH_EXTENSIONS
+                        or stem.endswith(REPORT_SUFFIX) or not entry.is_file()):
+                    continue
+                stat = entry.stat()
+                yield entry.path, (stat.st_size, stat.st_mtime_ns)
+
+    def scan(self) -> None:
+        now = time.time()
+        busy = {path for path, _sig, _ready in self._in_flight.values()}
+        busy.update(path for path, _sig, _ready in self._ready)
+        seen = set()
+        for path, signature in self._candidates():
+            seen.add(path)
+            if path in busy or signature[0] == 0 or self._indexed(path, signature):
+                continue
+            settling = self._settling.get(path)
+            if settling is None or settling[0] != signature:
+                self._settling[path] = (signature, now)
+            elif now - settling[1] >= self.settle_s:
+                del self._settling[path]
+                self._ready.append((path, signature, now))
+        for path in list(self._settling):
+            if path not in seen:
+                del self._settling[path]
+
+    def _collect(self) -> None:
+        for future in [f for f in self._in_flight if f.done()]:
+            path, signature, ready_at = self._in_flight.pop(future)
+            name = os.path.basename(path)
+            try:
+                info = future.result()
+            except Exception as e:
+                self.totals["failed"] += 1
+                self._record(path, signature, "failed", ready_at, error=str(e))
+                self.log(f"HATA {name}: {e}")
+                continue
+            latency = max(0.0, info["started_at"] - ready_at)
+            self._latencies.append(latency)
+            self._durations.append(info["elapsed_s"])
+            self.totals["done"] += 1
+            self.totals["pieces"] += info["pieces"]
+            self._record(path, signature, "done", ready_at, used_stocks=info["used_stocks"])
+            if self._history is not None:
+                self._history.add(info["history"])
+            self.log(f"{name}: {info['used_stocks']} stok, kuyrukta {latency:.1f} s, "
+                     f"işlem {info['elapsed_s']:.1f} s")
+
+    def _submit(self) -> None:
+        while self._ready and len(self._in_flight) < self.workers + self.queue_size:
+            path, signature, ready_at = self._ready.popleft()
+            self._record(path, signature, "queued", ready_at)
+            future = self._pool.submit(_process_file, path, self.stock_length, self.kerf,
+                                       self.stock_unit_price, self.options, self.labels)
+            self._in_flight[future] = (path, signature, ready_at)
+
+    def poll(self) -> None:
+        self._collect()
+        self.scan()
+        self._submit()
+
+    @property
+    def idle(self) -> bool:
+        return not (self._settling or self._ready or self._in_flight)
+
+    def stats(self) -> Dict[str, Any]:
+        elapsed = max(time.time() - self._started_at, 1e-9)
+        latencies = sorted(self._latencies)
+        return {
+            **self.totals,
+            "in_flight": len(self._in_flight),
+            "waiting": len(self._ready),
+            "settling": len(self._settling),
+            "files_per_min": self.totals["done"] * 60 / elapsed,
+            "pieces_per_s": self.totals["pieces"] / elapsed,
+            "queue_latency_avg_s": sum(latencies) / len(latencies) if latencies else 0.0,
+            "queue_latency_max_s": latencies[-1] if latencies else 0.0,
+            "processing_avg_s": sum(self._durations) / len(self._durations) if self._durations else 0.0,
+        }
+
+    def run(self, once: bool = False, stats_every_s: float = 60.0) -> None:
+        """
+        Klasörü yoklar; once=True ise mevcut dosyalar işlenince döner.
+        """
+        self._pool = ProcessPoolExecutor(max_workers=self.workers)
+        last_stats = time.time()
+        try:
+            while True:
+                self.poll()
+                if once and self.idle:
+                    break
+                if time.time() - last_stats >= stats_every_s:
+                    self.log(format_stats(self.stats()))
+                    last_stats = time.time()
+                time.sleep(self.poll_s)
+        finally:
+            self._pool.shutdown(wait=True, cancel_futures=True)
+            self._pool = None
+            # Yarıda kalan dosyalar indekste "queued" kalır ve sonraki çalıştırmada yeniden işlenir
+
+    def close(self) -> None:
+        self._conn.close()
+        if self._history is not None:
+            self._history.close()
+
+
+def format_stats(stats: Dict[str, Any]) -> str:
+    return (f"İşlenen {stats['done']} dosya ({stats['failed']} hatalı), "
+            f"{stats['files_per_min']:.1f} dosya/dk, {stats['pieces_per_s']:.0f} parça/s, "
+            f"kuyruk gecikmesi ort. {stats['queue_latency_avg_s']:.1f} s / en fazla "
+            f"{stats['queue_latency_max_s']:.1f} s, bekleyen {stats['waiting'] + stats['in_flight']}")